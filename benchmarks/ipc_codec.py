@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+IPC codec benchmark: bytes and encode + decode time per round trip at several payload sizes
+
+Compares the original indent=2 JSON with the codecs in src/utils/file_operations.py:
+compact stdlib JSON, orjson and msgpack (the last two only when installed). Payloads are
+a trigger carrying a large context string and a response carrying a base64 image.
+
+Usage: python benchmarks/ipc_codec.py [--sizes 1,64,1024,8192] [--repeats 20]
+"""
+
+import argparse
+import base64
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.constants import CodecConfig  # noqa: E402
+from src.utils.file_operations import decode_payload, encode_payload, msgpack, orjson  # noqa: E402
+
+
+def legacy_round_trip(data):
+    raw = json.dumps(data, indent=2).encode()
+    json.loads(raw.decode())
+    return raw
+
+
+def codec_round_trip(wire_format: str, use_orjson: bool):
+    def round_trip(data):
+        CodecConfig.USE_ORJSON = use_orjson
+        raw = encode_payload(data, wire_format)
+        decode_payload(raw)
+        return raw
+
+    return round_trip
+
+
+def payloads(size_kb: int) -> dict[str, dict]:
+    text = ("def handler(request):\n    return render(request, 'page.html', {'items': items})\n" * (size_kb * 16))[: size_kb * 1024]
+    image = base64.b64encode(os.urandom(size_kb * 1024 * 3 // 4)).decode()
+    trigger = {
+        "timestamp": "2025-01-01T00:00:00",
+        "system": "cursor-enhancer",
+        "data": {"tool": "cursor_enhancer_chat", "message": "Review this change", "context": text, "trigger_id": "review_1"},
+    }
+    response = {
+        "trigger_id": "review_1",
+        "user_input": "Looks good, see screenshot",
+        "attachments": [{"fileName": "shot.png", "mimeType": "image/png", "base64Data": image}],
+    }
+    return {"trigger": trigger, "response": response}
+
+
+def measure(round_trip, data, repeats: int) -> tuple[float, int]:
+    samples = []
+    raw = b""
+    for _ in range(repeats):
+        start = time.perf_counter()
+        raw = round_trip(data)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), len(raw)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1,64,1024,8192", help="comma-separated payload sizes in KB")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    codecs = {"json indent=2 (old)": legacy_round_trip, "json compact": codec_round_trip("json", False)}
+    if orjson is not None:
+        codecs["orjson"] = codec_round_trip("json", True)
+    if msgpack is not None:
+        codecs["msgpack"] = codec_round_trip("msgpack", True)
+
+    print(f"{'payload':>18} {'codec':>20} {'bytes':>12} {'round trip':>12}")
+    for size_kb in (int(s) for s in args.sizes.split(",")):
+        for kind, data in payloads(size_kb).items():
+            for name, round_trip in codecs.items():
+                seconds, size = measure(round_trip, data, args.repeats)
+                print(f"{f'{kind} {size_kb}KB':>18} {name:>20} {size:>12,} {seconds * 1000:>10.3f}ms")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Event loop lag benchmark: reading image-heavy response files on the loop vs on the I/O executor
+
+Writes --reviews response files, each carrying a base64 image of --size MB, then reads and parses
+them all concurrently through IpcFileCache, once directly in coroutines (how ResponseManager used
+to read them) and once through IoExecutor. A LoopLagMonitor sampling every millisecond reports
+how long every other coroutine would have waited meanwhile.
+
+Usage: python benchmarks/loop_lag.py [--reviews 8] [--size 4] [--rounds 3] [--workers 2]
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.constants import IoConfig  # noqa: E402
+from src.utils.io_executor import IoExecutor  # noqa: E402
+from src.utils.ipc_file_cache import IpcFileCache  # noqa: E402
+from src.utils.loop_lag_monitor import LoopLagMonitor  # noqa: E402
+
+
+def write_responses(directory: str, reviews: int, size_mb: int) -> list[str]:
+    paths = []
+    for i in range(reviews):
+        image = base64.b64encode(os.urandom(size_mb * 1024 * 1024)).decode()
+        attachment = {"fileName": f"shot_{i}.png", "mimeType": "image/png", "base64Data": image}
+        path = os.path.join(directory, f"cursor_enhancer_response_review_{i}.json")
+        with open(path, "w") as f:
+            json.dump({"trigger_id": f"review_{i}", "user_input": "see screenshot", "attachments": [attachment]}, f)
+        paths.append(path)
+    return paths
+
+
+async def measure(paths: list[str], rounds: int, io_executor: IoExecutor | None) -> tuple[dict, float]:
+    monitor = LoopLagMonitor(interval=0.001)
+    monitor_task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0.01)
+
+    async def read(path: str) -> None:
+        # A fresh cache per read: every round parses the files again, as new answers would be
+        cache = IpcFileCache()
+        if io_executor is None:
+            await asyncio.sleep(0)
+            cache.read_response(path)
+        else:
+            await io_executor.run("read_response", cache.read_response, path)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await asyncio.gather(*(read(path) for path in paths))
+    elapsed = time.perf_counter() - start
+
+    await asyncio.sleep(0.01)
+    monitor_task.cancel()
+    return monitor.get_stats(), elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reviews", type=int, default=8, help="concurrent responses per round")
+    parser.add_argument("--size", type=int, default=4, help="image size in MB")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=IoConfig.MAX_WORKERS, help="I/O executor threads")
+    args = parser.parse_args()
+    IoConfig.MAX_WORKERS = args.workers
+
+    with tempfile.TemporaryDirectory(prefix="cursor-enhancer-lag-") as directory:
+        paths = write_responses(directory, args.reviews, args.size)
+        io_executor = IoExecutor()
+        results = {"on the loop": await measure(paths, args.rounds, None), "I/O executor": await measure(paths, args.rounds, io_executor)}
+        io_executor.shutdown()
+
+    print(f"{args.reviews} x {args.size}MB responses, {args.rounds} rounds, {args.workers} I/O threads")
+    print(f"{'reads':>14} {'total':>10} {'lag p99':>10} {'lag max':>10} {'stalls':>7}")
+    for name, (stats, elapsed) in results.items():
+        print(f"{name:>14} {elapsed * 1000:>8.0f}ms {stats['p99_ms']:>8.1f}ms {stats['max_ms']:>8.1f}ms {stats['stalls']:>7}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Loopback benchmark: stdio vs streamable HTTP transport for large image responses
+
+Starts the server once per transport with every artificial delay set to zero and a
+private IPC directory, answers each cursor_enhancer_chat popup from an in-process fake
+extension with a random image of the requested size, and reports per-call latency as
+seen by the MCP client, including reading images returned as resource links. The IPC round trip is identical for both transports, so the
+difference between the columns is the cost of moving the response over the transport.
+
+Usage: python benchmarks/transport_loopback.py [--sizes 1,4,16] [--repeats 5]
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import time
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_SCRIPT = os.path.join(ROOT, "cursor_enhancer_mcp.py")
+
+
+def server_env(base_dir: str, namespace: str, port: int) -> dict[str, str]:
+    env = dict(os.environ)
+    env.update(
+        {
+            "CURSOR_ENHANCER_IPC__MODE": "instance",
+            "CURSOR_ENHANCER_IPC__BASE_DIR": base_dir,
+            "CURSOR_ENHANCER_IPC__NAMESPACE": namespace,
+            "CURSOR_ENHANCER_HTTP__PORT": str(port),
+            "CURSOR_ENHANCER_TIMEOUTS__PROCESSING_DELAY": "0",
+            "CURSOR_ENHANCER_TRIGGER__PRE_WRITE_DELAY": "0",
+            "CURSOR_ENHANCER_TRIGGER__POST_WRITE_DELAY": "0",
+            "CURSOR_ENHANCER_TRIGGER__SYNC_RETRY_DELAY": "0",
+        }
+    )
+    return env
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class FakeExtension:
+    """Publishes presence, acknowledges every trigger and answers it with an image of image_bytes"""
+
+    def __init__(self, ipc_dir: str):
+        self.ipc_dir = ipc_dir
+        self.image_bytes = 0
+
+    def _write(self, name: str, data: dict) -> None:
+        tmp = os.path.join(self.ipc_dir, f".{name}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, os.path.join(self.ipc_dir, name))
+
+    async def run(self) -> None:
+        os.makedirs(self.ipc_dir, mode=0o700, exist_ok=True)
+        trigger_file = os.path.join(self.ipc_dir, "cursor_enhancer_trigger.json")
+        while True:
+            self._write(f"cursor_enhancer_presence_{os.getpid()}.json", {"pid": os.getpid(), "workspace": ROOT, "protocol_version": 1})
+            try:
+                with open(trigger_file) as f:
+                    trigger = json.load(f)
+                os.unlink(trigger_file)
+            except (FileNotFoundError, json.JSONDecodeError):
+                await asyncio.sleep(0.005)
+                continue
+
+            trigger_id = trigger["data"]["trigger_id"]
+            self._write(f"cursor_enhancer_ack_{trigger_id}.json", {"trigger_id": trigger_id, "acknowledged": True})
+            image = base64.b64encode(os.urandom(self.image_bytes)).decode()
+            attachment = {"fileName": "bench.png", "mimeType": "image/png", "base64Data": image}
+            self._write(
+                f"cursor_enhancer_response_{trigger_id}.json",
+                {"trigger_id": trigger_id, "user_input": "looks good", "attachments": [attachment]},
+            )
+
+
+async def measure(session: ClientSession, extension: FakeExtension, label: str, sizes: list[int], repeats: int) -> dict[int, float]:
+    await session.initialize()
+    medians = {}
+    for size_mb in sizes:
+        extension.image_bytes = size_mb * 1024 * 1024
+        samples = []
+        for i in range(repeats):
+            # Distinct messages so coalescing and the answer policy never short-circuit a call
+            args = {"message": f"{label} {size_mb}MB #{i} {time.time_ns()}"}
+            start = time.perf_counter()
+            result = await session.call_tool("cursor_enhancer_chat", args)
+            # Images the server returns as resource links are read too, as a client showing them would
+            links = [item for item in result.content if item.type == "resource_link"]
+            for link in links:
+                await session.read_resource(link.uri)
+            samples.append(time.perf_counter() - start)
+            if not links and not any(item.type == "image" for item in result.content):
+                raise RuntimeError(f"{label}: no image in response: {result.content[0].text[:200]}")
+        medians[size_mb] = statistics.median(samples)
+    return medians
+
+
+async def bench_stdio(env: dict[str, str], extension: FakeExtension, sizes: list[int], repeats: int) -> dict[int, float]:
+    params = StdioServerParameters(command=sys.executable, args=[SERVER_SCRIPT], env=env, cwd=ROOT)
+    with open(os.devnull, "w") as errlog:
+        async with stdio_client(params, errlog=errlog) as (read, write), ClientSession(read, write) as session:
+            return await measure(session, extension, "stdio", sizes, repeats)
+
+
+async def bench_http(env: dict[str, str], port: int, extension: FakeExtension, sizes: list[int], repeats: int) -> dict[int, float]:
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, SERVER_SCRIPT, "--http", env=env, cwd=ROOT, stderr=asyncio.subprocess.DEVNULL
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                _, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("HTTP server did not start") from None
+                await asyncio.sleep(0.1)
+
+        with open(os.path.join(env["CURSOR_ENHANCER_IPC__BASE_DIR"], "http_token")) as f:
+            headers = {"Authorization": f"Bearer {f.read().strip()}"}
+        async with (
+            streamablehttp_client(f"http://127.0.0.1:{port}/mcp", headers=headers) as (read, write, _),
+            ClientSession(read, write) as session,
+        ):
+            return await measure(session, extension, "http", sizes, repeats)
+    finally:
+        process.terminate()
+        await process.wait()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1,4,16", help="comma-separated image sizes in MB")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="cursor-enhancer-bench-") as base_dir:
+        for transport in ("stdio", "http"):
+            # Each server gets its own IPC directory: an instance-mode server removes its directory on exit
+            port = free_port()
+            env = server_env(base_dir, transport, port)
+            extension = FakeExtension(os.path.join(base_dir, transport))
+            extension_task = asyncio.create_task(extension.run())
+            try:
+                if transport == "stdio":
+                    results[transport] = await bench_stdio(env, extension, sizes, args.repeats)
+                else:
+                    results[transport] = await bench_http(env, port, extension, sizes, args.repeats)
+            finally:
+                extension_task.cancel()
+    stdio, http = results["stdio"], results["http"]
+
+    print(f"{'image':>8} {'stdio':>10} {'http':>10}  (median of {args.repeats} calls)")
+    for size_mb in sizes:
+        print(f"{size_mb:>6}MB {stdio[size_mb] * 1000:>8.1f}ms {http[size_mb] * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -42,6 +42,12 @@ function activate(context) {
         handleImageUpload(triggerId);
     };
 
+    popupManager.handleStatusUpdate = (triggerId, state) => {
+        if (triggerId) {
+            fileWatcher.writeStatusFile(triggerId, state);
+        }
+    };
+
     // Silent activation - only log to console, not output channel
     console.log(
         'Cursor Enhancer extension activated for Cursor MCP integration by Lakshman Turlapati'
@@ -61,6 +67,13 @@ function activate(context) {
     fileWatcher.startMcpStatusMonitoring(context);
     fileWatcher.startCursorEnhancerIntegration(context);
 
+    // Publish presence so MCP servers know a popup can appear
+    const workspaceFolders = vscode.workspace.workspaceFolders;
+    fileWatcher.startPresencePublishing(
+        context,
+        workspaceFolders && workspaceFolders.length > 0 ? workspaceFolders[0].uri.fsPath : null
+    );
+
     // Show activation notification
     vscode.window.showInformationMessage(
         'Cursor Enhancer activated! Use Ctrl+Shift+R to open manually.'
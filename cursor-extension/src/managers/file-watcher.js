@@ -1,9 +1,190 @@
+const crypto = require('crypto');
 const fs = require('fs');
+const os = require('os');
 const path = require('path');
+const zlib = require('zlib');
+
+// Shared IPC directory, also home of the host-wide log files
+const SHARED_IPC_DIR = '/tmp';
 
 // Linux temp directory helper
 function getTempPath(filename) {
-    return path.join('/tmp', filename);
+    return path.join(SHARED_IPC_DIR, filename);
+}
+
+// IPC protocol version advertised in the presence record
+const PROTOCOL_VERSION = 1;
+const PRESENCE_INTERVAL_MS = 5000;
+const MAX_TRACKED_TRIGGERS = 100;
+const MAX_CONTEXT_SESSIONS = 32;
+
+// Optional protocol features this extension understands, advertised in the presence record
+const FEATURES = ['context_delta'];
+
+// Payload formats this extension reads, advertised so the server only writes one of them.
+// Formats other than JSON start with a header line: "#cursor-enhancer-ipc <format>/<version>\n"
+const WIRE_FORMATS = ['json'];
+const WIRE_HEADER_PREFIX = '#cursor-enhancer-ipc ';
+
+function decodePayload(text) {
+    if (!text.startsWith(WIRE_HEADER_PREFIX)) {
+        return JSON.parse(text);
+    }
+    const newline = text.indexOf('\n');
+    const [format, version] = text.slice(WIRE_HEADER_PREFIX.length, newline < 0 ? undefined : newline).split('/');
+    if (newline < 0 || format !== 'json' || Number(version) > 1) {
+        throw new Error(`Unsupported IPC payload format: ${format}/${version}`);
+    }
+    return JSON.parse(text.slice(newline + 1));
+}
+
+// A large context arrives as context_ref, pointing at a side file next to the trigger. Expose it as a
+// lazy toolData.context so the body is only read, unzipped and hash-checked when something renders it.
+function attachSpilledContext(toolData, ipcDir) {
+    const ref = toolData.context_ref;
+    if (!ref || !ref.file || path.basename(ref.file) !== ref.file) {
+        return;
+    }
+    let cached = null;
+    Object.defineProperty(toolData, 'context', {
+        configurable: true,
+        enumerable: false,
+        get() {
+            if (cached === null) {
+                try {
+                    let body = fs.readFileSync(path.join(ipcDir, ref.file));
+                    if (ref.encoding === 'gzip') {
+                        body = zlib.gunzipSync(body);
+                    }
+                    const digest = crypto.createHash('sha256').update(body).digest('hex');
+                    if (digest !== ref.sha256) {
+                        throw new Error(`hash mismatch for ${ref.file}`);
+                    }
+                    cached = body.toString('utf8');
+                } catch (error) {
+                    console.error(`Failed to load spilled context: ${error.message}`);
+                    cached = '';
+                }
+            }
+            return cached;
+        }
+    });
+}
+
+// Text handed to ingest_text arrives as text_ref: a side file next to the trigger plus the [offset, length]
+// of each page. Give toolData a readTextPage(n) that reads one page, so the popup never loads the whole text.
+function attachIngestedText(toolData, ipcDir) {
+    const ref = toolData.text_ref;
+    if (!ref || !ref.file || path.basename(ref.file) !== ref.file || !Array.isArray(ref.pages)) {
+        return;
+    }
+    // Enumerable, so it survives the popup's copy of toolData
+    toolData.readTextPage = page => {
+        const [offset, length] = ref.pages[page] || [0, 0];
+        const buffer = Buffer.alloc(length);
+        let fd = null;
+        try {
+            fd = fs.openSync(path.join(ipcDir, ref.file), 'r');
+            const read = fs.readSync(fd, buffer, 0, length, offset);
+            return buffer.toString('utf8', 0, read);
+        } catch (error) {
+            console.error(`Failed to read ingested text: ${error.message}`);
+            return '';
+        } finally {
+            if (fd !== null) {
+                fs.closeSync(fd);
+            }
+        }
+    };
+}
+
+function sha256(text) {
+    return crypto.createHash('sha256').update(text, 'utf8').digest('hex');
+}
+
+// A context_delta lists [start, end, replacement lines] edits over the base context split on '\n', in order.
+// Returns null for edits that do not fit the base.
+function applyContextDelta(base, ops) {
+    const lines = base.split('\n');
+    const result = [];
+    let position = 0;
+    for (const [start, end, replacement] of ops) {
+        if (start < position || end < start || end > lines.length) {
+            return null;
+        }
+        for (let i = position; i < start; i++) {
+            result.push(lines[i]);
+        }
+        for (const line of replacement) {
+            result.push(line);
+        }
+        position = end;
+    }
+    for (let i = position; i < lines.length; i++) {
+        result.push(lines[i]);
+    }
+    return result.join('\n');
+}
+
+// Root of private per-server IPC directories, mirroring get_ipc_base_dir() on the server
+function getIpcBaseDir() {
+    const runtimeDir = process.env.XDG_RUNTIME_DIR;
+    if (runtimeDir && fs.existsSync(runtimeDir)) {
+        return path.join(runtimeDir, 'cursor-enhancer');
+    }
+    return path.join(SHARED_IPC_DIR, `cursor-enhancer-${os.userInfo().uid}`);
+}
+
+function isPidAlive(pid) {
+    try {
+        process.kill(pid, 0);
+        return true;
+    } catch (error) {
+        return error.code === 'EPERM';
+    }
+}
+
+function realPath(p) {
+    try {
+        return fs.realpathSync(p);
+    } catch (error) {
+        return path.resolve(p);
+    }
+}
+
+// IPC directories this window serves: the shared one plus every running server
+// registered for this workspace or for no workspace at all
+function discoverIpcDirs(workspacePath) {
+    const dirs = [SHARED_IPC_DIR];
+    const registryDir = path.join(getIpcBaseDir(), 'instances');
+    let names = [];
+    try {
+        names = fs.readdirSync(registryDir);
+    } catch (error) {
+        return dirs;
+    }
+
+    const workspace = workspacePath ? realPath(workspacePath) : null;
+    for (const name of names) {
+        if (!name.endsWith('.json')) {
+            continue;
+        }
+        try {
+            const record = JSON.parse(fs.readFileSync(path.join(registryDir, name), 'utf8'));
+            if (!record.ipc_dir || !isPidAlive(record.pid)) {
+                continue;
+            }
+            if (record.workspace && workspace && record.workspace !== workspace) {
+                continue;
+            }
+            if (!dirs.includes(record.ipc_dir)) {
+                dirs.push(record.ipc_dir);
+            }
+        } catch (error) {
+            // Record mid-replace; the next discovery pass picks it up
+        }
+    }
+    return dirs;
 }
 
 class FileWatcher {
@@ -13,6 +194,68 @@ class FileWatcher {
         this.currentTriggerData = null;
         this.mcpStatus = false;
         this.statusCheckInterval = null;
+        this.presenceInterval = null;
+        this.presenceFileName = `cursor_enhancer_presence_${process.pid}.json`;
+        // IPC directories served by this window, and the one each trigger came from
+        this.ipcDirs = [SHARED_IPC_DIR];
+        this.triggerDirs = new Map();
+        // Last context of each review session, the base the server's next delta applies to
+        this.sessionContexts = new Map();
+    }
+
+    ipcPath(triggerId, filename) {
+        return path.join(this.triggerDirs.get(triggerId) || SHARED_IPC_DIR, filename);
+    }
+
+    startPresencePublishing(context, workspacePath) {
+        // Tell MCP servers a popup can appear; they fail fast when no fresh record exists.
+        // Each pass also rediscovers private IPC directories of servers started since.
+        const publish = () => {
+            this.ipcDirs = discoverIpcDirs(workspacePath);
+            this.ipcDirs.forEach(dir => this.writePresence(dir, workspacePath));
+        };
+        publish();
+        this.presenceInterval = setInterval(publish, PRESENCE_INTERVAL_MS);
+
+        context.subscriptions.push({
+            dispose: () => this.stopPresencePublishing()
+        });
+    }
+
+    writePresence(ipcDir, workspacePath) {
+        try {
+            const presenceData = {
+                pid: process.pid,
+                workspace: workspacePath || null,
+                protocol_version: PROTOCOL_VERSION,
+                wire_formats: WIRE_FORMATS,
+                features: FEATURES,
+                last_seen: new Date().toISOString(),
+                extension: 'cursor-enhancer'
+            };
+            // Write then rename so the server never reads a half-written record
+            const tmpFile = path.join(ipcDir, `.cursor_enhancer_presence_${process.pid}.json.tmp`);
+            fs.writeFileSync(tmpFile, JSON.stringify(presenceData));
+            fs.renameSync(tmpFile, path.join(ipcDir, this.presenceFileName));
+        } catch (error) {
+            console.error(`Failed to publish presence in ${ipcDir}: ${error.message}`);
+        }
+    }
+
+    stopPresencePublishing() {
+        if (this.presenceInterval) {
+            clearInterval(this.presenceInterval);
+            this.presenceInterval = null;
+        }
+        this.ipcDirs.forEach(dir => {
+            try {
+                fs.unlinkSync(path.join(dir, this.presenceFileName));
+            } catch (error) {
+                if (error.code !== 'ENOENT') {
+                    console.error(`Failed to remove presence record: ${error.message}`);
+                }
+            }
+        });
     }
 
     startCursorEnhancerIntegration(context) {
@@ -26,14 +269,19 @@ class FileWatcher {
 
         // Use polling approach for better reliability
         const pollInterval = setInterval(() => {
-            // Check main trigger file
-            this.checkTriggerFile(context, triggerFilePath);
+            this.ipcDirs.forEach(dir => {
+                // Check main trigger file
+                this.checkTriggerFile(context, path.join(dir, 'review_gate_trigger.json'), dir);
+
+                // Check backup trigger files
+                for (let i = 0; i < 3; i++) {
+                    const backupTriggerPath = path.join(dir, `review_gate_trigger_${i}.json`);
+                    this.checkTriggerFile(context, backupTriggerPath, dir);
+                }
+            });
 
-            // Check backup trigger files
-            for (let i = 0; i < 3; i++) {
-                const backupTriggerPath = getTempPath(`review_gate_trigger_${i}.json`);
-                this.checkTriggerFile(context, backupTriggerPath);
-            }
+            // Close the popup if the MCP call behind it was cancelled
+            this.checkCancelSignal();
         }, 250); // Check every 250ms for better performance
 
         // Store the interval for cleanup
@@ -56,11 +304,11 @@ class FileWatcher {
         console.log('Cursor Enhancer MCP integration ready!');
     }
 
-    checkTriggerFile(context, filePath) {
+    checkTriggerFile(context, filePath, ipcDir = SHARED_IPC_DIR) {
         try {
             if (fs.existsSync(filePath)) {
                 const data = fs.readFileSync(filePath, 'utf8');
-                const triggerData = JSON.parse(data);
+                const triggerData = decodePayload(data);
 
                 // Check if this is for Cursor and Cursor Enhancer
                 if (triggerData.editor && triggerData.editor !== 'cursor') {
@@ -75,8 +323,16 @@ class FileWatcher {
 
                 // Store current trigger data for response handling
                 this.currentTriggerData = triggerData.data;
-
-                this.handleCursorEnhancerToolCall(context, triggerData.data);
+                this.rememberTriggerDir(triggerData.data.trigger_id, ipcDir);
+                attachSpilledContext(triggerData.data, ipcDir);
+                attachIngestedText(triggerData.data, ipcDir);
+
+                if (this.resolveSessionContext(triggerData.data)) {
+                    this.handleCursorEnhancerToolCall(context, triggerData.data);
+                } else {
+                    // The server answers with a trigger carrying the whole context
+                    this.requestContextResync(triggerData.data.trigger_id);
+                }
 
                 // Clean up trigger file immediately
                 try {
@@ -92,12 +348,102 @@ class FileWatcher {
         }
     }
 
+    rememberTriggerDir(triggerId, ipcDir) {
+        // Acks, status and responses go back to the directory the trigger came from
+        if (!triggerId) {
+            return;
+        }
+        this.triggerDirs.delete(triggerId);
+        this.triggerDirs.set(triggerId, ipcDir);
+        if (this.triggerDirs.size > MAX_TRACKED_TRIGGERS) {
+            this.triggerDirs.delete(this.triggerDirs.keys().next().value);
+        }
+    }
+
+    resolveSessionContext(toolData) {
+        // Rebuild a delta against this session's last context and remember the result as the next base.
+        // Returns false when the base is missing or the rebuilt context does not match the server's hash.
+        const session = toolData.context_session;
+        if (session === undefined) {
+            return true;
+        }
+
+        let entry;
+        const delta = toolData.context_delta;
+        if (delta) {
+            const base = this.sessionContexts.get(session);
+            if (!base || base.sha256 !== delta.base) {
+                console.log(`No base context for session ${session}, requesting the whole context`);
+                return false;
+            }
+            const text = applyContextDelta(base.text(), delta.ops);
+            if (text === null || sha256(text) !== delta.sha256) {
+                console.log(`Context delta for session ${session} did not apply, requesting the whole context`);
+                return false;
+            }
+            toolData.context = text;
+            entry = { sha256: delta.sha256, text: () => text };
+        } else if (toolData.context_ref) {
+            // Spilled contexts stay lazy: the side file is only read if a later delta needs it
+            entry = { sha256: toolData.context_ref.sha256, text: () => toolData.context };
+        } else {
+            const text = toolData.context || '';
+            entry = { sha256: sha256(text), text: () => text };
+        }
+
+        toolData.context_sha256 = entry.sha256;
+        this.sessionContexts.delete(session);
+        this.sessionContexts.set(session, entry);
+        if (this.sessionContexts.size > MAX_CONTEXT_SESSIONS) {
+            this.sessionContexts.delete(this.sessionContexts.keys().next().value);
+        }
+        return true;
+    }
+
+    requestContextResync(triggerId) {
+        try {
+            const resyncData = {
+                timestamp: new Date().toISOString(),
+                trigger_id: triggerId,
+                acknowledged: false,
+                context_resync: true,
+                extension: 'review-gate-v2'
+            };
+            fs.writeFileSync(this.ipcPath(triggerId, `review_gate_ack_${triggerId}.json`), JSON.stringify(resyncData));
+        } catch (error) {
+            console.error(`Failed to request context resync: ${error.message}`);
+        }
+    }
+
+    checkCancelSignal() {
+        const triggerData = this.popupManager && this.popupManager.currentTriggerData;
+        if (!triggerData || !triggerData.trigger_id) {
+            return;
+        }
+
+        const cancelFile = this.ipcPath(
+            triggerData.trigger_id,
+            `cursor_enhancer_cancel_${triggerData.trigger_id}.json`
+        );
+        try {
+            if (fs.existsSync(cancelFile)) {
+                fs.unlinkSync(cancelFile);
+                console.log(`MCP call cancelled, closing popup: ${triggerData.trigger_id}`);
+                if (this.popupManager.chatPanel) {
+                    this.popupManager.chatPanel.dispose();
+                }
+            }
+        } catch (error) {
+            console.log(`Error handling cancel signal: ${error.message}`);
+        }
+    }
+
     handleCursorEnhancerToolCall(context, toolData) {
         console.log(`Handling Cursor Enhancer tool call: ${toolData.tool}`);
 
         // Send extension acknowledgement
         if (toolData.trigger_id) {
-            this.sendExtensionAcknowledgement(toolData.trigger_id, toolData.tool);
+            this.sendExtensionAcknowledgement(toolData.trigger_id, toolData.tool, toolData.context_sha256);
         }
 
         // Determine special handling mode
@@ -110,6 +456,16 @@ class FileWatcher {
             specialHandling = 'text_processing';
         }
 
+        // The server already listed the matching workspace files: pick from them without scanning the workspace
+        if (specialHandling === 'file_picker' && Array.isArray(toolData.candidates)) {
+            this.popupManager.pickFiles(toolData).then(selected => {
+                if (selected && selected.length) {
+                    this.writeResponseFile(toolData.trigger_id, selected.join('\n'));
+                }
+            });
+            return;
+        }
+
         // Open the popup with tool-specific options
         this.popupManager.openCursorEnhancerPopup(context, {
             message:
@@ -126,16 +482,17 @@ class FileWatcher {
         });
     }
 
-    sendExtensionAcknowledgement(triggerId, toolType) {
+    sendExtensionAcknowledgement(triggerId, toolType, contextSha256) {
         try {
             const ackData = {
                 timestamp: new Date().toISOString(),
                 trigger_id: triggerId,
                 acknowledged: true,
                 tool_type: toolType,
+                context_sha256: contextSha256,
                 extension: 'review-gate-v2'
             };
-            const ackFile = getTempPath(`review_gate_ack_${triggerId}.json`);
+            const ackFile = this.ipcPath(triggerId, `review_gate_ack_${triggerId}.json`);
             fs.writeFileSync(ackFile, JSON.stringify(ackData, null, 2));
             console.log(`Extension acknowledgement sent: ${ackFile}`);
         } catch (error) {
@@ -207,10 +564,10 @@ class FileWatcher {
         try {
             const timestamp = new Date().toISOString();
             const responsePatterns = [
-                getTempPath(`review_gate_response_${triggerId}.json`),
-                getTempPath('review_gate_response.json'),
-                getTempPath(`mcp_response_${triggerId}.json`),
-                getTempPath('mcp_response.json')
+                this.ipcPath(triggerId, `review_gate_response_${triggerId}.json`),
+                this.ipcPath(triggerId, 'review_gate_response.json'),
+                this.ipcPath(triggerId, `mcp_response_${triggerId}.json`),
+                this.ipcPath(triggerId, 'mcp_response.json')
             ];
 
             const responseData = {
@@ -241,6 +598,23 @@ class FileWatcher {
         }
     }
 
+    writeStatusFile(triggerId, state) {
+        // Popup activity (typing, uploading) picked up by the MCP server for progress notifications
+        try {
+            const statusData = {
+                timestamp: new Date().toISOString(),
+                trigger_id: triggerId,
+                state: state
+            };
+            fs.writeFileSync(
+                this.ipcPath(triggerId, `cursor_enhancer_status_${triggerId}.json`),
+                JSON.stringify(statusData)
+            );
+        } catch (error) {
+            console.error(`Failed to write status file: ${error.message}`);
+        }
+    }
+
     logToFile(message) {
         try {
             const logFile = getTempPath('review_gate_user_inputs.log');
@@ -261,6 +635,7 @@ class FileWatcher {
             clearInterval(this.statusCheckInterval);
             this.statusCheckInterval = null;
         }
+        this.stopPresencePublishing();
         this.currentTriggerData = null;
     }
 }
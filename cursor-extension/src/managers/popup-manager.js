@@ -50,6 +50,9 @@ class PopupManager {
                 }, 200);
             }
 
+            // Show the new call's text, or hide the previous one's
+            setTimeout(() => this.postTextPage(0), 100);
+
             return;
         }
 
@@ -146,11 +149,23 @@ class PopupManager {
                     'IMAGE_UPLOAD_CLICK',
                     currentTriggerId
                 );
+                if (mcpIntegration) {
+                    this.handleStatusUpdate(currentTriggerId, 'uploading');
+                }
                 this.handleImageUpload(currentTriggerId);
                 break;
+            case 'typing':
+                // Let the waiting MCP call report that the user is working on an answer
+                if (mcpIntegration) {
+                    this.handleStatusUpdate(currentTriggerId, 'typing');
+                }
+                break;
             case 'showError':
                 vscode.window.showErrorMessage(webviewMessage.message);
                 break;
+            case 'page':
+                this.postTextPage(webviewMessage.page);
+                break;
             case 'ready':
                 // Send initial MCP status
                 this.chatPanel.webview.postMessage({
@@ -174,10 +189,27 @@ class PopupManager {
                         specialHandling: specialHandling
                     });
                 }
+                this.postTextPage(0);
                 break;
         }
     }
 
+    // Send one page of ingested text to the webview; total 0 hides the text view
+    postTextPage(page) {
+        if (!this.chatPanel) {
+            return;
+        }
+        const data = this.currentTriggerData;
+        const total = data && data.readTextPage ? data.text_ref.pages.length : 0;
+        const current = Math.min(Math.max(page || 0, 0), Math.max(total - 1, 0));
+        this.chatPanel.webview.postMessage({
+            command: 'showPage',
+            page: current,
+            total: total,
+            text: total ? data.readTextPage(current) : ''
+        });
+    }
+
     logUserInput(inputText, eventType = 'MESSAGE', triggerId = null, attachments = []) {
         const timestamp = new Date().toISOString();
         const logMsg = `[${timestamp}] ${eventType}: ${inputText}`;
@@ -220,6 +252,13 @@ class PopupManager {
             color: var(--vscode-input-foreground);
             border: 1px solid var(--vscode-input-border);
         }
+        #pageText {
+            max-height: 300px;
+            overflow: auto;
+            white-space: pre-wrap;
+            padding: 10px;
+            background: var(--vscode-textCodeBlock-background);
+        }
         button {
             background: var(--vscode-button-background);
             color: var(--vscode-button-foreground);
@@ -234,6 +273,14 @@ class PopupManager {
     <div class="container">
         <h2>${title}</h2>
         <div id="messages"></div>
+        <div id="textPages" hidden>
+            <pre id="pageText"></pre>
+            <div>
+                <button onclick="showPage(-1)">◀ Prev</button>
+                <span id="pageLabel"></span>
+                <button onclick="showPage(1)">Next ▶</button>
+            </div>
+        </div>
         <textarea id="messageInput" placeholder="Type your message here..."></textarea>
         <div>
             <button onclick="sendMessage()">Send</button>
@@ -256,6 +303,16 @@ class PopupManager {
             }
         }
         
+        // Report typing at most every few seconds so the MCP server can send progress
+        let lastTypingReport = 0;
+        document.getElementById('messageInput').addEventListener('input', () => {
+            const now = Date.now();
+            if (now - lastTypingReport > 3000) {
+                lastTypingReport = now;
+                vscode.postMessage({ command: 'typing' });
+            }
+        });
+        
         function attachFile() {
             vscode.postMessage({ command: 'attach' });
         }
@@ -264,6 +321,22 @@ class PopupManager {
             vscode.postMessage({ command: 'uploadImage' });
         }
         
+        // Ingested text is shown a page at a time, each page fetched from the extension on demand
+        let currentPage = 0;
+        function showPage(step) {
+            vscode.postMessage({ command: 'page', page: currentPage + step });
+        }
+        
+        window.addEventListener('message', event => {
+            const message = event.data;
+            if (message.command === 'showPage') {
+                currentPage = message.page;
+                document.getElementById('textPages').hidden = !message.total;
+                document.getElementById('pageText').textContent = message.text;
+                document.getElementById('pageLabel').textContent = 'Page ' + (message.page + 1) + ' of ' + message.total;
+            }
+        });
+        
         
         // Send ready message when loaded
         window.addEventListener('load', () => {
@@ -280,6 +353,19 @@ class PopupManager {
         // To be implemented with file watcher integration
     }
 
+    async pickFiles(toolData) {
+        const total = toolData.candidate_total || toolData.candidates.length;
+        const shown = toolData.candidates.length < total ? `${toolData.candidates.length} of ${total}` : `${total}`;
+        const picked = await vscode.window.showQuickPick(toolData.candidates, {
+            canPickMany: true,
+            ignoreFocusOut: true,
+            title: `${toolData.title || 'File Review'} (${shown} files)`,
+            placeHolder: toolData.instruction || 'Select file(s) for review'
+        });
+        this.logUserInput(`${picked ? picked.length : 0} file(s) picked`, 'FILE_REVIEW', toolData.trigger_id);
+        return picked;
+    }
+
     handleFileAttachment(_triggerId) {
         console.log('handleFileAttachment called');
         // To be implemented with file watcher integration
@@ -290,6 +376,11 @@ class PopupManager {
         // To be implemented with file watcher integration
     }
 
+    handleStatusUpdate(_triggerId, _state) {
+        console.log('handleStatusUpdate called');
+        // To be implemented with file watcher integration
+    }
+
     dispose() {
         if (this.chatPanel) {
             this.chatPanel.dispose();
@@ -17,30 +17,118 @@ import sys
 from mcp.server.stdio import stdio_server
 
 # Import new modular components
-from src.config.constants import TimeoutConfig
+from src.config.constants import CoalescingConfig, ParseCacheConfig, RetryConfig, SchedulerConfig, TimeoutConfig
+from src.config.runtime_config import RuntimeConfig
+from src.managers.attachment_store import AttachmentStore
+from src.managers.context_tracker import ContextTracker
+from src.managers.ingest_store import IngestStore
+from src.managers.instance_registry import InstanceRegistry
+from src.managers.ipc_sweeper import IpcSweeper
+from src.managers.ipc_watcher import IpcWatcher
+from src.managers.popup_scheduler import PopupScheduler
+from src.managers.presence_registry import PresenceRegistry
+from src.managers.request_coalescer import RequestCoalescer
+from src.managers.response_index import ResponseIndex
 from src.managers.response_manager import ResponseManager
+from src.managers.review_journal import ReviewJournal
+from src.managers.status_monitor import ExtensionStatusMonitor
+from src.managers.ticket_manager import TicketManager
 from src.managers.trigger_manager import TriggerManager
+from src.managers.workspace_index import WorkspaceIndexRegistry
 from src.protocol.mcp_handler import McpProtocolHandler
 from src.services.cursor_enhancer_service import CursorEnhancerService
+from src.services.policy_engine import PolicyEngine
+from src.services.stats_collector import StatsCollector
 from src.services.tool_executor import ToolExecutor
-from src.utils.file_operations import get_temp_path
+from src.transport.broker import BrokerServer
+from src.transport.http import HttpTransport
+from src.utils.file_operations import get_shared_temp_path
+from src.utils.io_executor import IoExecutor
+from src.utils.ipc_file_cache import IpcFileCache
 from src.utils.logging_utils import flush_logger, setup_logger
+from src.utils.loop_lag_monitor import LoopLagMonitor
+from src.utils.retry_policy import RetryPolicy
+from src.utils.workspace_file_cache import WorkspaceFileCache
 
 # Configure logging using centralized utility
 logger = setup_logger(__name__)
-logger.info(f"🔧 Log file path: {get_temp_path('cursor_enhancer.log')}")
+logger.info(f"🔧 Log file path: {get_shared_temp_path('cursor_enhancer.log')}")
 
 
 class CursorEnhancerServer:
     """Refactored Cursor Enhancer Server using modular components"""
 
     def __init__(self):
+        # Settings come first: components read them while being built
+        self.runtime_config = RuntimeConfig()
+        self.runtime_config.load()
+
         # Initialize all components using dependency injection
-        self.response_manager = ResponseManager()
-        self.trigger_manager = TriggerManager()
+        self.instance_registry = InstanceRegistry()
+        self.io_executor = IoExecutor()
+        self.ipc_watcher = IpcWatcher(self.io_executor)
+        self.ipc_sweeper = IpcSweeper(self.io_executor)
+        self.ipc_file_cache = IpcFileCache()
+        self.loop_lag_monitor = LoopLagMonitor()
+        self.response_index = ResponseIndex(self.ipc_watcher, self.ipc_file_cache, self.io_executor)
+        self.status_monitor = ExtensionStatusMonitor(self.ipc_watcher, self.ipc_file_cache, self.io_executor)
+        self.presence_registry = PresenceRegistry(self.ipc_watcher, self.ipc_file_cache, self.io_executor)
+        self.response_manager = ResponseManager(self.ipc_watcher, self.ipc_file_cache, self.io_executor)
+        self.trigger_manager = TriggerManager(self.presence_registry, self.io_executor)
+        self.popup_scheduler = PopupScheduler()
+        self.request_coalescer = RequestCoalescer()
+        self.policy_engine = PolicyEngine(self.io_executor)
+        self.ticket_manager = TicketManager()
+        self.review_journal = ReviewJournal(self.io_executor)
+        self.context_tracker = ContextTracker(self.presence_registry, self.io_executor)
+        self.workspace_indexes = WorkspaceIndexRegistry(self.io_executor)
+        self.workspace_file_cache = WorkspaceFileCache()
+        self.ingest_store = IngestStore(self.io_executor)
+        self.attachment_store = AttachmentStore(self.io_executor)
         self.cursor_enhancer_service = CursorEnhancerService()
-        self.tool_executor = ToolExecutor(self.response_manager, self.trigger_manager)
-        self.mcp_handler = McpProtocolHandler(self.tool_executor)
+        self.stats_collector = StatsCollector(
+            self.io_executor,
+            self.loop_lag_monitor,
+            self.ipc_sweeper,
+            self.popup_scheduler,
+            self.ticket_manager,
+            {
+                "ipc_file_cache": self.ipc_file_cache,
+                "workspace_file_cache": self.workspace_file_cache,
+                "response_manager": self.response_manager,
+                "response_index": self.response_index,
+                "trigger_manager": self.trigger_manager,
+                "request_coalescer": self.request_coalescer,
+                "presence_registry": self.presence_registry,
+                "review_journal": self.review_journal,
+                "context_tracker": self.context_tracker,
+                "workspace_index": self.workspace_indexes,
+                "ingest_store": self.ingest_store,
+                "attachment_store": self.attachment_store,
+                "ipc_sweeper": self.ipc_sweeper,
+            },
+        )
+        self.tool_executor = ToolExecutor(
+            response_manager=self.response_manager,
+            trigger_manager=self.trigger_manager,
+            response_index=self.response_index,
+            popup_scheduler=self.popup_scheduler,
+            request_coalescer=self.request_coalescer,
+            policy_engine=self.policy_engine,
+            ticket_manager=self.ticket_manager,
+            status_monitor=self.status_monitor,
+            presence_registry=self.presence_registry,
+            review_journal=self.review_journal,
+            context_tracker=self.context_tracker,
+            workspace_indexes=self.workspace_indexes,
+            workspace_file_cache=self.workspace_file_cache,
+            ingest_store=self.ingest_store,
+            attachment_store=self.attachment_store,
+            stats_collector=self.stats_collector,
+            io_executor=self.io_executor,
+        )
+        self.mcp_handler = McpProtocolHandler(self.tool_executor, self.attachment_store)
+        self.runtime_config.subscribe(self._apply_runtime_config)
 
         # Server state
         self.shutdown_requested = False
@@ -55,33 +143,95 @@ class CursorEnhancerServer:
 
         async with stdio_server() as (read_stream, write_stream):
             logger.info("✅ Cursor Enhancer server ACTIVE on stdio transport for Cursor")
-
-            # Create server run task
-            server_task = asyncio.create_task(
+            await self._serve(
                 self.mcp_handler.server.run(read_stream, write_stream, self.mcp_handler.server.create_initialization_options())
             )
 
-            # Create shutdown monitor task
-            shutdown_task = asyncio.create_task(self._monitor_shutdown())
+    async def run_broker(self):
+        """Run as the per-user broker that thin stdio shims of every Cursor window connect to"""
+        logger.info("🚀 Starting Cursor Enhancer MCP broker...")
+        broker = BrokerServer(self.mcp_handler.server)
+        await self._serve(broker.serve())
+
+    async def run_http(self):
+        """Run on the streamable HTTP transport so several clients can share this server"""
+        logger.info("🚀 Starting Cursor Enhancer MCP Server on streamable HTTP...")
+        self.http_transport = HttpTransport(self.mcp_handler.server)
+        await self._serve(self.http_transport.serve())
+
+    async def _serve(self, transport):
+        """Run a transport alongside the watcher, heartbeat, config reloader and shutdown monitor"""
+        # Let extensions find a private IPC directory, then watch it once for every tool call
+        self.instance_registry.start()
+        self.ipc_watcher.start()
+
+        # Reviews a crashed or restarted server left open become tickets again, answered or still waiting
+        self.review_journal.start()
+        self.tool_executor.recover_reviews(await self.review_journal.recover())
+        journal_task = asyncio.create_task(self.review_journal.run())
+
+        # Keep the IPC directory small over weeks of uptime, not only at shutdown
+        sweeper_task = asyncio.create_task(self.ipc_sweeper.run())
 
-            # Create heartbeat task to keep log file fresh for extension status monitoring
-            heartbeat_task = asyncio.create_task(self._heartbeat_logger())
+        # Blocking file I/O runs on the I/O executor; the lag monitor shows whether anything still stalls the loop
+        lag_task = asyncio.create_task(self.loop_lag_monitor.run())
 
-            # Wait for either server completion or shutdown request
-            done, pending = await asyncio.wait([server_task, shutdown_task, heartbeat_task], return_when=asyncio.FIRST_COMPLETED)
+        # Stats snapshots for the cursor_enhancer_stats CLI, which cannot call the MCP tool itself
+        stats_task = asyncio.create_task(self.stats_collector.run())
 
-            # Cancel any pending tasks
-            for task in pending:
-                task.cancel()
-                try:
-                    await task
-                except asyncio.CancelledError:
-                    pass
+        # Create server run task
+        server_task = asyncio.create_task(transport)
 
-            if self.shutdown_requested:
-                logger.info(f"🛑 Cursor Enhancer server shutting down: {self.shutdown_reason}")
-            else:
-                logger.info("🏁 Cursor Enhancer server completed normally")
+        # Create shutdown monitor task
+        shutdown_task = asyncio.create_task(self._monitor_shutdown())
+
+        # Create heartbeat task to keep log file fresh for extension status monitoring
+        heartbeat_task = asyncio.create_task(self._heartbeat_logger())
+
+        # Pick up config file edits without a restart or losing in-flight reviews
+        config_task = asyncio.create_task(self.runtime_config.watch(self.io_executor))
+
+        # Wait for either server completion or shutdown request
+        done, pending = await asyncio.wait([server_task, shutdown_task, heartbeat_task, config_task], return_when=asyncio.FIRST_COMPLETED)
+
+        # Stop journalling first: calls cancelled by the shutdown stay open for the next server to recover
+        await self.review_journal.close()
+        journal_task.cancel()
+        sweeper_task.cancel()
+        self.workspace_indexes.stop()
+        lag_task.cancel()
+        stats_task.cancel()
+
+        # Cancel any pending tasks
+        for task in pending:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        self.stats_collector.stop()
+        self.ipc_watcher.stop()
+        self.instance_registry.stop()
+        self.io_executor.shutdown()
+
+        if self.shutdown_requested:
+            logger.info(f"🛑 Cursor Enhancer server shutting down: {self.shutdown_reason}")
+        else:
+            logger.info("🏁 Cursor Enhancer server completed normally")
+
+    def _apply_runtime_config(self, changed: set[str]) -> None:
+        """Push reloaded settings into components that copied them at construction"""
+        self.ipc_watcher.poll_interval = TimeoutConfig.WATCHER_POLL_INTERVAL
+        self.popup_scheduler.reconfigure(SchedulerConfig.MAX_ACTIVE_POPUPS, SchedulerConfig.AGING_INTERVAL, SchedulerConfig.URGENT_STACKING)
+        self.request_coalescer.window = CoalescingConfig.WINDOW
+        self.ipc_file_cache.max_entries = ParseCacheConfig.MAX_ENTRIES
+        self.ipc_file_cache.max_bytes = ParseCacheConfig.MAX_BYTES
+        self.tool_executor.ack_retry_policy = RetryPolicy(
+            RetryConfig.ACK_MAX_ATTEMPTS, RetryConfig.ACK_ATTEMPT_TIMEOUT, RetryConfig.ACK_BACKOFF_FACTOR
+        )
+        self.tool_executor.ack_breaker.failure_threshold = RetryConfig.BREAKER_FAILURE_THRESHOLD
+        self.tool_executor.ack_breaker.cooldown = RetryConfig.BREAKER_COOLDOWN
 
     async def _heartbeat_logger(self):
         """Periodically update log file to keep MCP status active in extension"""
@@ -133,7 +283,12 @@ async def main():
 
     try:
         server = CursorEnhancerServer()
-        await server.run()
+        if "--broker" in sys.argv[1:]:
+            await server.run_broker()
+        elif "--http" in sys.argv[1:]:
+            await server.run_http()
+        else:
+            await server.run()
     except Exception as e:
         logger.error(f"❌ Fatal error in MCP server: {e}")
         import traceback
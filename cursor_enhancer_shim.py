@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Cursor Enhancer stdio shim
+
+Thin per-window MCP entry point: forwards stdin/stdout byte-for-byte to the per-user
+Cursor Enhancer broker over its Unix socket, starting the broker on first use. Only the
+standard library and the config package are imported, so startup is a few milliseconds and
+every window shares one warm server, one IPC watcher and one popup scheduler.
+
+Falls back to running the full stdio server in this process if no broker can be reached.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_SCRIPT = os.path.join(SERVER_DIR, "cursor_enhancer_mcp.py")
+sys.path.insert(0, SERVER_DIR)
+
+from src.config.constants import BrokerConfig  # noqa: E402
+from src.config.runtime_config import RuntimeConfig  # noqa: E402
+from src.utils.file_operations import get_ipc_base_path  # noqa: E402
+
+CHUNK_SIZE = 256 * 1024
+
+
+def connect(socket_path: str, timeout: float) -> socket.socket | None:
+    """Connect to the broker socket, retrying until timeout while a starting broker binds it"""
+    deadline = time.monotonic() + timeout
+    while True:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(socket_path)
+            return sock
+        except (FileNotFoundError, ConnectionRefusedError):
+            sock.close()
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.05)
+
+
+def spawn_broker() -> None:
+    """Start the broker detached from this window so it outlives the shim"""
+    subprocess.Popen(
+        [sys.executable, SERVER_SCRIPT, "--broker"],
+        cwd=SERVER_DIR,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        close_fds=True,
+    )
+
+
+def pump_stdin(sock: socket.socket) -> None:
+    """Client -> broker; half-closes the socket at EOF so the broker ends the session"""
+    try:
+        while chunk := os.read(sys.stdin.fileno(), CHUNK_SIZE):
+            sock.sendall(chunk)
+    except OSError:
+        pass
+    finally:
+        try:
+            sock.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+
+
+def main() -> None:
+    RuntimeConfig().load()
+    socket_path = get_ipc_base_path(BrokerConfig.SOCKET_NAME)
+
+    sock = connect(socket_path, 0)
+    if sock is None:
+        spawn_broker()
+        sock = connect(socket_path, BrokerConfig.CONNECT_TIMEOUT)
+    if sock is None:
+        print(f"Cursor Enhancer broker unreachable at {socket_path}, running in-process", file=sys.stderr)
+        os.execv(sys.executable, [sys.executable, SERVER_SCRIPT])
+
+    threading.Thread(target=pump_stdin, args=(sock,), daemon=True).start()
+
+    # Broker -> client
+    stdout = sys.stdout.buffer
+    try:
+        while chunk := sock.recv(CHUNK_SIZE):
+            stdout.write(chunk)
+            stdout.flush()
+    except (OSError, BrokenPipeError):
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Cursor Enhancer stats
+
+Show the live state of the running Cursor Enhancer servers of this user: popups and tickets
+in flight, waiters, IPC directory size, cache hit rates, memory, event loop lag and tool
+latency. Reads the snapshots each server writes to its IPC directory every
+StatsConfig.SNAPSHOT_INTERVAL seconds, so it needs no MCP client and never slows a server down.
+Agents get the same data from the cursor_enhancer_stats tool.
+
+Usage: python cursor_enhancer_stats.py [--json] [--watch SECONDS]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.config.constants import FilePatterns, IpcConfig, StatsConfig  # noqa: E402
+from src.config.runtime_config import RuntimeConfig  # noqa: E402
+from src.utils.file_operations import get_ipc_base_dir, get_shared_temp_dir  # noqa: E402
+
+
+def ipc_dirs() -> list[str]:
+    """IPC directories servers may be using: shared /tmp and every private directory in the instance registry"""
+    dirs = [get_shared_temp_dir()]
+    registry_dir = os.path.join(get_ipc_base_dir(), IpcConfig.REGISTRY_DIR)
+    try:
+        with os.scandir(registry_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    with open(entry.path) as f:
+                        dirs.append(json.load(f)["ipc_dir"])
+                except (OSError, ValueError, KeyError, TypeError):
+                    continue
+    except OSError:
+        pass
+    return list(dict.fromkeys(os.path.realpath(d) for d in dirs))
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def load_snapshots() -> list[dict]:
+    """Snapshots of every server, each with its file's age in seconds"""
+    snapshots = []
+    for directory in ipc_dirs():
+        try:
+            names = [name for name in os.listdir(directory) if name.startswith(f"{FilePatterns.STATS_PREFIX}_") and name.endswith(".json")]
+        except OSError:
+            continue
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+                snapshot["snapshot_age"] = time.time() - os.stat(path).st_mtime
+            except (OSError, ValueError):
+                continue
+            snapshot["snapshot_file"] = path
+            snapshot["running"] = pid_alive(snapshot.get("pid", 0))
+            snapshots.append(snapshot)
+    return sorted(snapshots, key=lambda snapshot: snapshot.get("pid", 0))
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+
+
+def summarize(snapshot: dict) -> str:
+    state = "running" if snapshot["running"] else "not running"
+    if snapshot["running"] and snapshot["snapshot_age"] > 3 * max(StatsConfig.SNAPSHOT_INTERVAL, 1):
+        state = "stale"
+    lines = [
+        f"Server pid {snapshot.get('pid')} ({state}, snapshot {snapshot['snapshot_age']:.0f}s old, up {snapshot.get('uptime', 0):.0f}s)"
+    ]
+
+    in_flight = snapshot.get("in_flight", {})
+    popups, tickets = in_flight.get("popups", []), in_flight.get("tickets", [])
+    lines.append(f"  In flight: {len(popups)} popup(s), {len(tickets)} ticket(s)")
+    for popup in popups:
+        lines.append(f"    {popup['trigger_id']}: {popup['state']}, {popup['priority']}, {popup['age']:.0f}s")
+    for ticket in tickets:
+        lines.append(f"    {ticket['ticket']}: {ticket['status']}, {ticket['age']:.0f}s")
+
+    components = snapshot.get("components", {})
+    responses = components.get("response_manager", {})
+    lines.append(
+        f"  Waiters: {responses.get('response_waiters', 0)} response, {responses.get('ack_waiters', 0)} ack, "
+        f"{components.get('response_index', {}).get('waiters', 0)} get_user_input, "
+        f"{components.get('request_coalescer', {}).get('waiters', 0)} coalesced"
+    )
+
+    ipc_dir = snapshot.get("ipc_dir", {})
+    if "error" in ipc_dir:
+        lines.append(f"  IPC dir: {ipc_dir.get('path')} unreadable: {ipc_dir['error']}")
+    else:
+        by_class = ", ".join(f"{name} {counts['files']}" for name, counts in sorted(ipc_dir.get("by_class", {}).items()))
+        truncated = " (truncated)" if ipc_dir.get("truncated") else ""
+        lines.append(
+            f"  IPC dir: {ipc_dir.get('path')}: {ipc_dir.get('files', 0)} files, {format_bytes(ipc_dir.get('bytes', 0))}{truncated}"
+            + (f" [{by_class}]" if by_class else "")
+        )
+
+    caches = [(name, components.get(name, {})) for name in ("ipc_file_cache", "workspace_file_cache")]
+    lines.append(
+        "  Caches: "
+        + ", ".join(f"{name} {stats.get('hit_rate', 0.0):.0%} hits, {stats.get('entries', 0)} entries" for name, stats in caches)
+    )
+
+    memory = snapshot.get("memory", {})
+    rss = format_bytes(memory["rss_bytes"]) if "rss_bytes" in memory else "?"
+    lines.append(f"  Memory: {rss} resident, {format_bytes(memory.get('peak_rss_bytes', 0))} peak")
+
+    loop = snapshot.get("event_loop", {})
+    lines.append(
+        f"  Event loop lag: {loop.get('last_ms', 0.0):.1f}ms last, {loop.get('p99_ms', 0.0):.1f}ms p99, "
+        f"{loop.get('max_ms', 0.0):.1f}ms max, {loop.get('stalls', 0)} stalls"
+    )
+
+    latency = snapshot.get("latency_ms", {})
+    if latency:
+        lines.append("  Tool latency (recent calls):")
+        for name, stats in sorted(latency.items()):
+            lines.append(
+                f"    {name}: {stats['calls']} calls, p50 {stats['p50']:.0f}ms, p90 {stats['p90']:.0f}ms, "
+                f"p99 {stats['p99']:.0f}ms, max {stats['max']:.0f}ms"
+            )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--json", action="store_true", help="print the snapshots as JSON")
+    parser.add_argument("--watch", type=float, metavar="SECONDS", help="print again every SECONDS until interrupted")
+    args = parser.parse_args()
+    RuntimeConfig().load()
+
+    try:
+        while True:
+            snapshots = load_snapshots()
+            if args.json:
+                print(json.dumps(snapshots, indent=2))
+            elif not snapshots:
+                print("No Cursor Enhancer server has written stats (is one running with StatsConfig.SNAPSHOT_INTERVAL > 0?)")
+            else:
+                print("\n\n".join(summarize(snapshot) for snapshot in snapshots))
+            if not args.watch:
+                break
+            time.sleep(args.watch)
+            print()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
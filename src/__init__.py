@@ -7,6 +7,7 @@ This package contains the refactored components for Review Gate V2:
 - protocol: MCP protocol handling
 - services: Business logic and tool execution
 - managers: Response and trigger management
+- transport: Non-stdio MCP transports (per-user broker, streamable HTTP)
 
 All components follow Single Responsibility Principle and eliminate DRY violations.
 """
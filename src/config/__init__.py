@@ -1,5 +1,59 @@
 """Configuration module for Review Gate V2."""
 
-from .constants import FilePatterns, TimeoutConfig
+from .constants import (
+    AttachmentConfig,
+    BrokerConfig,
+    CoalescingConfig,
+    CodecConfig,
+    FilePatterns,
+    FileReviewConfig,
+    HttpConfig,
+    IngestConfig,
+    IoConfig,
+    IpcConfig,
+    JournalConfig,
+    ParseCacheConfig,
+    PolicyConfig,
+    PresenceConfig,
+    ProgressConfig,
+    RetryConfig,
+    ReviewStage,
+    RuntimeConfigSettings,
+    SchedulerConfig,
+    StatsConfig,
+    SweeperConfig,
+    TicketConfig,
+    TimeoutConfig,
+    TriggerConfig,
+    WorkspaceIndexConfig,
+)
+from .runtime_config import RuntimeConfig
 
-__all__ = ["TimeoutConfig", "FilePatterns"]
+__all__ = [
+    "AttachmentConfig",
+    "TimeoutConfig",
+    "FilePatterns",
+    "SchedulerConfig",
+    "CoalescingConfig",
+    "PolicyConfig",
+    "TicketConfig",
+    "ReviewStage",
+    "ProgressConfig",
+    "PresenceConfig",
+    "RetryConfig",
+    "ParseCacheConfig",
+    "TriggerConfig",
+    "RuntimeConfigSettings",
+    "RuntimeConfig",
+    "IpcConfig",
+    "BrokerConfig",
+    "HttpConfig",
+    "JournalConfig",
+    "SweeperConfig",
+    "CodecConfig",
+    "WorkspaceIndexConfig",
+    "FileReviewConfig",
+    "IngestConfig",
+    "IoConfig",
+    "StatsConfig",
+]
@@ -6,9 +6,236 @@ class TimeoutConfig:
     PROCESSING_DELAY = 0.5  # seconds
     ERROR_DELAY = 1.0  # seconds
     HEARTBEAT_INTERVAL = 10  # seconds
+    GET_USER_INPUT = 10  # seconds
+    WATCHER_POLL_INTERVAL = 0.25  # seconds, only used when inotify is unavailable
+    CHAT_RESPONSE = 300  # seconds cursor_enhancer_chat waits for the user's answer
+    FILE_REVIEW = 90  # seconds file_review waits for the user's selection
+    INGEST_TEXT = 120  # seconds ingest_text waits for the user's response
 
 
 class FilePatterns:
     TRIGGER_PREFIX = "cursor_enhancer_trigger"
     RESPONSE_PREFIX = "cursor_enhancer_response"
     MCP_RESPONSE_PREFIX = "mcp_response"
+    ACK_PREFIX = "cursor_enhancer_ack"
+    STATUS_PREFIX = "cursor_enhancer_status"
+    CANCEL_PREFIX = "cursor_enhancer_cancel"
+    PRESENCE_PREFIX = "cursor_enhancer_presence"
+    CONTEXT_PREFIX = "cursor_enhancer_context"
+    INGEST_PREFIX = "cursor_enhancer_ingest"
+    STATS_PREFIX = "cursor_enhancer_stats"
+
+
+class TriggerConfig:
+    BACKUP_COUNT = 3  # backup copies of each trigger file
+    SYNC_ATTEMPTS = 3
+    PRE_WRITE_DELAY = 0.1  # seconds
+    SYNC_RETRY_DELAY = 0.1  # seconds
+    POST_WRITE_DELAY = 0.2  # seconds left for the extension to pick up a new trigger
+    CONTEXT_SPILL_BYTES = 16 * 1024  # larger contexts go to one side file referenced by hash; 0 keeps them inline
+    CONTEXT_COMPRESS = False  # gzip context side files
+    CONTEXT_COMPRESS_LEVEL = 6
+    CONTEXT_DELTAS = True  # later rounds of a session send line edits against the context the extension confirmed
+    CONTEXT_DELTA_MIN_BYTES = 4096  # smaller contexts are always sent whole
+    CONTEXT_DELTA_MAX_RATIO = 0.5  # a delta above this share of the full context is not worth it
+    CONTEXT_DELTA_SESSIONS = 32  # sessions whose last context is remembered
+
+
+class SchedulerConfig:
+    MAX_ACTIVE_POPUPS = 1  # one human answers one popup at a time
+    AGING_INTERVAL = 60  # seconds of waiting that promote a request by one priority level
+    URGENT_STACKING = True  # urgent requests open on top of a lower-priority popup instead of queueing
+    METRICS_WINDOW = 200  # recent wait samples kept per priority
+
+
+class CoalescingConfig:
+    WINDOW = 300  # seconds after start during which identical requests join an in-flight call
+
+
+class PolicyConfig:
+    RULES_FILE = "~/.config/cursor-enhancer/policy.json"
+    RULES_FILE_ENV = "CURSOR_ENHANCER_POLICY_FILE"
+    AUDIT_FILE = "cursor_enhancer_policy_audit.jsonl"
+    RELOAD_CHECK_INTERVAL = 1.0  # seconds between rules file mtime checks
+    LAST_ANSWER_MAX_AGE = 3600  # seconds a cached human answer may be replayed
+    LAST_ANSWER_CACHE_SIZE = 500
+
+
+class TicketConfig:
+    TRIGGER_WAIT = 5  # seconds an async chat call waits for its popup before returning the ticket anyway
+    MAX_PENDING = 100
+    RESULT_TTL = 3600  # seconds an answered ticket is kept for collection
+
+
+class JournalConfig:
+    ENABLED = True
+    FILE_NAME = "cursor_enhancer_journal.jsonl"  # in /tmp in shared mode, else in BASE_DIR prefixed by the namespace
+    FLUSH_INTERVAL = 0.05  # seconds records are batched before one write + fsync
+    MAX_BATCH = 256  # buffered records that force a flush before the interval ends
+    COMPACT_BYTES = 1024 * 1024  # journal size that triggers dropping finished reviews
+    RECOVERY_MAX_AGE = 86400  # seconds after which an unfinished review is abandoned instead of recovered
+    RECOVERY_MIN_WAIT = 300  # seconds a recovered review waits for a late answer, even past its own deadline
+
+
+class SweeperConfig:
+    ENABLED = True
+    INTERVAL = 60  # seconds between sweep passes
+    MAX_ENTRIES_PER_PASS = 2000  # directory entries examined per pass; a large /tmp is covered over several passes
+    MAX_PASS_SECONDS = 0.05  # time one pass may spend on the event loop
+    ACK_MAX_AGE = 600  # seconds an acknowledgement may linger; each file class below has its own age limit
+    TRIGGER_MAX_AGE = 600  # main and backup trigger files nobody consumed
+    SPEECH_MAX_AGE = 600  # speech triggers, results and recorded audio
+    SIGNAL_MAX_AGE = 600  # status and cancel signals
+    GENERIC_RESPONSE_MAX_AGE = 600  # unmatched generic responses, which could pass for a fresh answer
+    RESPONSE_MAX_AGE = 86400  # per-trigger answers, kept as long as the journal may recover them
+    PRESENCE_MAX_AGE = 3600  # presence files of extensions that stopped refreshing them
+    CONTEXT_MAX_AGE = 3600  # spilled contexts no trigger has referenced since
+    INGEST_MAX_AGE = 3600  # ingest_text side files, including streams abandoned mid-way
+    STATS_MAX_AGE = 600  # stats snapshots of servers that stopped without removing theirs
+    TEMP_MAX_AGE = 600  # half-written *.tmp files
+
+
+class WorkspaceIndexConfig:
+    ENABLED = True  # index workspaces for file_review; without it the extension lists files itself
+    # Root indexed when a file_review call names none; default IpcConfig.WORKSPACE, else the workspace of the
+    # only live extension. Never the working directory, which under the broker is the server's install directory
+    ROOT = ""
+    MAX_ROOTS = 4  # workspaces indexed at once; the least recently reviewed one is dropped
+    RESPECT_GITIGNORE = True  # skip what .gitignore files and .git/info/exclude ignore
+    EXCLUDE = ".git"  # comma-separated file and directory names never indexed
+    WATCH = True  # follow changes with inotify; otherwise, or past the watch limit, rebuild every RESCAN_INTERVAL
+    MAX_WATCHES = 2048  # inotify watches all indexes hold together, leaving the rest of max_user_watches to the editor
+    RESCAN_INTERVAL = 60  # seconds
+    REBUILD_DELAY = 1.0  # seconds a directory change waits before the rebuild it triggers, to take a burst of them at once
+    MAX_FILES = 500_000  # indexing stops here
+    MAX_CANDIDATES = 2000  # matching files sent to the popup; the total is reported alongside
+    BUILD_WAIT = 10  # seconds file_review waits for the first build before falling back to the extension
+
+
+class FileReviewConfig:
+    MAX_FILE_BYTES = 256 * 1024  # contents returned per selected file; larger files are cut at a line break
+    MAX_TOTAL_BYTES = 1024 * 1024  # contents returned per file_review call; later files get digests only
+    BINARY_SNIFF_BYTES = 8192  # a NUL byte in this prefix marks a file as binary
+    CACHE_ENTRIES = 4096  # files whose digest is remembered
+    CACHE_BYTES = 32 * 1024 * 1024  # text files kept whole for repeated reviews
+
+
+class IngestConfig:
+    CHUNK_BYTES = 256 * 1024  # largest chunk of a streamed ingest_text; one-shot text is processed in chunks of this size
+    MAX_STREAM_BYTES = 64 * 1024 * 1024  # largest text one ingestion accepts
+    PAGE_BYTES = 64 * 1024  # the popup shows the text in pages of about this size, ending at line breaks
+    PREVIEW_BYTES = 2000  # start of the text shown in the popup message
+    STREAM_IDLE_TIMEOUT = 600  # seconds without a chunk before an unfinished stream is discarded
+
+
+class AttachmentConfig:
+    # "inline" puts images into the tool result as base64; "resource" returns resource links the client
+    # reads on demand; "auto" links images over INLINE_MAX_BYTES and inlines smaller ones
+    DELIVERY = "auto"
+    INLINE_MAX_BYTES = 512 * 1024
+    TTL = 3600  # seconds an attachment resource stays readable
+    MAX_BYTES = 128 * 1024 * 1024  # attachment resources kept in memory; the oldest go first
+
+
+class IoConfig:
+    # Threads running blocking filesystem calls. Parsing a response holds the GIL, so every extra thread
+    # parsing at once lengthens the loop's wait; two leave one free while the other waits on a slow sync
+    MAX_WORKERS = 2
+    BACKGROUND_WORKERS = 2  # threads for long jobs (workspace index builds, file_review reads, context deltas)
+    MAX_PENDING = 64  # calls queued for a thread, per lane; further callers wait on the event loop
+    SLOW_OPERATION = 1.0  # seconds after which one call is logged as slow
+    LAG_INTERVAL = 0.25  # seconds between event loop lag samples
+    LAG_WARN = 0.1  # lag in seconds logged as an event loop stall
+    LAG_SAMPLES = 1200  # recent samples kept for the lag percentiles
+
+
+class StatsConfig:
+    SNAPSHOT_INTERVAL = 5  # seconds between the stats snapshots the stats CLI reads; 0 writes none
+    LATENCY_SAMPLES = 512  # recent calls per tool kept for the latency percentiles
+    IPC_SCAN_INTERVAL = 10  # seconds an IPC directory scan is reused before the next one
+    IPC_SCAN_MAX_ENTRIES = 20000  # directory entries one scan examines; a crowded shared /tmp is reported as truncated
+
+
+class ReviewStage:
+    QUEUED = "queued"
+    TRIGGERED = "triggered"
+    ACKNOWLEDGED = "acknowledged"
+    TYPING = "typing"
+    UPLOADING = "uploading"
+    ANSWERED = "answered"
+    TIMEOUT = "timeout"
+    ERROR = "error"
+    CANCELLED = "cancelled"
+    FINAL = frozenset({ANSWERED, TIMEOUT, ERROR, CANCELLED})
+
+
+class ProgressConfig:
+    MIN_INTERVAL = 1.0  # seconds between progress notifications for one call
+    KEEPALIVE_INTERVAL = 15  # seconds of silence after which a "still waiting" notification is sent
+
+
+class PresenceConfig:
+    REQUIRE_EXTENSION = True  # fail fast instead of waiting minutes when no extension is listening
+    STALE_AFTER = 15  # seconds without a presence refresh before an extension counts as gone
+    MIN_PROTOCOL_VERSION = 1
+    TICKET_WAIT = 300  # seconds an async review waits for an extension to appear
+
+
+class RetryConfig:
+    ACK_ATTEMPT_TIMEOUT = 30  # seconds to wait for the extension to acknowledge the first trigger
+    # Trigger writes per popup, including the first. A popup that is slow to open rather than lost would
+    # be shown twice by a re-trigger, so re-triggering is opt-in: set 2 or more to enable it
+    ACK_MAX_ATTEMPTS = 1
+    ACK_BACKOFF_FACTOR = 2.0  # each re-trigger waits this much longer for its acknowledgement
+    BREAKER_FAILURE_THRESHOLD = 3  # consecutive unacknowledged triggers before re-triggering stops
+    BREAKER_COOLDOWN = 60  # seconds before a single trial re-trigger is allowed again
+
+
+class ParseCacheConfig:
+    MAX_ENTRIES = 256  # parsed IPC files kept
+    MAX_BYTES = 64 * 1024 * 1024  # total size of the files behind cached results
+
+
+class CodecConfig:
+    USE_ORJSON = True  # encode and decode JSON payloads with orjson when it is installed
+    ALLOW_MSGPACK = True  # write msgpack when it is installed and every live extension advertises it
+
+
+class RuntimeConfigSettings:
+    CONFIG_FILE = "~/.config/cursor-enhancer/config.json"
+    CONFIG_FILE_ENV = "CURSOR_ENHANCER_CONFIG_FILE"
+    ENV_PREFIX = "CURSOR_ENHANCER_"  # CURSOR_ENHANCER_<SECTION>__<KEY>, e.g. CURSOR_ENHANCER_TIMEOUTS__CHAT_RESPONSE=600
+    RELOAD_CHECK_INTERVAL = 2.0  # seconds between config file mtime checks
+
+
+class IpcConfig:
+    MODE = "shared"  # "shared" (/tmp, one namespace per host), "instance" (private dir per server) or "workspace"
+    BASE_DIR = ""  # root of private IPC dirs; default $XDG_RUNTIME_DIR/cursor-enhancer, else /tmp/cursor-enhancer-<uid>
+    NAMESPACE = ""  # explicit IPC dir name under BASE_DIR, overriding the one derived from MODE
+    WORKSPACE = ""  # workspace bound to the server in workspace mode; default the working directory
+    REGISTRY_DIR = "instances"  # under BASE_DIR: one record per running server, read by the extension for discovery
+
+
+class BrokerConfig:
+    SOCKET_NAME = "broker.sock"  # under the private IPC base dir
+    LOCK_NAME = "broker.lock"  # flock held by the one running broker
+    IDLE_TIMEOUT = 600  # seconds without connected shims before the broker exits; 0 keeps it running
+    CONNECT_TIMEOUT = 10  # seconds a shim waits for a broker it started
+    MAX_MESSAGE_BYTES = 256 * 1024 * 1024  # longest JSON-RPC line accepted, image responses included
+
+
+class HttpConfig:
+    HOST = "127.0.0.1"  # loopback only by default
+    PORT = 8765
+    UNIX_SOCKET = ""  # listen on this socket path (mode 0600) instead of HOST:PORT when set
+    PATH = "/mcp"
+    MAX_CONCURRENT_REQUESTS = 32  # requests in flight at once, long-running chat calls included; excess get 503
+    JSON_RESPONSE = False  # answer with plain JSON instead of an SSE stream
+    # Clients on HOST:PORT must send "Authorization: Bearer <token>" with the token from TOKEN_FILE, created
+    # (mode 0600) on first start; the Unix socket is protected by its 0600 mode instead
+    REQUIRE_TOKEN = True
+    TOKEN_FILE = ""  # default: http_token in the private IPC base directory
+    # Host and Origin headers accepted besides the loopback names of HOST:PORT, comma-separated; anything
+    # else is refused, so a web page cannot reach the server through DNS rebinding
+    ALLOWED_HOSTS = ""
+    ALLOWED_ORIGINS = ""
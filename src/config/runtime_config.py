@@ -0,0 +1,270 @@
+import asyncio
+import json
+import logging
+import os
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from ..utils.io_executor import BACKGROUND, IoExecutor
+from .constants import (
+    AttachmentConfig,
+    BrokerConfig,
+    CoalescingConfig,
+    CodecConfig,
+    FilePatterns,
+    FileReviewConfig,
+    HttpConfig,
+    IngestConfig,
+    IoConfig,
+    IpcConfig,
+    JournalConfig,
+    ParseCacheConfig,
+    PolicyConfig,
+    PresenceConfig,
+    ProgressConfig,
+    RetryConfig,
+    RuntimeConfigSettings,
+    SchedulerConfig,
+    StatsConfig,
+    SweeperConfig,
+    TicketConfig,
+    TimeoutConfig,
+    TriggerConfig,
+    WorkspaceIndexConfig,
+)
+
+# Config file section -> constants class whose attributes it overrides
+SECTIONS: dict[str, type] = {
+    "timeouts": TimeoutConfig,
+    "trigger": TriggerConfig,
+    "retry": RetryConfig,
+    "scheduler": SchedulerConfig,
+    "coalescing": CoalescingConfig,
+    "policy": PolicyConfig,
+    "tickets": TicketConfig,
+    "progress": ProgressConfig,
+    "presence": PresenceConfig,
+    "parse_cache": ParseCacheConfig,
+    "codec": CodecConfig,
+    "file_patterns": FilePatterns,
+    "ipc": IpcConfig,
+    "broker": BrokerConfig,
+    "http": HttpConfig,
+    "journal": JournalConfig,
+    "sweeper": SweeperConfig,
+    "workspace_index": WorkspaceIndexConfig,
+    "file_review": FileReviewConfig,
+    "ingest": IngestConfig,
+    "attachments": AttachmentConfig,
+    "io": IoConfig,
+    "stats": StatsConfig,
+}
+
+# Sections fixed once the IPC directory, watcher subscriptions, listening sockets, journal, workspace index
+# and I/O threads exist: applied at startup only
+RESTART_ONLY = frozenset({"file_patterns", "ipc", "broker", "http", "journal", "workspace_index", "io"})
+
+# Built-in values, captured before any layer is applied
+_DEFAULTS = {section: {key: value for key, value in vars(cls).items() if key.isupper()} for section, cls in SECTIONS.items()}
+
+# Settings for which zero would divide by zero, spin a loop or leave nothing to run:
+# 'section.KEY' -> (minimum, whether the minimum itself is allowed)
+_MINIMUMS: dict[str, tuple[float, bool]] = {
+    "scheduler.AGING_INTERVAL": (0, False),
+    "scheduler.MAX_ACTIVE_POPUPS": (1, True),
+    "scheduler.METRICS_WINDOW": (1, True),
+    "retry.ACK_ATTEMPT_TIMEOUT": (0, False),
+    "retry.ACK_MAX_ATTEMPTS": (1, True),
+    "retry.ACK_BACKOFF_FACTOR": (1, True),
+    "retry.BREAKER_FAILURE_THRESHOLD": (1, True),
+    "progress.KEEPALIVE_INTERVAL": (0, False),
+    "sweeper.INTERVAL": (0, False),
+    "workspace_index.RESCAN_INTERVAL": (0, False),
+    "io.MAX_WORKERS": (1, True),
+    "io.BACKGROUND_WORKERS": (1, True),
+    "io.LAG_INTERVAL": (0, False),
+    "io.LAG_SAMPLES": (1, True),
+}
+
+_TRUE = {"1", "true", "yes", "on"}
+_FALSE = {"0", "false", "no", "off"}
+
+ReloadCallback = Callable[[set[str]], None]
+
+
+def _check_minimum(name: str, default: Any, value: Any) -> None:
+    """Raise ValueError if value is below the minimum of setting name, or a fraction where the default is whole"""
+    if isinstance(default, int) and not float(value).is_integer():
+        raise ValueError(f"expected a whole number, got {value!r}")
+    if name not in _MINIMUMS:
+        return
+    minimum, inclusive = _MINIMUMS[name]
+    if value < minimum or (value == minimum and not inclusive):
+        raise ValueError(f"expected a number {'>=' if inclusive else '>'} {minimum}, got {value!r}")
+
+
+def _coerce(default: Any, value: Any, from_env: bool) -> Any:
+    """Convert value to the type of default, raising ValueError if it does not fit"""
+    if isinstance(default, bool):
+        if isinstance(value, bool):
+            return value
+        if from_env and value.strip().lower() in _TRUE | _FALSE:
+            return value.strip().lower() in _TRUE
+        raise ValueError(f"expected a boolean, got {value!r}")
+
+    if isinstance(default, int | float):
+        if from_env:
+            try:
+                value = int(value)
+            except ValueError:
+                value = float(value)
+        if isinstance(value, bool) or not isinstance(value, int | float):
+            raise ValueError(f"expected a number, got {value!r}")
+        if value < 0:
+            raise ValueError(f"expected a non-negative number, got {value!r}")
+        return value
+
+    if isinstance(default, str):
+        if not isinstance(value, str):
+            raise ValueError(f"expected a string, got {value!r}")
+        return value
+
+    raise ValueError(f"setting of type {type(default).__name__} cannot be overridden")
+
+
+class RuntimeConfig:
+    """Layer built-in defaults, a JSON config file and environment variables over the constants classes.
+
+    The file looks like {"timeouts": {"CHAT_RESPONSE": 600}, "retry": {...}}. Environment
+    variables CURSOR_ENHANCER_<SECTION>__<KEY> win over the file. Values are type-checked
+    against the defaults (an invalid one keeps the value in effect) and written onto the constants classes, so code reading e.g.
+    TimeoutConfig.CHAT_RESPONSE sees reloads immediately; components that copied a value
+    at construction are updated through subscribe() callbacks.
+    """
+
+    def __init__(self, config_file: str | None = None, environ: dict[str, str] | None = None):
+        self.logger = logging.getLogger(__name__)
+        self.environ = os.environ if environ is None else environ
+        self.config_file = Path(
+            os.path.expanduser(config_file or self.environ.get(RuntimeConfigSettings.CONFIG_FILE_ENV, RuntimeConfigSettings.CONFIG_FILE))
+        )
+        self._defaults = _DEFAULTS
+        self._file_mtime_ns: int | None = None
+        self._callbacks: list[ReloadCallback] = []
+        self.reload_count = 0
+        self.error_count = 0
+
+    def subscribe(self, callback: ReloadCallback) -> None:
+        """Register callback(changed) receiving the set of 'section.KEY' names changed by a reload"""
+        self._callbacks.append(callback)
+
+    def load(self) -> set[str]:
+        """Apply every layer, including startup-only sections; call once before building components"""
+        return self._apply(self._read_file(), startup=True)
+
+    def reload_if_changed(self) -> set[str]:
+        """Re-apply the layers if the config file appeared, disappeared or changed since the last load"""
+        if self._stat_file() == self._file_mtime_ns:
+            return set()
+        return self._apply(self._read_file(), startup=False)
+
+    async def watch(self, io_executor: IoExecutor) -> None:
+        """Check the config file for changes until cancelled, reading it on io_executor's background lane"""
+        while True:
+            await asyncio.sleep(RuntimeConfigSettings.RELOAD_CHECK_INTERVAL)
+            try:
+                if await io_executor.run("config_stat", self._stat_file, lane=BACKGROUND) != self._file_mtime_ns:
+                    self._apply(await io_executor.run("config_read", self._read_file, lane=BACKGROUND), startup=False)
+            except Exception as e:
+                self.logger.error(f"❌ Config reload failed: {e}")
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Current effective values of every configurable section"""
+        return {section: {key: getattr(cls, key) for key in self._defaults[section]} for section, cls in SECTIONS.items()}
+
+    def _stat_file(self) -> int | None:
+        try:
+            return self.config_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _read_file(self) -> dict[str, Any] | None:
+        """Overrides from the config file: {} if there is none, None if it cannot be used"""
+        self._file_mtime_ns = self._stat_file()
+        if self._file_mtime_ns is None:
+            return {}
+        try:
+            data = json.loads(self.config_file.read_text())
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.error(f"❌ Invalid config file {self.config_file}, keeping current settings: {e}")
+            return None
+        if not isinstance(data, dict):
+            self.logger.error(f"❌ Config file {self.config_file} must contain a JSON object, keeping current settings")
+            return None
+        return data
+
+    def _layer(
+        self, target: dict[str, dict[str, Any]], layered: set[str], section: str, key: str, value: Any, source: str, from_env: bool
+    ) -> None:
+        defaults = self._defaults.get(section)
+        if defaults is None or key not in defaults:
+            self.logger.warning(f"⚠️ Unknown setting {section}.{key} in {source}, ignoring")
+            return
+        name = f"{section}.{key}"
+        try:
+            value = _coerce(defaults[key], value, from_env)
+            _check_minimum(name, defaults[key], value)
+        except ValueError as e:
+            self.error_count += 1
+            # Keep what an earlier layer of this pass set, otherwise the value in effect now
+            if name not in layered:
+                target[section][key] = getattr(SECTIONS[section], key)
+            self.logger.error(f"❌ Invalid value for {name} in {source}, keeping {target[section][key]!r}: {e}")
+            return
+        target[section][key] = value
+        layered.add(name)
+
+    def _apply(self, file_data: dict[str, Any] | None, startup: bool) -> set[str]:
+        if file_data is None:
+            self.error_count += 1
+            return set()
+
+        effective = {section: dict(values) for section, values in self._defaults.items()}
+        layered: set[str] = set()
+
+        for section, values in file_data.items():
+            if not isinstance(values, dict):
+                self.logger.warning(f"⚠️ Config section {section} in {self.config_file} is not an object, ignoring")
+                continue
+            for key, value in values.items():
+                self._layer(effective, layered, section, key, value, str(self.config_file), from_env=False)
+
+        prefix = RuntimeConfigSettings.ENV_PREFIX
+        for name, value in self.environ.items():
+            if name.startswith(prefix) and "__" in name:
+                section, key = name[len(prefix) :].split("__", 1)
+                self._layer(effective, layered, section.lower(), key.upper(), value, f"${name}", from_env=True)
+
+        changed = set()
+        for section, values in effective.items():
+            cls = SECTIONS[section]
+            for key, value in values.items():
+                if getattr(cls, key) == value:
+                    continue
+                if section in RESTART_ONLY and not startup:
+                    self.logger.warning(f"⚠️ {section}.{key} changed but only takes effect after a restart")
+                    continue
+                setattr(cls, key, value)
+                changed.add(f"{section}.{key}")
+
+        if changed:
+            self.logger.info(f"⚙️ Configuration {'loaded' if startup else 'reloaded'}: {', '.join(sorted(changed))}")
+        if not startup:
+            self.reload_count += 1
+            for callback in self._callbacks:
+                try:
+                    callback(changed)
+                except Exception as e:
+                    self.logger.error(f"❌ Config reload callback failed: {e}")
+        return changed
@@ -1,6 +1,37 @@
 """Manager modules for Review Gate V2."""
 
+from .attachment_store import AttachmentStore
+from .context_tracker import ContextTracker
+from .ingest_store import IngestStore
+from .instance_registry import InstanceRegistry
+from .ipc_sweeper import IpcSweeper
+from .ipc_watcher import IpcWatcher
+from .popup_scheduler import PopupScheduler
+from .presence_registry import PresenceRegistry
+from .request_coalescer import RequestCoalescer
+from .response_index import ResponseIndex
 from .response_manager import ResponseManager
+from .review_journal import ReviewJournal
+from .status_monitor import ExtensionStatusMonitor
+from .ticket_manager import TicketManager
 from .trigger_manager import TriggerManager
+from .workspace_index import WorkspaceIndex
 
-__all__ = ["ResponseManager", "TriggerManager"]
+__all__ = [
+    "ResponseManager",
+    "TriggerManager",
+    "IpcWatcher",
+    "ResponseIndex",
+    "PopupScheduler",
+    "RequestCoalescer",
+    "TicketManager",
+    "ExtensionStatusMonitor",
+    "PresenceRegistry",
+    "InstanceRegistry",
+    "ReviewJournal",
+    "IpcSweeper",
+    "ContextTracker",
+    "WorkspaceIndex",
+    "IngestStore",
+    "AttachmentStore",
+]
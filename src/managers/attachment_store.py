@@ -0,0 +1,115 @@
+import base64
+import binascii
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any
+
+from ..config.constants import AttachmentConfig
+from ..utils.io_executor import BACKGROUND, IoExecutor
+
+URI_PREFIX = "cursor-enhancer://attachments/"
+
+
+def _decode(encoded: str) -> tuple[bytes, str]:
+    """Bytes and sha256 of base64 data; raises ValueError if it is not valid base64"""
+    try:
+        data = base64.b64decode(encoded, validate=True)
+    except binascii.Error as e:
+        raise ValueError(f"attachment has no valid base64 data: {e}") from e
+    return data, hashlib.sha256(data).hexdigest()
+
+
+class StoredAttachment:
+    __slots__ = ("uri", "name", "mime_type", "data", "expires_at")
+
+    def __init__(self, uri: str, name: str, mime_type: str, data: bytes, expires_at: float):
+        self.uri = uri
+        self.name = name
+        self.mime_type = mime_type
+        self.data = data
+        self.expires_at = expires_at
+
+
+class AttachmentStore:
+    """Attachments handed to clients as MCP resources instead of inline base64.
+
+    Entries are keyed by the sha256 of their bytes, so an image attached to several answers
+    is kept once. Each lives for TTL seconds after it was last stored, and the oldest are
+    dropped first once the total passes MAX_BYTES. Decoding and hashing run on the I/O
+    executor's background lane.
+    """
+
+    def __init__(self, io_executor: IoExecutor):
+        self.logger = logging.getLogger(__name__)
+        self.io_executor = io_executor
+        self._entries: OrderedDict[str, StoredAttachment] = OrderedDict()  # uri -> entry, oldest first
+        self._bytes = 0
+        self.stored = 0
+        self.reads = 0
+        self.evicted = 0
+        self.rejected = 0
+
+    async def put(self, attachment: dict[str, Any]) -> StoredAttachment:
+        """Keep an answer attachment and return its entry.
+
+        Raises ValueError for undecodable data, and for an attachment over MAX_BYTES, which would
+        be evicted as soon as it was stored.
+        """
+        encoded = attachment.get("base64Data")
+        if not isinstance(encoded, str):
+            raise ValueError("attachment has no base64 data")
+        # base64 takes 4 characters per 3 bytes: refuse what cannot fit before decoding it
+        self._check_size(len(encoded) // 4 * 3 - 2)
+        data, digest = await self.io_executor.run("decode_attachment", _decode, encoded, lane=BACKGROUND)
+        self._check_size(len(data))
+
+        uri = f"{URI_PREFIX}{digest}"
+        entry = self._entries.pop(uri, None)
+        if entry is None:
+            name = attachment.get("fileName") or "attachment"
+            entry = StoredAttachment(uri, name, attachment.get("mimeType") or "application/octet-stream", data, 0.0)
+            self._bytes += len(data)
+            self.stored += 1
+        entry.expires_at = time.monotonic() + AttachmentConfig.TTL
+        self._entries[uri] = entry
+        self._evict()
+        return entry
+
+    def _check_size(self, size: int) -> None:
+        if size > AttachmentConfig.MAX_BYTES:
+            self.rejected += 1
+            raise ValueError(f"attachment of {size} bytes is over the {AttachmentConfig.MAX_BYTES}-byte limit for attachment resources")
+
+    def get(self, uri: str) -> StoredAttachment | None:
+        self._evict()
+        entry = self._entries.get(uri)
+        if entry is not None:
+            self.reads += 1
+        return entry
+
+    def entries(self) -> list[StoredAttachment]:
+        self._evict()
+        return list(self._entries.values())
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest.expires_at > now and self._bytes <= AttachmentConfig.MAX_BYTES:
+                break
+            del self._entries[oldest.uri]
+            self._bytes -= len(oldest.data)
+            self.evicted += 1
+            self.logger.info(f"🗑️ Dropped attachment resource {oldest.name} ({len(oldest.data)} bytes)")
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "stored": self.stored,
+            "reads": self.reads,
+            "evicted": self.evicted,
+            "rejected": self.rejected,
+        }
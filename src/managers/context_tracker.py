@@ -0,0 +1,123 @@
+import difflib
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Any
+
+from ..config.constants import TriggerConfig
+from ..utils.io_executor import BACKGROUND, IoExecutor
+
+# Presence feature an extension advertises when it can apply context deltas
+DELTA_FEATURE = "context_delta"
+
+# Contexts remembered per session besides the confirmed one, for rounds still in flight
+_UNCONFIRMED_KEPT = 3
+
+
+def make_context_delta(base: str, context: str) -> list[list[Any]]:
+    """Line edits turning base into context: [start, end, replacement lines] over base.split("\\n"), in order"""
+    base_lines = base.split("\n")
+    lines = context.split("\n")
+    matcher = difflib.SequenceMatcher(None, base_lines, lines)
+    return [[i1, i2, lines[j1:j2]] for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"]
+
+
+class ContextTracker:
+    """Send each review round's context as a delta against the one the extension already holds.
+
+    Iterative reviews repeat nearly the same context (a file with small edits). Per session the
+    tracker remembers the contexts it sent and which of them an extension confirmed in its
+    acknowledgement; the next round carries only the changed lines against that confirmed base when
+    they are sufficiently smaller. An extension without the base, or whose result does not hash
+    to the expected value, asks for a resync and gets the whole context again.
+    """
+
+    def __init__(self, presence_registry, io_executor: IoExecutor):
+        self.presence_registry = presence_registry
+        self.io_executor = io_executor
+        self.logger = logging.getLogger(__name__)
+        self._sent: OrderedDict[str, dict[str, str]] = OrderedDict()  # session -> sha256 -> context, least recent first
+        self._confirmed: dict[str, str] = {}  # session -> sha256 of the context the extension holds
+        self.delta_count = 0
+        self.full_count = 0
+        self.resync_count = 0
+        self.bytes_saved = 0
+
+    def _deltas_supported(self) -> bool:
+        """Whichever window picks up the trigger must be able to apply a delta"""
+        extensions = self.presence_registry.live_extensions()
+        return bool(extensions) and all(DELTA_FEATURE in (record.get("features") or []) for record in extensions)
+
+    async def prepare(self, trigger_data: dict[str, Any], session: str) -> None:
+        """Tag trigger_data with its session and replace its context with a delta when that pays off"""
+        context = trigger_data.get("context")
+        if not TriggerConfig.CONTEXT_DELTAS or not isinstance(context, str):
+            return
+
+        digest = hashlib.sha256(context.encode()).hexdigest()
+        base_digest = self._confirmed.get(session)
+        sent = self._sent.setdefault(session, {})
+        sent.pop(digest, None)
+        sent[digest] = context
+        for stale in [d for d in sent if d != base_digest][:-_UNCONFIRMED_KEPT]:
+            del sent[stale]
+        self._sent.move_to_end(session)
+        while len(self._sent) > TriggerConfig.CONTEXT_DELTA_SESSIONS:
+            stale, _ = self._sent.popitem(last=False)
+            self._confirmed.pop(stale, None)
+        trigger_data["context_session"] = session
+
+        size = len(context.encode())
+        if base_digest is None or size < TriggerConfig.CONTEXT_DELTA_MIN_BYTES or not self._deltas_supported():
+            self.full_count += 1
+            return
+
+        ops = await self.io_executor.run("context_delta", make_context_delta, sent[base_digest], context, lane=BACKGROUND)
+        delta_size = len(json.dumps(ops, separators=(",", ":"), ensure_ascii=False).encode())
+        if delta_size > size * TriggerConfig.CONTEXT_DELTA_MAX_RATIO:
+            self.full_count += 1
+            return
+
+        del trigger_data["context"]
+        trigger_data["context_delta"] = {"base": base_digest, "sha256": digest, "ops": ops}
+        self.delta_count += 1
+        self.bytes_saved += size - delta_size
+        self.logger.info(f"🧮 Context for session '{session}' sent as {len(ops)} edit(s), {delta_size} of {size} bytes")
+
+    def confirm(self, session: str, digest: str | None) -> None:
+        """The extension acknowledged holding the context with this hash, the base of the next delta"""
+        if digest in self._sent.get(session, {}):
+            self._confirmed[session] = digest
+        else:
+            self._confirmed.pop(session, None)
+
+    def resync(self, trigger_data: dict[str, Any], context: str | None = None) -> bool:
+        """Put the whole context back into a trigger the extension could not apply as a delta.
+
+        context is the full context the caller kept; without it the tracker's own copy is used. Raises
+        RuntimeError if neither is there, rather than sending the popup an empty context.
+        """
+        delta = trigger_data.get("context_delta")
+        if delta is None:
+            return False
+        session = trigger_data.get("context_session", "")
+        if context is None:
+            context = self._sent.get(session, {}).get(delta["sha256"])
+        if context is None or hashlib.sha256(context.encode()).hexdigest() != delta["sha256"]:
+            raise RuntimeError(f"the context of session '{session}' is no longer available to resend in full")
+        del trigger_data["context_delta"]
+        self._confirmed.pop(session, None)
+        trigger_data["context"] = context
+        self.resync_count += 1
+        self.logger.warning(f"⚠️ Extension lacks the base context of session '{session}' - resending it whole")
+        return True
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "sessions": len(self._sent),
+            "deltas": self.delta_count,
+            "full": self.full_count,
+            "resyncs": self.resync_count,
+            "bytes_saved": self.bytes_saved,
+        }
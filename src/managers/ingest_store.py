@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import uuid
+from typing import Any
+
+from ..config.constants import FilePatterns, IngestConfig
+from ..utils.file_operations import create_private_file, get_temp_path
+from ..utils.io_executor import IoExecutor
+
+
+class IngestStream:
+    """Text handed to ingest_text in chunks, appended to one side file as it arrives.
+
+    Keeps a running sha256 and line count, and splits the text into pages of about
+    PAGE_BYTES ending at line breaks, so the popup can show one page at a time.
+    Its methods do file I/O and run on the I/O executor.
+    """
+
+    def __init__(self, stream_id: str):
+        self.stream_id = stream_id
+        self.file_name = f"{FilePatterns.INGEST_PREFIX}_{stream_id}.txt"
+        self.path = get_temp_path(self.file_name)
+        self._file = None  # opened by the first append
+        self._sha256 = hashlib.sha256()
+        self._page_tail = bytearray()  # bytes after the last complete page
+        self._preview = bytearray()
+        self.pages: list[list[int]] = []  # [offset, length] of each page
+        self.size = 0
+        self.newlines = 0
+        self.chunks = 0
+        self.last_byte = b""
+        self.updated_at = time.monotonic()
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+    @property
+    def lines(self) -> int:
+        return self.newlines + (1 if self.size and self.last_byte != b"\n" else 0)
+
+    @property
+    def preview(self) -> str:
+        return self._preview.decode("utf-8", errors="ignore")
+
+    def append(self, data: bytes) -> None:
+        if self._file is None:
+            self._file = create_private_file(self.path)
+        self._file.write(data)
+        self._sha256.update(data)
+        self.size += len(data)
+        self.newlines += data.count(b"\n")
+        self.chunks += 1
+        self.updated_at = time.monotonic()
+        if data:
+            self.last_byte = data[-1:]
+        if len(self._preview) < IngestConfig.PREVIEW_BYTES:
+            self._preview += data[: IngestConfig.PREVIEW_BYTES - len(self._preview)]
+
+        self._page_tail += data
+        while len(self._page_tail) >= IngestConfig.PAGE_BYTES:
+            cut = self._page_tail.rfind(b"\n", 0, IngestConfig.PAGE_BYTES) + 1
+            if not cut:
+                # One very long line: cut it, but not inside a UTF-8 character
+                cut = IngestConfig.PAGE_BYTES
+                while cut > 1 and self._page_tail[cut] & 0xC0 == 0x80:
+                    cut -= 1
+            self._add_page(cut)
+
+    def _add_page(self, length: int) -> None:
+        offset = self.pages[-1][0] + self.pages[-1][1] if self.pages else 0
+        self.pages.append([offset, length])
+        del self._page_tail[:length]
+
+    def write(self, data: bytes) -> None:
+        """Append data as chunks of at most CHUNK_BYTES"""
+        for offset in range(0, len(data), IngestConfig.CHUNK_BYTES):
+            self.append(data[offset : offset + IngestConfig.CHUNK_BYTES])
+        if not data:
+            self.append(b"")
+
+    def finish(self) -> None:
+        if self._page_tail:
+            self._add_page(len(self._page_tail))
+        if self._file is not None:
+            self._file.close()
+
+    def discard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def reference(self) -> dict[str, Any]:
+        """What the trigger carries instead of the text"""
+        return {"file": self.file_name, "sha256": self.sha256, "size": self.size, "lines": self.lines, "pages": self.pages}
+
+
+class IngestStore:
+    """Streams of ingest_text chunks still being received, by stream id"""
+
+    def __init__(self, io_executor: IoExecutor):
+        self.logger = logging.getLogger(__name__)
+        self.io_executor = io_executor
+        self._lock = asyncio.Lock()  # chunks are checked and written one at a time
+        self._streams: dict[str, IngestStream] = {}
+        self.streams_finished = 0
+        self.streams_expired = 0
+        self.bytes_ingested = 0
+
+    async def append(self, stream_id: str | None, text: str, chunk_index: int | None = None) -> IngestStream:
+        """Add a chunk to stream_id, starting it if new; without a stream id the text is a whole, one-chunk stream.
+
+        Raises ValueError for an oversized or out-of-order chunk, leaving the stream unchanged.
+        """
+        async with self._lock:
+            await self._expire_idle()
+            return await self._append(stream_id, text, chunk_index)
+
+    async def _append(self, stream_id: str | None, text: str, chunk_index: int | None) -> IngestStream:
+        data = text.encode()
+        if stream_id is not None and len(data) > IngestConfig.CHUNK_BYTES:
+            raise ValueError(f"chunk of {len(data)} bytes is over the {IngestConfig.CHUNK_BYTES}-byte limit; send it as smaller chunks")
+        if stream_id is not None and not stream_id.replace("-", "").replace("_", "").isalnum():
+            raise ValueError(f"stream id {stream_id!r} may only contain letters, digits, '-' and '_'")
+
+        stream = self._streams.get(stream_id) if stream_id is not None else None
+        expected_index = stream.chunks if stream else 0
+        if chunk_index is not None and chunk_index != expected_index:
+            raise ValueError(f"expected chunk {expected_index} of stream {stream_id}, got chunk {chunk_index}")
+        if (stream.size if stream else 0) + len(data) > IngestConfig.MAX_STREAM_BYTES:
+            raise ValueError(f"text would exceed the {IngestConfig.MAX_STREAM_BYTES}-byte limit for one ingestion")
+
+        if stream is None:
+            stream = IngestStream(stream_id or uuid.uuid4().hex)
+            try:
+                await self.io_executor.run("write_ingest", stream.write, data)
+            except FileExistsError as e:
+                raise ValueError(f"{stream.file_name} already exists; send the text under a new stream id") from e
+            self._streams[stream.stream_id] = stream
+        else:
+            await self.io_executor.run("write_ingest", stream.write, data)
+        self.bytes_ingested += len(data)
+        return stream
+
+    async def finish(self, stream_id: str) -> IngestStream:
+        """Close a stream: its file is complete and it no longer accepts chunks"""
+        async with self._lock:
+            stream = self._streams.pop(stream_id)
+            await self.io_executor.run("finish_ingest", stream.finish)
+        self.streams_finished += 1
+        self.logger.info(f"📥 Ingested {stream.size} bytes in {stream.chunks} chunk(s) into {stream.file_name} ({len(stream.pages)} pages)")
+        return stream
+
+    async def discard(self, stream: IngestStream) -> None:
+        """Remove a stream's side file"""
+        await self.io_executor.run("discard_ingest", stream.discard)
+
+    async def _expire_idle(self) -> None:
+        now = time.monotonic()
+        for stream_id, stream in list(self._streams.items()):
+            if now - stream.updated_at > IngestConfig.STREAM_IDLE_TIMEOUT:
+                del self._streams[stream_id]
+                await self.discard(stream)
+                self.streams_expired += 1
+                self.logger.warning(f"⚠️ Discarded ingest stream {stream_id}: no chunk for {IngestConfig.STREAM_IDLE_TIMEOUT}s")
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "open_streams": len(self._streams),
+            "finished": self.streams_finished,
+            "expired": self.streams_expired,
+            "bytes": self.bytes_ingested,
+        }
@@ -0,0 +1,103 @@
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+
+from ..config.constants import IpcConfig, PresenceConfig
+from ..utils.file_operations import ensure_private_dir, get_ipc_base_dir, get_temp_dir, ipc_namespace
+
+
+class InstanceRegistry:
+    """Advertise this server's private IPC directory so Cursor extensions can discover it.
+
+    Writes <base>/instances/<pid>.json on start and removes it on stop. Extensions list
+    that directory, skip records of dead pids and serve every IPC directory bound to
+    their workspace or to none. Shared mode needs no record: extensions always serve /tmp.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.record_file: str | None = None
+        self.owned_dir: str | None = None  # per-pid IPC directory removed on stop
+
+    @property
+    def enabled(self) -> bool:
+        return IpcConfig.MODE in ("instance", "workspace")
+
+    def _registry_dir(self) -> str:
+        return ensure_private_dir(os.path.join(ensure_private_dir(get_ipc_base_dir()), IpcConfig.REGISTRY_DIR))
+
+    def start(self) -> None:
+        """Publish this instance's record, pruning records left by servers that died"""
+        ipc_dir = get_temp_dir()
+        if not self.enabled:
+            self.logger.info(f"📂 IPC directory: {ipc_dir} (shared)")
+            return
+
+        registry_dir = self._registry_dir()
+        self._prune(registry_dir)
+
+        workspace = IpcConfig.WORKSPACE or (os.getcwd() if IpcConfig.MODE == "workspace" else "")
+        record = {
+            "pid": os.getpid(),
+            "ipc_dir": ipc_dir,
+            "mode": IpcConfig.MODE,
+            "workspace": os.path.realpath(workspace) if workspace else None,
+            "protocol_version": PresenceConfig.MIN_PROTOCOL_VERSION,
+            "started_at": datetime.now().isoformat(),
+        }
+        self.record_file = os.path.join(registry_dir, f"{os.getpid()}.json")
+        tmp_file = f"{self.record_file}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(record, f)
+        os.replace(tmp_file, self.record_file)
+        self.owned_dir = ipc_dir if self._is_own_instance_dir(ipc_dir) else None
+        self.logger.info(f"📂 IPC directory: {ipc_dir} ({IpcConfig.MODE}, registered in {registry_dir})")
+
+    def stop(self) -> None:
+        """Withdraw the record; this server's per-pid IPC directory is removed along with it"""
+        if self.record_file is None:
+            return
+        try:
+            os.unlink(self.record_file)
+        except FileNotFoundError:
+            pass
+        self.record_file = None
+
+        if self.owned_dir is not None:
+            shutil.rmtree(self.owned_dir, ignore_errors=True)
+            self.owned_dir = None
+
+    @staticmethod
+    def _is_own_instance_dir(ipc_dir: str) -> bool:
+        """Whether ipc_dir is the per-pid directory instance mode made for this process, which no other server uses.
+
+        A configured NAMESPACE or a workspace directory may be shared with other servers
+        and outlives this one, so it is never removed.
+        """
+        if IpcConfig.MODE != "instance" or IpcConfig.NAMESPACE:
+            return False
+        return ipc_dir == os.path.join(get_ipc_base_dir(), ipc_namespace())
+
+    def _prune(self, registry_dir: str) -> None:
+        with os.scandir(registry_dir) as it:
+            for entry in it:
+                pid = entry.name.removesuffix(".json")
+                if not pid.isdigit() or self._pid_alive(int(pid)):
+                    continue
+                try:
+                    os.unlink(entry.path)
+                    self.logger.info(f"🧹 Removed stale instance record for pid {pid}")
+                except FileNotFoundError:
+                    pass
+
+    @staticmethod
+    def _pid_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+            return True
+        except PermissionError:
+            return True
+        except ProcessLookupError:
+            return False
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import os
+import stat
+import time
+from collections import Counter
+from typing import Any
+
+from ..config.constants import FilePatterns, SweeperConfig
+from ..utils.file_operations import get_temp_dir
+from ..utils.io_executor import BACKGROUND, IoExecutor
+
+# Names the original Review Gate extension still writes
+_LEGACY_PREFIX = "review_gate_"
+
+
+class IpcSweeper:
+    """Remove IPC files nobody will read again, a bounded slice of the directory per pass.
+
+    Each file class (acks, triggers, speech files, signals, presence, spilled contexts,
+    ingested text, stats snapshots, answers, temp files) has its own age limit in SweeperConfig. A pass examines at most
+    MAX_ENTRIES_PER_PASS entries for at most MAX_PASS_SECONDS and the next pass resumes
+    where it stopped, so a crowded shared /tmp is covered over several passes. Passes
+    run on the I/O executor's background lane, one at a time.
+    """
+
+    def __init__(self, io_executor: IoExecutor, directory: str | None = None):
+        self.directory = directory or get_temp_dir()
+        self.io_executor = io_executor
+        self.logger = logging.getLogger(__name__)
+        self._scan: Any = None  # os.scandir iterator kept open between passes
+        self._sweeping = False
+        self._stopped = False
+        self._classes = (
+            ("speech", (f"{_LEGACY_PREFIX}speech_", f"{_LEGACY_PREFIX}audio_")),
+            ("ack", (FilePatterns.ACK_PREFIX, f"{_LEGACY_PREFIX}ack")),
+            ("trigger", (FilePatterns.TRIGGER_PREFIX, f"{_LEGACY_PREFIX}trigger")),
+            ("signal", (FilePatterns.STATUS_PREFIX, FilePatterns.CANCEL_PREFIX)),
+            ("presence", (FilePatterns.PRESENCE_PREFIX,)),
+            ("context", (FilePatterns.CONTEXT_PREFIX,)),
+            ("ingest", (FilePatterns.INGEST_PREFIX,)),
+            ("stats", (FilePatterns.STATS_PREFIX,)),
+            ("response", (FilePatterns.RESPONSE_PREFIX, FilePatterns.MCP_RESPONSE_PREFIX, f"{_LEGACY_PREFIX}response")),
+        )
+        self._generic_responses = frozenset(
+            f"{prefix}.json" for prefix in (FilePatterns.RESPONSE_PREFIX, FilePatterns.MCP_RESPONSE_PREFIX, f"{_LEGACY_PREFIX}response")
+        )
+        self._owned_prefixes = ("cursor_enhancer", _LEGACY_PREFIX, FilePatterns.MCP_RESPONSE_PREFIX)
+        self._uid = os.getuid()
+        self.removed: Counter[str] = Counter()
+        self.bytes_freed = 0
+        self.passes = 0
+        self.entries_scanned = 0
+        self.full_sweeps = 0
+        self.errors = 0
+
+    def classify(self, name: str) -> str | None:
+        """File class of an IPC file name, or None for files the sweeper never touches (logs, the journal, ...)"""
+        if name.endswith(".tmp"):
+            return "temp" if name.lstrip(".").startswith(self._owned_prefixes) else None
+        if name in self._generic_responses:
+            return "generic_response"
+        for file_class, prefixes in self._classes:
+            if name.startswith(prefixes):
+                return file_class
+        return None
+
+    async def run(self) -> None:
+        """Sweep every INTERVAL seconds until cancelled"""
+        try:
+            while True:
+                await asyncio.sleep(SweeperConfig.INTERVAL)
+                if SweeperConfig.ENABLED:
+                    await self.io_executor.run("sweep", self.sweep_pass, lane=BACKGROUND)
+        finally:
+            # A pass still running on its thread closes the listing itself when it ends
+            self._stopped = True
+            if not self._sweeping:
+                self._close_scan()
+
+    def sweep_pass(self) -> int:
+        """Examine the next slice of the directory, returning how many files were removed; blocking"""
+        self._sweeping = True
+        try:
+            return self._sweep()
+        finally:
+            self._sweeping = False
+            if self._stopped:
+                self._close_scan()
+
+    def _sweep(self) -> int:
+        self.passes += 1
+        deadline = time.monotonic() + SweeperConfig.MAX_PASS_SECONDS
+        now = time.time()
+        removed = 0
+
+        for _ in range(SweeperConfig.MAX_ENTRIES_PER_PASS):
+            if time.monotonic() >= deadline:
+                break
+            entry = self._next_entry()
+            if entry is None:
+                break
+            self.entries_scanned += 1
+
+            file_class = self.classify(entry.name)
+            if file_class is None:
+                continue
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            except OSError:
+                self.errors += 1
+                continue
+            if not stat.S_ISREG(st.st_mode) or st.st_uid != self._uid:
+                continue
+            if now - st.st_mtime < getattr(SweeperConfig, f"{file_class.upper()}_MAX_AGE"):
+                continue
+
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                self.errors += 1
+                self.logger.warning(f"⚠️ Sweeper could not remove {entry.name}: {e}")
+                continue
+            self.removed[file_class] += 1
+            self.bytes_freed += st.st_size
+            removed += 1
+
+        if removed:
+            self.logger.info(f"🧹 Swept {removed} stale IPC file(s) from {self.directory}")
+        return removed
+
+    def _next_entry(self) -> os.DirEntry | None:
+        """Next directory entry, starting a new listing after the previous one was exhausted"""
+        if self._scan is None:
+            try:
+                self._scan = os.scandir(self.directory)
+            except OSError as e:
+                self.errors += 1
+                self.logger.error(f"❌ Sweeper cannot list {self.directory}: {e}")
+                return None
+
+        entry = next(self._scan, None)
+        if entry is None:
+            self._close_scan()
+            self.full_sweeps += 1
+        return entry
+
+    def _close_scan(self) -> None:
+        if self._scan is not None:
+            self._scan.close()
+            self._scan = None
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "removed": dict(self.removed),
+            "bytes_freed": self.bytes_freed,
+            "passes": self.passes,
+            "entries_scanned": self.entries_scanned,
+            "full_sweeps": self.full_sweeps,
+            "errors": self.errors,
+        }
@@ -0,0 +1,228 @@
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+from collections.abc import Callable
+
+from ..config.constants import TimeoutConfig
+from ..utils.file_operations import get_temp_dir
+from ..utils.io_executor import IoExecutor
+
+# inotify constants from <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Event names delivered to subscribers
+CHANGED = "changed"
+DELETED = "deleted"
+
+IpcCallback = Callable[[str, str, str], None]
+
+
+class IpcWatcher:
+    """Watch the IPC directory once per server and dispatch file events to subscribers.
+
+    Uses inotify when available so no directory listing happens after the initial scan.
+    Otherwise falls back to polling that only rescans when the directory mtime changes.
+    Listings and stats after startup run on the I/O executor.
+    """
+
+    def __init__(self, io_executor: IoExecutor, directory: str | None = None, poll_interval: float | None = None):
+        self.directory = directory or get_temp_dir()
+        self.io_executor = io_executor
+        self.poll_interval = poll_interval if poll_interval is not None else TimeoutConfig.WATCHER_POLL_INTERVAL
+        self.logger = logging.getLogger(__name__)
+        self._subscribers: list[tuple[tuple[str, ...], IpcCallback]] = []
+        self._entries: dict[str, tuple[int, int, int]] = {}  # name -> (inode, mtime_ns, size)
+        self._dir_mtime_ns = 0
+        self._inotify_fd = -1
+        self._poll_task: asyncio.Task | None = None
+        self._rescan_task: asyncio.Task | None = None
+        self._rescan_again = False
+        self.backend = "stopped"
+
+    def subscribe(self, prefixes: tuple[str, ...], callback: IpcCallback) -> None:
+        """Register a callback(event, name, path) for files whose names start with any prefix"""
+        self._subscribers.append((prefixes, callback))
+
+    def start(self) -> None:
+        """Start watching; must be called from a running event loop"""
+        if self.backend != "stopped":
+            return
+
+        if self._start_inotify():
+            self.backend = "inotify"
+        else:
+            self.backend = "poll"
+            self._poll_task = asyncio.create_task(self._poll_loop())
+
+        # Index files that already exist before any event arrives; at startup, before anything is served
+        try:
+            self._apply_listing(*self._list_directory())
+        except Exception as e:
+            self.logger.error(f"❌ IPC directory scan failed: {e}")
+        self.logger.info(f"👁️ IPC watcher started on {self.directory} (backend: {self.backend})")
+
+    def stop(self) -> None:
+        """Stop watching and release the inotify descriptor or polling task"""
+        if self._inotify_fd >= 0:
+            try:
+                asyncio.get_running_loop().remove_reader(self._inotify_fd)
+            except RuntimeError:
+                pass
+            os.close(self._inotify_fd)
+            self._inotify_fd = -1
+
+        if self._poll_task:
+            self._poll_task.cancel()
+            self._poll_task = None
+        if self._rescan_task:
+            self._rescan_task.cancel()
+            self._rescan_task = None
+
+        self.backend = "stopped"
+
+    def _start_inotify(self) -> bool:
+        """Set up an inotify watch on the IPC directory, returning False if unavailable"""
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+            if fd < 0:
+                return False
+            if libc.inotify_add_watch(fd, os.fsencode(self.directory), _WATCH_MASK) < 0:
+                os.close(fd)
+                return False
+            asyncio.get_running_loop().add_reader(fd, self._on_inotify_readable)
+            self._inotify_fd = fd
+            return True
+        except Exception as e:
+            self.logger.warning(f"⚠️ inotify unavailable, falling back to polling: {e}")
+            return False
+
+    def _on_inotify_readable(self) -> None:
+        """Drain pending inotify events and dispatch them"""
+        try:
+            buffer = os.read(self._inotify_fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self.logger.error(f"❌ inotify read error: {e}")
+            return
+
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buffer):
+            _wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset : offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+
+            if mask & _IN_Q_OVERFLOW:
+                self.logger.warning("⚠️ inotify queue overflow - rescanning IPC directory")
+                self._request_rescan()
+            elif mask & (_IN_DELETE | _IN_MOVED_FROM):
+                self._entries.pop(name, None)
+                self._dispatch(DELETED, name)
+            elif mask & (_IN_CLOSE_WRITE | _IN_MOVED_TO):
+                self._dispatch(CHANGED, name)
+
+    async def _poll_loop(self) -> None:
+        """Fallback loop: one stat per interval, one directory listing only when it changed"""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                if await self.io_executor.run("watch_poll", self._directory_changed):
+                    await self._rescan()
+                else:
+                    changed = await self.io_executor.run("watch_restat", self._restat_known, dict(self._entries))
+                    for name, key in changed.items():
+                        if name in self._entries:
+                            self._entries[name] = key
+                            self._dispatch(CHANGED, name)
+            except Exception as e:
+                self.logger.error(f"❌ IPC watcher poll error: {e}")
+
+    def _matches(self, name: str) -> bool:
+        return any(name.startswith(prefixes) for prefixes, _ in self._subscribers)
+
+    def _directory_changed(self) -> bool:
+        return os.stat(self.directory).st_mtime_ns != self._dir_mtime_ns
+
+    def _request_rescan(self) -> None:
+        """Rescan in the background; a request during a rescan runs one more once it is done"""
+        if self._rescan_task and not self._rescan_task.done():
+            self._rescan_again = True
+            return
+        self._rescan_task = asyncio.create_task(self._rescan_until_settled())
+
+    async def _rescan_until_settled(self) -> None:
+        self._rescan_again = True
+        while self._rescan_again:
+            self._rescan_again = False
+            await self._rescan()
+
+    async def _rescan(self) -> None:
+        """List the directory once and emit events for watched files that appeared, changed or vanished"""
+        try:
+            listing = await self.io_executor.run("watch_scan", self._list_directory)
+        except Exception as e:
+            self.logger.error(f"❌ IPC directory scan failed: {e}")
+            return
+        self._apply_listing(*listing)
+
+    def _list_directory(self) -> tuple[int, dict[str, tuple[int, int, int]]]:
+        """The directory mtime and (inode, mtime_ns, size) of every watched file in it; blocking"""
+        dir_mtime_ns = os.stat(self.directory).st_mtime_ns
+        seen: dict[str, tuple[int, int, int]] = {}
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not self._matches(entry.name):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                seen[entry.name] = (st.st_ino, st.st_mtime_ns, st.st_size)
+        return dir_mtime_ns, seen
+
+    def _apply_listing(self, dir_mtime_ns: int, seen: dict[str, tuple[int, int, int]]) -> None:
+        self._dir_mtime_ns = dir_mtime_ns
+        for name in list(self._entries):
+            if name not in seen:
+                del self._entries[name]
+                self._dispatch(DELETED, name)
+
+        for name, key in seen.items():
+            if self._entries.get(name) != key:
+                self._entries[name] = key
+                self._dispatch(CHANGED, name)
+
+    def _restat_known(self, entries: dict[str, tuple[int, int, int]]) -> dict[str, tuple[int, int, int]]:
+        """New keys of known files rewritten in place, which does not change the directory mtime; blocking"""
+        changed = {}
+        for name, key in entries.items():
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            new_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+            if new_key != key:
+                changed[name] = new_key
+        return changed
+
+    def _dispatch(self, event: str, name: str) -> None:
+        path = os.path.join(self.directory, name)
+        for prefixes, callback in self._subscribers:
+            if name.startswith(prefixes):
+                try:
+                    callback(event, name, path)
+                except Exception as e:
+                    self.logger.error(f"❌ IPC watcher subscriber error for {name}: {e}")
@@ -0,0 +1,165 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any
+
+from ..config.constants import SchedulerConfig
+
+PRIORITY_URGENT = 0
+PRIORITY_NORMAL = 1
+PRIORITY_NAMES = {PRIORITY_URGENT: "urgent", PRIORITY_NORMAL: "normal"}
+
+
+class PopupLease:
+    """A request's claim on a popup slot, from enqueue until the human answered or it timed out"""
+
+    __slots__ = ("trigger_id", "priority", "enqueued_at", "admitted_at", "stacked", "_admitted", "_cancelled")
+
+    def __init__(self, trigger_id: str, priority: int):
+        self.trigger_id = trigger_id
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.admitted_at: float | None = None
+        self.stacked = False
+        self._admitted = asyncio.get_running_loop().create_future()
+        self._cancelled = False
+
+    @property
+    def urgent(self) -> bool:
+        return self.priority == PRIORITY_URGENT
+
+
+class PopupScheduler:
+    """Server-side priority queue deciding which review request may open a popup next.
+
+    Urgent requests jump ahead of normal ones, waiting requests age upward by one
+    priority level per aging interval, and an urgent request can be stacked on top
+    of an open lower-priority popup instead of queueing behind it.
+    """
+
+    def __init__(self, max_active: int | None = None, aging_interval: float | None = None, urgent_stacking: bool | None = None):
+        self.max_active = max_active if max_active is not None else SchedulerConfig.MAX_ACTIVE_POPUPS
+        self.aging_interval = aging_interval if aging_interval is not None else SchedulerConfig.AGING_INTERVAL
+        self.urgent_stacking = urgent_stacking if urgent_stacking is not None else SchedulerConfig.URGENT_STACKING
+        self.logger = logging.getLogger(__name__)
+        self._queue: list[tuple[float, int, PopupLease]] = []
+        self._sequence = itertools.count()
+        self._active: set[PopupLease] = set()
+        self._waits: dict[int, deque[float]] = {priority: deque(maxlen=SchedulerConfig.METRICS_WINDOW) for priority in PRIORITY_NAMES}
+        self._counts: dict[int, int] = dict.fromkeys(PRIORITY_NAMES, 0)
+        self._max_waits: dict[int, float] = dict.fromkeys(PRIORITY_NAMES, 0.0)
+
+    def _sort_key(self, lease: PopupLease) -> float:
+        # Aging lowers the effective priority by (now - enqueued_at) / aging_interval for every
+        # waiting lease alike, so the ordering reduces to this static key and the heap stays valid.
+        return lease.priority + lease.enqueued_at / self.aging_interval
+
+    @asynccontextmanager
+    async def slot(self, trigger_id: str, urgent: bool = False):
+        """Hold a popup slot for the duration of the block, waiting in priority order for it"""
+        lease = await self.acquire(trigger_id, urgent)
+        try:
+            yield lease
+        finally:
+            self.release(lease)
+
+    async def acquire(self, trigger_id: str, urgent: bool = False) -> PopupLease:
+        """Wait until the request may open its popup"""
+        lease = PopupLease(trigger_id, PRIORITY_URGENT if urgent else PRIORITY_NORMAL)
+
+        if lease.urgent and self.urgent_stacking and self._active and not any(active.urgent for active in self._active):
+            # Open on top of the lower-priority popup the human is looking at
+            lease.stacked = True
+            self._admit(lease)
+        else:
+            heapq.heappush(self._queue, (self._sort_key(lease), next(self._sequence), lease))
+            self._dispatch()
+
+        if not lease._admitted.done():
+            self.logger.info(
+                f"🕒 Popup {trigger_id} queued ({PRIORITY_NAMES[lease.priority]}, position {self.queue_position(lease)}, {len(self._active)} active)"
+            )
+
+        try:
+            await lease._admitted
+        except asyncio.CancelledError:
+            lease._cancelled = True
+            if lease.admitted_at is not None:
+                self.release(lease)
+            raise
+
+        return lease
+
+    def release(self, lease: PopupLease) -> None:
+        """Free the lease's slot and admit the next waiting request"""
+        if lease in self._active:
+            self._active.discard(lease)
+            self._dispatch()
+
+    def reconfigure(self, max_active: int, aging_interval: float, urgent_stacking: bool) -> None:
+        """Apply new limits to a running scheduler, re-keying waiting requests and admitting any that now fit"""
+        self.max_active = max_active
+        self.urgent_stacking = urgent_stacking
+        if aging_interval != self.aging_interval:
+            self.aging_interval = aging_interval
+            self._queue = [(self._sort_key(lease), seq, lease) for _key, seq, lease in self._queue]
+            heapq.heapify(self._queue)
+        self._dispatch()
+
+    def queue_position(self, lease: PopupLease) -> int:
+        """1-based position of a waiting lease in admission order, 0 if not queued"""
+        ordered = sorted(entry for entry in self._queue if not entry[2]._cancelled)
+        for position, (_key, _seq, queued) in enumerate(ordered, start=1):
+            if queued is lease:
+                return position
+        return 0
+
+    def _dispatch(self) -> None:
+        while self._queue and self._non_stacked_active() < self.max_active:
+            _key, _seq, lease = heapq.heappop(self._queue)
+            if not lease._cancelled:
+                self._admit(lease)
+
+    def _non_stacked_active(self) -> int:
+        return sum(1 for lease in self._active if not lease.stacked)
+
+    def _admit(self, lease: PopupLease) -> None:
+        lease.admitted_at = time.monotonic()
+        waited = lease.admitted_at - lease.enqueued_at
+        self._active.add(lease)
+        self._waits[lease.priority].append(waited)
+        self._counts[lease.priority] += 1
+        self._max_waits[lease.priority] = max(self._max_waits[lease.priority], waited)
+        lease._admitted.set_result(None)
+
+        stacked = " (stacked on open popup)" if lease.stacked else ""
+        self.logger.info(f"🚦 Popup {lease.trigger_id} admitted after {waited:.2f}s as {PRIORITY_NAMES[lease.priority]}{stacked}")
+
+    def in_flight(self) -> list[dict[str, Any]]:
+        """Popups showing or waiting for a slot, oldest first, with their age in seconds"""
+        now = time.monotonic()
+        leases = [(lease, "active") for lease in self._active]
+        leases += [(lease, "queued") for _key, _seq, lease in self._queue if not lease._cancelled]
+        return [
+            {"trigger_id": lease.trigger_id, "state": state, "priority": PRIORITY_NAMES[lease.priority], "age": now - lease.enqueued_at}
+            for lease, state in sorted(leases, key=lambda item: item[0].enqueued_at)
+        ]
+
+    def get_metrics(self) -> dict[str, dict[str, float]]:
+        """Per-priority wait-time metrics: admissions, queued now, average/p95/max wait in seconds"""
+        metrics = {}
+        for priority, name in PRIORITY_NAMES.items():
+            waits = sorted(self._waits[priority])
+            metrics[name] = {
+                "admitted": self._counts[priority],
+                "queued": sum(1 for _key, _seq, lease in self._queue if lease.priority == priority and not lease._cancelled),
+                "active": sum(1 for lease in self._active if lease.priority == priority),
+                "avg_wait": sum(waits) / len(waits) if waits else 0.0,
+                "p95_wait": waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+                "max_wait": self._max_waits[priority],
+            }
+        return metrics
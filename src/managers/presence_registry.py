@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any
+
+from ..config.constants import FilePatterns, PresenceConfig
+from ..utils.io_executor import IoExecutor
+from ..utils.ipc_file_cache import IpcFileCache
+from .ipc_watcher import CHANGED, IpcWatcher
+
+
+class PresenceRegistry:
+    """In-memory view of the Cursor extensions currently able to show a popup.
+
+    Each extension publishes cursor_enhancer_presence_<pid>.json (pid, workspace,
+    protocol version, last-seen) and refreshes it periodically; the IPC watcher
+    feeds every refresh here so checking for a listener never touches the disk.
+    Refreshed files are read on the I/O executor.
+    """
+
+    def __init__(self, watcher: IpcWatcher, file_cache: IpcFileCache, io_executor: IoExecutor):
+        self.logger = logging.getLogger(__name__)
+        self.file_cache = file_cache
+        self.io_executor = io_executor
+        self._tasks: set[asyncio.Task] = set()  # presence files being read
+        self._events: dict[str, int] = {}  # file name -> events seen, so a slow read never overrides a later event
+        self._records: dict[str, dict[str, Any]] = {}  # file name -> record
+        self._seen_at: dict[str, float] = {}  # file name -> monotonic receipt time
+        self._arrivals: set[asyncio.Future] = set()
+        watcher.subscribe((FilePatterns.PRESENCE_PREFIX,), self._on_file_event)
+
+    def _on_file_event(self, event: str, name: str, path: str) -> None:
+        self._events[name] = self._events.get(name, 0) + 1
+        if event != CHANGED:
+            self._events.pop(name, None)
+            self._records.pop(name, None)
+            self._seen_at.pop(name, None)
+            self.file_cache.forget(path)
+            return
+
+        task = asyncio.create_task(self._process_presence_file(name, path, self._events[name]))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _process_presence_file(self, name: str, path: str, event_number: int) -> None:
+        record = await self.io_executor.run("read_presence", self.file_cache.read_json, path)
+        if not isinstance(record, dict) or self._events.get(name) != event_number:
+            return
+
+        if name not in self._records:
+            self.logger.info(f"🧩 Extension present: pid {record.get('pid')} workspace {record.get('workspace', '?')}")
+        self._records[name] = record
+        self._seen_at[name] = time.monotonic()
+
+        for waiter in self._arrivals:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    @staticmethod
+    def _pid_alive(pid: Any) -> bool:
+        try:
+            os.kill(int(pid), 0)
+            return True
+        except PermissionError:
+            return True  # exists, owned by someone else
+        except (ProcessLookupError, ValueError, TypeError):
+            return False
+
+    def live_extensions(self) -> list[dict[str, Any]]:
+        """Presence records refreshed recently by a running extension speaking a compatible protocol"""
+        now = time.monotonic()
+        live = []
+        for name, record in self._records.items():
+            if now - self._seen_at[name] > PresenceConfig.STALE_AFTER:
+                continue
+            if record.get("protocol_version", 0) < PresenceConfig.MIN_PROTOCOL_VERSION:
+                continue
+            if not self._pid_alive(record.get("pid")):
+                continue
+            live.append(record)
+        return live
+
+    def has_live_extension(self) -> bool:
+        return bool(self.live_extensions())
+
+    def get_stats(self) -> dict[str, int]:
+        return {"records": len(self._records), "live_extensions": len(self.live_extensions()), "arrival_waiters": len(self._arrivals)}
+
+    async def wait_for_extension(self, timeout: float) -> bool:
+        """Wait up to timeout seconds for a live extension to publish its presence"""
+        deadline = time.monotonic() + timeout
+        while not self.has_live_extension():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            waiter = asyncio.get_running_loop().create_future()
+            self._arrivals.add(waiter)
+            try:
+                # Wake at least once per staleness window in case a record silently went stale
+                await asyncio.wait_for(waiter, min(remaining, PresenceConfig.STALE_AFTER))
+            except TimeoutError:
+                pass
+            finally:
+                self._arrivals.discard(waiter)
+        return True
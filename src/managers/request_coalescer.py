@@ -0,0 +1,111 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from ..config.constants import CoalescingConfig
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class _Flight:
+    __slots__ = ("task", "started_at", "waiters", "listeners", "stage")
+
+    def __init__(self):
+        self.task: asyncio.Task | None = None
+        self.started_at = time.monotonic()
+        self.waiters = 0
+        self.listeners: list[Callable[[str], None]] = []  # on_stage callbacks of the waiters still attached
+        self.stage: str | None = None
+
+    def notify(self, stage: str) -> None:
+        """Pass a stage of the shared call on to every waiter"""
+        self.stage = stage
+        for listener in list(self.listeners):
+            listener(stage)
+
+
+class RequestCoalescer:
+    """Single-flight execution of identical tool calls.
+
+    A retry with the same tool and normalized arguments, arriving while the first
+    call is still in flight and within the coalescing window, attaches to the
+    existing call and shares its result instead of opening another popup. Stages the
+    shared call reports reach every waiter, and a late joiner first hears the latest one.
+    """
+
+    def __init__(self, window: float | None = None):
+        self.window = window if window is not None else CoalescingConfig.WINDOW
+        self.logger = logging.getLogger(__name__)
+        self._inflight: dict[str, _Flight] = {}
+        self.coalesced_count = 0
+
+    @staticmethod
+    def _normalize(value: Any) -> Any:
+        if isinstance(value, str):
+            return _WHITESPACE.sub(" ", value).strip()
+        if isinstance(value, dict):
+            # Omitted and empty arguments mean the same thing to the tool
+            return {key: RequestCoalescer._normalize(item) for key, item in value.items() if item not in (None, "")}
+        if isinstance(value, list):
+            return [RequestCoalescer._normalize(item) for item in value]
+        return value
+
+    def make_key(self, tool: str, arguments: dict[str, Any]) -> str:
+        """Hash the tool name and normalized arguments into a coalescing key"""
+        payload = json.dumps([tool, self._normalize(arguments or {})], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def inflight_count(self) -> int:
+        return len(self._inflight)
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "in_flight": len(self._inflight),
+            "waiters": sum(flight.waiters for flight in self._inflight.values()),
+            "coalesced": self.coalesced_count,
+        }
+
+    async def run(
+        self, key: str, factory: Callable[[Callable[[str], None]], Awaitable[Any]], on_stage: Callable[[str], None] | None = None
+    ) -> Any:
+        """Await the in-flight call for key, starting it with factory(on_stage) if there is none to join.
+
+        The call started by factory reports its stages to the on_stage it is given, which
+        forwards them to the on_stage of each waiter for as long as that waiter waits.
+        """
+        flight = self._inflight.get(key)
+        if flight and not flight.task.done() and time.monotonic() - flight.started_at <= self.window:
+            self.coalesced_count += 1
+            self.logger.info(f"🔗 Coalescing duplicate request {key[:12]} onto in-flight call ({flight.waiters} waiting)")
+            if on_stage and flight.stage is not None:
+                on_stage(flight.stage)
+        else:
+            flight = _Flight()
+            flight.task = asyncio.create_task(factory(flight.notify))
+            self._inflight[key] = flight
+            flight.task.add_done_callback(lambda _task, key=key, flight=flight: self._forget(key, flight))
+
+        flight.waiters += 1
+        if on_stage:
+            flight.listeners.append(on_stage)
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            # The shared call only stops when nobody is waiting for it any more
+            if flight.waiters == 1 and not flight.task.done():
+                self.logger.info(f"🛑 Last waiter for request {key[:12]} cancelled - cancelling shared call")
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+            if on_stage:
+                flight.listeners.remove(on_stage)
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
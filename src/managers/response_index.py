@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from pathlib import Path
+
+from ..config.constants import FilePatterns
+from ..utils.file_operations import trigger_id_from_name
+from ..utils.io_executor import IoExecutor
+from ..utils.ipc_file_cache import IpcFileCache
+from .ipc_watcher import CHANGED, IpcWatcher
+
+_RESPONSE_PREFIXES = (FilePatterns.RESPONSE_PREFIX, FilePatterns.MCP_RESPONSE_PREFIX)
+
+
+class ResponseIndex:
+    """In-memory index of pending response files, kept current by the IPC watcher.
+
+    Lookups never touch the directory listing: callers either claim an indexed
+    response immediately or wait on an event until the watcher indexes a new one.
+    Claimed files are read and removed on the I/O executor.
+    """
+
+    def __init__(self, watcher: IpcWatcher, file_cache: IpcFileCache, io_executor: IoExecutor):
+        self.logger = logging.getLogger(__name__)
+        self.file_cache = file_cache
+        self.io_executor = io_executor
+        self._claim_lock = asyncio.Lock()  # one claim at a time, so a response is never handed out twice
+        self._pending: dict[str, str] = {}  # name -> path, in arrival order
+        self._reserved: set[str] = set()  # trigger ids owned by an active chat wait
+        self._waiters: set[asyncio.Future] = set()
+        self._claimed: deque[str] = deque(maxlen=256)  # recently answered trigger ids, for late sibling files
+        watcher.subscribe(_RESPONSE_PREFIXES, self._on_file_event)
+
+    def _on_file_event(self, event: str, name: str, path: str) -> None:
+        if not name.endswith(".json"):
+            return
+
+        if event == CHANGED:
+            self._pending[name] = path
+            for waiter in self._waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+        else:
+            self._pending.pop(name, None)
+
+    def reserve(self, trigger_id: str) -> None:
+        """Keep responses for a trigger, and responses carrying no trigger id, out of generic retrieval while its wait is active"""
+        self._reserved.add(trigger_id)
+
+    def release(self, trigger_id: str) -> None:
+        self._reserved.discard(trigger_id)
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    async def claim(self) -> tuple[str, str] | None:
+        """Consume the oldest unreserved response, returning (user_input, source_file_name)"""
+        async with self._claim_lock:
+            for name, path in list(self._pending.items()):
+                name_trigger_id = trigger_id_from_name(name, _RESPONSE_PREFIXES)
+                if name_trigger_id in self._reserved or name not in self._pending:
+                    continue
+
+                response_file = Path(path)
+                parsed = await self.io_executor.run("read_response", self.file_cache.read_response, path)
+                if parsed is None:
+                    # Gone, still being written (the watcher reports it again once complete) or malformed
+                    if not await self.io_executor.run("stat", response_file.exists):
+                        self._pending.pop(name, None)
+                    continue
+                user_input, _attachments, trigger_id = parsed
+
+                if trigger_id and trigger_id in self._reserved:
+                    continue
+                if not trigger_id and not name_trigger_id and self._reserved:
+                    # An answer without any id goes to the oldest chat wait (ResponseManager) while one is active
+                    continue
+
+                await self._consume(name, response_file)
+                if (trigger_id or name_trigger_id) in self._claimed:
+                    continue
+                if not user_input:
+                    self.logger.warning(f"⚠️ Empty user input in file: {response_file}")
+                    continue
+
+                # The extension writes one answer to several files; drop the siblings so it is returned once
+                if trigger_id or name_trigger_id:
+                    self._claimed.append(trigger_id or name_trigger_id)
+                    await self._drop_siblings(trigger_id or name_trigger_id)
+
+                self.logger.info(f"✅ RETRIEVED USER INPUT from {name}: {user_input[:100]}...")
+                return user_input, name
+
+            return None
+
+    async def _consume(self, name: str, response_file: Path) -> None:
+        self._pending.pop(name, None)
+        self.file_cache.forget(str(response_file))
+        try:
+            await self.io_executor.run("unlink", response_file.unlink)
+            self.logger.info(f"🧹 Response file cleaned up: {response_file}")
+        except FileNotFoundError:
+            pass
+        except Exception as cleanup_error:
+            self.logger.warning(f"⚠️ Cleanup error: {cleanup_error}")
+
+    async def _drop_siblings(self, trigger_id: str) -> None:
+        for name, path in list(self._pending.items()):
+            name_trigger_id = trigger_id_from_name(name, _RESPONSE_PREFIXES)
+            if name_trigger_id:
+                if name_trigger_id == trigger_id:
+                    await self._consume(name, Path(path))
+                continue
+            parsed = await self.io_executor.run("read_response", self.file_cache.read_response, path)
+            if parsed and parsed[2] == trigger_id:
+                await self._consume(name, Path(path))
+
+    async def wait_for_response(self, timeout: float) -> tuple[str, str] | None:
+        """Return an indexed response immediately, or wait up to timeout seconds for the watcher to index one"""
+        deadline = time.monotonic() + max(timeout, 0)
+
+        while True:
+            # Registered before claiming: a file indexed while the claim awaits the executor still wakes this wait
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.add(waiter)
+            try:
+                result = await self.claim()
+                if result is not None:
+                    return result
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                await asyncio.wait_for(waiter, remaining)
+            except TimeoutError:
+                pass
+            finally:
+                self._waiters.discard(waiter)
+
+    def get_stats(self) -> dict[str, int]:
+        return {"pending": len(self._pending), "reserved": len(self._reserved), "waiters": len(self._waiters)}
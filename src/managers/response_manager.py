@@ -1,144 +1,202 @@
 import asyncio
-import json
 import logging
-import time
+import os
+from collections import deque
+from collections.abc import Coroutine
 from pathlib import Path
+from typing import Any
 
 from ..config.constants import FilePatterns, TimeoutConfig
-from ..utils.file_operations import get_temp_path
+from ..utils.file_operations import get_temp_path, trigger_id_from_name
+from ..utils.io_executor import IoExecutor
+from ..utils.ipc_file_cache import IpcFileCache
+from .ipc_watcher import CHANGED, IpcWatcher
+
+_RESPONSE_PREFIXES = (FilePatterns.RESPONSE_PREFIX, FilePatterns.MCP_RESPONSE_PREFIX)
 
 
 class ResponseManager:
-    def __init__(self):
-        self.logger = logging.getLogger(__name__)
-        self._last_attachments = []
+    """Deliver extension acknowledgements and user responses to the calls waiting for them.
 
-    async def wait_for_user_input(self, trigger_id: str, timeout: int = None) -> str | None:
-        """Wait for user input from the Cursor extension popup with frequent checks and multiple response patterns"""
-        if timeout is None:
-            timeout = TimeoutConfig.DEFAULT_USER_INPUT
+    Waits are futures keyed by trigger id and resolved from IPC watcher events, so
+    any number of acknowledgement and response waits share one directory watch.
+    Files are read, parsed and removed on the I/O executor, so a large answer does not
+    hold up the event loop.
+    """
 
-        response_patterns = [
+    def __init__(self, watcher: IpcWatcher, file_cache: IpcFileCache, io_executor: IoExecutor):
+        self.logger = logging.getLogger(__name__)
+        self.file_cache = file_cache
+        self.io_executor = io_executor
+        self._tasks: set[asyncio.Task] = set()  # file events being processed
+        self._last_attachments = []
+        self._response_waiters: dict[str, asyncio.Future] = {}
+        self._ack_waiters: dict[str, asyncio.Future] = {}
+        self._answered: deque[str] = deque(maxlen=256)  # recently answered trigger ids, for late duplicate files
+        watcher.subscribe(_RESPONSE_PREFIXES, self._on_response_file)
+        watcher.subscribe((FilePatterns.ACK_PREFIX,), self._on_ack_file)
+
+    @staticmethod
+    def _response_paths(trigger_id: str) -> list[Path]:
+        return [
             Path(get_temp_path(f"{FilePatterns.RESPONSE_PREFIX}_{trigger_id}.json")),
             Path(get_temp_path(f"{FilePatterns.RESPONSE_PREFIX}.json")),  # Fallback generic response
             Path(get_temp_path(f"{FilePatterns.MCP_RESPONSE_PREFIX}_{trigger_id}.json")),  # Alternative pattern
             Path(get_temp_path(f"{FilePatterns.MCP_RESPONSE_PREFIX}.json")),  # Generic MCP response
         ]
 
-        self.logger.info(f"👁️ Monitoring for response files: {[str(p) for p in response_patterns]}")
-        self.logger.info(f"🔍 Trigger ID: {trigger_id}")
-
-        start_time = time.time()
-        check_interval = 0.1  # Check every 100ms for faster response
-
-        while time.time() - start_time < timeout:
-            try:
-                # Check all possible response file patterns
-                for response_file in response_patterns:
-                    if response_file.exists():
-                        try:
-                            file_content = response_file.read_text().strip()
-                            self.logger.info(f"📄 Found response file {response_file}: {file_content[:200]}...")
-
-                            # Handle JSON format
-                            if file_content.startswith("{"):
-                                data = json.loads(file_content)
-                                user_input = data.get("user_input", data.get("response", data.get("message", ""))).strip()
-                                attachments = data.get("attachments", [])
-
-                                # Also check if trigger_id matches (if specified)
-                                response_trigger_id = data.get("trigger_id", "")
-                                if response_trigger_id and response_trigger_id != trigger_id:
-                                    self.logger.info(f"⚠️ Trigger ID mismatch: expected {trigger_id}, got {response_trigger_id}")
-                                    continue
-
-                                # Process attachments if present
-                                if attachments:
-                                    self.logger.info(f"📎 Found {len(attachments)} attachments")
-                                    # Store attachments for use in response
-                                    self._last_attachments = attachments
-                                    attachment_descriptions = []
-                                    for att in attachments:
-                                        if att.get("mimeType", "").startswith("image/"):
-                                            attachment_descriptions.append(f"Image: {att.get('fileName', 'unknown')}")
-
-                                    if attachment_descriptions:
-                                        user_input += f"\n\nAttached: {', '.join(attachment_descriptions)}"
-                                else:
-                                    self._last_attachments = []
-
-                            # Handle plain text format
-                            else:
-                                user_input = file_content
-                                attachments = []
-                                self._last_attachments = []
-
-                            # Clean up response file immediately
-                            try:
-                                response_file.unlink()
-                                self.logger.info(f"🧹 Response file cleaned up: {response_file}")
-                            except Exception as cleanup_error:
-                                self.logger.warning(f"⚠️ Cleanup error: {cleanup_error}")
-
-                            if user_input:
-                                self.logger.info(f"🎉 RECEIVED USER INPUT for trigger {trigger_id}: {user_input[:100]}...")
-                                return user_input
-                            else:
-                                self.logger.warning(f"⚠️ Empty user input in file: {response_file}")
-
-                        except json.JSONDecodeError as e:
-                            self.logger.error(f"❌ JSON decode error in {response_file}: {e}")
-                        except Exception as e:
-                            self.logger.error(f"❌ Error processing response file {response_file}: {e}")
-
-                # Check more frequently for faster response
-                await asyncio.sleep(check_interval)
-
-            except Exception as e:
-                self.logger.error(f"❌ Error in wait loop: {e}")
-                await asyncio.sleep(0.5)
-
-        self.logger.warning(f"⏰ TIMEOUT waiting for user input (trigger_id: {trigger_id})")
-        return None
-
-    async def wait_for_extension_acknowledgement(self, trigger_id: str, timeout: int = None) -> bool:
-        """Wait for extension acknowledgement that popup was activated"""
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _on_response_file(self, event: str, name: str, path: str) -> None:
+        if event == CHANGED and name.endswith(".json") and (self._response_waiters or self._answered):
+            self._spawn(self._process_response_file(Path(path)))
+
+    async def _process_response_file(self, response_file: Path) -> None:
+        """Resolve the waiter a response file belongs to; files for nobody waiting are left alone"""
+        name_trigger_id = trigger_id_from_name(response_file.name, _RESPONSE_PREFIXES)
+        if name_trigger_id and name_trigger_id not in self._response_waiters and name_trigger_id not in self._answered:
+            return
+
+        # Missing, half-written and malformed files all read as None; the cache parses each version once
+        parsed = await self.io_executor.run("read_response", self.file_cache.read_response, str(response_file))
+        if parsed is None:
+            return
+        user_input, attachments, response_trigger_id = parsed
+
+        trigger_id = response_trigger_id or name_trigger_id
+        if not trigger_id and self._response_waiters:
+            # Plain text in a generic file carries no id: it answers the longest-waiting call
+            trigger_id = next(iter(self._response_waiters))
+
+        if trigger_id in self._answered:
+            # Another copy of an answer that was already delivered
+            await self._unlink(response_file)
+            return
+
+        waiter = self._response_waiters.get(trigger_id)
+        if waiter is None or waiter.done():
+            return
+
+        self.logger.info(f"📄 Found response file {response_file}: {user_input[:200]}...")
+
+        if not user_input:
+            await self._unlink(response_file)
+            self.logger.warning(f"⚠️ Empty user input in file: {response_file}")
+            return
+
+        # Process attachments if present
+        if attachments:
+            self.logger.info(f"📎 Found {len(attachments)} attachments")
+            attachment_descriptions = []
+            for att in attachments:
+                if att.get("mimeType", "").startswith("image/"):
+                    attachment_descriptions.append(f"Image: {att.get('fileName', 'unknown')}")
+
+            if attachment_descriptions:
+                user_input += f"\n\nAttached: {', '.join(attachment_descriptions)}"
+
+        self.logger.info(f"🎉 RECEIVED USER INPUT for trigger {trigger_id}: {user_input[:100]}...")
+        self._answered.append(trigger_id)
+        waiter.set_result((user_input, attachments))
+        await self._unlink(response_file)
+
+        # The extension writes the answer to several files; remove the remaining copies
+        for sibling in self._response_paths(trigger_id):
+            if sibling != response_file:
+                await self._process_response_file(sibling)
+
+    async def _unlink(self, response_file: Path) -> None:
+        self.file_cache.forget(str(response_file))
+        try:
+            await self.io_executor.run("unlink", response_file.unlink)
+            self.logger.info(f"🧹 Response file cleaned up: {response_file}")
+        except FileNotFoundError:
+            pass
+        except Exception as cleanup_error:
+            self.logger.warning(f"⚠️ Cleanup error: {cleanup_error}")
+
+    def _on_ack_file(self, event: str, name: str, path: str) -> None:
+        if event == CHANGED and trigger_id_from_name(name, (FilePatterns.ACK_PREFIX,)) in self._ack_waiters:
+            self._spawn(self._process_ack_file(name, path))
+
+    async def _process_ack_file(self, name: str, path: str) -> None:
+        trigger_id = trigger_id_from_name(name, (FilePatterns.ACK_PREFIX,))
+        if trigger_id not in self._ack_waiters:
+            return
+
+        data = await self.io_executor.run("read_ack", self.file_cache.read_json, path)
+        waiter = self._ack_waiters.get(trigger_id)
+        if not isinstance(data, dict) or waiter is None or waiter.done():
+            return
+
+        if data.get("acknowledged", False):
+            self.logger.info(f"📨 EXTENSION ACKNOWLEDGED popup activation for trigger {trigger_id}")
+            waiter.set_result(data)
+        elif data.get("context_resync", False):
+            # The extension could not rebuild a context delta and held the popup back until it gets the whole context
+            waiter.set_result(data)
+
+        # Clean up acknowledgement file immediately
+        self.file_cache.forget(path)
+        try:
+            await self.io_executor.run("unlink", os.unlink, path)
+            self.logger.info("🧹 Acknowledgement file cleaned up")
+        except Exception as e:
+            self.logger.warning(f"Failed to cleanup acknowledgement file: {e}")
+
+    async def wait_for_response(self, trigger_id: str, timeout: float | None = None) -> tuple[str, list[dict[str, Any]]] | None:
+        """Wait for the user's response to a trigger, returning (user_input, attachments) or None on timeout"""
         if timeout is None:
-            timeout = TimeoutConfig.EXTENSION_ACKNOWLEDGEMENT
-
-        ack_file = Path(get_temp_path(f"cursor_enhancer_ack_{trigger_id}.json"))
-
-        self.logger.info(f"🔍 Monitoring for extension acknowledgement: {ack_file}")
-
-        start_time = time.time()
-        check_interval = 0.1  # Check every 100ms for fast response
-
-        while time.time() - start_time < timeout:
-            try:
-                if ack_file.exists():
-                    data = json.loads(ack_file.read_text())
-                    ack_status = data.get("acknowledged", False)
+            timeout = TimeoutConfig.DEFAULT_USER_INPUT
 
-                    # Clean up acknowledgement file immediately
-                    try:
-                        ack_file.unlink()
-                        self.logger.info(f"🧹 Acknowledgement file cleaned up")
-                    except Exception as e:
-                        self.logger.warning(f"Failed to cleanup acknowledgement file: {e}")
+        self.logger.info(f"👁️ Waiting for response files for trigger {trigger_id}")
+        waiter = asyncio.get_running_loop().create_future()
+        self._response_waiters[trigger_id] = waiter
+        try:
+            # Pick up answers written before this wait was registered
+            for response_file in self._response_paths(trigger_id):
+                if waiter.done():
+                    break
+                await self._process_response_file(response_file)
+
+            return await asyncio.wait_for(waiter, timeout)
+        except TimeoutError:
+            self.logger.warning(f"⏰ TIMEOUT waiting for user input (trigger_id: {trigger_id})")
+            return None
+        finally:
+            self._response_waiters.pop(trigger_id, None)
 
-                    if ack_status:
-                        self.logger.info(f"📨 EXTENSION ACKNOWLEDGED popup activation for trigger {trigger_id}")
-                        return True
+    async def wait_for_user_input(self, trigger_id: str, timeout: int = None) -> str | None:
+        """Wait for user input from the Cursor extension popup"""
+        result = await self.wait_for_response(trigger_id, timeout)
+        if result is None:
+            return None
 
-                # Check frequently for faster response
-                await asyncio.sleep(check_interval)
+        user_input, self._last_attachments = result
+        return user_input
 
-            except Exception as e:
-                self.logger.error(f"❌ Error reading acknowledgement file: {e}")
-                await asyncio.sleep(0.5)
+    async def wait_for_extension_acknowledgement(self, trigger_id: str, timeout: int = None) -> dict[str, Any] | None:
+        """Wait for extension acknowledgement that popup was activated, returning the acknowledgement or None on timeout"""
+        if timeout is None:
+            timeout = TimeoutConfig.EXTENSION_ACKNOWLEDGEMENT
 
-        self.logger.warning(f"⏰ TIMEOUT waiting for extension acknowledgement (trigger_id: {trigger_id})")
-        return False
+        ack_name = f"{FilePatterns.ACK_PREFIX}_{trigger_id}.json"
+        self.logger.info(f"🔍 Monitoring for extension acknowledgement: {ack_name}")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._ack_waiters[trigger_id] = waiter
+        try:
+            # Pick up an acknowledgement written before this wait was registered
+            await self._process_ack_file(ack_name, get_temp_path(ack_name))
+            return await asyncio.wait_for(waiter, timeout)
+        except TimeoutError:
+            self.logger.warning(f"⏰ TIMEOUT waiting for extension acknowledgement (trigger_id: {trigger_id})")
+            return None
+        finally:
+            self._ack_waiters.pop(trigger_id, None)
 
     def get_last_attachments(self):
         """Get the last processed attachments"""
@@ -147,3 +205,6 @@ class ResponseManager:
     def clear_attachments(self):
         """Clear stored attachments"""
         self._last_attachments = []
+
+    def get_stats(self) -> dict[str, int]:
+        return {"response_waiters": len(self._response_waiters), "ack_waiters": len(self._ack_waiters), "processing": len(self._tasks)}
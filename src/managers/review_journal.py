@@ -0,0 +1,287 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import time
+from typing import Any
+
+from ..config.constants import IpcConfig, JournalConfig, ReviewStage
+from ..utils.file_operations import get_ipc_base_path, get_temp_path, ipc_namespace
+from ..utils.io_executor import JOURNAL, IoExecutor
+
+# Journal events beyond the review stages
+COLLECTED = "collected"  # an answered ticket was handed to the agent
+RECOVERED = "recovered"  # a restarted server took over an unfinished review
+
+# Events after which no future server has anything left to do for a review
+_FINISHED = frozenset({ReviewStage.TIMEOUT, ReviewStage.ERROR, ReviewStage.CANCELLED, COLLECTED})
+
+
+def journal_path() -> str:
+    """Where the journal lives: somewhere the next server for the same IPC directory will look.
+
+    Shared mode keeps it in /tmp. Private modes keep it in the base dir, outside the IPC
+    directory: instance mode gets a new directory per pid and removes it on shutdown, so
+    its servers share one journal and recover what any dead one left behind.
+    """
+    if IpcConfig.MODE not in ("instance", "workspace"):
+        return get_temp_path(JournalConfig.FILE_NAME)
+    namespace = "instance" if IpcConfig.MODE == "instance" and not IpcConfig.NAMESPACE else ipc_namespace()
+    return get_ipc_base_path(f"{namespace}_{JournalConfig.FILE_NAME}")
+
+
+class PendingReview:
+    """An unfinished review rebuilt from the journal after a restart"""
+
+    __slots__ = ("trigger_id", "message", "title", "ticket_key", "deadline", "answer")
+
+    def __init__(self, trigger_id: str, record: dict[str, Any]):
+        self.trigger_id = trigger_id
+        self.message = record.get("message", "")
+        self.title = record.get("title", "")
+        self.ticket_key = record.get("ticket_key")
+        self.deadline = record.get("ts", time.time()) + record.get("timeout", 0)
+        self.answer: tuple[str, list[dict[str, Any]]] | None = None  # answered before the restart, never collected
+
+
+class _ReviewHistory:
+    """Journal lines of one review, folded while replaying"""
+
+    __slots__ = ("trigger", "lines", "owner_pid", "answer")
+
+    def __init__(self, trigger: dict[str, Any], line: str):
+        self.trigger = trigger
+        self.lines = [line]
+        self.owner_pid = trigger.get("pid")
+        self.answer: dict[str, Any] | None = None
+
+
+class ReviewJournal:
+    """Append-only JSONL record of every trigger, ack, answer and timeout, so a restart loses no review.
+
+    Records are buffered and written in batches with one fsync per batch. Several servers
+    may share one IPC directory and so one journal: appends hold a shared flock, while
+    compaction (dropping finished reviews) and recovery hold it exclusively and swap the
+    file atomically. On startup, reviews left unfinished by a server that is no longer
+    running are taken over and handed to the ticket manager.
+    """
+
+    def __init__(self, io_executor: IoExecutor):
+        self.logger = logging.getLogger(__name__)
+        self.io_executor = io_executor
+        self.path: str | None = None
+        self.closed = False
+        self._buffer: list[str] = []
+        self._pending = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._compact_at = JournalConfig.COMPACT_BYTES
+        self.records_written = 0
+        self.flush_count = 0
+        self.compactions = 0
+        self.corrupt_lines = 0
+        self.recovered_count = 0
+
+    @property
+    def enabled(self) -> bool:
+        return JournalConfig.ENABLED and self.path is not None
+
+    def start(self) -> None:
+        if JournalConfig.ENABLED:
+            self.path = journal_path()
+            self.closed = False
+
+    def record(self, event: str, trigger_id: str, **fields: Any) -> None:
+        """Queue one event for the next batch; never blocks the caller"""
+        if not self.enabled or self.closed:
+            return
+        entry = {"event": event, "trigger_id": trigger_id, "pid": os.getpid(), "ts": time.time(), **fields}
+        self._buffer.append(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._pending.set()
+
+    async def run(self) -> None:
+        """Flush batches until cancelled"""
+        while True:
+            await self._pending.wait()
+            if len(self._buffer) < JournalConfig.MAX_BATCH:
+                await asyncio.sleep(JournalConfig.FLUSH_INTERVAL)
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            lines, self._buffer = self._buffer, []
+            self._pending.clear()
+            if not lines or self.path is None:
+                return
+            try:
+                size = await self.io_executor.run("journal_append", self._append, lines, lane=JOURNAL)
+            except OSError as e:
+                self.logger.error(f"❌ Review journal write failed, {len(lines)} record(s) lost: {e}")
+                return
+            self.records_written += len(lines)
+            self.flush_count += 1
+
+            if size >= self._compact_at:
+                try:
+                    size = await self.io_executor.run("journal_compact", self._rewrite, None, lane=JOURNAL)
+                except OSError as e:
+                    self.logger.warning(f"⚠️ Review journal compaction failed: {e}")
+                # Reviews still open may keep the journal large; only compact again once it has doubled
+                self._compact_at = max(JournalConfig.COMPACT_BYTES, 2 * size)
+
+    async def close(self) -> None:
+        """Stop taking records and write out what is buffered.
+
+        Called before in-flight calls are cancelled at shutdown, so those cancellations are
+        not journalled and the next server picks the reviews up.
+        """
+        self.closed = True
+        await self.flush()
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "buffered": len(self._buffer),
+            "records_written": self.records_written,
+            "flushes": self.flush_count,
+            "compactions": self.compactions,
+            "corrupt_lines": self.corrupt_lines,
+            "recovered": self.recovered_count,
+        }
+
+    async def recover(self) -> list[PendingReview]:
+        """Take over the reviews left unfinished by servers that are no longer running"""
+        if not self.enabled:
+            return []
+        recovered: list[PendingReview] = []
+        try:
+            await self.io_executor.run("journal_recover", self._rewrite, recovered, lane=JOURNAL)
+        except OSError as e:
+            self.logger.error(f"❌ Review journal recovery failed: {e}")
+            return []
+        self.recovered_count += len(recovered)
+        if recovered:
+            self.logger.info(f"♻️ Recovered {len(recovered)} unfinished review(s) from {self.path}")
+        return recovered
+
+    def _open_locked(self, lock: int) -> int:
+        """Open the journal for appending under lock, retrying if it was swapped out while we waited"""
+        while True:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            fcntl.flock(fd, lock)
+            try:
+                if os.fstat(fd).st_ino == os.stat(self.path).st_ino:
+                    return fd
+            except FileNotFoundError:
+                pass
+            os.close(fd)
+
+    def _append(self, lines: list[str]) -> int:
+        data = "".join(lines).encode()
+        fd = self._open_locked(fcntl.LOCK_SH)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view) :]
+            os.fsync(fd)
+            return os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+
+    def _rewrite(self, recovered: list[PendingReview] | None) -> int:
+        """Rewrite the journal with only unfinished reviews, optionally adopting orphaned ones into recovered"""
+        fd = self._open_locked(fcntl.LOCK_EX)
+        try:
+            with open(self.path, encoding="utf-8", errors="replace") as f:
+                histories = self._replay(f)
+
+            now = time.time()
+            kept: list[str] = []
+            for trigger_id, history in histories.items():
+                if recovered is not None and not self._owner_alive(history.owner_pid):
+                    if now - history.trigger.get("ts", now) > JournalConfig.RECOVERY_MAX_AGE:
+                        self.logger.info(f"🧹 Abandoning review {trigger_id} left unfinished for over {JournalConfig.RECOVERY_MAX_AGE}s")
+                        continue
+                    review = PendingReview(trigger_id, history.trigger)
+                    if history.answer is not None:
+                        review.answer = self._recovered_answer(history.answer)
+                    recovered.append(review)
+                    adopt = {"event": RECOVERED, "trigger_id": trigger_id, "pid": os.getpid(), "ts": now}
+                    history.lines.append(json.dumps(adopt, separators=(",", ":")) + "\n")
+                kept.extend(history.lines)
+
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            tmp_fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            try:
+                data = "".join(kept).encode()
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(tmp_fd, view) :]
+                os.fsync(tmp_fd)
+            finally:
+                os.close(tmp_fd)
+            os.replace(tmp_path, self.path)
+            dir_fd = os.open(os.path.dirname(self.path), os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+            self.compactions += 1
+            return len(data)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _recovered_answer(answer: dict[str, Any]) -> tuple[str, list[dict[str, Any]]]:
+        """(user_input, attachments) of a journaled answer; only the number of its attachments was kept"""
+        user_input = answer.get("user_input", "")
+        if answer.get("attachment_count"):
+            user_input += f"\n\n({answer['attachment_count']} attachment(s) of this answer were not kept across the restart)"
+        # Journals written before attachments were left out still carry them inline
+        return user_input, answer.get("attachments", [])
+
+    def _replay(self, lines) -> dict[str, _ReviewHistory]:
+        """Fold journal lines into the histories of reviews that are not finished yet"""
+        histories: dict[str, _ReviewHistory] = {}
+        for line in lines:
+            if not line.endswith("\n"):
+                # A batch cut short by a crash; everything before it was fsynced whole
+                self.corrupt_lines += 1
+                continue
+            try:
+                entry = json.loads(line)
+                event, trigger_id = entry["event"], entry["trigger_id"]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                self.corrupt_lines += 1
+                continue
+
+            history = histories.get(trigger_id)
+            if event == ReviewStage.TRIGGERED:
+                if history is None:
+                    histories[trigger_id] = _ReviewHistory(entry, line)
+                continue
+            if history is None:
+                continue
+
+            if event in _FINISHED or (event == ReviewStage.ANSWERED and "answer" not in entry):
+                # A direct call's answer went straight back to its caller; a ticket's waits to be collected
+                del histories[trigger_id]
+                continue
+            if event == ReviewStage.ANSWERED:
+                history.answer = entry["answer"]
+            history.lines.append(line)
+            history.owner_pid = entry.get("pid", history.owner_pid)
+        return histories
+
+    @staticmethod
+    def _owner_alive(pid: Any) -> bool:
+        if pid == os.getpid():
+            return True
+        try:
+            os.kill(int(pid), 0)
+            return True
+        except PermissionError:
+            return True
+        except (ProcessLookupError, ValueError, TypeError):
+            return False
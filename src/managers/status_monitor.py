@@ -0,0 +1,52 @@
+import asyncio
+import logging
+import os
+from collections.abc import Callable
+
+from ..config.constants import FilePatterns, ReviewStage
+from ..utils.io_executor import IoExecutor
+from ..utils.ipc_file_cache import IpcFileCache
+from .ipc_watcher import CHANGED, IpcWatcher
+
+# Popup states the extension reports while the user is working on an answer
+_EXTENSION_STATES = {ReviewStage.TYPING, ReviewStage.UPLOADING}
+
+
+class ExtensionStatusMonitor:
+    """Route popup status files written by the extension (typing, uploading) to the call waiting on that trigger"""
+
+    def __init__(self, watcher: IpcWatcher, file_cache: IpcFileCache, io_executor: IoExecutor):
+        self.logger = logging.getLogger(__name__)
+        self.file_cache = file_cache
+        self.io_executor = io_executor
+        self._tasks: set[asyncio.Task] = set()  # status files being read on the I/O executor
+        self._listeners: dict[str, Callable[[str], None]] = {}
+        watcher.subscribe((FilePatterns.STATUS_PREFIX,), self._on_file_event)
+
+    def listen(self, trigger_id: str, callback: Callable[[str], None]) -> None:
+        self._listeners[trigger_id] = callback
+
+    def unlisten(self, trigger_id: str) -> None:
+        self._listeners.pop(trigger_id, None)
+
+    def _on_file_event(self, event: str, name: str, path: str) -> None:
+        if event == CHANGED:
+            task = asyncio.create_task(self._process_status_file(path))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _process_status_file(self, path: str) -> None:
+        data = await self.io_executor.run("read_status", self.file_cache.read_json, path)
+        if not isinstance(data, dict):
+            return
+        self.file_cache.forget(path)
+        try:
+            await self.io_executor.run("unlink", os.unlink, path)
+        except FileNotFoundError:
+            return
+
+        trigger_id = data.get("trigger_id", "")
+        state = data.get("state", "")
+        callback = self._listeners.get(trigger_id)
+        if callback and state in _EXTENSION_STATES:
+            callback(state)
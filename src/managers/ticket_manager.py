@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from ..config.constants import ReviewStage, TicketConfig
+
+
+class Ticket:
+    """An outstanding review whose answer the agent collects later"""
+
+    __slots__ = ("ticket_id", "key", "summary", "status", "created_at", "completed_at", "task", "triggered")
+
+    def __init__(self, ticket_id: str, key: str, summary: str):
+        self.ticket_id = ticket_id
+        self.key = key
+        self.summary = summary
+        self.status = ReviewStage.QUEUED
+        self.created_at = time.time()
+        self.completed_at: float | None = None
+        self.task: asyncio.Task | None = None
+        self.triggered = asyncio.Event()
+
+    def set_status(self, status: str) -> None:
+        self.status = status
+        if status != ReviewStage.QUEUED:
+            # Anything past the queue means the caller no longer needs to wait for the trigger
+            self.triggered.set()
+
+    @property
+    def done(self) -> bool:
+        return self.task is not None and self.task.done()
+
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+
+class TicketManager:
+    """Track reviews running in the background so agents can keep working and collect answers later"""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._tickets: dict[str, Ticket] = {}
+
+    def create(self, ticket_id: str, key: str, summary: str, run: Callable[[Ticket], Awaitable[Any]]) -> Ticket:
+        """Start run(ticket) in the background and track it under ticket_id, which must not be in use"""
+        self._purge_expired()
+        if ticket_id in self._tickets:
+            raise ValueError(f"ticket {ticket_id} already exists")
+        pending = sum(1 for ticket in self._tickets.values() if not ticket.done)
+        if pending >= TicketConfig.MAX_PENDING:
+            raise RuntimeError(f"too many pending tickets ({pending}); collect some results first")
+
+        ticket = Ticket(ticket_id, key, summary)
+        ticket.task = asyncio.create_task(run(ticket))
+        ticket.task.add_done_callback(lambda task, ticket=ticket: self._on_done(ticket, task))
+        self._tickets[ticket_id] = ticket
+        self.logger.info(f"🎫 Ticket {ticket_id} created: {summary[:100]}")
+        return ticket
+
+    def _on_done(self, ticket: Ticket, task: asyncio.Task) -> None:
+        ticket.completed_at = time.time()
+        if task.cancelled():
+            ticket.set_status(ReviewStage.CANCELLED)
+        elif task.exception() is not None:
+            self.logger.error(f"❌ Ticket {ticket.ticket_id} failed: {task.exception()}")
+            ticket.set_status(ReviewStage.ERROR)
+        elif ticket.status not in ReviewStage.FINAL:
+            ticket.set_status(ReviewStage.ANSWERED)
+        self.logger.info(f"🎫 Ticket {ticket.ticket_id} finished: {ticket.status}")
+
+    def get(self, ticket_id: str) -> Ticket | None:
+        return self._tickets.get(ticket_id)
+
+    def find_pending(self, key: str) -> Ticket | None:
+        """Return an unfinished ticket for an identical request, if any"""
+        for ticket in self._tickets.values():
+            if ticket.key == key and not ticket.done:
+                return ticket
+        return None
+
+    def list_tickets(self) -> list[Ticket]:
+        self._purge_expired()
+        return sorted(self._tickets.values(), key=lambda ticket: ticket.created_at)
+
+    async def wait(self, ticket: Ticket, timeout: float) -> bool:
+        """Wait up to timeout seconds for the ticket to finish, returning whether it did"""
+        if not ticket.done and timeout > 0:
+            try:
+                await asyncio.wait_for(asyncio.shield(ticket.task), timeout)
+            except TimeoutError:
+                pass
+            except (asyncio.CancelledError, Exception):
+                if not ticket.done:
+                    raise
+        return ticket.done
+
+    def collect(self, ticket: Ticket) -> Any:
+        """Return a finished ticket's result and forget the ticket"""
+        self._tickets.pop(ticket.ticket_id, None)
+        if ticket.task.cancelled():
+            return None
+        if ticket.task.exception() is not None:
+            raise ticket.task.exception()
+        return ticket.task.result()
+
+    def _purge_expired(self) -> None:
+        now = time.time()
+        for ticket_id, ticket in list(self._tickets.items()):
+            if ticket.completed_at is not None and now - ticket.completed_at > TicketConfig.RESULT_TTL:
+                self.logger.info(f"🧹 Ticket {ticket_id} expired uncollected")
+                del self._tickets[ticket_id]
@@ -1,24 +1,47 @@
 import asyncio
-import json
+import gzip
+import hashlib
 import logging
 import os
+import stat
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
-from ..config.constants import FilePatterns
-from ..utils.file_operations import get_temp_path
+from ..config.constants import FilePatterns, TimeoutConfig, TriggerConfig
+from ..utils.file_operations import (
+    create_private_file,
+    decode_payload,
+    encode_payload,
+    get_shared_temp_path,
+    get_temp_path,
+    negotiate_wire_format,
+)
+from ..utils.io_executor import IoExecutor
 
 
 class TriggerManager:
-    def __init__(self):
+    def __init__(self, presence_registry, io_executor: IoExecutor):
+        self.presence_registry = presence_registry
+        self.io_executor = io_executor
         self.logger = logging.getLogger(__name__)
+        self._tasks: set[asyncio.Task] = set()
+        self.cancelled_count = 0
+        self.spilled_count = 0
+        self.spilled_bytes = 0
+
+    def _wire_format(self) -> str:
+        """Most compact format every live extension can read"""
+        return negotiate_wire_format(record.get("wire_formats") for record in self.presence_registry.live_extensions())
 
     async def trigger_cursor_popup_immediately(self, data: dict[str, Any]) -> bool:
         """Create trigger file for Cursor extension with immediate activation and enhanced debugging"""
         try:
             # Add delay before creating trigger to ensure readiness
-            await asyncio.sleep(0.1)  # Wait 100ms before trigger creation
+            await asyncio.sleep(TriggerConfig.PRE_WRITE_DELAY)
+
+            # A large context is written once beside the triggers instead of inline in each of them
+            data = await self.io_executor.run("spill_context", self._spill_context, data)
 
             trigger_file = Path(get_temp_path(f"{FilePatterns.TRIGGER_PREFIX}.json"))
 
@@ -33,48 +56,37 @@ class TriggerManager:
                 "immediate_activation": True,
             }
 
-            self.logger.info(f"🎯 CREATING trigger file with data: {json.dumps(trigger_data, indent=2)}")
-
-            # Write trigger file with immediate flush
-            trigger_file.write_text(json.dumps(trigger_data, indent=2))
+            wire_format = self._wire_format()
+            payload = encode_payload(trigger_data, wire_format)
+            self.logger.info(f"🎯 CREATING trigger file for {data.get('trigger_id')} ({len(payload)} bytes, {wire_format})")
 
-            # Verify file was written successfully
-            if not trigger_file.exists():
-                self.logger.error(f"❌ Failed to create trigger file: {trigger_file}")
+            # Write trigger file with immediate flush, and verify it was written
+            file_size = await self.io_executor.run("write_trigger", self._write_trigger, trigger_file, payload)
+            if not file_size:
                 return False
 
-            try:
-                file_size = trigger_file.stat().st_size
-                if file_size == 0:
-                    self.logger.error(f"❌ Trigger file is empty: {trigger_file}")
-                    return False
-            except FileNotFoundError:
-                # File may have been consumed by the extension already - this is OK
-                self.logger.info(f"✅ Trigger file was consumed immediately by extension: {trigger_file}")
-                file_size = len(json.dumps(trigger_data, indent=2))
-
             # Force file system sync with retry
-            for attempt in range(3):
+            for attempt in range(TriggerConfig.SYNC_ATTEMPTS):
                 try:
-                    os.sync()
+                    await self.io_executor.run("sync", os.sync)
                     break
                 except Exception as sync_error:
                     self.logger.warning(f"⚠️ Sync attempt {attempt + 1} failed: {sync_error}")
-                    await asyncio.sleep(0.1)  # Wait 100ms between attempts
+                    await asyncio.sleep(TriggerConfig.SYNC_RETRY_DELAY)
 
             self.logger.info(f"🔥 IMMEDIATE trigger created for Cursor: {trigger_file}")
             self.logger.info(f"📁 Trigger file path: {trigger_file.absolute()}")
             self.logger.info(f"📊 Trigger file size: {file_size} bytes")
 
             # Create multiple backup trigger files for reliability
-            await self._create_backup_triggers(data)
+            await self._create_backup_triggers(data, wire_format)
 
             # Add small delay to allow extension to process
-            await asyncio.sleep(0.2)  # Wait 200ms for extension to process
+            await asyncio.sleep(TriggerConfig.POST_WRITE_DELAY)  # Give the extension time to process
 
             # Note: Trigger file may have been consumed by extension already, which is good!
             try:
-                if trigger_file.exists():
+                if await self.io_executor.run("stat", trigger_file.exists):
                     self.logger.info(f"✅ Trigger file still exists: {trigger_file}")
                 else:
                     self.logger.info(f"✅ Trigger file was consumed by extension: {trigger_file}")
@@ -84,8 +96,8 @@ class TriggerManager:
                 self.logger.info(f"🎯 This is expected behavior - extension is working properly")
 
             # Check if extension might be watching
-            log_file = Path(get_temp_path("cursor_enhancer.log"))
-            if log_file.exists():
+            log_file = Path(get_shared_temp_path("cursor_enhancer.log"))
+            if await self.io_executor.run("stat", log_file.exists):
                 self.logger.info(f"📝 MCP log file exists: {log_file}")
             else:
                 self.logger.warning(f"⚠️ MCP log file missing: {log_file}")
@@ -103,30 +115,92 @@ class TriggerManager:
 
             self.logger.error(f"🔍 Full traceback: {traceback.format_exc()}")
             # Wait before returning failure
-            await asyncio.sleep(1.0)  # Wait 1 second before confirming failure
+            await asyncio.sleep(TimeoutConfig.ERROR_DELAY)  # Wait before confirming failure
             return False
 
-    async def _create_backup_triggers(self, data: dict[str, Any]):
-        """Create backup trigger files for better reliability"""
+    def _write_trigger(self, trigger_file: Path, payload: bytes) -> int:
+        """Write the trigger file and return its size, 0 if it did not land; runs on an I/O thread"""
+        trigger_file.write_bytes(payload)
+        if not trigger_file.exists():
+            self.logger.error(f"❌ Failed to create trigger file: {trigger_file}")
+            return 0
+
         try:
-            # Create multiple backup trigger files
-            for i in range(3):
-                backup_trigger = Path(get_temp_path(f"{FilePatterns.TRIGGER_PREFIX}_{i}.json"))
-                backup_data = {
-                    "backup_id": i,
-                    "timestamp": datetime.now().isoformat(),
-                    "system": "cursor-enhancer",
-                    "data": data,
-                    "mcp_integration": True,
-                    "immediate_activation": True,
-                }
-                backup_trigger.write_text(json.dumps(backup_data, indent=2))
+            file_size = trigger_file.stat().st_size
+            if file_size == 0:
+                self.logger.error(f"❌ Trigger file is empty: {trigger_file}")
+            return file_size
+        except FileNotFoundError:
+            # File may have been consumed by the extension already - this is OK
+            self.logger.info(f"✅ Trigger file was consumed immediately by extension: {trigger_file}")
+            return len(payload)
+
+    def _spill_context(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Move a context over CONTEXT_SPILL_BYTES into a content-addressed side file, leaving a reference"""
+        context = data.get("context")
+        if not isinstance(context, str) or not TriggerConfig.CONTEXT_SPILL_BYTES:
+            return data
+        body = context.encode()
+        if len(body) <= TriggerConfig.CONTEXT_SPILL_BYTES:
+            return data
 
+        size = len(body)
+        digest = hashlib.sha256(body).hexdigest()
+        encoding = "gzip" if TriggerConfig.CONTEXT_COMPRESS else "identity"
+        file_name = f"{FilePatterns.CONTEXT_PREFIX}_{digest}.txt{'.gz' if encoding == 'gzip' else ''}"
+        side_file = get_temp_path(file_name)
+
+        try:
+            st = os.lstat(side_file)
+        except FileNotFoundError:
+            st = None
+        if st is not None and stat.S_ISREG(st.st_mode) and st.st_uid == os.getuid():
+            # Same content, same file: a re-trigger or repeated review only refreshes its age for the sweeper
+            os.utime(side_file)
+        else:
+            # Missing, or not a file of ours (e.g. planted in a shared /tmp): write it, replacing what is there
+            if encoding == "gzip":
+                body = gzip.compress(body, compresslevel=TriggerConfig.CONTEXT_COMPRESS_LEVEL, mtime=0)
+            tmp_file = f"{side_file}.{os.getpid()}.tmp"
+            try:
+                with create_private_file(tmp_file) as f:
+                    f.write(body)
+                os.replace(tmp_file, side_file)
+            except OSError as e:
+                self.logger.warning(f"⚠️ Could not spill context to {file_name}, sending it inline: {e}")
+                return data
+            self.spilled_count += 1
+            self.spilled_bytes += len(body)
+            self.logger.info(f"📦 Spilled {size}-byte context to {file_name} ({len(body)} bytes, {encoding})")
+
+        spilled = {key: value for key, value in data.items() if key != "context"}
+        spilled["context_ref"] = {"file": file_name, "sha256": digest, "size": size, "encoding": encoding}
+        return spilled
+
+    async def _create_backup_triggers(self, data: dict[str, Any], wire_format: str):
+        """Create backup trigger files for better reliability"""
+        try:
+            await self.io_executor.run("write_backups", self._write_backup_triggers, data, wire_format)
             self.logger.info("🔄 Backup trigger files created for reliability")
 
         except Exception as e:
             self.logger.warning(f"⚠️ Backup trigger creation failed: {e}")
 
+    @staticmethod
+    def _write_backup_triggers(data: dict[str, Any], wire_format: str) -> None:
+        # Create multiple backup trigger files
+        for i in range(TriggerConfig.BACKUP_COUNT):
+            backup_trigger = Path(get_temp_path(f"{FilePatterns.TRIGGER_PREFIX}_{i}.json"))
+            backup_data = {
+                "backup_id": i,
+                "timestamp": datetime.now().isoformat(),
+                "system": "cursor-enhancer",
+                "data": data,
+                "mcp_integration": True,
+                "immediate_activation": True,
+            }
+            backup_trigger.write_bytes(encode_payload(backup_data, wire_format))
+
     def cleanup_trigger_files(self):
         """Clean up any existing trigger files"""
         try:
@@ -137,7 +211,7 @@ class TriggerManager:
                 self.logger.info("🧹 Main trigger file cleaned up")
 
             # Clean up backup trigger files
-            for i in range(3):
+            for i in range(TriggerConfig.BACKUP_COUNT):
                 backup_trigger = Path(get_temp_path(f"{FilePatterns.TRIGGER_PREFIX}_{i}.json"))
                 if backup_trigger.exists():
                     backup_trigger.unlink()
@@ -145,3 +219,65 @@ class TriggerManager:
 
         except Exception as e:
             self.logger.warning(f"⚠️ Error cleaning up trigger files: {e}")
+
+    def cancel_trigger(self, trigger_id: str) -> None:
+        """Release every IPC file of a cancelled call and tell the extension to close its popup.
+
+        Returns at once: it runs while the caller is being cancelled, where any await would be
+        interrupted, so the file work is a task of its own on the I/O executor.
+        """
+        self.cancelled_count += 1
+        task = asyncio.create_task(self._cancel_trigger(trigger_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _cancel_trigger(self, trigger_id: str) -> None:
+        try:
+            removed = await self.io_executor.run("cancel_trigger", self._release_trigger_files, trigger_id)
+        except Exception as e:
+            self.logger.error(f"❌ Could not release the IPC files of cancelled trigger {trigger_id}: {e}")
+            return
+        self.logger.warning(f"🛑 CANCELLED trigger {trigger_id}: removed {removed} IPC files, asked extension to close the popup")
+
+    def _release_trigger_files(self, trigger_id: str) -> int:
+        """Remove the cancelled trigger's files and write its cancel signal, returning how many files went; blocking"""
+        removed = 0
+
+        # Shared trigger, backup and generic response files are only removed if they still carry this trigger
+        shared_files = [Path(get_temp_path(f"{FilePatterns.TRIGGER_PREFIX}.json"))]
+        shared_files += [Path(get_temp_path(f"{FilePatterns.TRIGGER_PREFIX}_{i}.json")) for i in range(TriggerConfig.BACKUP_COUNT)]
+        shared_files += [
+            Path(get_temp_path(f"{prefix}.json")) for prefix in (FilePatterns.RESPONSE_PREFIX, FilePatterns.MCP_RESPONSE_PREFIX)
+        ]
+        for shared_file in shared_files:
+            try:
+                data = decode_payload(shared_file.read_bytes())
+                owner = data.get("data", data).get("trigger_id", "")
+                if owner == trigger_id:
+                    shared_file.unlink()
+                    removed += 1
+            except (FileNotFoundError, ValueError, AttributeError):
+                continue
+            except Exception as e:
+                self.logger.warning(f"⚠️ Could not inspect {shared_file} during cancellation: {e}")
+
+        for prefix in (FilePatterns.ACK_PREFIX, FilePatterns.RESPONSE_PREFIX, FilePatterns.MCP_RESPONSE_PREFIX, FilePatterns.STATUS_PREFIX):
+            try:
+                Path(get_temp_path(f"{prefix}_{trigger_id}.json")).unlink()
+                removed += 1
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                self.logger.warning(f"⚠️ Could not remove {prefix} file during cancellation: {e}")
+
+        try:
+            cancel_signal = Path(get_temp_path(f"{FilePatterns.CANCEL_PREFIX}_{trigger_id}.json"))
+            cancel_signal.write_bytes(
+                encode_payload({"trigger_id": trigger_id, "timestamp": datetime.now().isoformat(), "system": "cursor-enhancer"})
+            )
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not write cancel signal for {trigger_id}: {e}")
+        return removed
+
+    def get_stats(self) -> dict[str, int]:
+        return {"cancelled": self.cancelled_count, "spilled_contexts": self.spilled_count, "spilled_bytes": self.spilled_bytes}
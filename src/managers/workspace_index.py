@@ -0,0 +1,493 @@
+import asyncio
+import ctypes
+import ctypes.util
+import heapq
+import logging
+import os
+import re
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from ..config.constants import WorkspaceIndexConfig
+from ..utils.io_executor import BACKGROUND, IoExecutor
+
+# inotify constants from <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_ONLYDIR
+_EVENT_HEADER = struct.Struct("iIII")
+
+# file_types entries naming an extension: "py", ".py" or "*.py"
+_EXTENSION_PATTERN = re.compile(r"(?:\*?\.)?([\w+-]+)")
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Regex source for a gitignore-style glob: * and ? stay within one path segment, ** crosses them"""
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 2 :]:
+            end = pattern.index("]", i + 2)
+            body = pattern[i + 1 : end].replace("\\", "\\\\")
+            out.append(f"[^{body[1:]}]" if body[0] in "!^" else f"[{body}]")
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    """Patterns of one .gitignore, matched against paths relative to its directory"""
+
+    def __init__(self, lines: list[str]):
+        self.rules: list[tuple[re.Pattern, bool, bool]] = []  # (regex, negated, directories only)
+        for line in lines:
+            line = line.rstrip("\r\n").rstrip(" ")
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            # A slash anywhere but the end anchors the pattern to this directory
+            anchored = "/" in line
+            source = glob_to_regex(line.lstrip("/"))
+            self.rules.append((re.compile(source if anchored else f"(?:.*/)?{source}"), negated, dir_only))
+
+    @classmethod
+    def load(cls, path: str) -> "IgnoreRules | None":
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                return cls(f.readlines())
+        except OSError:
+            return None
+
+    def match(self, rel_path: str, is_dir: bool) -> bool | None:
+        """True if ignored, False if re-included by a negation, None if no pattern applies; the last match wins"""
+        for regex, negated, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.fullmatch(rel_path):
+                return not negated
+        return None
+
+
+class _Snapshot:
+    """Everything one build produces, swapped in as a whole once complete"""
+
+    def __init__(self, inotify_fd: int):
+        self.inotify_fd = inotify_fd
+        self.files: set[str] = set()
+        self.by_extension: dict[str, set[str]] = {}
+        self.ignores: dict[str, IgnoreRules] = {}  # directory -> rules of its .gitignore
+        self.watches: dict[int, str] = {}  # inotify watch descriptor -> directory
+        self.watch_failures = 0
+        self.truncated = False
+
+
+class _WatchBudget:
+    """inotify watches the indexes of all roots may hold together, shared with the build threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.used = 0
+
+    def take(self) -> bool:
+        with self._lock:
+            if self.used >= WorkspaceIndexConfig.MAX_WATCHES:
+                return False
+            self.used += 1
+            return True
+
+    def give(self, count: int = 1) -> None:
+        with self._lock:
+            self.used -= count
+
+
+class WorkspaceIndex:
+    """In-memory list of the files under one workspace root, for answering file_review without touching the disk.
+
+    Built with os.scandir in a worker thread, skipping what .gitignore files (and
+    .git/info/exclude) ignore, and kept current from inotify events on every indexed
+    directory: files are added and removed in place, while a directory that appears,
+    goes away or gets a new .gitignore triggers a rebuild off the event loop. Without
+    inotify, or once the shared watch budget (MAX_WATCHES) or the system's watch limit
+    is reached, the index holds no watches and is rebuilt every RESCAN_INTERVAL seconds
+    instead. Queries by extension use a per-extension index;
+    other globs are matched against the path list.
+    """
+
+    def __init__(self, io_executor: IoExecutor, root: str, watch_budget: _WatchBudget | None = None):
+        self.root = os.path.realpath(root)
+        self.io_executor = io_executor
+        self.watch_budget = watch_budget or _WatchBudget()
+        self.logger = logging.getLogger(__name__)
+        self._libc: Any = None
+        self._snapshot = _Snapshot(-1)
+        self._ready = asyncio.Event()
+        self._rebuild_requested = asyncio.Event()
+        self.backend = "stopped"
+        self.builds = 0
+        self.last_build_seconds = 0.0
+        self.events = 0
+
+    @staticmethod
+    def _excluded_names() -> frozenset[str]:
+        return frozenset(part.strip() for part in WorkspaceIndexConfig.EXCLUDE.split(","))
+
+    async def run(self) -> None:
+        """Build the index, then follow changes until cancelled"""
+        try:
+            while True:
+                await self._rebuild()
+                self._ready.set()
+                try:
+                    # Events keep a fully watched index current; otherwise fall back to periodic rebuilds
+                    timeout = None if self.backend == "inotify" else WorkspaceIndexConfig.RESCAN_INTERVAL
+                    await asyncio.wait_for(self._rebuild_requested.wait(), timeout)
+                except TimeoutError:
+                    pass
+                if self._rebuild_requested.is_set():
+                    # Take a checkout or an unpacked archive as one change rather than a rebuild per directory
+                    await asyncio.sleep(WorkspaceIndexConfig.REBUILD_DELAY)
+                self._rebuild_requested.clear()
+        finally:
+            self._drop_watches(self._snapshot)
+            self.backend = "stopped"
+
+    async def wait_ready(self, timeout: float) -> bool:
+        """Wait up to timeout seconds for the first build; False if it is still building"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+            return True
+        except TimeoutError:
+            return False
+
+    def query(self, patterns: list[str], limit: int) -> tuple[list[str], int]:
+        """Files matching any pattern, first limit of them in path order, and the total number of matches.
+
+        "*" matches everything, "py", ".py" and "*.py" an extension; other patterns are
+        globs, matched against the file name unless they contain a slash.
+        """
+        snapshot = self._snapshot
+        matches: set[str] = set()
+        globs = []
+        for pattern in patterns or ["*"]:
+            pattern = pattern.strip()
+            if pattern in ("", "*", "**"):
+                matches = snapshot.files
+                globs = []
+                break
+            extension = _EXTENSION_PATTERN.fullmatch(pattern)
+            if extension:
+                matches |= snapshot.by_extension.get(extension.group(1).lower(), set())
+            else:
+                source = glob_to_regex(pattern.lstrip("/"))
+                globs.append(source if "/" in pattern else f"(?:.*/)?{source}")
+
+        if globs:
+            regex = re.compile("|".join(f"(?:{source})" for source in globs))
+            matches = matches | {path for path in snapshot.files if regex.fullmatch(path)}
+        return heapq.nsmallest(limit, matches), len(matches)
+
+    def resolve(self, path: str) -> str | None:
+        """Real absolute path of a file named relative to the root (or absolutely), None if it lies outside the workspace"""
+        full_path = os.path.realpath(os.path.join(self.root, path))
+        # commonpath rather than a prefix test, which would reject everything under a root of "/"
+        return full_path if full_path != self.root and os.path.commonpath([self.root, full_path]) == self.root else None
+
+    async def _rebuild(self) -> None:
+        start = time.monotonic()
+        build = asyncio.ensure_future(self.io_executor.run("index_build", self._build, lane=BACKGROUND))
+        try:
+            snapshot = await asyncio.shield(build)
+        except asyncio.CancelledError:
+            # The build thread carries on: close what it produces rather than leak its inotify fd and watches
+            build.add_done_callback(self._discard_build)
+            raise
+        except Exception as e:
+            self.logger.error(f"❌ Workspace index build failed for {self.root}: {e}")
+            return
+
+        if snapshot.watch_failures:
+            # A partly watched tree would miss changes anyway: give the watches back and rescan instead
+            self._drop_watches(snapshot)
+        old_snapshot = self._snapshot
+        self._snapshot = snapshot
+        self._drop_watches(old_snapshot)
+        if snapshot.inotify_fd >= 0:
+            # Events queued while the build ran are applied on top of it
+            asyncio.get_running_loop().add_reader(snapshot.inotify_fd, self._on_inotify_readable)
+        self.backend = "inotify" if snapshot.inotify_fd >= 0 else "poll"
+
+        self.builds += 1
+        self.last_build_seconds = time.monotonic() - start
+        self.logger.info(
+            f"🗂️ Indexed {len(snapshot.files)} files under {self.root} in {self.last_build_seconds:.2f}s (backend: {self.backend})"
+        )
+        if snapshot.truncated:
+            self.logger.warning(f"⚠️ Workspace index stopped at MAX_FILES={WorkspaceIndexConfig.MAX_FILES} files")
+        if snapshot.watch_failures:
+            self.logger.warning(
+                f"⚠️ {self.root} needs more inotify watches than the budget (MAX_WATCHES={WorkspaceIndexConfig.MAX_WATCHES}) "
+                f"or the system allows - rescanning every {WorkspaceIndexConfig.RESCAN_INTERVAL}s instead"
+            )
+
+    def _discard_build(self, build: asyncio.Future) -> None:
+        if not build.cancelled() and build.exception() is None:
+            self._drop_watches(build.result())
+
+    def _build(self) -> _Snapshot:
+        """Walk the whole workspace into a new snapshot with its own inotify instance; runs in a worker thread"""
+        snapshot = _Snapshot(self._open_inotify() if WorkspaceIndexConfig.WATCH else -1)
+        try:
+            exclude = IgnoreRules.load(os.path.join(self.root, ".git", "info", "exclude"))
+            if exclude and WorkspaceIndexConfig.RESPECT_GITIGNORE:
+                # Outermost rules, below any .gitignore; "/" is not a real directory so it never clashes
+                snapshot.ignores["/"] = exclude
+            self._walk(snapshot, "")
+        except BaseException:
+            self._drop_watches(snapshot)
+            raise
+        return snapshot
+
+    def _walk(self, snapshot: _Snapshot, top: str) -> None:
+        """Index directory top (relative to the root, "" for the root itself) and everything below it"""
+        excluded = self._excluded_names()
+        pending = [top]
+        while pending:
+            rel_dir = pending.pop()
+            directory = os.path.join(self.root, rel_dir)
+            if snapshot.inotify_fd >= 0:
+                self._add_watch(snapshot, rel_dir)
+            try:
+                with os.scandir(directory) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+
+            if WorkspaceIndexConfig.RESPECT_GITIGNORE and any(entry.name == ".gitignore" for entry in entries):
+                rules = IgnoreRules.load(os.path.join(directory, ".gitignore"))
+                if rules:
+                    snapshot.ignores[rel_dir] = rules
+
+            for entry in entries:
+                if entry.name in excluded:
+                    continue
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if self._ignored(snapshot, rel_path, is_dir):
+                    continue
+                if is_dir:
+                    pending.append(rel_path)
+                elif len(snapshot.files) >= WorkspaceIndexConfig.MAX_FILES:
+                    snapshot.truncated = True
+                    return
+                else:
+                    self._add_file(snapshot, rel_path)
+
+    @staticmethod
+    def _ignored(snapshot: _Snapshot, rel_path: str, is_dir: bool) -> bool:
+        """Whether the innermost .gitignore with an opinion on rel_path ignores it"""
+        if not snapshot.ignores:
+            return False
+        parts = rel_path.split("/")
+        for depth in range(len(parts) - 1, -1, -1):
+            rules = snapshot.ignores.get("/".join(parts[:depth]))
+            if rules is not None:
+                verdict = rules.match("/".join(parts[depth:]), is_dir)
+                if verdict is not None:
+                    return verdict
+        rules = snapshot.ignores.get("/")
+        return bool(rules and rules.match(rel_path, is_dir))
+
+    @staticmethod
+    def _extension(rel_path: str) -> str:
+        name = rel_path.rsplit("/", 1)[-1]
+        return name.rsplit(".", 1)[-1].lower() if "." in name.lstrip(".") else ""
+
+    def _add_file(self, snapshot: _Snapshot, rel_path: str) -> None:
+        snapshot.files.add(rel_path)
+        snapshot.by_extension.setdefault(self._extension(rel_path), set()).add(rel_path)
+
+    def _remove_file(self, snapshot: _Snapshot, rel_path: str) -> None:
+        snapshot.files.discard(rel_path)
+        snapshot.by_extension.get(self._extension(rel_path), set()).discard(rel_path)
+
+    def _open_inotify(self) -> int:
+        try:
+            self._libc = self._libc or ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            return self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        except Exception as e:
+            self.logger.warning(f"⚠️ inotify unavailable for the workspace index: {e}")
+            return -1
+
+    def _add_watch(self, snapshot: _Snapshot, rel_dir: str) -> None:
+        if snapshot.watch_failures:
+            return  # this snapshot is going to be rescanned rather than watched
+        if not self.watch_budget.take():
+            snapshot.watch_failures += 1
+            return
+        wd = self._libc.inotify_add_watch(snapshot.inotify_fd, os.fsencode(os.path.join(self.root, rel_dir)), _WATCH_MASK)
+        if wd < 0:
+            self.watch_budget.give()
+            snapshot.watch_failures += 1
+        else:
+            snapshot.watches[wd] = rel_dir
+
+    def _drop_watches(self, snapshot: _Snapshot) -> None:
+        """Close a snapshot's inotify instance, returning its watches to the budget"""
+        if snapshot.inotify_fd < 0:
+            return
+        try:
+            asyncio.get_running_loop().remove_reader(snapshot.inotify_fd)
+        except RuntimeError:
+            pass
+        os.close(snapshot.inotify_fd)
+        snapshot.inotify_fd = -1
+        self.watch_budget.give(len(snapshot.watches))
+        snapshot.watches.clear()
+
+    def _on_inotify_readable(self) -> None:
+        snapshot = self._snapshot
+        try:
+            buffer = os.read(snapshot.inotify_fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self.logger.error(f"❌ Workspace inotify read error: {e}")
+            return
+
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buffer):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset : offset + length].rstrip(b"\0").decode(errors="surrogateescape")
+            offset += length
+            self.events += 1
+            try:
+                self._apply_event(snapshot, wd, mask, name)
+            except Exception as e:
+                self.logger.error(f"❌ Workspace index update failed for {name}: {e}")
+
+    def _apply_event(self, snapshot: _Snapshot, wd: int, mask: int, name: str) -> None:
+        if mask & _IN_Q_OVERFLOW:
+            self.logger.warning("⚠️ Workspace inotify queue overflow - rebuilding the index")
+            self._rebuild_requested.set()
+            return
+        rel_dir = snapshot.watches.get(wd)
+        if rel_dir is None:
+            return
+        if mask & _IN_IGNORED:
+            del snapshot.watches[wd]
+            self.watch_budget.give()
+            return
+        if name in self._excluded_names():
+            return
+
+        rel_path = f"{rel_dir}/{name}" if rel_dir else name
+        if name == ".gitignore" and WorkspaceIndexConfig.RESPECT_GITIGNORE:
+            # New rules can hide or reveal anything below
+            self._rebuild_requested.set()
+        elif mask & _IN_ISDIR:
+            # Walking or pruning a whole subtree here would stall the event loop; the rebuild runs on a worker thread
+            if not self._ignored(snapshot, rel_path, True):
+                self._rebuild_requested.set()
+        elif mask & (_IN_DELETE | _IN_MOVED_FROM):
+            self._remove_file(snapshot, rel_path)
+        elif self._ignored(snapshot, rel_path, False):
+            return
+        elif len(snapshot.files) < WorkspaceIndexConfig.MAX_FILES:
+            self._add_file(snapshot, rel_path)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "root": self.root,
+            "backend": self.backend,
+            "files": len(self._snapshot.files),
+            "watched_directories": len(self._snapshot.watches),
+            "truncated": self._snapshot.truncated,
+            "builds": self.builds,
+            "last_build_seconds": round(self.last_build_seconds, 3),
+            "events": self.events,
+        }
+
+
+class WorkspaceIndexRegistry:
+    """One WorkspaceIndex per workspace root, built on the first file_review for that root.
+
+    Nothing is indexed at startup: a server shared by several windows (the broker) learns each
+    window's root from its file_review calls. At most MAX_ROOTS indexes are kept, the least
+    recently used one is stopped to make room, and all of them share one inotify watch budget.
+    """
+
+    def __init__(self, io_executor: IoExecutor):
+        self.io_executor = io_executor
+        self.logger = logging.getLogger(__name__)
+        self.watch_budget = _WatchBudget()
+        self._indexes: OrderedDict[str, tuple[WorkspaceIndex, asyncio.Task]] = OrderedDict()  # least recently used first
+
+    def get(self, root: str) -> WorkspaceIndex | None:
+        """The index of root, started now if new; None if indexing is disabled or root is not a directory"""
+        if not WorkspaceIndexConfig.ENABLED:
+            return None
+        root = os.path.realpath(root)
+        entry = self._indexes.get(root)
+        if entry is not None:
+            self._indexes.move_to_end(root)
+            return entry[0]
+        if not os.path.isdir(root):
+            return None
+
+        while len(self._indexes) >= WorkspaceIndexConfig.MAX_ROOTS:
+            old_root, (_old_index, old_task) = self._indexes.popitem(last=False)
+            old_task.cancel()
+            self.logger.info(f"🗂️ Stopped the workspace index of {old_root} to make room for {root}")
+        index = WorkspaceIndex(self.io_executor, root, self.watch_budget)
+        self._indexes[root] = (index, asyncio.create_task(index.run()))
+        return index
+
+    def stop(self) -> None:
+        for _index, task in self._indexes.values():
+            task.cancel()
+        self._indexes.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "watches": self.watch_budget.used,
+            "roots": {root: index.get_stats() for root, (index, _task) in self._indexes.items()},
+        }
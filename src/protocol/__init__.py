@@ -1,5 +1,6 @@
 """MCP Protocol handling module for Review Gate V2."""
 
 from .mcp_handler import McpProtocolHandler
+from .progress_reporter import ProgressReporter
 
-__all__ = ["McpProtocolHandler"]
+__all__ = ["McpProtocolHandler", "ProgressReporter"]
@@ -1,13 +1,18 @@
 import logging
 
 from mcp.server import Server
-from mcp.types import Tool
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.types import Resource, Tool
+
+from ..config.constants import IngestConfig, TimeoutConfig
+from .progress_reporter import ProgressReporter
 
 
 class McpProtocolHandler:
-    def __init__(self, tool_executor):
+    def __init__(self, tool_executor, attachment_store):
         self.server = Server("cursor-enhancer")
         self.tool_executor = tool_executor
+        self.attachment_store = attachment_store
         self.logger = logging.getLogger(__name__)
         self.setup_handlers()
 
@@ -26,21 +31,47 @@ class McpProtocolHandler:
         async def call_tool(name: str, arguments: dict):
             """Handle tool calls from Cursor Agent with immediate activation"""
             self.logger.info(f"🎯 CURSOR AGENT CALLED TOOL: {name}")
-            self.logger.info(f"📋 Tool arguments: {arguments}")
+            self.logger.info(f"📋 Tool arguments: {self._loggable(arguments)}")
 
             # Log that we're processing
             for handler in self.logger.handlers:
                 if hasattr(handler, "flush"):
                     handler.flush()
 
-            return await self.tool_executor.execute_tool(name, arguments)
+            # Stream popup progress to clients that sent a progressToken
+            progress = ProgressReporter.for_current_request(self.server)
+            try:
+                return await self.tool_executor.execute_tool(name, arguments, progress)
+            finally:
+                progress.close()
+
+        @self.server.list_resources()
+        async def list_resources():
+            """List answer attachments that tool results link to instead of inlining"""
+            return [
+                Resource(uri=entry.uri, name=entry.name, mimeType=entry.mime_type, size=len(entry.data))
+                for entry in self.attachment_store.entries()
+            ]
+
+        @self.server.read_resource()
+        async def read_resource(uri):
+            entry = self.attachment_store.get(str(uri))
+            if entry is None:
+                raise ValueError(f"Unknown or expired resource: {uri}")
+            self.logger.info(f"📸 Client read attachment {entry.name} ({len(entry.data)} bytes)")
+            return [ReadResourceContents(content=entry.data, mime_type=entry.mime_type)]
+
+    @staticmethod
+    def _loggable(arguments: dict) -> dict:
+        """Arguments with long strings, such as ingested text, replaced by their length"""
+        return {key: f"<{len(value)} chars>" if isinstance(value, str) and len(value) > 200 else value for key, value in arguments.items()}
 
     def _get_available_tools(self) -> list[Tool]:
         """Get list of available tools"""
         return [
             Tool(
                 name="cursor_enhancer_chat",
-                description="Open Cursor Enhancer chat popup in Cursor for feedback and reviews. Use this when you need user input, feedback, or review from the human user. The popup will appear in Cursor and wait for user response for up to 5 minutes.",
+                description=f"Open Cursor Enhancer chat popup in Cursor for feedback and reviews. Use this when you need user input, feedback, or review from the human user. The popup will appear in Cursor and wait for user response for up to {TimeoutConfig.CHAT_RESPONSE} seconds.",
                 inputSchema={
                     "type": "object",
                     "properties": {
@@ -59,8 +90,124 @@ class McpProtocolHandler:
                             "description": "Additional context about what needs review (code, implementation, etc.)",
                             "default": "",
                         },
+                        "session": {
+                            "type": "string",
+                            "description": "Name shared by the rounds of one iterative review; each round after the first only sends what changed in its context",
+                            "default": "default",
+                        },
                         "urgent": {"type": "boolean", "description": "Whether this is an urgent review request", "default": False},
+                        "async": {
+                            "type": "boolean",
+                            "description": "Return a ticket id as soon as the popup is triggered instead of waiting for the answer; collect it later with cursor_enhancer_get_result",
+                            "default": False,
+                        },
+                    },
+                },
+            ),
+            Tool(
+                name="cursor_enhancer_get_result",
+                description="Collect the user's answer for a ticket returned by cursor_enhancer_chat in async mode. Returns the answer if available, otherwise the ticket status.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "ticket": {"type": "string", "description": "Ticket id returned by cursor_enhancer_chat"},
+                        "wait": {
+                            "type": "number",
+                            "description": "Maximum number of seconds to wait for the answer (0 returns immediately)",
+                            "default": 0,
+                        },
+                    },
+                    "required": ["ticket"],
+                },
+            ),
+            Tool(
+                name="cursor_enhancer_list_tickets",
+                description="List pending and uncollected Cursor Enhancer review tickets with their status and age.",
+                inputSchema={"type": "object", "properties": {}},
+            ),
+            Tool(
+                name="cursor_enhancer_stats",
+                description="Report the live state of the Cursor Enhancer server as JSON: popups and tickets in flight with their age, waiter counts, IPC directory size, cache hit rates, memory use, event loop lag and recent tool latency percentiles. Cheap enough to call every few seconds.",
+                inputSchema={"type": "object", "properties": {}},
+            ),
+            Tool(
+                name="file_review",
+                description=f"Ask the user to pick files for review in Cursor. The popup offers workspace files matching file_types from a server-side index and waits up to {TimeoutConfig.FILE_REVIEW} seconds for the selection.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "instruction": {
+                            "type": "string",
+                            "description": "What the user should select files for",
+                            "default": "Please select file(s) for review:",
+                        },
+                        "file_types": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": 'Extensions ("py", ".ts") or globs ("src/**/*.js", "test_*.py") of the files to offer; "*" offers every file',
+                            "default": ["*"],
+                        },
+                        "workspace_root": {
+                            "type": "string",
+                            "description": "Absolute path of the project to offer files from; defaults to the workspace of the open Cursor window when there is only one",
+                        },
+                        "include": {
+                            "type": "string",
+                            "enum": ["names", "digests", "contents"],
+                            "description": "What to return for the selected files: their names, also their size, line count and sha256, or also their contents",
+                            "default": "names",
+                        },
+                        "start_line": {
+                            "type": "integer",
+                            "description": "With include=contents, first line of each file to return",
+                            "default": 1,
+                        },
+                        "end_line": {
+                            "type": "integer",
+                            "description": "With include=contents, last line of each file to return; defaults to the end of the file",
+                        },
+                    },
+                },
+            ),
+            Tool(
+                name="ingest_text",
+                description=f"Show text to the user in Cursor and wait up to {TimeoutConfig.INGEST_TEXT} seconds for their response. Text over {IngestConfig.CHUNK_BYTES} bytes is sent as a stream: several calls with the same stream id, numbered chunk_index, the last one with final=true. The result refers to the stored text by path and sha256 instead of repeating it.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "text_content": {"type": "string", "description": "The text, or with stream set, the next chunk of it"},
+                        "source": {"type": "string", "description": "Where the text comes from", "default": "extension"},
+                        "context": {"type": "string", "description": "What the user should do with the text", "default": ""},
+                        "processing_mode": {"type": "string", "description": "How the text should be processed", "default": "immediate"},
+                        "stream": {
+                            "type": "string",
+                            "description": "Id shared by the chunks of one text (letters, digits, '-' and '_'); omit to send the text whole",
+                        },
+                        "chunk_index": {
+                            "type": "integer",
+                            "description": "With stream, 0-based position of this chunk; out-of-order chunks are rejected",
+                        },
+                        "final": {
+                            "type": "boolean",
+                            "description": "With stream, whether this is the last chunk; the popup opens once it arrives",
+                            "default": True,
+                        },
+                    },
+                    "required": ["text_content"],
+                },
+            ),
+            Tool(
+                name="get_user_input",
+                description="Retrieve a pending user response written by the Cursor Enhancer popup. Returns immediately when a response is already available, otherwise waits up to the given timeout.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "timeout": {
+                            "type": "number",
+                            "description": "Maximum number of seconds to wait for a response (0 returns immediately)",
+                            "default": 10,
+                        },
                     },
                 },
-            )
+            ),
         ]
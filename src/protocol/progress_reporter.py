@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import time
+
+from ..config.constants import ProgressConfig, ReviewStage
+
+STAGE_MESSAGES = {
+    ReviewStage.QUEUED: "Waiting for other reviews to finish before opening the popup",
+    ReviewStage.TRIGGERED: "Popup triggered in Cursor, waiting for the extension",
+    ReviewStage.ACKNOWLEDGED: "Extension opened the popup, waiting for the user",
+    ReviewStage.TYPING: "User is typing a response",
+    ReviewStage.UPLOADING: "User is attaching an image",
+    ReviewStage.ANSWERED: "User answered",
+    ReviewStage.TIMEOUT: "Timed out waiting for the user",
+    ReviewStage.ERROR: "Popup could not be triggered",
+}
+
+
+class ProgressReporter:
+    """Send rate-limited MCP progress notifications for one tool call.
+
+    Does nothing when the client did not ask for progress (no progressToken).
+    Notifications closer together than MIN_INTERVAL are coalesced so only the
+    latest stage is sent, and a keepalive is sent after KEEPALIVE_INTERVAL of silence.
+    """
+
+    def __init__(self, session=None, progress_token: str | int | None = None, request_id: str | int | None = None):
+        self.session = session
+        self.progress_token = progress_token
+        self.request_id = request_id
+        self.logger = logging.getLogger(__name__)
+        self._progress = 0
+        self._started_at = time.monotonic()
+        self._last_sent_at = 0.0
+        self._last_message = ""
+        self._pending_message: str | None = None
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._keepalive_task: asyncio.Task | None = None
+        self._send_tasks: set[asyncio.Task] = set()
+        self._closed = False
+
+    @classmethod
+    def for_current_request(cls, server) -> "ProgressReporter":
+        """Build a reporter from the MCP server's current request context"""
+        try:
+            ctx = server.request_context
+        except LookupError:
+            return cls()
+        token = ctx.meta.progressToken if ctx.meta else None
+        return cls(ctx.session, token, ctx.request_id)
+
+    @property
+    def enabled(self) -> bool:
+        return self.session is not None and self.progress_token is not None
+
+    def stage(self, stage: str) -> None:
+        """Report that the review reached a stage"""
+        self.report(STAGE_MESSAGES.get(stage, stage))
+
+    def report(self, message: str) -> None:
+        """Queue a progress message, sending now or once the rate limit allows"""
+        if not self.enabled or self._closed or message == self._last_message:
+            return
+
+        if self._keepalive_task is None:
+            self._keepalive_task = asyncio.create_task(self._keepalive_loop())
+
+        self._pending_message = message
+        delay = self._last_sent_at + ProgressConfig.MIN_INTERVAL - time.monotonic()
+        if delay <= 0:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(delay, self._flush)
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        if self._pending_message is None:
+            return
+
+        message, self._pending_message = self._pending_message, None
+        self._progress += 1
+        self._last_sent_at = time.monotonic()
+        self._last_message = message
+        task = asyncio.create_task(self._send(self._progress, message))
+        self._send_tasks.add(task)
+        task.add_done_callback(self._send_tasks.discard)
+
+    async def _send(self, progress: int, message: str) -> None:
+        try:
+            await self.session.send_progress_notification(
+                self.progress_token, progress, message=message, related_request_id=str(self.request_id)
+            )
+        except Exception as e:
+            self.logger.warning(f"⚠️ Failed to send progress notification: {e}")
+
+    async def _keepalive_loop(self) -> None:
+        while True:
+            await asyncio.sleep(ProgressConfig.KEEPALIVE_INTERVAL)
+            if self._pending_message is None and time.monotonic() - self._last_sent_at >= ProgressConfig.KEEPALIVE_INTERVAL:
+                # Always differs from the last message, so it is never deduplicated away
+                self.report(f"Still waiting for the user ({time.monotonic() - self._started_at:.0f}s)")
+
+    def close(self) -> None:
+        """Stop the keepalive and drop anything not yet sent; later reports are ignored"""
+        self._closed = True
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._keepalive_task:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
@@ -1,6 +1,8 @@
 """Service modules for Cursor Enhancer."""
 
 from .cursor_enhancer_service import CursorEnhancerService
+from .policy_engine import PolicyEngine
+from .stats_collector import StatsCollector
 from .tool_executor import ToolExecutor
 
-__all__ = ["ToolExecutor", "CursorEnhancerService"]
+__all__ = ["ToolExecutor", "CursorEnhancerService", "PolicyEngine", "StatsCollector"]
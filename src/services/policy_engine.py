@@ -0,0 +1,174 @@
+"""
+Policy engine that answers routine review requests without a human round trip.
+"""
+
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from ..config.constants import PolicyConfig
+from ..utils.file_operations import get_temp_path
+from ..utils.io_executor import JOURNAL, IoExecutor
+
+
+class PolicyRule:
+    """A compiled auto-response rule; every matcher it defines must match"""
+
+    __slots__ = ("name", "tool", "patterns", "response", "use_last_answer", "max_age")
+
+    def __init__(self, spec: dict[str, Any]):
+        self.name = spec.get("name", "unnamed")
+        self.tool = spec.get("tool")
+        flags = re.IGNORECASE if spec.get("ignore_case", True) else 0
+        self.patterns: list[tuple[str, re.Pattern]] = []
+        for field in ("message", "context"):
+            if f"{field}_regex" in spec:
+                self.patterns.append((field, re.compile(spec[f"{field}_regex"], flags)))
+            if f"{field}_glob" in spec:
+                self.patterns.append((field, re.compile(fnmatch.translate(spec[f"{field}_glob"]), flags)))
+        self.response = spec.get("response")
+        self.use_last_answer = bool(spec.get("use_last_answer", False))
+        self.max_age = spec.get("max_age", PolicyConfig.LAST_ANSWER_MAX_AGE)
+
+        if self.response is None and not self.use_last_answer:
+            raise ValueError(f"rule '{self.name}' needs either 'response' or 'use_last_answer'")
+        if isinstance(self.max_age, bool) or not isinstance(self.max_age, int | float) or self.max_age < 0:
+            raise ValueError(f"rule '{self.name}' needs a non-negative number of seconds for 'max_age', got {self.max_age!r}")
+
+    def matches(self, tool: str, fields: dict[str, str]) -> bool:
+        if self.tool and self.tool != tool:
+            return False
+        return all(pattern.search(fields.get(field, "")) for field, pattern in self.patterns)
+
+
+class PolicyDecision:
+    """An automatic answer produced by a policy rule"""
+
+    __slots__ = ("response", "rule_name", "source")
+
+    def __init__(self, response: str, rule_name: str, source: str):
+        self.response = response
+        self.rule_name = rule_name
+        self.source = source
+
+
+class PolicyEngine:
+    """Match review requests against rules loaded from a JSON file and answer them from policy or a cached previous answer.
+
+    Rules file format::
+
+        {"rules": [
+            {"name": "continue", "message_regex": "^continue\\\\?$", "response": "Yes, continue."},
+            {"name": "tests", "message_glob": "*run tests*", "response": "Yes, run the tests."},
+            {"name": "repeat", "message_glob": "*", "use_last_answer": true, "max_age": 3600}
+        ]}
+    """
+
+    def __init__(self, io_executor: IoExecutor, rules_file: str | None = None, audit_file: str | None = None):
+        self.logger = logging.getLogger(__name__)
+        self.io_executor = io_executor
+        self.rules_file = Path(os.path.expanduser(rules_file or os.environ.get(PolicyConfig.RULES_FILE_ENV, PolicyConfig.RULES_FILE)))
+        self.audit_file = Path(audit_file or get_temp_path(PolicyConfig.AUDIT_FILE))
+        self._rules: list[PolicyRule] = []
+        self._rules_mtime_ns = 0
+        self._next_reload_check = 0.0
+        self._last_answers: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self.auto_answered_count = 0
+
+    async def _reload_if_changed(self) -> None:
+        """Reload rules when the file changed, checking its mtime at most once per interval"""
+        now = time.monotonic()
+        if now < self._next_reload_check:
+            return
+        self._next_reload_check = now + PolicyConfig.RELOAD_CHECK_INTERVAL
+
+        try:
+            loaded = await self.io_executor.run("policy_reload", self._load_rules, self._rules_mtime_ns)
+        except FileNotFoundError:
+            if self._rules:
+                self.logger.info(f"📜 Policy file removed, auto-responses disabled: {self.rules_file}")
+            self._rules, self._rules_mtime_ns = [], 0
+            return
+        except Exception as e:
+            # Keep the previous rule set rather than answering from a half-written file
+            self.logger.error(f"❌ Invalid policy file {self.rules_file}: {e}")
+            return
+
+        if loaded is not None:
+            self._rules_mtime_ns, self._rules = loaded
+            self.logger.info(f"📜 Loaded {len(self._rules)} policy rules from {self.rules_file}")
+
+    def _load_rules(self, known_mtime_ns: int) -> tuple[int, list[PolicyRule]] | None:
+        """The rules file's mtime and compiled rules, None if it still has known_mtime_ns; runs on an I/O thread"""
+        mtime_ns = self.rules_file.stat().st_mtime_ns
+        if mtime_ns == known_mtime_ns:
+            return None
+        specs = json.loads(self.rules_file.read_text()).get("rules", [])
+        return mtime_ns, [PolicyRule(spec) for spec in specs]
+
+    @staticmethod
+    def _answer_key(tool: str, fields: dict[str, str]) -> str:
+        normalized = [tool] + [" ".join(fields.get(field, "").split()).lower() for field in ("message", "context")]
+        return hashlib.sha256(json.dumps(normalized).encode()).hexdigest()
+
+    async def evaluate(self, tool: str, arguments: dict[str, Any]) -> PolicyDecision | None:
+        """Return an automatic answer for the request, or None if it needs a human"""
+        await self._reload_if_changed()
+        if not self._rules:
+            return None
+
+        fields = {"message": str(arguments.get("message", "")), "context": str(arguments.get("context", ""))}
+        for rule in self._rules:
+            if not rule.matches(tool, fields):
+                continue
+
+            if rule.use_last_answer:
+                cached = self._last_answers.get(self._answer_key(tool, fields))
+                if cached is None or time.time() - cached[1] > rule.max_age:
+                    continue
+                decision = PolicyDecision(cached[0], rule.name, "last_answer")
+            else:
+                decision = PolicyDecision(str(rule.response), rule.name, "policy")
+
+            self.auto_answered_count += 1
+            await self._audit(tool, fields, decision)
+            return decision
+
+        return None
+
+    def record_answer(self, tool: str, arguments: dict[str, Any], answer: str) -> None:
+        """Remember a human answer so last-answer rules can replay it"""
+        fields = {"message": str(arguments.get("message", "")), "context": str(arguments.get("context", ""))}
+        key = self._answer_key(tool, fields)
+        self._last_answers[key] = (answer, time.time())
+        self._last_answers.move_to_end(key)
+        while len(self._last_answers) > PolicyConfig.LAST_ANSWER_CACHE_SIZE:
+            self._last_answers.popitem(last=False)
+
+    async def _audit(self, tool: str, fields: dict[str, str], decision: PolicyDecision) -> None:
+        self.logger.info(f"🤖 AUTO-RESPONSE by policy rule '{decision.rule_name}' ({decision.source}): {decision.response[:100]}")
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "tool": tool,
+            "rule": decision.rule_name,
+            "source": decision.source,
+            "message": fields["message"][:200],
+            "response": decision.response,
+        }
+        try:
+            # The journal lane's single thread keeps audit lines whole and in order
+            await self.io_executor.run("policy_audit", self._append_audit, json.dumps(entry) + "\n", lane=JOURNAL)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not write policy audit entry: {e}")
+
+    def _append_audit(self, line: str) -> None:
+        with self.audit_file.open("a", encoding="utf-8") as audit:
+            audit.write(line)
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import logging
+import os
+import resource
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any
+
+from ..config.constants import FilePatterns, StatsConfig
+from ..utils.file_operations import create_private_file, get_temp_dir, get_temp_path
+
+MAX_TOOL_NAMES = 64  # tools with their own latency samples; calls to further (unknown) names share one entry
+OTHER_TOOLS = "(other)"
+
+
+class StatsCollector:
+    """Gather the live state of the server for the cursor_enhancer_stats tool and the stats CLI.
+
+    One collect() reads counters the components already keep, so it can be called every few
+    seconds: the only filesystem work, listing the IPC directory, runs on the I/O executor and
+    is reused for IPC_SCAN_INTERVAL seconds. Every SNAPSHOT_INTERVAL seconds the result is also
+    written to cursor_enhancer_stats_<pid>.json in the IPC directory for the stats CLI.
+    """
+
+    def __init__(self, io_executor, loop_lag_monitor, ipc_sweeper, popup_scheduler, ticket_manager, components: dict[str, Any]):
+        self.io_executor = io_executor
+        self.loop_lag_monitor = loop_lag_monitor
+        self.ipc_sweeper = ipc_sweeper
+        self.popup_scheduler = popup_scheduler
+        self.ticket_manager = ticket_manager
+        self.components = components  # name -> object with get_stats()
+        self.logger = logging.getLogger(__name__)
+        self.started_at = time.monotonic()
+        self._latencies: dict[str, deque[float]] = {}
+        self._calls: dict[str, int] = {}
+        self._ipc_scan: dict[str, Any] | None = None
+        self._ipc_scanned_at = 0.0
+        self._ipc_scan_lock = asyncio.Lock()
+        self._snapshot_failed = False
+        self.snapshot_file = get_temp_path(f"{FilePatterns.STATS_PREFIX}_{os.getpid()}.json")
+
+    def record_call(self, name: str, seconds: float) -> None:
+        """Remember how long one tool call took"""
+        if name not in self._latencies and len(self._latencies) >= MAX_TOOL_NAMES:
+            name = OTHER_TOOLS
+        samples = self._latencies.get(name)
+        if samples is None:
+            samples = self._latencies[name] = deque(maxlen=StatsConfig.LATENCY_SAMPLES)
+        samples.append(seconds)
+        self._calls[name] = self._calls.get(name, 0) + 1
+
+    async def collect(self) -> dict[str, Any]:
+        """Snapshot of in-flight reviews, latencies, memory, event loop lag, IPC directory and component counters"""
+        return {
+            "pid": os.getpid(),
+            "generated_at": datetime.now().isoformat(),
+            "uptime": time.monotonic() - self.started_at,
+            "in_flight": self._in_flight(),
+            "latency_ms": self._latency_stats(),
+            "event_loop": self.loop_lag_monitor.get_stats(),
+            "memory": self._memory_stats(),
+            "ipc_dir": await self._ipc_dir_stats(),
+            "io": self.io_executor.get_stats(),
+            "scheduler": self.popup_scheduler.get_metrics(),
+            "components": {name: component.get_stats() for name, component in self.components.items()},
+        }
+
+    def _in_flight(self) -> dict[str, list[dict[str, Any]]]:
+        tickets = [
+            {"ticket": ticket.ticket_id, "status": ticket.status, "age": ticket.age()}
+            for ticket in self.ticket_manager.list_tickets()
+            if not ticket.done
+        ]
+        return {"popups": self.popup_scheduler.in_flight(), "tickets": tickets}
+
+    def _latency_stats(self) -> dict[str, dict[str, float | int]]:
+        stats = {}
+        for name, samples in self._latencies.items():
+            ordered = sorted(samples)
+            stats[name] = {
+                "calls": self._calls[name],
+                "p50": ordered[int(len(ordered) * 0.5)] * 1000,
+                "p90": ordered[int(len(ordered) * 0.9)] * 1000,
+                "p99": ordered[int(len(ordered) * 0.99)] * 1000,
+                "max": ordered[-1] * 1000,
+            }
+        return stats
+
+    @staticmethod
+    def _memory_stats() -> dict[str, int]:
+        """Resident and peak resident memory in bytes"""
+        memory = {}
+        try:
+            with open("/proc/self/status") as f:
+                for line in f:
+                    if line.startswith(("VmRSS:", "VmHWM:")):
+                        key = "rss_bytes" if line.startswith("VmRSS:") else "peak_rss_bytes"
+                        memory[key] = int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        if "peak_rss_bytes" not in memory:
+            # Without /proc only the peak is known: kilobytes on Linux, bytes on macOS
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            memory["peak_rss_bytes"] = peak if sys.platform == "darwin" else peak * 1024
+        return memory
+
+    async def _ipc_dir_stats(self) -> dict[str, Any]:
+        async with self._ipc_scan_lock:
+            if self._ipc_scan is None or time.monotonic() - self._ipc_scanned_at >= StatsConfig.IPC_SCAN_INTERVAL:
+                self._ipc_scan = await self.io_executor.run("scan_ipc_dir", self._scan_ipc_dir, get_temp_dir())
+                self._ipc_scanned_at = time.monotonic()
+        return {**self._ipc_scan, "age": time.monotonic() - self._ipc_scanned_at}
+
+    def _scan_ipc_dir(self, directory: str) -> dict[str, Any]:
+        """Count and size the IPC files in directory by sweeper class; runs on an I/O thread"""
+        by_class: dict[str, dict[str, int]] = {}
+        files = total_bytes = examined = 0
+        truncated = False
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if examined >= StatsConfig.IPC_SCAN_MAX_ENTRIES:
+                        truncated = True
+                        break
+                    examined += 1
+                    file_class = self.ipc_sweeper.classify(entry.name)
+                    if file_class is None:
+                        if not entry.name.startswith("cursor_enhancer"):
+                            continue  # not ours, e.g. other programs' files in a shared /tmp
+                        file_class = "other"
+                    try:
+                        size = entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+                    counts = by_class.setdefault(file_class, {"files": 0, "bytes": 0})
+                    counts["files"] += 1
+                    counts["bytes"] += size
+                    files += 1
+                    total_bytes += size
+        except OSError as e:
+            return {"path": directory, "error": str(e)}
+        return {"path": directory, "files": files, "bytes": total_bytes, "by_class": by_class, "truncated": truncated}
+
+    async def run(self) -> None:
+        """Write a snapshot every SNAPSHOT_INTERVAL seconds until cancelled"""
+        while True:
+            interval = StatsConfig.SNAPSHOT_INTERVAL
+            if interval > 0:
+                await self._write_snapshot()
+            # While snapshots are off, look again every second in case a config reload turns them on
+            await asyncio.sleep(interval if interval > 0 else 1)
+
+    async def _write_snapshot(self) -> None:
+        payload = json.dumps(await self.collect()).encode()
+        try:
+            await self.io_executor.run("write_stats", self._write_file, self.snapshot_file, payload)
+            self._snapshot_failed = False
+        except OSError as e:
+            if not self._snapshot_failed:
+                self.logger.warning(f"⚠️ Could not write stats snapshot {self.snapshot_file}: {e}")
+            self._snapshot_failed = True
+
+    @staticmethod
+    def _write_file(path: str, payload: bytes) -> None:
+        tmp_file = f"{path}.tmp"
+        try:
+            os.unlink(tmp_file)  # left by an interrupted write; in a shared /tmp, a link planted there is removed, not followed
+        except FileNotFoundError:
+            pass
+        with create_private_file(tmp_file) as f:
+            f.write(payload)
+        os.replace(tmp_file, path)
+
+    def stop(self) -> None:
+        """Remove this server's snapshot so the stats CLI stops listing it"""
+        try:
+            os.unlink(self.snapshot_file)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.warning(f"⚠️ Could not remove stats snapshot {self.snapshot_file}: {e}")
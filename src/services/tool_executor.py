@@ -1,29 +1,127 @@
 import asyncio
+import json
 import logging
+import os
+import re
 import time
+from collections.abc import Callable
 from datetime import datetime
 from typing import Any
 
 from mcp.types import ImageContent, TextContent
 
-from ..config.constants import TimeoutConfig
+try:
+    from mcp.types import ResourceLink
+except ImportError:  # mcp before 1.10 has no resource links; the URI is then given as text
+    ResourceLink = None
+
+from ..config.constants import (
+    AttachmentConfig,
+    FileReviewConfig,
+    IngestConfig,
+    IpcConfig,
+    JournalConfig,
+    PresenceConfig,
+    RetryConfig,
+    ReviewStage,
+    TicketConfig,
+    TimeoutConfig,
+    WorkspaceIndexConfig,
+)
+from ..managers.review_journal import COLLECTED, PendingReview
+from ..managers.workspace_index import WorkspaceIndex
+from ..protocol.progress_reporter import ProgressReporter
+from ..utils.file_operations import new_trigger_id
+from ..utils.io_executor import BACKGROUND
+from ..utils.retry_policy import CircuitBreaker, RetryPolicy
 
 
 class ToolExecutor:
-    def __init__(self, response_manager, trigger_manager):
+    def __init__(
+        self,
+        *,
+        response_manager,
+        trigger_manager,
+        response_index,
+        popup_scheduler,
+        request_coalescer,
+        policy_engine,
+        ticket_manager,
+        status_monitor,
+        presence_registry,
+        review_journal,
+        context_tracker,
+        workspace_indexes,
+        workspace_file_cache,
+        ingest_store,
+        attachment_store,
+        stats_collector,
+        io_executor,
+    ):
         self.response_manager = response_manager
         self.trigger_manager = trigger_manager
+        self.response_index = response_index
+        self.popup_scheduler = popup_scheduler
+        self.request_coalescer = request_coalescer
+        self.policy_engine = policy_engine
+        self.ticket_manager = ticket_manager
+        self.status_monitor = status_monitor
+        self.presence_registry = presence_registry
+        self.review_journal = review_journal
+        self.context_tracker = context_tracker
+        self.workspace_indexes = workspace_indexes
+        self.workspace_file_cache = workspace_file_cache
+        self.ingest_store = ingest_store
+        self.attachment_store = attachment_store
+        self.stats_collector = stats_collector
+        self.io_executor = io_executor
         self.logger = logging.getLogger(__name__)
-        self._last_attachments = []
+        self.ack_retry_policy = RetryPolicy(RetryConfig.ACK_MAX_ATTEMPTS, RetryConfig.ACK_ATTEMPT_TIMEOUT, RetryConfig.ACK_BACKOFF_FACTOR)
+        self.ack_breaker = CircuitBreaker(RetryConfig.BREAKER_FAILURE_THRESHOLD, RetryConfig.BREAKER_COOLDOWN)
+        self.missing_ack_count = 0
+
+    async def execute_tool(self, name: str, arguments: dict[str, Any], progress: ProgressReporter | None = None) -> list[TextContent]:
+        """Execute the specified tool with given arguments, reporting popup stages through progress"""
+        started = time.perf_counter()
+        try:
+            return await self._execute_tool(name, arguments, progress or ProgressReporter())
+        finally:
+            self.stats_collector.record_call(name, time.perf_counter() - started)
 
-    async def execute_tool(self, name: str, arguments: dict[str, Any]) -> list[TextContent]:
-        """Execute the specified tool with given arguments"""
-        await asyncio.sleep(TimeoutConfig.PROCESSING_DELAY)
-        self.logger.info(f"⚙️ Processing tool call: {name}")
+    async def _execute_tool(self, name: str, arguments: dict[str, Any], progress: ProgressReporter) -> list[TextContent]:
+        # Diagnostics skip the processing delay so they stay cheap to poll
+        if name == "cursor_enhancer_stats":
+            return [TextContent(type="text", text=json.dumps(await self.stats_collector.collect(), indent=2))]
 
         try:
+            # Routine questions are answered from policy right away, skipping the popup round trip entirely
+            if name == "cursor_enhancer_chat":
+                decision = await self.policy_engine.evaluate(name, arguments)
+                if decision:
+                    text = f"User Response: {decision.response}\n\n(Auto-response from policy rule '{decision.rule_name}')"
+                    return [TextContent(type="text", text=text)]
+
+            await asyncio.sleep(TimeoutConfig.PROCESSING_DELAY)
+            self.logger.info(f"⚙️ Processing tool call: {name}")
+
             if name == "cursor_enhancer_chat":
-                return await self._handle_cursor_enhancer_chat(arguments)
+                # Retries of an unanswered request share its popup and result
+                key = self.request_coalescer.make_key(name, {k: v for k, v in arguments.items() if k != "async"})
+                if arguments.get("async", False):
+                    return await self._handle_cursor_enhancer_chat_ticket(key, arguments)
+                return await self.request_coalescer.run(
+                    key, lambda on_stage: self._handle_cursor_enhancer_chat(arguments, on_stage), progress.stage
+                )
+            elif name == "get_user_input":
+                return await self._handle_get_user_input(arguments)
+            elif name == "cursor_enhancer_get_result":
+                return await self._handle_get_result(arguments)
+            elif name == "cursor_enhancer_list_tickets":
+                return await self._handle_list_tickets(arguments)
+            elif name == "file_review":
+                return await self._handle_file_review(arguments)
+            elif name == "ingest_text":
+                return await self._handle_ingest_text(arguments)
             else:
                 self.logger.error(f"❌ Unknown tool: {name}")
                 await asyncio.sleep(TimeoutConfig.ERROR_DELAY)
@@ -33,72 +131,566 @@ class ToolExecutor:
             await asyncio.sleep(TimeoutConfig.ERROR_DELAY)
             return [TextContent(type="text", text=f"ERROR: Tool {name} failed: {str(e)}")]
 
-    async def _handle_cursor_enhancer_chat(self, args: dict) -> list[TextContent]:
-        """Handle Cursor Enhancer chat popup and wait for user input with 5 minute timeout"""
+    async def _handle_cursor_enhancer_chat(self, args: dict, on_stage: Callable[[str], None]) -> list[TextContent]:
+        """Handle Cursor Enhancer chat popup and wait for user input (TimeoutConfig.CHAT_RESPONSE)"""
         message = args.get("message", "Please provide your review or feedback:")
         title = args.get("title", "Cursor Enhancer - Enhanced Cursor IDE")
-        context = args.get("context", "")
-        urgent = args.get("urgent", False)
 
         self.logger.info(f"💬 ACTIVATING Cursor Enhancer chat popup IMMEDIATELY for Cursor Agent")
         self.logger.info(f"📝 Title: {title}")
         self.logger.info(f"📄 Message: {message}")
 
+        # Nobody can answer if no extension is listening: say so now rather than after minutes of waiting
+        if PresenceConfig.REQUIRE_EXTENSION and not self.presence_registry.has_live_extension():
+            self.logger.error("❌ No live Cursor Enhancer extension registered - not triggering popup")
+            return [TextContent(type="text", text=self._no_extension_message())]
+
         # Create trigger file for Cursor extension IMMEDIATELY
-        trigger_id = f"review_{int(time.time() * 1000)}"  # Use milliseconds for uniqueness
+        trigger_id = new_trigger_id("review")
+        return await self._run_scheduled_chat(trigger_id, args, on_stage)
+
+    @staticmethod
+    def _no_extension_message() -> str:
+        response = "ERROR: No Cursor Enhancer extension is running, so no popup can appear.\n\n"
+        response += "💡 Open Cursor with the Cursor Enhancer extension enabled, or call cursor_enhancer_chat with async=true "
+        response += "to queue the review until an extension starts."
+        return response
+
+    async def _run_scheduled_chat(self, trigger_id: str, args: dict, on_stage: Callable[[str], None] | None = None) -> list[TextContent]:
+        """Wait for a popup slot, then run the chat popup for trigger_id"""
+        on_stage = on_stage or (lambda stage: None)
+        message = args.get("message", "Please provide your review or feedback:")
+        title = args.get("title", "Cursor Enhancer - Enhanced Cursor IDE")
+        context = args.get("context", "")
+        session = args.get("session") or "default"
+        urgent = args.get("urgent", False)
+
+        # One human answers popups one at a time: wait for our turn in priority order
+        async with self.popup_scheduler.slot(trigger_id, urgent):
+            return await self._run_chat_popup(trigger_id, message, title, context, session, urgent, on_stage)
+
+    async def _run_chat_popup(
+        self, trigger_id: str, message: str, title: str, context: str, session: str, urgent: bool, on_stage: Callable[[str], None]
+    ) -> list[TextContent]:
+        """Trigger the chat popup once a slot is held and wait for the user's answer"""
+        try:
+            return await self._trigger_and_wait(trigger_id, message, title, context, session, urgent, on_stage)
+        except asyncio.CancelledError:
+            if self.review_journal.closed:
+                # Server shutdown, not the client: leave the popup up so the next server collects its answer
+                raise
+            # The client cancelled the call: stop waiting and leave nothing behind for the extension or /tmp
+            self.review_journal.record(ReviewStage.CANCELLED, trigger_id)
+            self.trigger_manager.cancel_trigger(trigger_id)
+            on_stage(ReviewStage.CANCELLED)
+            raise
+        except Exception:
+            self.review_journal.record(ReviewStage.ERROR, trigger_id)
+            raise
+
+    async def _trigger_and_wait(
+        self, trigger_id: str, message: str, title: str, context: str, session: str, urgent: bool, on_stage: Callable[[str], None]
+    ) -> list[TextContent]:
+        trigger_data = {
+            "tool": "cursor_enhancer_chat",
+            "message": message,
+            "title": title,
+            "context": context,
+            "urgent": urgent,
+            "trigger_id": trigger_id,
+            "timestamp": datetime.now().isoformat(),
+            "immediate_activation": True,
+        }
+        # Later rounds of an iterative review only send what changed since the context the extension holds
+        await self.context_tracker.prepare(trigger_data, session)
+
+        # Read once so a config reload mid-wait does not change this call's deadline
+        timeout = TimeoutConfig.CHAT_RESPONSE
 
         # Force immediate trigger creation with enhanced debugging
-        success = await self.trigger_manager.trigger_cursor_popup_immediately(
-            {
-                "tool": "cursor_enhancer_chat",
-                "message": message,
-                "title": title,
-                "context": context,
-                "urgent": urgent,
-                "trigger_id": trigger_id,
-                "timestamp": datetime.now().isoformat(),
-                "immediate_activation": True,
-            }
-        )
+        success = await self.trigger_manager.trigger_cursor_popup_immediately(trigger_data)
 
         if success:
             self.logger.info(f"🔥 POPUP TRIGGERED IMMEDIATELY - waiting for user input (trigger_id: {trigger_id})")
+            on_stage(ReviewStage.TRIGGERED)
+            ticket = self.ticket_manager.get(trigger_id)
+            self.review_journal.record(
+                ReviewStage.TRIGGERED,
+                trigger_id,
+                message=message,
+                title=title,
+                urgent=urgent,
+                timeout=timeout,
+                ticket_key=ticket.key if ticket else None,
+            )
 
-            # Wait for extension acknowledgement first
-            ack_received = await self.response_manager.wait_for_extension_acknowledgement(trigger_id, timeout=30)
-            if ack_received:
-                self.logger.info("📨 Extension acknowledged popup activation")
-            else:
-                self.logger.warning("⚠️ No extension acknowledgement received - popup may not have opened")
-
-            # Wait for user input from the popup with 5 MINUTE timeout
-            self.logger.info("⏳ Waiting for user input for up to 5 minutes...")
-            user_input = await self.response_manager.wait_for_user_input(trigger_id, timeout=300)  # 5 MINUTE timeout
+            # Keep this trigger's answer away from get_user_input while we wait for it
+            self.response_index.reserve(trigger_id)
+            # Typing and upload activity reported by the popup becomes progress for the caller
+            self.status_monitor.listen(trigger_id, on_stage)
+            try:
+                # Wait for user input from the popup
+                self.logger.info(f"⏳ Waiting for user input for up to {timeout}s...")
+                result = await self._await_review(trigger_id, trigger_data, context, timeout, on_stage)
+            finally:
+                self.status_monitor.unlisten(trigger_id)
+                self.response_index.release(trigger_id)
 
-            if user_input:
+            if result:
+                user_input, attachments = result
                 # Return user input directly to MCP client
                 self.logger.info(f"✅ RETURNING USER REVIEW TO MCP CLIENT: {user_input[:100]}...")
-
-                # Check for images in the last response data
-                response_content = [TextContent(type="text", text=f"User Response: {user_input}")]
-
-                # If we have stored attachment data, include images
-                if hasattr(self, "_last_attachments") and self._last_attachments:
-                    for attachment in self._last_attachments:
-                        if attachment.get("mimeType", "").startswith("image/"):
-                            try:
-                                image_content = ImageContent(type="image", data=attachment["base64Data"], mimeType=attachment["mimeType"])
-                                response_content.append(image_content)
-                                self.logger.info(f"📸 Added image to response: {attachment.get('fileName', 'unknown')}")
-                            except Exception as e:
-                                self.logger.error(f"❌ Error adding image to response: {e}")
-
-                return response_content
+                self.policy_engine.record_answer("cursor_enhancer_chat", {"message": message, "context": context}, user_input)
+                self._journal_answer(trigger_id, ticket is not None, user_input, attachments)
+                on_stage(ReviewStage.ANSWERED)
+                return await self._answer_content(user_input, attachments)
             else:
-                response = f"TIMEOUT: No user input received for cursor enhancer within 5 minutes"
-                self.logger.warning("⚠️ Cursor Enhancer timed out waiting for user input after 5 minutes")
+                response = f"TIMEOUT: No user input received for cursor enhancer within {timeout} seconds"
+                self.logger.warning(f"⚠️ Cursor Enhancer timed out waiting for user input after {timeout}s")
+                self.review_journal.record(ReviewStage.TIMEOUT, trigger_id)
+                on_stage(ReviewStage.TIMEOUT)
                 return [TextContent(type="text", text=response)]
         else:
             response = f"ERROR: Failed to trigger Cursor Enhancer popup"
             self.logger.error("❌ Failed to trigger Cursor Enhancer popup")
+            on_stage(ReviewStage.ERROR)
             return [TextContent(type="text", text=response)]
+
+    def _journal_answer(self, trigger_id: str, for_ticket: bool, user_input: str, attachments: list[dict[str, Any]]) -> None:
+        # A ticket's answer is kept in the journal until collected; a direct call hands it over right away.
+        # Attachments are only counted: their base64 would bloat every write and compaction of the journal
+        if for_ticket:
+            answer = {"user_input": user_input, "attachment_count": len(attachments)}
+            self.review_journal.record(ReviewStage.ANSWERED, trigger_id, answer=answer)
+        else:
+            self.review_journal.record(ReviewStage.ANSWERED, trigger_id)
+
+    async def _answer_content(self, user_input: str, attachments: list[dict[str, Any]]) -> list[TextContent | ImageContent]:
+        response_content = [TextContent(type="text", text=f"User Response: {user_input}")]
+
+        # Include images attached to this answer
+        for attachment in attachments:
+            if attachment.get("mimeType", "").startswith("image/"):
+                try:
+                    if self._link_attachment(attachment):
+                        response_content.append(await self._attachment_link(attachment))
+                        continue
+                    image_content = ImageContent(type="image", data=attachment["base64Data"], mimeType=attachment["mimeType"])
+                    response_content.append(image_content)
+                    self.logger.info(f"📸 Added image to response: {attachment.get('fileName', 'unknown')}")
+                except Exception as e:
+                    self.logger.error(f"❌ Error adding image to response: {e}")
+        return response_content
+
+    @staticmethod
+    def _link_attachment(attachment: dict[str, Any]) -> bool:
+        """Whether to hand the attachment over as a resource rather than inline base64"""
+        if AttachmentConfig.DELIVERY == "resource":
+            return True
+        # base64 takes 4 characters per 3 bytes
+        return AttachmentConfig.DELIVERY == "auto" and len(attachment.get("base64Data", "")) * 3 // 4 > AttachmentConfig.INLINE_MAX_BYTES
+
+    async def _attachment_link(self, attachment: dict[str, Any]) -> "ResourceLink | TextContent":
+        """Keep the attachment as a resource and point the client at it, so the result stays small"""
+        try:
+            entry = await self.attachment_store.put(attachment)
+        except ValueError as e:
+            name = attachment.get("fileName") or "attachment"
+            self.logger.error(f"❌ Attachment {name} not stored: {e}")
+            return TextContent(type="text", text=f"📸 Image {name} could not be attached: {e}")
+        self.logger.info(f"📸 Added image to response as resource {entry.uri}: {entry.name} ({len(entry.data)} bytes)")
+        if ResourceLink is not None:
+            return ResourceLink(type="resource_link", uri=entry.uri, name=entry.name, mimeType=entry.mime_type, size=len(entry.data))
+        text = f"📸 Image {entry.name} ({entry.mime_type}, {len(entry.data)} bytes): read resource {entry.uri}"
+        return TextContent(type="text", text=text)
+
+    async def _await_review(
+        self, trigger_id: str, trigger_data: dict, context: str, timeout: float, on_stage: Callable[[str], None]
+    ) -> tuple[str, list[dict[str, Any]]] | None:
+        """Wait for the acknowledgement and the answer concurrently; the answer ends the wait as soon as it arrives.
+
+        An acknowledgement that does not come in time is reported and the trigger is rewritten,
+        with longer waits each attempt, for as long as the retry policy and circuit breaker allow.
+        """
+        response_task = asyncio.create_task(self.response_manager.wait_for_response(trigger_id, timeout=timeout))
+        attempt = 1
+        ack_task = asyncio.create_task(
+            self.response_manager.wait_for_extension_acknowledgement(trigger_id, timeout=self.ack_retry_policy.attempt_timeout(attempt))
+        )
+        try:
+            while True:
+                pending = {response_task, ack_task} if ack_task else {response_task}
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if response_task in done:
+                    return response_task.result()
+
+                ack = ack_task.result()
+                if ack and ack.get("context_resync"):
+                    # Rewrite the trigger with the whole context; a duplicate request for a trigger already rewritten only waits again
+                    if self.context_tracker.resync(trigger_data, context):
+                        await self.trigger_manager.trigger_cursor_popup_immediately(trigger_data)
+                    ack_task = asyncio.create_task(
+                        self.response_manager.wait_for_extension_acknowledgement(
+                            trigger_id, timeout=self.ack_retry_policy.attempt_timeout(attempt)
+                        )
+                    )
+                    continue
+
+                if ack:
+                    self.logger.info("📨 Extension acknowledged popup activation")
+                    if "context_session" in trigger_data:
+                        self.context_tracker.confirm(trigger_data["context_session"], ack.get("context_sha256"))
+                    self.review_journal.record(ReviewStage.ACKNOWLEDGED, trigger_id)
+                    self.ack_breaker.record_success()
+                    on_stage(ReviewStage.ACKNOWLEDGED)
+                    ack_task = None
+                    continue
+
+                self.ack_breaker.record_failure()
+                self.missing_ack_count += 1
+                self.logger.warning(f"⚠️ No extension acknowledgement for attempt {attempt} - popup may not have opened")
+                if not self.ack_retry_policy.should_retry(attempt) or not self.ack_breaker.allow():
+                    self.logger.warning(f"⚠️ Not re-triggering (circuit {self.ack_breaker.state}) - still waiting for a response")
+                    ack_task = None
+                    continue
+
+                attempt += 1
+                self.logger.info(f"🔁 Re-triggering popup (attempt {attempt}/{self.ack_retry_policy.max_attempts})")
+                await self.trigger_manager.trigger_cursor_popup_immediately(trigger_data)
+                ack_task = asyncio.create_task(
+                    self.response_manager.wait_for_extension_acknowledgement(
+                        trigger_id, timeout=self.ack_retry_policy.attempt_timeout(attempt)
+                    )
+                )
+        finally:
+            for task in (response_task, ack_task):
+                if task and not task.done():
+                    task.cancel()
+
+    async def _handle_cursor_enhancer_chat_ticket(self, key: str, args: dict) -> list[TextContent]:
+        """Start the chat popup in the background and return a ticket as soon as the trigger is written"""
+        ticket = self.ticket_manager.find_pending(key)
+        if ticket:
+            self.logger.info(f"🔗 Reusing pending ticket {ticket.ticket_id} for identical request")
+        else:
+            trigger_id = new_trigger_id("review")
+            summary = args.get("message", "Please provide your review or feedback:")
+            ticket = self.ticket_manager.create(trigger_id, key, summary, lambda ticket: self._run_ticket_chat(ticket, args))
+
+        # Return once the popup is up; if it is queued behind other reviews, say so rather than block
+        try:
+            await asyncio.wait_for(ticket.triggered.wait(), TicketConfig.TRIGGER_WAIT)
+        except TimeoutError:
+            pass
+
+        result_message = f"🎫 Review ticket: {ticket.ticket_id}\n"
+        result_message += f"📊 Status: {ticket.status}\n\n"
+        result_message += f"🎯 Continue working and call cursor_enhancer_get_result with ticket='{ticket.ticket_id}' "
+        result_message += "(optionally wait=<seconds>) to collect the user's answer."
+        return [TextContent(type="text", text=result_message)]
+
+    async def _run_ticket_chat(self, ticket, args: dict) -> list[TextContent]:
+        """Background body of an async review: wait for an extension if none is listening, then run the popup"""
+        if PresenceConfig.REQUIRE_EXTENSION and not self.presence_registry.has_live_extension():
+            self.logger.info(f"🕒 Ticket {ticket.ticket_id} waiting for a Cursor Enhancer extension to start")
+            if not await self.presence_registry.wait_for_extension(PresenceConfig.TICKET_WAIT):
+                ticket.set_status(ReviewStage.ERROR)
+                return [TextContent(type="text", text=self._no_extension_message())]
+
+        return await self._run_scheduled_chat(ticket.ticket_id, args, ticket.set_status)
+
+    def recover_reviews(self, reviews: list[PendingReview]) -> None:
+        """Turn reviews left unfinished by a previous server into tickets the agent can collect"""
+        for review in reviews:
+            if self.ticket_manager.get(review.trigger_id):
+                continue
+            key = review.ticket_key or f"recovered:{review.trigger_id}"
+            try:
+                self.ticket_manager.create(
+                    review.trigger_id,
+                    key,
+                    f"[recovered] {review.message}",
+                    lambda ticket, review=review: self._run_recovered_review(ticket, review),
+                )
+            except RuntimeError as e:
+                self.logger.error(f"❌ Could not recover review {review.trigger_id}: {e}")
+
+    async def _run_recovered_review(self, ticket, review: PendingReview) -> list[TextContent]:
+        """Background body of a recovered review: hand over its answer, waiting for a late one if need be"""
+        if review.answer is not None:
+            return await self._answer_content(*review.answer)
+
+        # The popup may still be open, or already answered into a file nobody was waiting for
+        ticket.set_status(ReviewStage.TRIGGERED)
+        timeout = max(review.deadline - time.time(), JournalConfig.RECOVERY_MIN_WAIT)
+        self.response_index.reserve(review.trigger_id)
+        self.status_monitor.listen(review.trigger_id, ticket.set_status)
+        try:
+            result = await self.response_manager.wait_for_response(review.trigger_id, timeout=timeout)
+        finally:
+            self.status_monitor.unlisten(review.trigger_id)
+            self.response_index.release(review.trigger_id)
+
+        if result:
+            user_input, attachments = result
+            self.logger.info(f"✅ Late answer for recovered review {review.trigger_id}: {user_input[:100]}...")
+            self._journal_answer(review.trigger_id, True, user_input, attachments)
+            return await self._answer_content(user_input, attachments)
+
+        self.review_journal.record(ReviewStage.TIMEOUT, review.trigger_id)
+        ticket.set_status(ReviewStage.TIMEOUT)
+        return [
+            TextContent(
+                type="text", text=f"TIMEOUT: No answer arrived for recovered review {review.trigger_id} within {timeout:.0f} seconds"
+            )
+        ]
+
+    async def _handle_get_result(self, args: dict) -> list[TextContent]:
+        """Return a ticket's answer, optionally waiting up to `wait` seconds for it"""
+        ticket_id = args.get("ticket", "")
+        wait = args.get("wait", 0)
+
+        ticket = self.ticket_manager.get(ticket_id)
+        if ticket is None:
+            return [TextContent(type="text", text=f"ERROR: Unknown or already collected ticket: {ticket_id}")]
+
+        if not await self.ticket_manager.wait(ticket, wait):
+            response = f"⏳ Ticket {ticket_id} is still pending\n\n📊 Status: {ticket.status}\n⏱️ Age: {ticket.age():.0f}s\n\n"
+            response += "🎯 Call cursor_enhancer_get_result again later, or pass wait=<seconds> to block until the answer arrives."
+            return [TextContent(type="text", text=response)]
+
+        result = self.ticket_manager.collect(ticket)
+        self.review_journal.record(COLLECTED, ticket_id)
+        if result is None:
+            return [TextContent(type="text", text=f"CANCELLED: Ticket {ticket_id} was cancelled before the user answered")]
+        return result
+
+    async def _handle_list_tickets(self, args: dict) -> list[TextContent]:
+        """List outstanding and uncollected review tickets"""
+        tickets = self.ticket_manager.list_tickets()
+        if not tickets:
+            return [TextContent(type="text", text="📭 No pending review tickets")]
+
+        lines = [f"🎫 {len(tickets)} review ticket(s):"]
+        for ticket in tickets:
+            lines.append(f"• {ticket.ticket_id} - {ticket.status} - {ticket.age():.0f}s - {ticket.summary[:80]}")
+        return [TextContent(type="text", text="\n".join(lines))]
+
+    async def _handle_file_review(self, args: dict) -> list[TextContent]:
+        """Offer the user matching workspace files from the index and wait for their selection"""
+        instruction = args.get("instruction", "Please select file(s) for review:")
+        file_types = args.get("file_types") or ["*"]
+
+        self.logger.info(f"📁 ACTIVATING File Review for Cursor Agent: {instruction}")
+        if PresenceConfig.REQUIRE_EXTENSION and not self.presence_registry.has_live_extension():
+            return [TextContent(type="text", text=self._no_extension_message())]
+
+        trigger_id = new_trigger_id("file")
+        trigger_data = {
+            "tool": "file_review",
+            "instruction": instruction,
+            "file_types": file_types,
+            "title": "File Review - Cursor Enhancer",
+            "trigger_id": trigger_id,
+            "timestamp": datetime.now().isoformat(),
+            "immediate_activation": True,
+        }
+        # Without a known root or a finished index the extension enumerates the workspace itself, as before
+        root = self._workspace_root(args)
+        index = self.workspace_indexes.get(root) if root else None
+        if index is not None and await index.wait_ready(WorkspaceIndexConfig.BUILD_WAIT):
+            candidates, total = index.query(file_types, WorkspaceIndexConfig.MAX_CANDIDATES)
+            trigger_data.update(workspace_root=index.root, candidates=candidates, candidate_total=total)
+            self.logger.info(f"🗂️ Offering {len(candidates)} of {total} matching files")
+
+        timeout = TimeoutConfig.FILE_REVIEW
+        try:
+            result = await self._run_tool_popup(trigger_data, timeout)
+        except RuntimeError:
+            return [TextContent(type="text", text="⚠️ File Review trigger failed. Manual activation may be needed.")]
+
+        if result is None:
+            self.logger.warning("⚠️ File review timed out")
+            response = f"⏰ File Review timed out.\n\n**Instruction:** {instruction}\n\n"
+            response += f"No files selected within {timeout} seconds. Try again or proceed with current workspace files."
+            return [TextContent(type="text", text=response)]
+
+        user_input, _attachments = result
+        self.logger.info(f"✅ FILES SELECTED: {user_input}")
+        response = f"📁 File Review completed!\n\n**Selected Files:** {user_input}\n\n**Instruction:** {instruction}\n"
+        response += f"**Allowed Types:** {', '.join(file_types)}\n"
+        if "candidates" in trigger_data:
+            response += f"**Workspace:** {trigger_data['workspace_root']} ({trigger_data['candidate_total']} matching files)\n"
+        include = args.get("include", "names")
+        if include not in ("digests", "contents"):
+            response += "\nYou can now proceed to analyze the selected files."
+            return [TextContent(type="text", text=response)]
+
+        if index is None:
+            response += "\n⚠️ No workspace root is known, so the selected files cannot be read; pass workspace_root."
+            return [TextContent(type="text", text=response)]
+
+        # Hand over what the agent would otherwise fetch with one more tool call per file
+        selected = [name.strip() for name in re.split(r"[\n,]", user_input) if name.strip()]
+        file_reports = await self.io_executor.run(
+            "describe_files",
+            self._describe_files,
+            index,
+            selected,
+            include == "contents",
+            args.get("start_line", 1),
+            args.get("end_line"),
+            lane=BACKGROUND,
+        )
+        return [TextContent(type="text", text=response)] + file_reports
+
+    async def _run_tool_popup(self, trigger_data: dict, timeout: float) -> tuple[str, list[dict[str, Any]]] | None:
+        """Trigger a one-off tool popup once a slot is free and wait for its response, None on timeout.
+
+        Raises RuntimeError if the trigger could not be written.
+        """
+        trigger_id = trigger_data["trigger_id"]
+        async with self.popup_scheduler.slot(trigger_id, False):
+            try:
+                if not await self.trigger_manager.trigger_cursor_popup_immediately(trigger_data):
+                    raise RuntimeError(f"trigger {trigger_id} failed")
+                self.response_index.reserve(trigger_id)
+                try:
+                    return await self.response_manager.wait_for_response(trigger_id, timeout=timeout)
+                finally:
+                    self.response_index.release(trigger_id)
+            except asyncio.CancelledError:
+                self.trigger_manager.cancel_trigger(trigger_id)
+                raise
+
+    def _workspace_root(self, args: dict) -> str | None:
+        """Root for file_review: the call's workspace_root, the configured one, else the only live extension's workspace"""
+        root = args.get("workspace_root") or WorkspaceIndexConfig.ROOT or IpcConfig.WORKSPACE
+        if root:
+            return os.path.expanduser(root)
+        workspaces = {record.get("workspace") for record in self.presence_registry.live_extensions()}
+        return workspaces.pop() if len(workspaces) == 1 else None
+
+    def _describe_files(
+        self, index: WorkspaceIndex, names: list[str], with_contents: bool, start_line: int, end_line: int | None
+    ) -> list[TextContent]:
+        """Digest, and optionally the contents of a line range, of each selected file within the size caps"""
+        budget = FileReviewConfig.MAX_TOTAL_BYTES
+        reports = []
+        for name in names:
+            path = index.resolve(name)
+            if path is None:
+                reports.append(TextContent(type="text", text=f"⚠️ {name}: not inside the workspace {index.root}"))
+                continue
+            max_bytes = min(FileReviewConfig.MAX_FILE_BYTES, budget) if with_contents and budget > 0 else None
+            try:
+                excerpt = self.workspace_file_cache.excerpt(path, start_line, end_line, max_bytes)
+            except OSError as e:
+                reports.append(TextContent(type="text", text=f"⚠️ {name}: {e.strerror or e}"))
+                continue
+
+            report = f"📄 {name} - {excerpt.size} bytes, {excerpt.lines} lines, sha256 {excerpt.sha256}"
+            if excerpt.text == "":
+                report += f"\n(no lines in range {start_line}-{end_line or 'end'})"
+            elif excerpt.text is not None:
+                budget -= len(excerpt.text.encode())
+                report += f"\nLines {excerpt.start_line}-{excerpt.end_line}"
+                if excerpt.truncated:
+                    report += f" (cut at the {max_bytes}-byte limit)"
+                text = excerpt.text if excerpt.text.endswith("\n") else f"{excerpt.text}\n"
+                fence = "```"
+                while fence in text:
+                    fence += "`"
+                report += f":\n{fence}\n{text}{fence}"
+            elif with_contents:
+                report += "\n(binary file, contents omitted)" if excerpt.binary else "\n(contents omitted: response size limit reached)"
+            reports.append(TextContent(type="text", text=report))
+        return reports
+
+    async def _handle_ingest_text(self, args: dict) -> list[TextContent]:
+        """Take text to process, whole or as a stream of chunks, and ask the user about it once complete"""
+        stream_id = args.get("stream") or None
+        try:
+            stream = await self.ingest_store.append(stream_id, args.get("text_content", ""), args.get("chunk_index"))
+        except ValueError as e:
+            return [TextContent(type="text", text=f"ERROR: {e}")]
+        if stream_id is not None and not args.get("final", True):
+            response = f"📥 Chunk {stream.chunks - 1} of stream {stream_id} stored: {stream.size} bytes so far, sha256 {stream.sha256}.\n"
+            response += f"Send chunk_index={stream.chunks} next, with final=true on the last chunk."
+            return [TextContent(type="text", text=response)]
+
+        stream = await self.ingest_store.finish(stream.stream_id)
+        source = args.get("source", "extension")
+        context = args.get("context", "")
+        processing_mode = args.get("processing_mode", "immediate")
+        summary = f"{stream.size} bytes, {stream.lines} lines, sha256 {stream.sha256}"
+        self.logger.info(f"🚀 ACTIVATING ingest_text for Cursor Agent: {summary}")
+        self.logger.info(f"📍 Source: {source}, Mode: {processing_mode}")
+
+        if PresenceConfig.REQUIRE_EXTENSION and not self.presence_registry.has_live_extension():
+            await self.ingest_store.discard(stream)
+            return [TextContent(type="text", text=self._no_extension_message())]
+
+        # The text stays in its side file: the popup pages through it and the result only refers to it
+        message = f"Text to process from {source}: {stream.size} bytes, {stream.lines} lines in {len(stream.pages)} page(s)\n\n"
+        message += stream.preview + ("…" if stream.size > IngestConfig.PREVIEW_BYTES else "")
+        trigger_data = {
+            "tool": "ingest_text",
+            "source": source,
+            "context": context,
+            "processing_mode": processing_mode,
+            "title": "Text Ingestion - Cursor Enhancer",
+            "message": message,
+            "text_ref": stream.reference(),
+            "trigger_id": new_trigger_id("ingest"),
+            "timestamp": datetime.now().isoformat(),
+            "immediate_activation": True,
+        }
+
+        timeout = TimeoutConfig.INGEST_TEXT
+        try:
+            result = await self._run_tool_popup(trigger_data, timeout)
+        except RuntimeError:
+            self.logger.error("❌ Failed to trigger text ingestion popup")
+            response = f"⚠️ Text ingestion trigger failed.\n\n📝 Text: {stream.path} ({summary})\nManual activation may be needed."
+            return [TextContent(type="text", text=response)]
+
+        if result is None:
+            self.logger.warning("⚠️ Text ingestion timed out")
+            response = f"⏰ Text ingestion timed out.\n\n📝 Text: {stream.path} ({summary})\n📍 Source: {source}\n\n"
+            response += f"No user response received within {timeout} seconds. The text is noted but no additional processing occurred."
+            return [TextContent(type="text", text=response)]
+
+        user_input, _attachments = result
+        self.logger.info("✅ INGEST SUCCESS: User provided feedback for text ingestion")
+        response = "✅ Text ingestion completed!\n\n"
+        response += f"📝 Text: {stream.path} ({summary})\n"
+        response += f"💬 User Response: {user_input}\n"
+        response += f"📍 Source: {source}\n"
+        response += f"💭 Context: {context}\n"
+        response += f"⚙️ Processing Mode: {processing_mode}\n\n"
+        response += "🎯 The text has been processed and user feedback collected successfully."
+        return [TextContent(type="text", text=response)]
+
+    async def _handle_get_user_input(self, args: dict) -> list[TextContent]:
+        """Retrieve user input from indexed response files, waiting on the watcher instead of rescanning"""
+        timeout = args.get("timeout", TimeoutConfig.GET_USER_INPUT)
+
+        self.logger.info(f"🔍 CHECKING for user input (timeout: {timeout}s, indexed: {self.response_index.pending_count()})")
+
+        result = await self.response_index.wait_for_response(timeout)
+        if result:
+            user_input, source_name = result
+            result_message = "✅ User Input Retrieved\n\n"
+            result_message += f"💬 User Response: {user_input}\n"
+            result_message += f"📁 Source File: {source_name}\n"
+            result_message += f"⏰ Retrieved at: {datetime.now().isoformat()}\n\n"
+            result_message += "🎯 User input successfully captured from Cursor Enhancer."
+            return [TextContent(type="text", text=result_message)]
+
+        no_input_message = f"⏰ No user input found within {timeout} seconds\n\n"
+        no_input_message += "💡 User may not have provided input yet, or the popup may not be active.\n\n"
+        no_input_message += "🎯 Try calling this tool again after the user provides input."
+
+        self.logger.warning(f"⏰ No user input found within {timeout} seconds")
+        return [TextContent(type="text", text=no_input_message)]
@@ -0,0 +1,6 @@
+"""Non-stdio MCP transports for Review Gate V2: per-user broker and streamable HTTP."""
+
+from .broker import BrokerServer, socket_server_session
+from .http import HttpTransport
+
+__all__ = ["BrokerServer", "HttpTransport", "socket_server_session"]
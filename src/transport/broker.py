@@ -0,0 +1,141 @@
+import asyncio
+import fcntl
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+
+import anyio
+import mcp.types as types
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+from mcp.server import Server
+from mcp.shared.message import SessionMessage
+
+from ..config.constants import BrokerConfig
+from ..utils.file_operations import get_ipc_base_path
+
+
+@asynccontextmanager
+async def socket_server_session(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """MCP transport over one socket connection, framed like stdio: one JSON-RPC message per line"""
+    read_stream: MemoryObjectReceiveStream[SessionMessage | Exception]
+    read_stream_writer: MemoryObjectSendStream[SessionMessage | Exception]
+    write_stream: MemoryObjectSendStream[SessionMessage]
+    write_stream_reader: MemoryObjectReceiveStream[SessionMessage]
+
+    read_stream_writer, read_stream = anyio.create_memory_object_stream(0)
+    write_stream, write_stream_reader = anyio.create_memory_object_stream(0)
+
+    async def socket_reader():
+        try:
+            async with read_stream_writer:
+                while line := await reader.readline():
+                    try:
+                        message = types.JSONRPCMessage.model_validate_json(line)
+                    except Exception as exc:
+                        await read_stream_writer.send(exc)
+                        continue
+                    await read_stream_writer.send(SessionMessage(message))
+        except (anyio.ClosedResourceError, ConnectionError, ValueError):
+            # ValueError: a line longer than BrokerConfig.MAX_MESSAGE_BYTES; the session ends
+            await anyio.lowlevel.checkpoint()
+
+    async def socket_writer():
+        try:
+            async with write_stream_reader:
+                async for session_message in write_stream_reader:
+                    json = session_message.message.model_dump_json(by_alias=True, exclude_none=True)
+                    writer.write(json.encode() + b"\n")
+                    await writer.drain()
+        except (anyio.ClosedResourceError, ConnectionError):
+            await anyio.lowlevel.checkpoint()
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(socket_reader)
+        tg.start_soon(socket_writer)
+        try:
+            yield read_stream, write_stream
+        finally:
+            tg.cancel_scope.cancel()
+
+
+class BrokerServer:
+    """Per-user MCP broker: serves every window's stdio shim over one Unix socket.
+
+    One broker process owns the IPC watcher, caches and popup scheduler for all
+    windows. A flock on the lock file keeps it single; it exits after IDLE_TIMEOUT
+    seconds without connected shims so it does not linger after Cursor closes.
+    """
+
+    def __init__(self, server: Server, socket_path: str | None = None, idle_timeout: float | None = None):
+        self.server = server
+        self.socket_path = socket_path or get_ipc_base_path(BrokerConfig.SOCKET_NAME)
+        self.lock_path = f"{os.path.splitext(self.socket_path)[0]}.lock"
+        self.idle_timeout = idle_timeout if idle_timeout is not None else BrokerConfig.IDLE_TIMEOUT
+        self.logger = logging.getLogger(__name__)
+        self.active_sessions = 0
+        self.total_sessions = 0
+        self._last_activity = time.monotonic()
+        self._lock_fd = -1
+
+    def _acquire_lock(self) -> bool:
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def _release_lock(self) -> None:
+        if self._lock_fd >= 0:
+            os.close(self._lock_fd)
+            self._lock_fd = -1
+
+    async def serve(self) -> None:
+        """Accept shim connections until idle, or return at once if another broker already runs"""
+        if not self._acquire_lock():
+            self.logger.info(f"🔌 Another broker already serves {self.socket_path} - exiting")
+            return
+
+        try:
+            # We hold the lock, so any existing socket file belongs to a broker that died
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+
+            server = await asyncio.start_unix_server(self._handle_connection, self.socket_path, limit=BrokerConfig.MAX_MESSAGE_BYTES)
+            os.chmod(self.socket_path, 0o600)
+            self.logger.info(f"🔌 Broker listening on {self.socket_path}")
+
+            async with server:
+                while not self._idle_expired():
+                    await asyncio.sleep(min(self.idle_timeout, 5) if self.idle_timeout else 5)
+            self.logger.info(f"💤 Broker idle for {self.idle_timeout}s with no shims connected - exiting")
+        finally:
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+            self._release_lock()
+
+    def _idle_expired(self) -> bool:
+        return bool(self.idle_timeout) and self.active_sessions == 0 and time.monotonic() - self._last_activity >= self.idle_timeout
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.active_sessions += 1
+        self.total_sessions += 1
+        session_number = self.total_sessions
+        self.logger.info(f"🔗 Shim session #{session_number} connected ({self.active_sessions} active)")
+        try:
+            async with socket_server_session(reader, writer) as (read_stream, write_stream):
+                await self.server.run(read_stream, write_stream, self.server.create_initialization_options())
+        except Exception as e:
+            self.logger.error(f"❌ Shim session #{session_number} failed: {e}")
+        finally:
+            self.active_sessions -= 1
+            self._last_activity = time.monotonic()
+            writer.close()
+            self.logger.info(f"🔌 Shim session #{session_number} closed ({self.active_sessions} active)")
@@ -0,0 +1,204 @@
+import hmac
+import logging
+import os
+import secrets
+import socket
+import stat
+
+import uvicorn
+from mcp.server import Server
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from mcp.server.transport_security import TransportSecurityMiddleware, TransportSecuritySettings
+from starlette.requests import Request
+
+from ..config.constants import HttpConfig
+from ..utils.file_operations import create_private_file, get_ipc_base_path
+
+TOKEN_FILE_NAME = "http_token"
+_LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "[::1]")
+
+
+def token_path() -> str:
+    """File holding the bearer token TCP clients must send"""
+    return os.path.expanduser(HttpConfig.TOKEN_FILE) if HttpConfig.TOKEN_FILE else get_ipc_base_path(TOKEN_FILE_NAME)
+
+
+def load_token(path: str | None = None) -> str:
+    """The bearer token in path, created first if there is none; refuses a file other users could read"""
+    path = path or token_path()
+    if not os.path.lexists(path):
+        # Written under a private name and linked into place, so a concurrent reader never sees it half-written
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with create_private_file(tmp) as f:
+            f.write(secrets.token_urlsafe(32).encode())
+        try:
+            os.link(tmp, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(tmp)
+    fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW)
+    with os.fdopen(fd, "rb") as f:
+        st = os.fstat(f.fileno())
+        if not stat.S_ISREG(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+            raise RuntimeError(f"HTTP token file {path} must be a regular file of this user with mode 0600")
+        token = f.read().decode().strip()
+    if not token:
+        raise RuntimeError(f"HTTP token file {path} is empty")
+    return token
+
+
+def _split(setting: str) -> list[str]:
+    return [item.strip() for item in setting.split(",") if item.strip()]
+
+
+async def _send_plain(send, status: int, text: str, headers: list[tuple[bytes, bytes]] | None = None) -> None:
+    body = text.encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"text/plain; charset=utf-8"), (b"content-length", str(len(body)).encode())] + (headers or []),
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class HttpTransport:
+    """Streamable HTTP (SSE) MCP transport so many clients can share one warm server.
+
+    Listens on HOST:PORT or a Unix socket. Each client gets its own MCP session
+    (Mcp-Session-Id); requests beyond MAX_CONCURRENT_REQUESTS in flight are refused
+    with 503 so a burst of clients cannot pile unbounded work onto the server.
+    Requests with a Host or Origin header not in the allowed lists are refused (421/403)
+    against DNS rebinding, and TCP clients need the bearer token from token_path() (401).
+    """
+
+    def __init__(
+        self,
+        server: Server,
+        host: str | None = None,
+        port: int | None = None,
+        unix_socket: str | None = None,
+        token: str | None = None,
+    ):
+        self.host = host or HttpConfig.HOST
+        self.port = port if port is not None else HttpConfig.PORT
+        self.unix_socket = unix_socket if unix_socket is not None else HttpConfig.UNIX_SOCKET
+        self.max_concurrent = HttpConfig.MAX_CONCURRENT_REQUESTS
+        # Unix socket clients are this user's processes; only TCP listeners need a token
+        self.token = None if self.unix_socket or not HttpConfig.REQUIRE_TOKEN else token or load_token()
+        self.security_settings = self._security_settings()
+        self.security = TransportSecurityMiddleware(self.security_settings)
+        self.session_manager = StreamableHTTPSessionManager(
+            app=server, json_response=HttpConfig.JSON_RESPONSE, security_settings=self.security_settings
+        )
+        self.logger = logging.getLogger(__name__)
+        self.in_flight = 0
+        self.total_requests = 0
+        self.rejected_requests = 0
+        self.unauthorized_requests = 0
+
+    def _security_settings(self) -> TransportSecuritySettings:
+        if self.unix_socket:
+            hosts = ["localhost", "localhost:*"]
+        else:
+            names = list(_LOOPBACK_HOSTS) if self.host in ("127.0.0.1", "localhost", "::1") else [self.host]
+            hosts = [f"{name}:{self.port}" for name in names]
+        hosts += _split(HttpConfig.ALLOWED_HOSTS)
+        origins = [f"http://{host}" for host in hosts] + _split(HttpConfig.ALLOWED_ORIGINS)
+        return TransportSecuritySettings(enable_dns_rebinding_protection=True, allowed_hosts=hosts, allowed_origins=origins)
+
+    def _authorized(self, scope) -> bool:
+        if self.token is None:
+            return True
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, credentials = value.decode("latin-1").partition(" ")
+                return scheme.lower() == "bearer" and hmac.compare_digest(credentials.strip().encode(), self.token.encode())
+        return False
+
+    @property
+    def address(self) -> str:
+        return f"unix:{self.unix_socket}" if self.unix_socket else f"http://{self.host}:{self.port}{HttpConfig.PATH}"
+
+    async def app(self, scope, receive, send) -> None:
+        """ASGI entry point"""
+        if scope["type"] != "http":
+            return
+        if scope["path"].rstrip("/") != HttpConfig.PATH:
+            await _send_plain(send, 404, "Not found")
+            return
+        # Checked before the token, so a page reached through DNS rebinding learns nothing
+        refusal = await self.security.validate_request(Request(scope))
+        if refusal is not None:
+            self.unauthorized_requests += 1
+            await refusal(scope, receive, send)
+            return
+        if not self._authorized(scope):
+            self.unauthorized_requests += 1
+            await _send_plain(send, 401, "Missing or wrong bearer token", [(b"www-authenticate", b"Bearer")])
+            return
+        if self.in_flight >= self.max_concurrent:
+            self.rejected_requests += 1
+            await _send_plain(send, 503, "Too many concurrent requests", [(b"retry-after", b"1")])
+            return
+
+        self.in_flight += 1
+        self.total_requests += 1
+        try:
+            await self.session_manager.handle_request(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    def _socket_in_use(self) -> bool:
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.unix_socket)
+            return True
+        except OSError:
+            return False
+        finally:
+            probe.close()
+
+    def _bind_unix_socket(self) -> socket.socket:
+        """Bind the Unix socket ourselves so it is 0600 before the first client can connect"""
+        # Nothing answers on a leftover socket file, so it belongs to a server that was killed
+        try:
+            os.unlink(self.unix_socket)
+        except FileNotFoundError:
+            pass
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            sock.bind(self.unix_socket)
+        finally:
+            os.umask(old_umask)
+        sock.listen(128)
+        return sock
+
+    async def serve(self) -> None:
+        """Serve until cancelled"""
+        sockets = None
+        if self.unix_socket:
+            if self._socket_in_use():
+                self.logger.error(f"❌ Another server already listens on {self.unix_socket} - not starting HTTP transport")
+                return
+            sockets = [self._bind_unix_socket()]
+            config = uvicorn.Config(self.app, interface="asgi3", lifespan="off", log_level="warning")
+        else:
+            config = uvicorn.Config(self.app, host=self.host, port=self.port, interface="asgi3", lifespan="off", log_level="warning")
+        server = uvicorn.Server(config)
+
+        try:
+            async with self.session_manager.run():
+                self.logger.info(f"🌐 Streamable HTTP transport listening on {self.address}")
+                if self.token is not None:
+                    self.logger.info(f"🔑 Clients must send the bearer token in {token_path()}")
+                await server.serve(sockets=sockets)
+        finally:
+            if self.unix_socket:
+                try:
+                    os.unlink(self.unix_socket)
+                except FileNotFoundError:
+                    pass
@@ -1,6 +1,50 @@
 """Utility modules for Review Gate V2."""
 
-from .file_operations import get_temp_path, read_json_file, write_json_file
+from .file_operations import (
+    create_private_file,
+    ensure_private_dir,
+    get_ipc_base_dir,
+    get_ipc_base_path,
+    get_shared_temp_dir,
+    get_shared_temp_path,
+    get_temp_dir,
+    get_temp_path,
+    new_trigger_id,
+    parse_response_content,
+    read_json_file,
+    resolve_ipc_dir,
+    trigger_id_from_name,
+    write_json_file,
+)
+from .io_executor import IoExecutor
+from .ipc_file_cache import IpcFileCache
 from .logging_utils import flush_logger, log_with_flush, setup_logger
+from .loop_lag_monitor import LoopLagMonitor
+from .retry_policy import CircuitBreaker, RetryPolicy
+from .workspace_file_cache import WorkspaceFileCache
 
-__all__ = ["get_temp_path", "write_json_file", "read_json_file", "setup_logger", "flush_logger", "log_with_flush"]
+__all__ = [
+    "get_temp_dir",
+    "get_temp_path",
+    "get_shared_temp_dir",
+    "get_shared_temp_path",
+    "get_ipc_base_dir",
+    "get_ipc_base_path",
+    "ensure_private_dir",
+    "create_private_file",
+    "resolve_ipc_dir",
+    "parse_response_content",
+    "new_trigger_id",
+    "trigger_id_from_name",
+    "write_json_file",
+    "read_json_file",
+    "setup_logger",
+    "flush_logger",
+    "log_with_flush",
+    "RetryPolicy",
+    "CircuitBreaker",
+    "IpcFileCache",
+    "WorkspaceFileCache",
+    "IoExecutor",
+    "LoopLagMonitor",
+]
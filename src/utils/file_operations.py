@@ -1,26 +1,230 @@
+import hashlib
 import json
 import os
+import stat
+import uuid
+from collections.abc import Iterable
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO
+
+from ..config.constants import CodecConfig, IpcConfig
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+_ipc_dir: str | None = None
+
+# Payloads in a format other than JSON start with one header line: b"#cursor-enhancer-ipc <format>/<version>\n"
+WIRE_HEADER_PREFIX = b"#cursor-enhancer-ipc "
+WIRE_FORMAT_VERSION = 1
+
+
+def get_shared_temp_dir() -> str:
+    """Host-wide temp directory for files every server shares with the extension, such as the log"""
+    return "/tmp"
+
+
+def get_shared_temp_path(filename: str) -> str:
+    return os.path.join(get_shared_temp_dir(), filename)
+
+
+def get_ipc_base_dir() -> str:
+    """Private per-user root holding the namespaced IPC directories and the instance registry"""
+    if IpcConfig.BASE_DIR:
+        return os.path.expanduser(IpcConfig.BASE_DIR)
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", "")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "cursor-enhancer")
+    return os.path.join(get_shared_temp_dir(), f"cursor-enhancer-{os.getuid()}")
+
+
+def ensure_private_dir(path: str) -> str:
+    """Create path (mode 0700) if needed and refuse to use it unless it is ours and closed to others"""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise RuntimeError(f"IPC directory {path} is not a directory")
+    if st.st_uid != os.getuid():
+        raise RuntimeError(f"IPC directory {path} is owned by uid {st.st_uid}, not by this user")
+    if st.st_mode & 0o077:
+        os.chmod(path, 0o700)
+    return path
+
+
+def create_private_file(path: str) -> BinaryIO:
+    """Create path for writing, readable by this user only.
+
+    Raises FileExistsError if the name is taken, even by a symlink, so a file or link
+    planted under a predictable name in a shared /tmp is never written through.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600)
+    return os.fdopen(fd, "wb")
+
+
+def get_ipc_base_path(filename: str) -> str:
+    """Path of a per-user file (broker socket, lock) in the private IPC base dir, creating the dir if needed"""
+    return os.path.join(ensure_private_dir(get_ipc_base_dir()), filename)
+
+
+def ipc_namespace() -> str:
+    """Name of this server's IPC directory under the base dir for the configured mode"""
+    if IpcConfig.NAMESPACE:
+        return IpcConfig.NAMESPACE
+    if IpcConfig.MODE == "instance":
+        return f"instance-{os.getpid()}"
+    workspace = os.path.realpath(IpcConfig.WORKSPACE or os.getcwd())
+    return f"ws-{hashlib.sha1(workspace.encode()).hexdigest()[:12]}"
+
+
+def resolve_ipc_dir() -> str:
+    """IPC directory for the configured mode: shared /tmp, or a private per-instance or per-workspace directory"""
+    if IpcConfig.MODE not in ("instance", "workspace"):
+        return get_shared_temp_dir()
+    base = ensure_private_dir(get_ipc_base_dir())
+    return ensure_private_dir(os.path.join(base, ipc_namespace()))
+
+
+def get_temp_dir() -> str:
+    """Get the directory used for IPC files, resolved from IpcConfig on first use"""
+    global _ipc_dir
+    if _ipc_dir is None:
+        _ipc_dir = resolve_ipc_dir()
+    return _ipc_dir
 
 
 def get_temp_path(filename: str) -> str:
-    """Get temporary file path for Linux systems"""
-    return os.path.join("/tmp", filename)
+    """Get the path of an IPC file in this server's IPC directory"""
+    return os.path.join(get_temp_dir(), filename)
+
+
+class IncompletePayloadError(ValueError):
+    """A headed payload ended early: its writer has not finished yet"""
+
+
+def available_wire_formats() -> list[str]:
+    """Wire formats this process can read and write, preferred first"""
+    return (["msgpack"] if msgpack is not None else []) + ["json"]
+
+
+def negotiate_wire_format(peer_formats: Iterable[list[str] | None]) -> str:
+    """Best format every peer reads; peers that advertise nothing only read JSON, and so does an unknown audience"""
+    candidates = available_wire_formats() if CodecConfig.ALLOW_MSGPACK else ["json"]
+    peers = 0
+    for formats in peer_formats:
+        peers += 1
+        candidates = [name for name in candidates if name in (formats or ["json"])]
+    return candidates[0] if candidates and peers else "json"
+
+
+def _json_dumps(data: Any) -> bytes:
+    if orjson is not None and CodecConfig.USE_ORJSON:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _json_loads(raw: bytes | str) -> Any:
+    if orjson is not None and CodecConfig.USE_ORJSON:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def encode_payload(data: Any, wire_format: str = "json") -> bytes:
+    """Serialize an IPC payload; JSON stays header-less so every extension version can read it"""
+    if wire_format == "msgpack" and msgpack is not None:
+        return WIRE_HEADER_PREFIX + f"msgpack/{WIRE_FORMAT_VERSION}\n".encode() + msgpack.packb(data, use_bin_type=True)
+    return _json_dumps(data)
+
+
+def decode_payload(raw: bytes | str) -> Any:
+    """Deserialize an IPC payload in any supported wire format.
+
+    Raises json.JSONDecodeError for malformed JSON, IncompletePayloadError for a headed payload
+    cut short and ValueError for any other unreadable payload.
+    """
+    if isinstance(raw, str) or not raw.startswith(WIRE_HEADER_PREFIX):
+        if isinstance(raw, bytes) and raw and WIRE_HEADER_PREFIX.startswith(raw):
+            raise IncompletePayloadError("payload header not finished")
+        return _json_loads(raw)
+
+    header, newline, body = raw.partition(b"\n")
+    if not newline:
+        raise IncompletePayloadError("payload header not finished")
+    wire_format, _, version = header[len(WIRE_HEADER_PREFIX) :].decode(errors="replace").partition("/")
+    if not version.isdigit() or int(version) > WIRE_FORMAT_VERSION:
+        raise ValueError(f"unsupported payload version {header!r}")
+    if wire_format == "json":
+        return _json_loads(body)
+    if wire_format == "msgpack" and msgpack is not None:
+        try:
+            return msgpack.unpackb(body, raw=False)
+        except msgpack.OutOfData as e:
+            raise IncompletePayloadError(str(e)) from e
+        except (ValueError, msgpack.UnpackException) as e:
+            if "incomplete" in str(e).lower():
+                raise IncompletePayloadError(str(e)) from e
+            raise ValueError(f"malformed msgpack payload: {e}") from e
+    raise ValueError(f"unsupported payload format {wire_format!r}")
 
 
 def write_json_file(file_path: str, data: dict[str, Any]) -> bool:
     """Write JSON data to file with error handling"""
     try:
-        Path(file_path).write_text(json.dumps(data, indent=2))
+        Path(file_path).write_bytes(encode_payload(data))
         return True
     except Exception:
         return False
 
 
 def read_json_file(file_path: str) -> dict[str, Any] | None:
-    """Read JSON data from file with error handling"""
+    """Read an IPC payload in any wire format from file with error handling"""
     try:
-        return json.loads(Path(file_path).read_text())
+        return decode_payload(Path(file_path).read_bytes())
     except Exception:
         return None
+
+
+def parse_response_content(file_content: str | bytes) -> tuple[str, list[dict[str, Any]], str]:
+    """Parse a response file written by the extension into (user_input, attachments, trigger_id)
+
+    Raises json.JSONDecodeError (or another ValueError) for malformed payloads, including JSON of the
+    wrong shape; plain text payloads are returned as-is.
+    """
+    if isinstance(file_content, bytes) and not file_content.startswith(WIRE_HEADER_PREFIX):
+        file_content = file_content.decode(errors="replace")
+    if isinstance(file_content, str):
+        file_content = file_content.strip()
+        if not file_content.startswith("{"):
+            return file_content, [], ""
+
+    data = decode_payload(file_content)
+    if not isinstance(data, dict):
+        raise ValueError(f"response payload is a {type(data).__name__}, not an object")
+    user_input = data.get("user_input", data.get("response", data.get("message", "")))
+    attachments = data.get("attachments", [])
+    trigger_id = data.get("trigger_id", "")
+    if not isinstance(user_input, str) or not isinstance(trigger_id, str):
+        raise ValueError("response user_input and trigger_id must be strings")
+    if not isinstance(attachments, list) or not all(isinstance(attachment, dict) for attachment in attachments):
+        raise ValueError("response attachments must be a list of objects")
+    return user_input.strip(), attachments, trigger_id
+
+
+def new_trigger_id(kind: str) -> str:
+    """A trigger id no other request of any process will use, e.g. review_<32 hex digits>"""
+    return f"{kind}_{uuid.uuid4().hex}"
+
+
+def trigger_id_from_name(name: str, prefixes: tuple[str, ...]) -> str:
+    """Extract the trigger id embedded in an IPC file name (<prefix>_<trigger_id>.json), or '' for generic files"""
+    stem = name.removesuffix(".json")
+    for prefix in prefixes:
+        if stem.startswith(f"{prefix}_"):
+            return stem[len(prefix) + 1 :]
+    return ""
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from ..config.constants import IoConfig
+
+T = TypeVar("T")
+
+# Lanes: thread pools of their own, so a long job in one never holds up the calls of another
+IPC = "ipc"  # reading, writing and removing IPC files on the path of a tool call
+JOURNAL = "journal"  # review journal appends, compactions and recovery, one at a time
+BACKGROUND = "background"  # workspace index builds, file_review reads and other long jobs
+
+
+class _OperationStats:
+    __slots__ = ("lane", "calls", "errors", "total_seconds", "max_seconds", "queued_seconds")
+
+    def __init__(self, lane: str):
+        self.lane = lane
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.queued_seconds = 0.0  # time spent waiting for a worker thread
+
+
+class _Lane:
+    __slots__ = ("workers", "pool", "admitted", "in_flight", "peak_in_flight", "blocked")
+
+    def __init__(self, name: str, workers: int):
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"cursor-enhancer-{name}")
+        self.admitted = asyncio.Semaphore(workers + IoConfig.MAX_PENDING)
+        self.in_flight = 0  # calls handed to the pool and not finished
+        self.peak_in_flight = 0
+        self.blocked = 0  # callers waiting for the pool to admit them
+
+
+class IoExecutor:
+    """Run blocking filesystem calls on bounded thread pools so they never stall the event loop.
+
+    Each lane (IPC, JOURNAL, BACKGROUND) has its own threads: at most its worker count of
+    calls run at once and at most MAX_PENDING more wait for a thread; callers beyond that
+    wait on the event loop. Each call is timed under an operation name ("read_response",
+    "write_trigger", "sync", ...) for get_stats().
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lanes = {
+            IPC: _Lane(IPC, IoConfig.MAX_WORKERS),
+            JOURNAL: _Lane(JOURNAL, 1),
+            BACKGROUND: _Lane(BACKGROUND, IoConfig.BACKGROUND_WORKERS),
+        }
+        self._operations: dict[str, _OperationStats] = {}
+
+    async def run(self, operation: str, func: Callable[..., T], *args: Any, lane: str = IPC) -> T:
+        """Call func(*args) on a worker thread of lane and return its result, re-raising its exception"""
+        pool = self._lanes[lane]
+        stats = self._operations.get(operation)
+        if stats is None:
+            stats = self._operations[operation] = _OperationStats(lane)
+
+        pool.blocked += 1
+        try:
+            await pool.admitted.acquire()
+        finally:
+            pool.blocked -= 1
+
+        submitted = time.perf_counter()
+        started = submitted
+
+        def timed() -> T:
+            nonlocal started
+            started = time.perf_counter()
+            return func(*args)
+
+        pool.in_flight += 1
+        pool.peak_in_flight = max(pool.peak_in_flight, pool.in_flight)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool.pool, timed)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            pool.in_flight -= 1
+            pool.admitted.release()
+            finished = time.perf_counter()
+            stats.calls += 1
+            stats.queued_seconds += started - submitted
+            stats.total_seconds += finished - started
+            stats.max_seconds = max(stats.max_seconds, finished - started)
+            if finished - started > IoConfig.SLOW_OPERATION and lane != BACKGROUND:
+                self.logger.warning(f"🐢 Slow {operation} took {finished - started:.2f}s on an I/O thread")
+
+    def shutdown(self) -> None:
+        """Stop accepting work; calls already running finish on their threads"""
+        for pool in self._lanes.values():
+            pool.pool.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "lanes": {
+                name: {
+                    "workers": pool.workers,
+                    "in_flight": pool.in_flight,
+                    "queue_depth": max(pool.in_flight - pool.workers, 0),
+                    "peak_queue_depth": max(pool.peak_in_flight - pool.workers, 0),
+                    "blocked": pool.blocked,
+                }
+                for name, pool in self._lanes.items()
+            },
+            "operations": {
+                name: {
+                    "lane": stats.lane,
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "mean_ms": stats.total_seconds * 1000 / stats.calls if stats.calls else 0.0,
+                    "max_ms": stats.max_seconds * 1000,
+                    "mean_queued_ms": stats.queued_seconds * 1000 / stats.calls if stats.calls else 0.0,
+                }
+                for name, stats in self._operations.items()
+            },
+        }
@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from ..config.constants import ParseCacheConfig
+from .file_operations import IncompletePayloadError, decode_payload, parse_response_content
+
+# Markers cached in place of a parsed value
+_INCOMPLETE = object()
+_MALFORMED = object()
+
+
+def _looks_truncated(error: json.JSONDecodeError) -> bool:
+    """Whether a decode error means the writer has not finished, rather than that the file is corrupt"""
+    return error.pos >= len(error.doc.rstrip()) or error.msg.startswith("Unterminated string")
+
+
+class IpcFileCache:
+    """Parse each version of an IPC file at most once.
+
+    Results are keyed by path and (inode, mtime_ns, size), so re-reading an unchanged
+    file costs one fstat. Files caught mid-write are remembered as incomplete and
+    parsed again only once they change; malformed files are logged once per version.
+    Safe to call from I/O threads; files are read and parsed outside the lock.
+    """
+
+    def __init__(self, max_entries: int | None = None, max_bytes: int | None = None):
+        self.logger = logging.getLogger(__name__)
+        self.max_entries = max_entries or ParseCacheConfig.MAX_ENTRIES
+        self.max_bytes = max_bytes or ParseCacheConfig.MAX_BYTES
+        self._entries: OrderedDict[str, tuple[tuple[int, int, int], Any]] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.incomplete = 0
+        self.malformed = 0
+
+    def read_json(self, path: str) -> Any | None:
+        """Parsed payload of path in any wire format, or None if missing, incomplete or malformed"""
+        return self.load(path, decode_payload)
+
+    def read_response(self, path: str) -> tuple[str, list[dict[str, Any]], str] | None:
+        """(user_input, attachments, trigger_id) of a response file, or None if missing, incomplete or malformed"""
+        return self.load(path, parse_response_content)
+
+    def load(self, path: str, parser: Callable[[bytes], Any]) -> Any | None:
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            self.forget(path)
+            return None
+
+        with f:
+            st = os.fstat(f.fileno())
+            key = (st.st_ino, st.st_mtime_ns, st.st_size)
+            with self._lock:
+                cached = self._entries.get(path)
+                if cached is not None and cached[0] == key:
+                    self.hits += 1
+                    self._entries.move_to_end(path)
+                    value = cached[1]
+                    return None if value is _INCOMPLETE or value is _MALFORMED else value
+                self.misses += 1
+            raw = f.read()
+
+        if not raw.strip() or len(raw) != st.st_size:
+            value = _INCOMPLETE
+        else:
+            try:
+                value = parser(raw)
+            except IncompletePayloadError:
+                value = _INCOMPLETE
+            except ValueError as e:
+                if isinstance(e, json.JSONDecodeError) and _looks_truncated(e):
+                    value = _INCOMPLETE
+                else:
+                    self.malformed += 1
+                    self.logger.error(f"❌ Malformed IPC file {path}: {e}")
+                    value = _MALFORMED
+
+        if value is _INCOMPLETE:
+            # Still being written: the next write changes the key and gets parsed then
+            self.incomplete += 1
+            self.logger.debug(f"⏳ IPC file {path} is incomplete, will retry when it changes")
+
+        self._store(path, key, value)
+        return None if value is _INCOMPLETE or value is _MALFORMED else value
+
+    def _store(self, path: str, key: tuple[int, int, int], value: Any) -> None:
+        with self._lock:
+            self._forget(path)
+            self._entries[path] = (key, value)
+            self._sizes[path] = key[2]
+            self._total_bytes += key[2]
+            while self._entries and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                if oldest == path:
+                    break
+                self._forget(oldest)
+
+    def forget(self, path: str) -> None:
+        """Drop the cached result for path, e.g. after consuming or deleting the file"""
+        with self._lock:
+            self._forget(path)
+
+    def _forget(self, path: str) -> None:
+        if self._entries.pop(path, None) is not None:
+            self._total_bytes -= self._sizes.pop(path, 0)
+
+    def get_stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "incomplete": self.incomplete,
+            "malformed": self.malformed,
+        }
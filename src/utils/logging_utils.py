@@ -1,13 +1,13 @@
 import logging
 import sys
 
-from .file_operations import get_temp_path
+from .file_operations import get_shared_temp_path
 
 
 def setup_logger(name: str = __name__, log_file: str | None = None) -> logging.Logger:
     """Setup logger with file and stderr handlers"""
     if log_file is None:
-        log_file = get_temp_path("cursor_enhancer.log")
+        log_file = get_shared_temp_path("cursor_enhancer.log")
 
     # Create logging handlers
     handlers = []
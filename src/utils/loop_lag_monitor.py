@@ -0,0 +1,45 @@
+import asyncio
+import logging
+from collections import deque
+
+from ..config.constants import IoConfig
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes a sleeping task.
+
+    The lag is the time every other coroutine also had to wait, for instance while a blocking
+    call ran on the loop thread. Sampled every LAG_INTERVAL seconds; lags over LAG_WARN are
+    logged as stalls.
+    """
+
+    def __init__(self, interval: float | None = None):
+        self.logger = logging.getLogger(__name__)
+        self.interval = interval or IoConfig.LAG_INTERVAL
+        self._samples: deque[float] = deque(maxlen=IoConfig.LAG_SAMPLES)
+        self.max_lag = 0.0
+        self.stalls = 0
+
+    async def run(self) -> None:
+        """Sample until cancelled"""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - start - self.interval, 0.0)
+            self._samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if lag > IoConfig.LAG_WARN:
+                self.stalls += 1
+                self.logger.warning(f"🐢 Event loop stalled for {lag * 1000:.0f}ms")
+
+    def get_stats(self) -> dict[str, float | int]:
+        ordered = sorted(self._samples)
+        return {
+            "samples": len(ordered),
+            "last_ms": self._samples[-1] * 1000 if ordered else 0.0,
+            "mean_ms": sum(ordered) * 1000 / len(ordered) if ordered else 0.0,
+            "p99_ms": ordered[int(len(ordered) * 0.99)] * 1000 if ordered else 0.0,
+            "max_ms": self.max_lag * 1000,
+            "stalls": self.stalls,
+        }
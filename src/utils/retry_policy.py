@@ -0,0 +1,69 @@
+import time
+
+
+class RetryPolicy:
+    """Bounded attempts with a per-attempt timeout that grows geometrically"""
+
+    __slots__ = ("max_attempts", "base_timeout", "backoff_factor")
+
+    def __init__(self, max_attempts: int, base_timeout: float, backoff_factor: float = 2.0):
+        self.max_attempts = max_attempts
+        self.base_timeout = base_timeout
+        self.backoff_factor = backoff_factor
+
+    def attempt_timeout(self, attempt: int) -> float:
+        """Timeout for the given 1-based attempt"""
+        return self.base_timeout * self.backoff_factor ** (attempt - 1)
+
+    def should_retry(self, attempt: int) -> bool:
+        """Whether another attempt may follow the given 1-based attempt"""
+        return attempt < self.max_attempts
+
+
+class CircuitBreaker:
+    """Stop retrying an operation that keeps failing, then probe it again after a cooldown.
+
+    closed: retries allowed. open: after failure_threshold consecutive failures, retries are
+    refused until cooldown seconds pass. half-open: one trial is allowed; its success closes
+    the breaker and its failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_count = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """Whether a retry may be attempted now"""
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opened_count += 1
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._trial_in_flight = False
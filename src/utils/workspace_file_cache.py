@@ -0,0 +1,177 @@
+import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+
+from ..config.constants import FileReviewConfig
+
+# Bytes scanned per step when counting lines in a mapped file
+_CHUNK = 1024 * 1024
+
+
+class FileExcerpt:
+    """Digest of one file and the text of the requested line range, as file_review reports it"""
+
+    __slots__ = ("path", "size", "sha256", "lines", "binary", "start_line", "end_line", "text", "truncated")
+
+    def __init__(self, path: str, size: int, sha256: str, lines: int, binary: bool):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.lines = lines
+        self.binary = binary
+        self.start_line = 1
+        self.end_line = lines
+        self.text: str | None = None  # None when no contents were asked for, or the file is binary
+        self.truncated = False
+
+
+class _CachedFile:
+    __slots__ = ("sha256", "lines", "binary", "data")
+
+    def __init__(self, sha256: str, lines: int, binary: bool, data: bytes | None):
+        self.sha256 = sha256
+        self.lines = lines
+        self.binary = binary
+        self.data = data  # whole file when it is text and fits MAX_FILE_BYTES
+
+
+def _count_lines(data: mmap.mmap | bytes) -> int:
+    newlines = sum(data[offset : offset + _CHUNK].count(b"\n") for offset in range(0, len(data), _CHUNK))
+    return newlines + (1 if data and data[-1:] != b"\n" else 0)
+
+
+def _line_offset(data: mmap.mmap | bytes, line: int) -> int:
+    """Byte offset where 1-based line starts, len(data) past the end"""
+    remaining = line - 1
+    offset = 0
+    while remaining > 0 and offset < len(data):
+        chunk = data[offset : offset + _CHUNK]
+        count = chunk.count(b"\n")
+        if count < remaining:
+            remaining -= count
+            offset += len(chunk)
+            continue
+        position = -1
+        for _ in range(remaining):
+            position = chunk.index(b"\n", position + 1)
+        return offset + position + 1
+    return min(offset, len(data))
+
+
+def _cut(raw: bytes, max_bytes: int) -> tuple[bytes, bool]:
+    """raw limited to max_bytes, ending at a line break when one falls inside the limit"""
+    if len(raw) <= max_bytes:
+        return raw, False
+    cut = raw[:max_bytes]
+    newline = cut.rfind(b"\n")
+    return (cut[: newline + 1] if newline >= 0 else cut), True
+
+
+class WorkspaceFileCache:
+    """Digest and excerpt workspace files for file_review, each version read from disk at most once.
+
+    Files are memory-mapped, so hashing and line counting need no copy of the whole file and
+    a line range of a large file only copies that range. Results are keyed by path and
+    (inode, mtime_ns, size), and text files up to MAX_FILE_BYTES are kept whole within
+    CACHE_BYTES in total, so a repeated review of unchanged files costs one fstat each.
+    Safe to call from worker threads.
+    """
+
+    def __init__(self):
+        self._entries: OrderedDict[str, tuple[tuple[int, int, int], _CachedFile]] = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_read = 0
+
+    def excerpt(self, path: str, start_line: int = 1, end_line: int | None = None, max_bytes: int | None = None) -> FileExcerpt:
+        """Digest of path plus, unless max_bytes is None, the text of lines start_line..end_line within max_bytes.
+
+        Raises OSError if the file cannot be read.
+        """
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            key = (st.st_ino, st.st_mtime_ns, st.st_size)
+            with self._lock:
+                cached = self._entries.get(path)
+                entry = cached[1] if cached is not None and cached[0] == key else None
+                if entry is not None:
+                    self.hits += 1
+                    self._entries.move_to_end(path)
+
+            if entry is not None and (entry.data is not None or entry.binary or max_bytes is None):
+                return self._result(path, st.st_size, entry, entry.data, start_line, end_line, max_bytes)
+
+            data: mmap.mmap | bytes = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if st.st_size else b""
+            try:
+                if entry is None:
+                    entry = self._digest(data)
+                    self.misses += 1
+                    self.bytes_read += st.st_size
+                    self._store(path, key, entry)
+                return self._result(path, st.st_size, entry, data, start_line, end_line, max_bytes)
+            finally:
+                if isinstance(data, mmap.mmap):
+                    data.close()
+
+    @staticmethod
+    def _digest(data: mmap.mmap | bytes) -> _CachedFile:
+        binary = b"\0" in data[: FileReviewConfig.BINARY_SNIFF_BYTES]
+        kept = data[:] if not binary and len(data) <= FileReviewConfig.MAX_FILE_BYTES else None
+        return _CachedFile(hashlib.sha256(data).hexdigest(), _count_lines(data), binary, kept)
+
+    @staticmethod
+    def _result(
+        path: str,
+        size: int,
+        entry: _CachedFile,
+        data: mmap.mmap | bytes | None,
+        start_line: int,
+        end_line: int | None,
+        max_bytes: int | None,
+    ) -> FileExcerpt:
+        result = FileExcerpt(path, size, entry.sha256, entry.lines, entry.binary)
+        if max_bytes is None or data is None or entry.binary:
+            return result
+
+        start_line = max(start_line, 1)
+        end_line = min(end_line or entry.lines, entry.lines)
+        # Only the requested range is copied out of a mapping
+        start = _line_offset(data, start_line)
+        raw = data[start : _line_offset(data, end_line + 1)] if end_line >= start_line else b""
+
+        raw, result.truncated = _cut(raw, max_bytes)
+        result.text = raw.decode("utf-8", errors="replace")
+        result.start_line = start_line
+        result.end_line = start_line + raw.count(b"\n") - (1 if raw.endswith(b"\n") else 0) if raw else start_line - 1
+        return result
+
+    def _store(self, path: str, key: tuple[int, int, int], entry: _CachedFile) -> None:
+        with self._lock:
+            self._forget(path)
+            self._entries[path] = (key, entry)
+            self._cached_bytes += len(entry.data or b"")
+            while len(self._entries) > FileReviewConfig.CACHE_ENTRIES or self._cached_bytes > FileReviewConfig.CACHE_BYTES:
+                oldest = next(iter(self._entries))
+                if oldest == path:
+                    break
+                self._forget(oldest)
+
+    def _forget(self, path: str) -> None:
+        cached = self._entries.pop(path, None)
+        if cached is not None:
+            self._cached_bytes -= len(cached[1].data or b"")
+
+    def get_stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "cached_bytes": self._cached_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bytes_read": self.bytes_read,
+        }
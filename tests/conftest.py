@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config.runtime_config import SECTIONS  # noqa: E402
+from src.utils import file_operations  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def restore_config():
+    """Put back every constant a test (or a RuntimeConfig it loads) changed"""
+    saved = {cls: {key: value for key, value in vars(cls).items() if key.isupper()} for cls in SECTIONS.values()}
+    yield
+    for cls, values in saved.items():
+        for key, value in values.items():
+            setattr(cls, key, value)
+
+
+@pytest.fixture
+def ipc_dir(tmp_path, monkeypatch):
+    """A fresh IPC directory for the test"""
+    monkeypatch.setattr(file_operations, "_ipc_dir", str(tmp_path))
+    return str(tmp_path)
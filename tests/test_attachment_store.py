@@ -0,0 +1,88 @@
+import asyncio
+import base64
+import inspect
+import time
+
+import pytest
+
+from src.config.constants import AttachmentConfig
+from src.managers.attachment_store import URI_PREFIX, AttachmentStore
+from src.services.tool_executor import ToolExecutor
+from src.utils.io_executor import IoExecutor
+
+
+def attachment(data: bytes, name: str = "shot.png") -> dict:
+    return {"fileName": name, "mimeType": "image/png", "base64Data": base64.b64encode(data).decode()}
+
+
+def put_all(store: AttachmentStore, *attachments: dict) -> list:
+    async def main():
+        return [await store.put(item) for item in attachments]
+
+    return asyncio.run(main())
+
+
+def test_identical_attachments_are_kept_once():
+    store = AttachmentStore(IoExecutor())
+    first, second = put_all(store, attachment(b"image", "a.png"), attachment(b"image", "b.png"))
+
+    assert first is second
+    assert first.uri.startswith(URI_PREFIX)
+    assert store.get(first.uri).data == b"image"
+    assert store.get_stats() == {"entries": 1, "bytes": 5, "stored": 1, "reads": 1, "evicted": 0, "rejected": 0}
+
+
+def test_oldest_attachments_are_evicted_past_the_byte_limit():
+    AttachmentConfig.MAX_BYTES = 10
+    store = AttachmentStore(IoExecutor())
+    first, second, third = put_all(store, attachment(b"1234"), attachment(b"5678"), attachment(b"abcd"))
+
+    assert store.get(first.uri) is None
+    assert [entry.uri for entry in store.entries()] == [second.uri, third.uri]
+    assert store.evicted == 1
+
+
+def test_expired_attachments_are_dropped():
+    store = AttachmentStore(IoExecutor())
+    (entry,) = put_all(store, attachment(b"image"))
+    entry.expires_at = time.monotonic() - 1
+
+    assert store.get(entry.uri) is None
+    assert store.entries() == []
+
+
+@pytest.mark.parametrize("data", [b"x" * 11, b"x" * 1000])
+def test_attachment_over_the_byte_limit_is_refused_not_stored(data):
+    AttachmentConfig.MAX_BYTES = 10
+    store = AttachmentStore(IoExecutor())
+    (kept,) = put_all(store, attachment(b"small"))
+
+    with pytest.raises(ValueError, match="over the 10-byte limit"):
+        put_all(store, attachment(data))
+    # Nothing already kept was pushed out to make room for it
+    assert store.entries() == [kept]
+    assert store.rejected == 1
+
+
+def test_invalid_base64_is_refused():
+    store = AttachmentStore(IoExecutor())
+    with pytest.raises(ValueError, match="base64"):
+        put_all(store, {"fileName": "x.png", "base64Data": "not base64!"})
+    with pytest.raises(ValueError, match="base64"):
+        put_all(store, {"fileName": "x.png"})
+
+
+def test_answer_links_stored_images_and_reports_refused_ones():
+    AttachmentConfig.DELIVERY = "resource"
+    AttachmentConfig.MAX_BYTES = 10
+    store = AttachmentStore(IoExecutor())
+    components = dict.fromkeys(inspect.signature(ToolExecutor).parameters)
+    executor = ToolExecutor(**{**components, "attachment_store": store})
+
+    content = asyncio.run(executor._answer_content("looks good", [attachment(b"small"), attachment(b"x" * 100, "big.png")]))
+
+    assert content[0].text == "User Response: looks good"
+    link = content[1]
+    assert str(link.uri) == store.entries()[0].uri
+    assert (link.name, link.size) == ("shot.png", 5)
+    assert content[2].text.startswith("📸 Image big.png could not be attached: attachment of 100 bytes")
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import os
+import stat
+
+from mcp.server import Server
+
+import cursor_enhancer_shim
+from src.transport.broker import BrokerServer
+
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {"protocolVersion": "2025-06-18", "capabilities": {}, "clientInfo": {"name": "test", "version": "0"}},
+}
+
+
+async def wait_for_socket(path: str) -> None:
+    for _ in range(200):
+        if os.path.exists(path):
+            return
+        await asyncio.sleep(0.01)
+    raise TimeoutError(path)
+
+
+async def initialize(socket_path: str) -> dict:
+    """Speak to the broker as a shim forwarding a client's stdio would"""
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    writer.write(json.dumps(INITIALIZE).encode() + b"\n")
+    await writer.drain()
+    response = json.loads(await asyncio.wait_for(reader.readline(), 5))
+    writer.close()
+    await writer.wait_closed()
+    return response
+
+
+def test_shims_of_several_windows_share_one_broker(tmp_path):
+    socket_path = str(tmp_path / "b.sock")
+
+    async def main():
+        broker = BrokerServer(Server("test"), socket_path, idle_timeout=0)
+        serving = asyncio.create_task(broker.serve())
+        await wait_for_socket(socket_path)
+        mode = stat.S_IMODE(os.stat(socket_path).st_mode)
+        responses = await asyncio.gather(initialize(socket_path), initialize(socket_path))
+        # A second broker finds the lock held and leaves the socket to the first
+        await asyncio.wait_for(BrokerServer(Server("other"), socket_path).serve(), 1)
+        answered_after = await initialize(socket_path)
+        serving.cancel()
+        await asyncio.gather(serving, return_exceptions=True)
+        return broker, mode, responses + [answered_after]
+
+    broker, mode, responses = asyncio.run(main())
+    assert mode == 0o600
+    assert [response["result"]["serverInfo"]["name"] for response in responses] == ["test"] * 3
+    assert broker.total_sessions == 3
+    assert not os.path.exists(socket_path)
+
+
+def test_idle_broker_exits_and_frees_the_socket(tmp_path):
+    socket_path = str(tmp_path / "b.sock")
+
+    async def main():
+        broker = BrokerServer(Server("test"), socket_path, idle_timeout=0.05)
+        serving = asyncio.create_task(broker.serve())
+        await wait_for_socket(socket_path)
+        await initialize(socket_path)
+        await asyncio.wait_for(serving, 2)
+        return broker
+
+    broker = asyncio.run(main())
+    assert broker.active_sessions == 0
+    assert not os.path.exists(socket_path)
+    assert broker._acquire_lock()  # released for the next broker
+    broker._release_lock()
+
+
+def test_stale_socket_of_a_dead_broker_is_replaced(tmp_path):
+    socket_path = str(tmp_path / "b.sock")
+    open(socket_path, "w").close()
+
+    async def main():
+        serving = asyncio.create_task(BrokerServer(Server("test"), socket_path, idle_timeout=0).serve())
+        # Refused until the broker has replaced the leftover file with its own socket
+        (await asyncio.to_thread(cursor_enhancer_shim.connect, socket_path, 2)).close()
+        response = await initialize(socket_path)
+        serving.cancel()
+        await asyncio.gather(serving, return_exceptions=True)
+        return response
+
+    assert asyncio.run(main())["id"] == 1
+
+
+def test_shim_connect_gives_up_without_a_broker(tmp_path):
+    assert cursor_enhancer_shim.connect(str(tmp_path / "missing.sock"), 0) is None
+
+
+def test_shim_connect_reaches_a_listening_broker(tmp_path):
+    socket_path = str(tmp_path / "b.sock")
+
+    async def main():
+        serving = asyncio.create_task(BrokerServer(Server("test"), socket_path, idle_timeout=0).serve())
+        await wait_for_socket(socket_path)
+        sock = await asyncio.to_thread(cursor_enhancer_shim.connect, socket_path, 1)
+        sock.close()
+        serving.cancel()
+        await asyncio.gather(serving, return_exceptions=True)
+        return sock
+
+    assert asyncio.run(main()) is not None
@@ -0,0 +1,189 @@
+import asyncio
+import hashlib
+import random
+
+import pytest
+
+from src.config.constants import TriggerConfig
+from src.managers.context_tracker import DELTA_FEATURE, ContextTracker, make_context_delta
+from src.utils.io_executor import IoExecutor
+
+
+def apply_context_delta(base: str, ops: list) -> str | None:
+    """Mirror of applyContextDelta in the extension's file-watcher.js"""
+    lines = base.split("\n")
+    result = []
+    position = 0
+    for start, end, replacement in ops:
+        if start < position or end < start or end > len(lines):
+            return None
+        result.extend(lines[position:start])
+        result.extend(replacement)
+        position = end
+    result.extend(lines[position:])
+    return "\n".join(result)
+
+
+@pytest.mark.parametrize(
+    "base, context",
+    [
+        ("a\nb\nc", "a\nb\nc"),
+        ("a\nb\nc", "a\nB\nc"),
+        ("a\nb\nc", "x\na\nb\nc\ny"),
+        ("a\nb\nc", "a\nc"),
+        ("a\nb\nc", ""),
+        ("", "a\nb"),
+        ("a\nb\n", "a\nb"),
+        ("a\r\nb", "a\r\nb\r\nc"),
+        ("line\n" * 3, "line\n" * 5),
+        ("ünïcode\n🙂", "ünïcode\n🙃\nmore"),
+    ],
+)
+def test_delta_round_trip(base, context):
+    assert apply_context_delta(base, make_context_delta(base, context)) == context
+
+
+def test_delta_round_trip_of_random_edits():
+    rng = random.Random(7)
+    lines = [f"line {i} {'x' * rng.randint(0, 40)}" for i in range(500)]
+    base = "\n".join(lines)
+    for _ in range(50):
+        position = rng.randrange(len(lines))
+        action = rng.choice(("edit", "insert", "delete"))
+        if action == "edit":
+            lines[position] = f"edited {lines[position]}"
+        elif action == "insert":
+            lines.insert(position, "inserted")
+        else:
+            del lines[position]
+    context = "\n".join(lines)
+
+    ops = make_context_delta(base, context)
+
+    assert apply_context_delta(base, ops) == context
+    assert len(ops) <= 50
+
+
+def test_unchanged_context_needs_no_edits():
+    assert make_context_delta("a\nb", "a\nb") == []
+
+
+class FakePresence:
+    def __init__(self, features):
+        self.features = features
+
+    def live_extensions(self):
+        return [{"features": self.features}]
+
+
+def sha256(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+@pytest.fixture
+def small_contexts():
+    TriggerConfig.CONTEXT_DELTAS = True
+    TriggerConfig.CONTEXT_DELTA_MIN_BYTES = 0
+
+
+def test_tracker_sends_a_delta_against_the_confirmed_context(small_contexts):
+    first = "\n".join(f"line {i}" for i in range(200))
+    second = first.replace("line 100", "line one hundred")
+
+    async def main():
+        tracker = ContextTracker(FakePresence([DELTA_FEATURE]), IoExecutor())
+        round_one = {"context": first}
+        await tracker.prepare(round_one, "session")
+        tracker.confirm("session", sha256(first))
+        round_two = {"context": second}
+        await tracker.prepare(round_two, "session")
+        return tracker, round_one, round_two
+
+    tracker, round_one, round_two = asyncio.run(main())
+
+    assert round_one["context"] == first
+    delta = round_two["context_delta"]
+    assert "context" not in round_two
+    assert (delta["base"], delta["sha256"]) == (sha256(first), sha256(second))
+    assert apply_context_delta(first, delta["ops"]) == second
+    assert tracker.get_stats()["deltas"] == 1
+
+
+def test_tracker_sends_whole_contexts_to_extensions_without_delta_support(small_contexts):
+    async def main():
+        tracker = ContextTracker(FakePresence([]), IoExecutor())
+        await tracker.prepare({"context": "a\nb"}, "session")
+        tracker.confirm("session", sha256("a\nb"))
+        trigger = {"context": "a\nc"}
+        await tracker.prepare(trigger, "session")
+        return trigger
+
+    assert asyncio.run(main())["context"] == "a\nc"
+
+
+def test_resync_puts_the_whole_context_back(small_contexts):
+    first = "\n".join(f"line {i}" for i in range(200))
+    second = first + "\nappended"
+
+    async def main():
+        tracker = ContextTracker(FakePresence([DELTA_FEATURE]), IoExecutor())
+        await tracker.prepare({"context": first}, "session")
+        tracker.confirm("session", sha256(first))
+        trigger = {"context": second}
+        await tracker.prepare(trigger, "session")
+        return tracker, trigger
+
+    tracker, trigger = asyncio.run(main())
+
+    assert "context_delta" in trigger
+    assert tracker.resync(trigger)
+    assert trigger["context"] == second
+    assert not tracker.resync(trigger)
+    # Without a confirmed base the next round is sent whole
+    next_round = {"context": second + "\nmore"}
+    asyncio.run(tracker.prepare(next_round, "session"))
+    assert "context" in next_round
+
+
+def test_resync_after_the_context_was_pruned(small_contexts):
+    base = "\n".join(f"line {i}" for i in range(200))
+    rounds = [f"{base}\nround {i}" for i in range(5)]
+
+    async def main():
+        tracker = ContextTracker(FakePresence([DELTA_FEATURE]), IoExecutor())
+        await tracker.prepare({"context": base}, "session")
+        tracker.confirm("session", sha256(base))
+        triggers = [{"context": context} for context in rounds]
+        for trigger in triggers:
+            # Later rounds started while the first was still unacknowledged push its context out
+            await tracker.prepare(trigger, "session")
+        return tracker, triggers[0]
+
+    tracker, trigger = asyncio.run(main())
+
+    assert trigger["context_delta"]["sha256"] == sha256(rounds[0])
+    with pytest.raises(RuntimeError, match="no longer available"):
+        tracker.resync(trigger)
+    assert "context" not in trigger
+    with pytest.raises(RuntimeError):
+        tracker.resync(trigger, "not the context this delta produces")
+    # The copy the caller kept restores it
+    assert tracker.resync(trigger, rounds[0])
+    assert trigger["context"] == rounds[0]
+    assert "context_delta" not in trigger
+
+
+def test_confirming_an_unknown_context_forgets_the_base(small_contexts):
+    first = "\n".join(f"line {i}" for i in range(200))
+    second = first + "\nappended"
+
+    async def main():
+        tracker = ContextTracker(FakePresence([DELTA_FEATURE]), IoExecutor())
+        await tracker.prepare({"context": first}, "session")
+        tracker.confirm("session", sha256(first))
+        tracker.confirm("session", "not a hash we sent")
+        trigger = {"context": second}
+        await tracker.prepare(trigger, "session")
+        return trigger
+
+    assert asyncio.run(main())["context"] == second
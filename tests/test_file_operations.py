@@ -0,0 +1,113 @@
+import pytest
+
+from src.config.constants import CodecConfig, FilePatterns
+from src.utils import file_operations
+from src.utils.file_operations import (
+    WIRE_HEADER_PREFIX,
+    IncompletePayloadError,
+    available_wire_formats,
+    decode_payload,
+    encode_payload,
+    negotiate_wire_format,
+    new_trigger_id,
+    trigger_id_from_name,
+)
+
+PAYLOAD = {"trigger_id": "t1", "user_input": "ça marche ✅", "attachments": [{"size": 3}], "urgent": False}
+
+
+def test_trigger_ids_are_unique_within_a_millisecond():
+    ids = [new_trigger_id(kind) for kind in ("review", "file", "ingest") for _ in range(1000)]
+    assert len(set(ids)) == len(ids)
+    assert ids[0].startswith("review_") and ids[-1].startswith("ingest_")
+
+
+def test_trigger_id_round_trips_through_file_names():
+    trigger_id = new_trigger_id("file")
+    prefixes = (FilePatterns.RESPONSE_PREFIX, FilePatterns.MCP_RESPONSE_PREFIX)
+    assert trigger_id_from_name(f"{FilePatterns.RESPONSE_PREFIX}_{trigger_id}.json", prefixes) == trigger_id
+    assert trigger_id_from_name(f"{FilePatterns.RESPONSE_PREFIX}.json", prefixes) == ""
+
+
+@pytest.fixture(params=["orjson", "json"])
+def json_codec(request, monkeypatch):
+    """Run with orjson, and with the standard library as when orjson is not installed"""
+    if request.param == "json":
+        monkeypatch.setattr(file_operations, "orjson", None)
+    elif file_operations.orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+
+@pytest.fixture
+def without_msgpack(monkeypatch):
+    monkeypatch.setattr(file_operations, "msgpack", None)
+
+
+def test_json_payload_round_trips_without_a_header(json_codec):
+    encoded = encode_payload(PAYLOAD)
+    assert not encoded.startswith(WIRE_HEADER_PREFIX)
+    assert decode_payload(encoded) == PAYLOAD
+    assert decode_payload(encoded.decode()) == PAYLOAD
+
+
+def test_both_json_codecs_read_each_others_payloads(monkeypatch):
+    if file_operations.orjson is None:
+        pytest.skip("orjson is not installed")
+    fast = encode_payload(PAYLOAD)
+    monkeypatch.setattr(file_operations, "orjson", None)
+    assert decode_payload(fast) == PAYLOAD
+    assert file_operations._json_loads(encode_payload(PAYLOAD)) == PAYLOAD
+
+
+def test_msgpack_payload_round_trips(json_codec):
+    if file_operations.msgpack is None:
+        pytest.skip("msgpack is not installed")
+    encoded = encode_payload({**PAYLOAD, "raw": b"\x00\xff"}, "msgpack")
+    assert encoded.startswith(WIRE_HEADER_PREFIX + b"msgpack/1\n")
+    assert decode_payload(encoded) == {**PAYLOAD, "raw": b"\x00\xff"}
+
+
+def test_headed_json_payload_is_read(json_codec):
+    assert decode_payload(WIRE_HEADER_PREFIX + b"json/1\n" + encode_payload(PAYLOAD)) == PAYLOAD
+
+
+def test_without_msgpack_everything_is_json(without_msgpack):
+    assert available_wire_formats() == ["json"]
+    assert negotiate_wire_format([["msgpack", "json"]]) == "json"
+    assert encode_payload(PAYLOAD, "msgpack") == encode_payload(PAYLOAD)
+    with pytest.raises(ValueError, match="unsupported payload format"):
+        decode_payload(WIRE_HEADER_PREFIX + b"msgpack/1\n\x80")
+
+
+@pytest.mark.parametrize(
+    ("peers", "expected"),
+    [
+        ([["msgpack", "json"], ["msgpack", "json"]], "msgpack"),
+        ([["msgpack", "json"], None], "json"),  # an extension that advertises nothing reads JSON only
+        ([], "json"),
+    ],
+)
+def test_format_is_negotiated_across_every_peer(peers, expected):
+    if file_operations.msgpack is None:
+        pytest.skip("msgpack is not installed")
+    assert negotiate_wire_format(peers) == expected
+
+
+def test_msgpack_can_be_disabled():
+    CodecConfig.ALLOW_MSGPACK = False
+    assert negotiate_wire_format([["msgpack", "json"]]) == "json"
+
+
+@pytest.mark.parametrize("cut", [3, len(WIRE_HEADER_PREFIX) + 4, -2])
+def test_payload_cut_short_is_incomplete(cut):
+    if file_operations.msgpack is None:
+        pytest.skip("msgpack is not installed")
+    encoded = encode_payload(PAYLOAD, "msgpack")
+    with pytest.raises(IncompletePayloadError):
+        decode_payload(encoded[:cut])
+
+
+def test_payload_from_a_newer_protocol_is_refused():
+    with pytest.raises(ValueError, match="unsupported payload version"):
+        decode_payload(WIRE_HEADER_PREFIX + b"json/99\n{}")
@@ -0,0 +1,117 @@
+import asyncio
+import os
+import stat
+
+import httpx
+import pytest
+from mcp.server import Server
+
+from src.config.constants import HttpConfig, IpcConfig
+from src.transport.http import HttpTransport, load_token, token_path
+
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {"protocolVersion": "2025-06-18", "capabilities": {}, "clientInfo": {"name": "test", "version": "0"}},
+}
+
+
+@pytest.fixture
+def transport(tmp_path) -> HttpTransport:
+    IpcConfig.BASE_DIR = str(tmp_path)
+    HttpConfig.JSON_RESPONSE = True
+    return HttpTransport(Server("test"), host="127.0.0.1", port=8765)
+
+
+def headers(transport: HttpTransport, **extra: str) -> dict[str, str]:
+    return {
+        "Host": "127.0.0.1:8765",
+        "Accept": "application/json, text/event-stream",
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {transport.token}",
+        **extra,
+    }
+
+
+def post(transport: HttpTransport, request_headers: dict[str, str], path: str = "/mcp", run: bool = False) -> httpx.Response:
+    async def send() -> httpx.Response:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=transport.app), base_url="http://127.0.0.1:8765")
+        async with client:
+            if not run:
+                return await client.post(path, json=INITIALIZE, headers=request_headers)
+            async with transport.session_manager.run():
+                return await client.post(path, json=INITIALIZE, headers=request_headers)
+
+    return asyncio.run(send())
+
+
+def test_initialize_with_token_succeeds(transport):
+    response = post(transport, headers(transport, Origin="http://localhost:8765"), run=True)
+    assert response.status_code == 200
+    assert response.json()["result"]["serverInfo"]["name"] == "test"
+
+
+def test_foreign_origin_is_refused(transport):
+    response = post(transport, headers(transport, Origin="http://evil.example"))
+    assert response.status_code == 403
+    assert transport.unauthorized_requests == 1
+
+
+def test_rebound_host_is_refused(transport):
+    response = post(transport, headers(transport, Host="evil.example:8765"))
+    assert response.status_code == 421
+
+
+def test_extra_origin_can_be_allowed(tmp_path):
+    IpcConfig.BASE_DIR = str(tmp_path)
+    HttpConfig.ALLOWED_ORIGINS = "https://app.example"
+    transport = HttpTransport(Server("test"), host="127.0.0.1", port=8765)
+    assert "https://app.example" in transport.security_settings.allowed_origins
+    assert "http://evil.example" not in transport.security_settings.allowed_origins
+
+
+@pytest.mark.parametrize("authorization", [None, "Bearer wrong", "Basic abc"])
+def test_missing_or_wrong_token_is_refused(transport, authorization):
+    request_headers = headers(transport)
+    if authorization is None:
+        del request_headers["Authorization"]
+    else:
+        request_headers["Authorization"] = authorization
+    response = post(transport, request_headers)
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+
+
+def test_unknown_path_is_not_found(transport):
+    assert post(transport, headers(transport), path="/other").status_code == 404
+
+
+def test_requests_over_the_limit_get_503(transport):
+    transport.in_flight = transport.max_concurrent
+    response = post(transport, headers(transport))
+    assert response.status_code == 503
+    assert transport.rejected_requests == 1
+
+
+def test_unix_socket_needs_no_token(tmp_path):
+    IpcConfig.BASE_DIR = str(tmp_path)
+    transport = HttpTransport(Server("test"), unix_socket=str(tmp_path / "mcp.sock"))
+    assert transport.token is None
+    assert not os.path.exists(token_path())
+
+
+def test_token_file_is_private_and_reused(tmp_path):
+    IpcConfig.BASE_DIR = str(tmp_path)
+    token = load_token()
+    assert stat.S_IMODE(os.stat(token_path()).st_mode) == 0o600
+    assert load_token() == token
+    assert os.listdir(tmp_path) == ["http_token"]
+
+
+def test_readable_token_file_is_rejected(tmp_path):
+    path = tmp_path / "token"
+    path.write_text("secret")
+    path.chmod(0o644)
+    with pytest.raises(RuntimeError, match="0600"):
+        load_token(str(path))
@@ -0,0 +1,63 @@
+import asyncio
+import hashlib
+import os
+import stat
+
+import pytest
+
+from src.config.constants import IngestConfig
+from src.managers.ingest_store import IngestStore
+from src.utils.io_executor import IoExecutor
+
+
+def test_concurrent_one_shot_texts_get_their_own_streams(ipc_dir):
+    async def main():
+        store = IngestStore(IoExecutor())
+        streams = await asyncio.gather(*(store.append(None, f"text {i}\n") for i in range(20)))
+        return [await store.finish(stream.stream_id) for stream in streams]
+
+    streams = asyncio.run(main())
+    assert len({stream.stream_id for stream in streams}) == 20
+    for i, stream in enumerate(streams):
+        with open(stream.path) as f:
+            assert f.read() == f"text {i}\n"
+        assert stat.S_IMODE(os.stat(stream.path).st_mode) == 0o600
+
+
+def test_chunked_stream_is_paged_at_line_breaks(ipc_dir):
+    IngestConfig.PAGE_BYTES = 10
+    chunks = ["line one\nline", " two\nline three\n", "tail"]
+
+    async def main():
+        store = IngestStore(IoExecutor())
+        for index, chunk in enumerate(chunks):
+            await store.append("notes", chunk, index)
+        return await store.finish("notes")
+
+    stream = asyncio.run(main())
+    text = "".join(chunks).encode()
+    assert stream.size == len(text)
+    assert stream.lines == 4
+    assert stream.sha256 == hashlib.sha256(text).hexdigest()
+    assert [text[offset : offset + length] for offset, length in stream.pages] == [
+        b"line one\n",
+        b"line two\n",
+        b"line three",
+        b"\ntail",
+    ]
+
+
+def test_out_of_order_chunk_is_rejected(ipc_dir):
+    async def main():
+        store = IngestStore(IoExecutor())
+        await store.append("notes", "first", 0)
+        with pytest.raises(ValueError, match="expected chunk 1"):
+            await store.append("notes", "third", 2)
+        return await store.finish("notes")
+
+    assert asyncio.run(main()).chunks == 1
+
+
+def test_stream_id_may_not_escape_the_ipc_dir(ipc_dir):
+    with pytest.raises(ValueError, match="may only contain"):
+        asyncio.run(IngestStore(IoExecutor()).append("../x", "text", 0))
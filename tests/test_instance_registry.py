@@ -0,0 +1,113 @@
+import json
+import os
+
+import pytest
+
+from src.config.constants import IpcConfig, JournalConfig
+from src.managers.instance_registry import InstanceRegistry
+from src.managers.review_journal import journal_path
+from src.utils import file_operations
+
+
+@pytest.fixture
+def base_dir(tmp_path, monkeypatch):
+    """A private IPC base dir, with the IPC directory resolved afresh from IpcConfig"""
+    IpcConfig.BASE_DIR = str(tmp_path)
+    monkeypatch.setattr(file_operations, "_ipc_dir", None)
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    ("mode", "namespace", "expected"),
+    [
+        ("instance", "", f"instance-{os.getpid()}"),
+        ("instance", "team", "team"),
+        ("workspace", "team", "team"),
+    ],
+)
+def test_namespace_follows_the_mode(mode, namespace, expected):
+    IpcConfig.MODE, IpcConfig.NAMESPACE = mode, namespace
+    assert file_operations.ipc_namespace() == expected
+
+
+def test_workspace_namespace_is_stable_per_workspace(tmp_path):
+    IpcConfig.MODE = "workspace"
+    IpcConfig.WORKSPACE = str(tmp_path / "a")
+    first = file_operations.ipc_namespace()
+    IpcConfig.WORKSPACE = str(tmp_path / "b")
+
+    assert first.startswith("ws-")
+    assert file_operations.ipc_namespace() != first
+    IpcConfig.WORKSPACE = str(tmp_path / "a")
+    assert file_operations.ipc_namespace() == first
+
+
+def test_shared_mode_uses_tmp_and_registers_nothing(base_dir):
+    IpcConfig.MODE = "shared"
+    registry = InstanceRegistry()
+    registry.start()
+
+    assert file_operations.get_temp_dir() == file_operations.get_shared_temp_dir()
+    assert registry.record_file is None
+    assert not (base_dir / IpcConfig.REGISTRY_DIR).exists()
+
+
+def test_instance_directory_is_private_registered_and_removed_on_stop(base_dir):
+    IpcConfig.MODE = "instance"
+    registry = InstanceRegistry()
+    registry.start()
+    ipc_dir = file_operations.get_temp_dir()
+    with open(registry.record_file) as f:
+        record = json.load(f)
+
+    assert ipc_dir == str(base_dir / f"instance-{os.getpid()}")
+    assert os.stat(ipc_dir).st_mode & 0o777 == 0o700
+    assert (record["pid"], record["ipc_dir"], record["workspace"]) == (os.getpid(), ipc_dir, None)
+
+    registry.stop()
+    assert not os.path.exists(ipc_dir)
+    assert os.listdir(base_dir / IpcConfig.REGISTRY_DIR) == []
+
+
+@pytest.mark.parametrize(("mode", "namespace"), [("instance", "team"), ("workspace", ""), ("workspace", "team")])
+def test_shared_or_lasting_directories_are_kept_on_stop(base_dir, mode, namespace):
+    IpcConfig.MODE, IpcConfig.NAMESPACE = mode, namespace
+    registry = InstanceRegistry()
+    registry.start()
+    ipc_dir = file_operations.get_temp_dir()
+    registry.stop()
+
+    assert os.path.isdir(ipc_dir)
+    assert registry.record_file is None
+
+
+def test_records_of_dead_servers_are_pruned(base_dir):
+    IpcConfig.MODE = "workspace"
+    registry_dir = base_dir / IpcConfig.REGISTRY_DIR
+    registry_dir.mkdir()
+    (registry_dir / "999999999.json").write_text("{}")
+    registry = InstanceRegistry()
+    registry.start()
+
+    assert os.listdir(registry_dir) == [f"{os.getpid()}.json"]
+    registry.stop()
+
+
+def test_instance_journal_outlives_the_instance_directory(base_dir):
+    IpcConfig.MODE = "instance"
+    registry = InstanceRegistry()
+    registry.start()
+    path = journal_path()
+    with open(path, "w") as f:
+        f.write("{}\n")
+    registry.stop()
+
+    # The next server, with another pid and so another IPC directory, reads the same journal
+    assert path == str(base_dir / f"instance_{JournalConfig.FILE_NAME}")
+    assert os.path.exists(path)
+
+
+def test_workspace_journal_is_per_namespace(base_dir):
+    IpcConfig.MODE = "workspace"
+    IpcConfig.NAMESPACE = "team"
+    assert journal_path() == str(base_dir / f"team_{JournalConfig.FILE_NAME}")
@@ -0,0 +1,186 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from src.config.constants import FilePatterns, IoConfig, RuntimeConfigSettings, SweeperConfig, TimeoutConfig
+from src.config.runtime_config import RuntimeConfig
+from src.managers.ipc_sweeper import IpcSweeper
+from src.managers.ipc_watcher import CHANGED, DELETED, IpcWatcher
+from src.managers.trigger_manager import TriggerManager
+from src.utils.io_executor import BACKGROUND, IPC, JOURNAL, IoExecutor
+from src.utils.loop_lag_monitor import LoopLagMonitor
+
+
+def test_a_busy_lane_does_not_hold_up_another():
+    IoConfig.BACKGROUND_WORKERS = 1
+
+    async def main():
+        executor = IoExecutor()
+        release = threading.Event()
+        long_job = asyncio.create_task(executor.run("index_build", release.wait, 10, lane=BACKGROUND))
+        await asyncio.sleep(0.01)
+        started = time.monotonic()
+        threads = [await executor.run("read_response", threading.get_ident, lane=lane) for lane in (IPC, JOURNAL)]
+        waited = time.monotonic() - started
+        stats = executor.get_stats()
+        release.set()
+        await long_job
+        return threads, waited, stats
+
+    threads, waited, stats = asyncio.run(main())
+    assert threading.get_ident() not in threads
+    assert waited < 1
+    assert stats["lanes"][BACKGROUND]["in_flight"] == 1
+    assert stats["operations"]["index_build"]["lane"] == BACKGROUND
+
+
+def test_errors_are_reraised_and_counted():
+    async def main():
+        executor = IoExecutor()
+        with pytest.raises(FileNotFoundError):
+            await executor.run("read_response", os.stat, "/nonexistent/file")
+        return executor.get_stats()["operations"]["read_response"]
+
+    stats = asyncio.run(main())
+    assert (stats["calls"], stats["errors"]) == (1, 1)
+
+
+def test_lag_monitor_sees_a_blocked_loop():
+    IoConfig.LAG_WARN = 0.05
+
+    async def main():
+        monitor = LoopLagMonitor(interval=0.01)
+        task = asyncio.create_task(monitor.run())
+        await asyncio.sleep(0.05)
+        time.sleep(0.1)  # blocks the loop, as a synchronous file read on it would
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return monitor.get_stats()
+
+    stats = asyncio.run(main())
+    assert stats["samples"] >= 3
+    assert stats["stalls"] >= 1
+    assert stats["max_ms"] >= 50
+
+
+def test_sweeper_pass_runs_off_the_loop(tmp_path):
+    SweeperConfig.INTERVAL = 0.01
+    stale = tmp_path / f"{FilePatterns.ACK_PREFIX}_t1.json"
+    stale.write_text("{}")
+    os.utime(stale, (0, 0))
+
+    async def main():
+        sweeper = IpcSweeper(IoExecutor(), str(tmp_path))
+        threads = []
+        sweep_pass = sweeper.sweep_pass
+        sweeper.sweep_pass = lambda: (threads.append(threading.get_ident()), sweep_pass())[1]
+        task = asyncio.create_task(sweeper.run())
+        for _ in range(100):
+            if not stale.exists():
+                break
+            await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return sweeper, threads
+
+    sweeper, threads = asyncio.run(main())
+    assert not stale.exists()
+    assert sweeper.removed["ack"] == 1
+    assert threads and threading.get_ident() not in threads
+
+
+def test_polling_watcher_reports_changes(tmp_path):
+    events = []
+
+    async def main():
+        watcher = IpcWatcher(IoExecutor(), str(tmp_path), poll_interval=0.01)
+        watcher.subscribe(("watched",), lambda event, name, path: events.append((event, name)))
+        watcher._start_inotify = lambda: False
+        (tmp_path / "watched_a").write_text("1")
+        watcher.start()
+        (tmp_path / "watched_b").write_text("2")
+        await asyncio.sleep(0.1)
+        # Rewritten in place: the directory mtime stays, only the file's own stat changes
+        with open(tmp_path / "watched_a", "a") as f:
+            f.write("more")
+        await asyncio.sleep(0.1)
+        (tmp_path / "watched_b").unlink()
+        await asyncio.sleep(0.1)
+        watcher.stop()
+        return watcher.backend
+
+    assert asyncio.run(main()) == "stopped"
+    assert events == [(CHANGED, "watched_a"), (CHANGED, "watched_b"), (CHANGED, "watched_a"), (DELETED, "watched_b")]
+
+
+def test_overflow_rescans_are_serialized(tmp_path):
+    (tmp_path / "watched_a").write_text("1")
+
+    async def main():
+        executor = IoExecutor()
+        watcher = IpcWatcher(executor, str(tmp_path))
+        watcher.subscribe(("watched",), lambda event, name, path: None)
+        release = threading.Event()
+        list_directory = watcher._list_directory
+        watcher._list_directory = lambda: (release.wait(10), list_directory())[1]
+        watcher._request_rescan()
+        await asyncio.sleep(0.05)
+        for _ in range(4):
+            watcher._request_rescan()
+        release.set()
+        await watcher._rescan_task
+        return executor.get_stats()["operations"]["watch_scan"]["calls"], watcher._entries
+
+    calls, entries = asyncio.run(main())
+    # One rescan for the first request and one more for all that arrived while it ran
+    assert calls == 2
+    assert list(entries) == ["watched_a"]
+
+
+def test_cancel_trigger_releases_files_in_the_background(ipc_dir):
+    paths = [os.path.join(ipc_dir, f"{prefix}_t1.json") for prefix in (FilePatterns.ACK_PREFIX, FilePatterns.RESPONSE_PREFIX)]
+    for path in paths:
+        with open(path, "w") as f:
+            f.write("{}")
+
+    async def main():
+        manager = TriggerManager(None, IoExecutor())
+        manager.cancel_trigger("t1")
+        await asyncio.gather(*manager._tasks)
+        return manager
+
+    manager = asyncio.run(main())
+    assert manager.cancelled_count == 1
+    assert not any(os.path.exists(path) for path in paths)
+    assert os.path.exists(os.path.join(ipc_dir, f"{FilePatterns.CANCEL_PREFIX}_t1.json"))
+
+
+def test_config_watch_reloads_through_the_executor(tmp_path, monkeypatch):
+    monkeypatch.setattr(RuntimeConfigSettings, "RELOAD_CHECK_INTERVAL", 0.01)
+    config_file = tmp_path / "config.json"
+    config_file.write_text("{}")
+
+    async def main():
+        executor = IoExecutor()
+        config = RuntimeConfig(str(config_file), {})
+        config.load()
+        task = asyncio.create_task(config.watch(executor))
+        config_file.write_text(json.dumps({"timeouts": {"CHAT_RESPONSE": 42}}))
+        os.utime(config_file, ns=(1, 1))
+        for _ in range(100):
+            if TimeoutConfig.CHAT_RESPONSE == 42:
+                break
+            await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return config, executor.get_stats()["operations"]
+
+    config, operations = asyncio.run(main())
+    assert TimeoutConfig.CHAT_RESPONSE == 42
+    assert config.reload_count == 1
+    assert operations["config_read"]["lane"] == BACKGROUND
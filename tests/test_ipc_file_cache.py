@@ -0,0 +1,120 @@
+import json
+import os
+
+import pytest
+
+from src.utils.file_operations import WIRE_FORMAT_VERSION, WIRE_HEADER_PREFIX
+from src.utils.ipc_file_cache import IpcFileCache
+
+
+def write(path, content: bytes, mtime_ns: int) -> None:
+    with open(path, "wb") as f:
+        f.write(content)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_unchanged_file_is_parsed_once(tmp_path):
+    path = str(tmp_path / "response.json")
+    write(path, json.dumps({"trigger_id": "t1", "user_input": "hi"}).encode(), 1_000)
+    cache = IpcFileCache()
+
+    assert cache.read_response(path) == ("hi", [], "t1")
+    assert cache.read_response(path) == ("hi", [], "t1")
+    assert (cache.misses, cache.hits) == (1, 1)
+
+
+def test_incomplete_file_is_retried_once_it_changes(tmp_path):
+    path = str(tmp_path / "response.json")
+    full = json.dumps({"trigger_id": "t1", "user_input": "hello"}).encode()
+    write(path, full[:10], 1_000)
+    cache = IpcFileCache()
+
+    assert cache.read_json(path) is None
+    assert cache.read_json(path) is None
+    assert cache.incomplete == 1  # the same version is not parsed twice
+    assert cache.malformed == 0
+
+    write(path, full, 2_000)
+    assert cache.read_json(path) == {"trigger_id": "t1", "user_input": "hello"}
+
+
+def test_empty_file_is_incomplete(tmp_path):
+    path = str(tmp_path / "response.json")
+    write(path, b"  \n", 1_000)
+    cache = IpcFileCache()
+
+    assert cache.read_json(path) is None
+    assert (cache.incomplete, cache.malformed) == (1, 0)
+
+
+def test_malformed_file_is_reported_once_per_version(tmp_path):
+    path = str(tmp_path / "response.json")
+    write(path, b'{"user_input": "hi",, "x": 1}', 1_000)
+    cache = IpcFileCache()
+
+    assert cache.read_json(path) is None
+    assert cache.read_json(path) is None
+    assert (cache.malformed, cache.incomplete, cache.hits) == (1, 0, 1)
+
+    write(path, b'{"user_input": "fixed"}', 2_000)
+    assert cache.read_json(path) == {"user_input": "fixed"}
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        WIRE_HEADER_PREFIX + f"json/{WIRE_FORMAT_VERSION}\n".encode() + b'["not", "an", "object"]',
+        b'{"user_input": 5}',
+        b'{"user_input": null, "trigger_id": "t1"}',
+        b'{"user_input": "hi", "trigger_id": 7}',
+        b'{"user_input": "hi", "attachments": "image.png"}',
+        b'{"user_input": "hi", "attachments": ["image.png"]}',
+    ],
+)
+def test_response_of_the_wrong_shape_is_malformed(tmp_path, content):
+    path = str(tmp_path / "response.json")
+    write(path, content, 1_000)
+    cache = IpcFileCache()
+
+    assert cache.read_response(path) is None
+    assert (cache.malformed, cache.incomplete) == (1, 0)
+
+
+def test_key_includes_size_and_inode(tmp_path):
+    path = str(tmp_path / "response.json")
+    write(path, b'{"user_input": "a"}', 1_000)
+    cache = IpcFileCache()
+    assert cache.read_json(path) == {"user_input": "a"}
+
+    # Same mtime, different size
+    write(path, b'{"user_input": "ab"}', 1_000)
+    assert cache.read_json(path) == {"user_input": "ab"}
+
+    # Same mtime and size, new inode
+    replacement = str(tmp_path / "replacement.json")
+    write(replacement, b'{"user_input": "xy"}', 1_000)
+    os.replace(replacement, path)
+    assert cache.read_json(path) == {"user_input": "xy"}
+
+
+def test_missing_file_is_forgotten(tmp_path):
+    path = str(tmp_path / "response.json")
+    write(path, b'{"user_input": "a"}', 1_000)
+    cache = IpcFileCache()
+    cache.read_json(path)
+    os.unlink(path)
+
+    assert cache.read_json(path) is None
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_eviction_keeps_totals_within_limits(tmp_path):
+    cache = IpcFileCache(max_entries=2)
+    for i in range(3):
+        path = str(tmp_path / f"{i}.json")
+        write(path, b'{"user_input": "a"}', 1_000)
+        cache.read_json(path)
+
+    stats = cache.get_stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] == 2 * len(b'{"user_input": "a"}')
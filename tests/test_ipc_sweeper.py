@@ -0,0 +1,98 @@
+import os
+import time
+
+import pytest
+
+from src.config.constants import FilePatterns, JournalConfig, SweeperConfig
+from src.managers.ipc_sweeper import IpcSweeper
+from src.utils.io_executor import IoExecutor
+
+
+def create(directory, name: str, age: float) -> str:
+    path = directory / name
+    path.write_text("{}")
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return name
+
+
+def sweep(directory) -> IpcSweeper:
+    sweeper = IpcSweeper(IoExecutor(), str(directory))
+    # One pass to the end of the listing, then one to notice it ended
+    while sweeper.full_sweeps == 0:
+        sweeper.sweep_pass()
+    return sweeper
+
+
+@pytest.mark.parametrize(
+    ("name", "expected"),
+    [
+        (f"{FilePatterns.ACK_PREFIX}_t1.json", "ack"),
+        (f"{FilePatterns.TRIGGER_PREFIX}_0.json", "trigger"),
+        (f"{FilePatterns.CANCEL_PREFIX}_t1.json", "signal"),
+        (f"{FilePatterns.RESPONSE_PREFIX}_t1.json", "response"),
+        (f"{FilePatterns.RESPONSE_PREFIX}.json", "generic_response"),
+        (f"{FilePatterns.MCP_RESPONSE_PREFIX}.json", "generic_response"),
+        ("review_gate_speech_1.wav", "speech"),
+        (f".{FilePatterns.TRIGGER_PREFIX}.json.tmp", "temp"),
+        ("other.json.tmp", None),
+        (JournalConfig.FILE_NAME, None),
+        ("cursor_enhancer.log", None),
+        ("unrelated.json", None),
+    ],
+)
+def test_files_are_classified_by_name(tmp_path, name, expected):
+    assert IpcSweeper(IoExecutor(), str(tmp_path)).classify(name) == expected
+
+
+def test_each_class_is_kept_until_its_own_age_limit(tmp_path):
+    hour = 3600
+    removed = {
+        create(tmp_path, f"{FilePatterns.ACK_PREFIX}_old.json", hour),
+        create(tmp_path, f"{FilePatterns.RESPONSE_PREFIX}.json", hour),  # generic: could pass for a fresh answer
+        create(tmp_path, f"{FilePatterns.RESPONSE_PREFIX}_stale.json", 2 * SweeperConfig.RESPONSE_MAX_AGE),
+    }
+    kept = {
+        create(tmp_path, f"{FilePatterns.ACK_PREFIX}_new.json", 1),
+        create(tmp_path, f"{FilePatterns.RESPONSE_PREFIX}_t1.json", hour),  # the journal may still recover it
+        create(tmp_path, f"{FilePatterns.PRESENCE_PREFIX}_1.json", SweeperConfig.PRESENCE_MAX_AGE - 60),
+        create(tmp_path, JournalConfig.FILE_NAME, 10 * SweeperConfig.RESPONSE_MAX_AGE),
+        create(tmp_path, "unrelated.json", 10 * SweeperConfig.RESPONSE_MAX_AGE),
+    }
+
+    sweeper = sweep(tmp_path)
+
+    assert set(os.listdir(tmp_path)) == kept
+    assert sweeper.removed == {"ack": 1, "generic_response": 1, "response": 1}
+    assert sweeper.bytes_freed == 2 * len(removed)
+
+
+def test_ages_follow_the_configured_limits(tmp_path):
+    SweeperConfig.ACK_MAX_AGE = 5
+    create(tmp_path, f"{FilePatterns.ACK_PREFIX}_t1.json", 10)
+
+    sweep(tmp_path)
+    assert os.listdir(tmp_path) == []
+
+
+def test_symlinks_and_directories_are_left_alone(tmp_path):
+    target = tmp_path / "target"
+    target.write_text("{}")
+    os.symlink(target, tmp_path / f"{FilePatterns.ACK_PREFIX}_link.json")
+    (tmp_path / f"{FilePatterns.ACK_PREFIX}_dir").mkdir()
+    SweeperConfig.ACK_MAX_AGE = 0
+
+    sweep(tmp_path)
+    assert len(os.listdir(tmp_path)) == 3
+
+
+def test_large_directory_is_covered_over_several_passes(tmp_path):
+    SweeperConfig.MAX_ENTRIES_PER_PASS = 4
+    for i in range(10):
+        create(tmp_path, f"{FilePatterns.ACK_PREFIX}_{i}.json", 3600)
+    sweeper = IpcSweeper(IoExecutor(), str(tmp_path))
+
+    assert sweeper.sweep_pass() == 4
+    assert len(os.listdir(tmp_path)) == 6
+    assert sweeper.sweep_pass() + sweeper.sweep_pass() == 6
+    assert sweeper.get_stats()["passes"] == 3
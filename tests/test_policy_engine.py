@@ -0,0 +1,96 @@
+import asyncio
+import inspect
+import json
+import os
+import time
+
+import pytest
+
+from src.config.constants import PolicyConfig, TimeoutConfig
+from src.services.policy_engine import PolicyEngine, PolicyRule
+from src.services.tool_executor import ToolExecutor
+from src.utils.io_executor import IoExecutor
+
+RULES = [
+    {"name": "continue", "message_regex": "^continue\\?$", "response": "Yes, continue."},
+    {"name": "tests", "tool": "cursor_enhancer_chat", "message_glob": "*run tests*", "response": "Yes, run the tests."},
+    {"name": "repeat", "message_glob": "*", "use_last_answer": True, "max_age": 60},
+]
+
+
+@pytest.fixture
+def engine(tmp_path) -> PolicyEngine:
+    PolicyConfig.RELOAD_CHECK_INTERVAL = 0
+    rules_file = tmp_path / "policy.json"
+    rules_file.write_text(json.dumps({"rules": RULES}))
+    return PolicyEngine(IoExecutor(), str(rules_file), str(tmp_path / "audit.jsonl"))
+
+
+def evaluate(engine: PolicyEngine, arguments: dict, tool: str = "cursor_enhancer_chat"):
+    return asyncio.run(engine.evaluate(tool, arguments))
+
+
+def audit_entries(engine: PolicyEngine) -> list[dict]:
+    with open(engine.audit_file) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_first_matching_rule_answers_and_is_audited(engine):
+    decision = evaluate(engine, {"message": "Continue?"})
+    assert (decision.response, decision.rule_name, decision.source) == ("Yes, continue.", "continue", "policy")
+    assert evaluate(engine, {"message": "Shall I run tests now?"}).rule_name == "tests"
+
+    assert [entry["rule"] for entry in audit_entries(engine)] == ["continue", "tests"]
+    assert engine.auto_answered_count == 2
+
+
+def test_rule_for_another_tool_does_not_match(engine):
+    assert evaluate(engine, {"message": "run tests"}, tool="get_user_input") is None
+
+
+def test_last_answer_is_replayed_until_max_age(engine):
+    arguments = {"message": "Deploy  to staging?", "context": "diff"}
+    assert evaluate(engine, arguments) is None
+
+    engine.record_answer("cursor_enhancer_chat", arguments, "Not yet.")
+    decision = evaluate(engine, {"message": "deploy to STAGING?", "context": "diff"})
+    assert (decision.response, decision.source) == ("Not yet.", "last_answer")
+
+    key = next(iter(engine._last_answers))
+    engine._last_answers[key] = ("Not yet.", time.time() - 61)
+    assert evaluate(engine, arguments) is None
+
+
+@pytest.mark.parametrize("max_age", ["3600", -1, None, True])
+def test_rule_with_bad_max_age_is_rejected(max_age):
+    with pytest.raises(ValueError, match="max_age"):
+        PolicyRule({"name": "bad", "use_last_answer": True, "max_age": max_age})
+
+
+def test_invalid_rules_file_keeps_the_previous_rules(engine):
+    assert evaluate(engine, {"message": "continue?"}).rule_name == "continue"
+    engine.rules_file.write_text(json.dumps({"rules": [{"name": "bad", "use_last_answer": True, "max_age": "1h"}]}))
+    os.utime(engine.rules_file, ns=(1, 1))
+
+    assert evaluate(engine, {"message": "continue?"}).rule_name == "continue"
+
+
+def test_removed_rules_file_disables_auto_responses(engine):
+    assert evaluate(engine, {"message": "continue?"}) is not None
+    engine.rules_file.unlink()
+
+    assert evaluate(engine, {"message": "continue?"}) is None
+
+
+def test_policy_failure_is_reported_as_a_tool_error():
+    TimeoutConfig.ERROR_DELAY = 0
+
+    class BrokenPolicy:
+        async def evaluate(self, tool, arguments):
+            raise OSError("disk gone")
+
+    components = dict.fromkeys(inspect.signature(ToolExecutor).parameters)
+    executor = ToolExecutor(**{**components, "policy_engine": BrokenPolicy()})
+
+    result = asyncio.run(executor._execute_tool("cursor_enhancer_chat", {"message": "hi"}, None))
+    assert result[0].text == "ERROR: Tool cursor_enhancer_chat failed: disk gone"
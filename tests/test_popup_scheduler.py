@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from src.managers import popup_scheduler
+from src.managers.popup_scheduler import PopupScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(popup_scheduler, "time", clock)
+    return clock
+
+
+async def admission_order(scheduler: PopupScheduler, clock: FakeClock, requests: list[tuple[str, bool, float]]) -> list[str]:
+    """Hold the only slot, queue (trigger_id, urgent, seconds later) requests, then release and record who gets in"""
+    holder = await scheduler.acquire("holder")
+    order = []
+
+    async def request(trigger_id: str, urgent: bool):
+        async with scheduler.slot(trigger_id, urgent):
+            order.append(trigger_id)
+
+    tasks = []
+    for trigger_id, urgent, delay in requests:
+        clock.now += delay
+        tasks.append(asyncio.create_task(request(trigger_id, urgent)))
+        await asyncio.sleep(0)
+    scheduler.release(holder)
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_urgent_request_jumps_the_queue(clock):
+    async def main():
+        scheduler = PopupScheduler(max_active=1, aging_interval=60, urgent_stacking=False)
+        return await admission_order(scheduler, clock, [("normal", False, 0), ("urgent", True, 1)])
+
+    assert asyncio.run(main()) == ["urgent", "normal"]
+
+
+def test_waiting_request_ages_past_a_newer_urgent_one(clock):
+    async def main():
+        scheduler = PopupScheduler(max_active=1, aging_interval=60, urgent_stacking=False)
+        return await admission_order(scheduler, clock, [("old", False, 0), ("urgent", True, 61)])
+
+    assert asyncio.run(main()) == ["old", "urgent"]
+
+
+def test_requests_of_equal_priority_are_first_come_first_served(clock):
+    async def main():
+        scheduler = PopupScheduler(max_active=1, aging_interval=60, urgent_stacking=False)
+        return await admission_order(scheduler, clock, [("a", False, 0), ("b", False, 0), ("c", False, 0)])
+
+    assert asyncio.run(main()) == ["a", "b", "c"]
+
+
+def test_reconfigure_rekeys_waiting_requests(clock):
+    async def main():
+        scheduler = PopupScheduler(max_active=1, aging_interval=60, urgent_stacking=False)
+        await scheduler.acquire("holder")
+        old = asyncio.create_task(scheduler.acquire("old"))
+        await asyncio.sleep(0)
+        clock.now += 30
+        urgent = asyncio.create_task(scheduler.acquire("urgent", urgent=True))
+        await asyncio.sleep(0)
+
+        def positions():
+            return {lease.trigger_id: scheduler.queue_position(lease) for _key, _seq, lease in scheduler._queue}
+
+        # 30s of waiting are half an aging interval at 60s, but three at 10s
+        before = positions()
+        scheduler.reconfigure(1, 10, False)
+        after = positions()
+        old.cancel()
+        urgent.cancel()
+        await asyncio.gather(old, urgent, return_exceptions=True)
+        return before, after
+
+    before, after = asyncio.run(main())
+    assert before == {"urgent": 1, "old": 2}
+    assert after == {"old": 1, "urgent": 2}
+
+
+def test_urgent_request_stacks_on_a_normal_popup(clock):
+    async def main():
+        scheduler = PopupScheduler(max_active=1, aging_interval=60, urgent_stacking=True)
+        normal = await scheduler.acquire("normal")
+        urgent = await asyncio.wait_for(scheduler.acquire("urgent", urgent=True), 1)
+        return normal, urgent
+
+    normal, urgent = asyncio.run(main())
+    assert urgent.stacked and not normal.stacked
+
+
+def test_cancelled_waiter_gives_up_its_place(clock):
+    async def main():
+        scheduler = PopupScheduler(max_active=1, aging_interval=60, urgent_stacking=False)
+        holder = await scheduler.acquire("holder")
+        first = asyncio.create_task(scheduler.acquire("first"))
+        second = asyncio.create_task(scheduler.acquire("second"))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        scheduler.release(holder)
+        lease = await asyncio.wait_for(second, 1)
+        return first.cancelled(), lease.trigger_id, scheduler.get_metrics()["normal"]["queued"]
+
+    assert asyncio.run(main()) == (True, "second", 0)
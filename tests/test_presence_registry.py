@@ -0,0 +1,83 @@
+import asyncio
+import inspect
+import json
+import os
+
+from src.config.constants import FilePatterns, PresenceConfig
+from src.managers.ipc_watcher import CHANGED, DELETED, IpcWatcher
+from src.managers.presence_registry import PresenceRegistry
+from src.services.tool_executor import ToolExecutor
+from src.utils.io_executor import IoExecutor
+from src.utils.ipc_file_cache import IpcFileCache
+
+NAME = f"{FilePatterns.PRESENCE_PREFIX}_1.json"
+
+
+def new_registry(directory) -> PresenceRegistry:
+    executor = IoExecutor()
+    return PresenceRegistry(IpcWatcher(executor, str(directory)), IpcFileCache(), executor)
+
+
+async def publish(registry: PresenceRegistry, directory, **record) -> None:
+    """Write a presence file and report it as the watcher would, waiting until it is read"""
+    path = directory / NAME
+    path.write_text(json.dumps({"pid": os.getpid(), "protocol_version": PresenceConfig.MIN_PROTOCOL_VERSION, **record}))
+    registry._on_file_event(CHANGED, NAME, str(path))
+    await asyncio.gather(*registry._tasks)
+
+
+def test_fresh_record_of_a_running_extension_is_live(tmp_path):
+    registry = new_registry(tmp_path)
+
+    async def main():
+        await publish(registry, tmp_path, workspace="/ws")
+        return registry.live_extensions()
+
+    assert [record["workspace"] for record in asyncio.run(main())] == ["/ws"]
+
+
+def test_dead_old_or_stale_extensions_are_not_live(tmp_path, monkeypatch):
+    registry = new_registry(tmp_path)
+
+    async def main():
+        await publish(registry, tmp_path, pid=999999999)
+        dead = registry.has_live_extension()
+        await publish(registry, tmp_path, protocol_version=0)
+        old = registry.has_live_extension()
+        await publish(registry, tmp_path)
+        monkeypatch.setattr(PresenceConfig, "STALE_AFTER", -1)
+        return dead, old, registry.has_live_extension()
+
+    assert asyncio.run(main()) == (False, False, False)
+
+
+def test_deleted_presence_file_forgets_the_extension(tmp_path):
+    registry = new_registry(tmp_path)
+
+    async def main():
+        await publish(registry, tmp_path)
+        registry._on_file_event(DELETED, NAME, str(tmp_path / NAME))
+        return registry.get_stats()
+
+    assert asyncio.run(main()) == {"records": 0, "live_extensions": 0, "arrival_waiters": 0}
+
+
+def test_waiting_for_an_extension_wakes_on_arrival_or_times_out(tmp_path):
+    registry = new_registry(tmp_path)
+
+    async def main():
+        missing = await registry.wait_for_extension(0.01)
+        wait = asyncio.create_task(registry.wait_for_extension(5))
+        await asyncio.sleep(0.01)
+        await publish(registry, tmp_path)
+        return missing, await asyncio.wait_for(wait, 1)
+
+    assert asyncio.run(main()) == (False, True)
+
+
+def test_chat_fails_fast_without_an_extension(tmp_path):
+    components = dict.fromkeys(inspect.signature(ToolExecutor).parameters)
+    executor = ToolExecutor(**{**components, "presence_registry": new_registry(tmp_path)})
+
+    content = asyncio.run(executor._handle_cursor_enhancer_chat({"message": "Review this"}, lambda stage: None))
+    assert content[0].text.startswith("ERROR: No Cursor Enhancer extension is running")
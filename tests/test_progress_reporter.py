@@ -0,0 +1,80 @@
+import asyncio
+
+from src.config.constants import ProgressConfig, ReviewStage
+from src.protocol.progress_reporter import STAGE_MESSAGES, ProgressReporter
+
+
+class RecordingSession:
+    def __init__(self):
+        self.sent = []
+
+    async def send_progress_notification(self, token, progress, message=None, related_request_id=None):
+        self.sent.append((token, progress, message, related_request_id))
+
+
+def test_reporter_without_token_sends_nothing():
+    session = RecordingSession()
+
+    async def main():
+        reporter = ProgressReporter(session, None, 1)
+        reporter.stage(ReviewStage.TRIGGERED)
+        await asyncio.sleep(0)
+        return reporter
+
+    assert not asyncio.run(main()).enabled
+    assert session.sent == []
+
+
+def test_stages_are_sent_in_order_and_repeats_dropped():
+    ProgressConfig.MIN_INTERVAL = 0
+    session = RecordingSession()
+
+    async def main():
+        reporter = ProgressReporter(session, "tok", 7)
+        for stage in (ReviewStage.TRIGGERED, ReviewStage.TRIGGERED, ReviewStage.ACKNOWLEDGED):
+            reporter.stage(stage)
+            await asyncio.sleep(0)
+        reporter.close()
+
+    asyncio.run(main())
+    assert session.sent == [
+        ("tok", 1, STAGE_MESSAGES[ReviewStage.TRIGGERED], "7"),
+        ("tok", 2, STAGE_MESSAGES[ReviewStage.ACKNOWLEDGED], "7"),
+    ]
+
+
+def test_bursts_are_coalesced_to_the_latest_stage():
+    ProgressConfig.MIN_INTERVAL = 0.05
+    session = RecordingSession()
+
+    async def main():
+        reporter = ProgressReporter(session, "tok", 1)
+        reporter.stage(ReviewStage.TRIGGERED)
+        reporter.stage(ReviewStage.ACKNOWLEDGED)
+        reporter.stage(ReviewStage.TYPING)
+        await asyncio.sleep(0.1)
+        reporter.close()
+
+    asyncio.run(main())
+    assert [message for _, _, message, _ in session.sent] == [STAGE_MESSAGES[ReviewStage.TRIGGERED], STAGE_MESSAGES[ReviewStage.TYPING]]
+
+
+def test_keepalive_is_sent_after_silence_and_stops_on_close():
+    ProgressConfig.MIN_INTERVAL = 0
+    ProgressConfig.KEEPALIVE_INTERVAL = 0.02
+    session = RecordingSession()
+
+    async def main():
+        reporter = ProgressReporter(session, "tok", 1)
+        reporter.stage(ReviewStage.ACKNOWLEDGED)
+        await asyncio.sleep(0.05)
+        reporter.close()
+        sent = len(session.sent)
+        reporter.stage(ReviewStage.ANSWERED)
+        await asyncio.sleep(0.05)
+        return sent
+
+    sent = asyncio.run(main())
+    assert sent >= 2
+    assert session.sent[1][2].startswith("Still waiting for the user")
+    assert len(session.sent) == sent
@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+
+from src.managers.request_coalescer import RequestCoalescer
+
+
+def test_identical_requests_share_one_call():
+    calls = []
+
+    async def main():
+        coalescer = RequestCoalescer(window=60)
+        release = asyncio.Event()
+
+        async def work(on_stage):
+            calls.append(1)
+            await release.wait()
+            return "answer"
+
+        key = coalescer.make_key("chat", {"message": "Review  this\n"})
+        first = asyncio.create_task(coalescer.run(key, work))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(coalescer.run(coalescer.make_key("chat", {"message": "Review this", "title": ""}), work))
+        await asyncio.sleep(0)
+        release.set()
+        return await first, await second, coalescer.get_stats()
+
+    first, second, stats = asyncio.run(main())
+    assert (first, second) == ("answer", "answer")
+    assert len(calls) == 1
+    assert stats == {"in_flight": 0, "waiters": 0, "coalesced": 1}
+
+
+def test_cancelling_one_waiter_keeps_the_shared_call():
+    async def main():
+        coalescer = RequestCoalescer(window=60)
+        release = asyncio.Event()
+
+        async def work(on_stage):
+            await release.wait()
+            return "answer"
+
+        first = asyncio.create_task(coalescer.run("key", work))
+        second = asyncio.create_task(coalescer.run("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return first, await second
+
+    first, second = asyncio.run(main())
+    assert first.cancelled()
+    assert second == "answer"
+
+
+def test_cancelling_the_last_waiter_cancels_the_shared_call():
+    cancelled = []
+
+    async def main():
+        coalescer = RequestCoalescer(window=60)
+
+        async def work(on_stage):
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+
+        waiters = [asyncio.create_task(coalescer.run("key", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+        return coalescer.inflight_count()
+
+    assert asyncio.run(main()) == 0
+    assert cancelled == [1]
+
+
+def test_stages_reach_every_waiter_still_attached():
+    async def main():
+        coalescer = RequestCoalescer(window=60)
+        step = asyncio.Event()
+        first_stages, second_stages, third_stages = [], [], []
+
+        async def work(on_stage):
+            on_stage("queued")
+            await step.wait()
+            step.clear()
+            on_stage("triggered")
+            await step.wait()
+            on_stage("answered")
+            return "answer"
+
+        first = asyncio.create_task(coalescer.run("key", work, first_stages.append))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(coalescer.run("key", work, second_stages.append))
+        third = asyncio.create_task(coalescer.run("key", work, third_stages.append))
+        await asyncio.sleep(0)
+        third.cancel()
+        await asyncio.sleep(0)
+        step.set()
+        await asyncio.sleep(0)
+        step.set()
+        await asyncio.gather(first, second)
+        return first_stages, second_stages, third_stages
+
+    first_stages, second_stages, third_stages = asyncio.run(main())
+    assert first_stages == ["queued", "triggered", "answered"]
+    # A late joiner hears the latest stage first; a cancelled one hears nothing more
+    assert second_stages == ["queued", "triggered", "answered"]
+    assert third_stages == ["queued"]
+
+
+def test_request_after_the_window_starts_a_new_call():
+    calls = []
+
+    async def main():
+        coalescer = RequestCoalescer(window=0)
+        release = asyncio.Event()
+
+        async def work(on_stage):
+            calls.append(1)
+            await release.wait()
+            return len(calls)
+
+        first = asyncio.create_task(coalescer.run("key", work))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(coalescer.run("key", work))
+        await asyncio.sleep(0)
+        release.set()
+        return await first, await second
+
+    assert asyncio.run(main()) == (2, 2)
+    assert len(calls) == 2
+
+
+def test_shared_call_error_reaches_every_waiter():
+    async def main():
+        coalescer = RequestCoalescer(window=60)
+
+        async def work(on_stage):
+            await asyncio.sleep(0)
+            raise RuntimeError("trigger failed")
+
+        return await asyncio.gather(coalescer.run("key", work), coalescer.run("key", work), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+
+
+@pytest.mark.parametrize(
+    "left, right",
+    [
+        ({"message": "a  b"}, {"message": " a b "}),
+        ({"message": "a", "title": None}, {"message": "a"}),
+        ({"message": "a", "title": ""}, {"message": "a"}),
+    ],
+)
+def test_make_key_normalizes_arguments(left, right):
+    coalescer = RequestCoalescer(window=60)
+    assert coalescer.make_key("chat", left) == coalescer.make_key("chat", right)
@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+from src.config.constants import FilePatterns
+from src.managers.ipc_watcher import CHANGED, DELETED, IpcWatcher
+from src.managers.response_index import ResponseIndex
+from src.utils.io_executor import IoExecutor
+from src.utils.ipc_file_cache import IpcFileCache
+
+
+def new_index(directory) -> ResponseIndex:
+    executor = IoExecutor()
+    return ResponseIndex(IpcWatcher(executor, str(directory)), IpcFileCache(), executor)
+
+
+def respond(index: ResponseIndex, directory, name: str, **payload) -> None:
+    """Write a response file and report it as the watcher would"""
+    path = directory / name
+    path.write_text(json.dumps(payload))
+    index._on_file_event(CHANGED, name, str(path))
+
+
+def test_oldest_response_is_claimed_and_removed(tmp_path):
+    index = new_index(tmp_path)
+    respond(index, tmp_path, f"{FilePatterns.RESPONSE_PREFIX}_t1.json", trigger_id="t1", user_input="first")
+    respond(index, tmp_path, f"{FilePatterns.RESPONSE_PREFIX}_t2.json", trigger_id="t2", user_input="second")
+
+    assert asyncio.run(index.claim()) == ("first", f"{FilePatterns.RESPONSE_PREFIX}_t1.json")
+    assert not (tmp_path / f"{FilePatterns.RESPONSE_PREFIX}_t1.json").exists()
+    assert index.pending_count() == 1
+
+
+def test_sibling_copies_of_an_answer_are_returned_once(tmp_path):
+    index = new_index(tmp_path)
+    respond(index, tmp_path, f"{FilePatterns.RESPONSE_PREFIX}_t1.json", trigger_id="t1", user_input="answer")
+    respond(index, tmp_path, f"{FilePatterns.MCP_RESPONSE_PREFIX}_t1.json", trigger_id="t1", user_input="answer")
+    respond(index, tmp_path, f"{FilePatterns.RESPONSE_PREFIX}.json", trigger_id="t1", user_input="answer")
+
+    async def main():
+        return await index.claim(), await index.claim()
+
+    first, second = asyncio.run(main())
+    assert first[0] == "answer"
+    assert second is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_reserved_responses_are_left_for_their_wait(tmp_path):
+    index = new_index(tmp_path)
+    index.reserve("t1")
+    respond(index, tmp_path, f"{FilePatterns.RESPONSE_PREFIX}_t1.json", trigger_id="t1", user_input="mine")
+    # Carries no id at all: belongs to the active chat wait
+    respond(index, tmp_path, f"{FilePatterns.RESPONSE_PREFIX}.json", user_input="anonymous")
+
+    assert asyncio.run(index.claim()) is None
+    assert index.pending_count() == 2
+
+    index.release("t1")
+    assert asyncio.run(index.claim())[0] == "mine"
+
+
+def test_deleted_files_leave_the_index(tmp_path):
+    index = new_index(tmp_path)
+    name = f"{FilePatterns.RESPONSE_PREFIX}_t1.json"
+    respond(index, tmp_path, name, trigger_id="t1", user_input="gone")
+    (tmp_path / name).unlink()
+    index._on_file_event(DELETED, name, str(tmp_path / name))
+
+    assert index.pending_count() == 0
+
+
+def test_wait_wakes_when_a_response_is_indexed(tmp_path):
+    index = new_index(tmp_path)
+
+    async def main():
+        wait = asyncio.create_task(index.wait_for_response(5))
+        await asyncio.sleep(0.01)
+        respond(index, tmp_path, f"{FilePatterns.RESPONSE_PREFIX}_t1.json", trigger_id="t1", user_input="late")
+        return await asyncio.wait_for(wait, 1), await index.wait_for_response(0)
+
+    answered, timed_out = asyncio.run(main())
+    assert answered[0] == "late"
+    assert timed_out is None
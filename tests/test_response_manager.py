@@ -0,0 +1,63 @@
+import asyncio
+import json
+import os
+
+from src.config.constants import FilePatterns
+from src.managers.ipc_watcher import CHANGED, IpcWatcher
+from src.managers.response_manager import ResponseManager
+from src.utils.io_executor import IoExecutor
+from src.utils.ipc_file_cache import IpcFileCache
+
+
+def new_manager(ipc_dir: str) -> ResponseManager:
+    executor = IoExecutor()
+    return ResponseManager(IpcWatcher(executor, ipc_dir), IpcFileCache(), executor)
+
+
+def deliver(manager: ResponseManager, ipc_dir: str, name: str, data: dict) -> None:
+    """Write an IPC file and report it as the watcher would"""
+    path = os.path.join(ipc_dir, name)
+    with open(path, "w") as f:
+        json.dump(data, f)
+    callback = manager._on_ack_file if name.startswith(FilePatterns.ACK_PREFIX) else manager._on_response_file
+    callback(CHANGED, name, path)
+
+
+def test_answer_arriving_before_the_ack_is_not_missed(ipc_dir):
+    manager = new_manager(ipc_dir)
+
+    async def main():
+        ack = asyncio.create_task(manager.wait_for_extension_acknowledgement("t1", timeout=5))
+        response = asyncio.create_task(manager.wait_for_response("t1", timeout=5))
+        await asyncio.sleep(0.01)
+        # A fast user answers before the extension's ack lands
+        deliver(manager, ipc_dir, f"{FilePatterns.RESPONSE_PREFIX}_t1.json", {"trigger_id": "t1", "user_input": "done"})
+        answer = await asyncio.wait_for(response, 1)
+        deliver(manager, ipc_dir, f"{FilePatterns.ACK_PREFIX}_t1.json", {"acknowledged": True})
+        ack = await asyncio.wait_for(ack, 1)
+        await asyncio.gather(*manager._tasks)  # the ack file is removed after its wait is resolved
+        return answer, ack
+
+    answer, ack = asyncio.run(main())
+    assert answer == ("done", [])
+    assert ack["acknowledged"]
+    assert os.listdir(ipc_dir) == []
+
+
+def test_answer_written_before_the_wait_is_picked_up(ipc_dir):
+    with open(os.path.join(ipc_dir, f"{FilePatterns.RESPONSE_PREFIX}.json"), "w") as f:
+        json.dump({"trigger_id": "t1", "user_input": "early"}, f)
+
+    assert asyncio.run(new_manager(ipc_dir).wait_for_response("t1", timeout=1)) == ("early", [])
+
+
+def test_waits_time_out_with_none(ipc_dir):
+    manager = new_manager(ipc_dir)
+
+    async def main():
+        return await asyncio.gather(
+            manager.wait_for_extension_acknowledgement("t1", timeout=0.01), manager.wait_for_response("t1", timeout=0.01)
+        )
+
+    assert asyncio.run(main()) == [None, None]
+    assert manager.get_stats() == {"response_waiters": 0, "ack_waiters": 0, "processing": 0}
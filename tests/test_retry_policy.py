@@ -0,0 +1,60 @@
+import pytest
+
+from src.utils.retry_policy import CircuitBreaker, RetryPolicy
+
+
+def test_attempt_timeouts_grow_geometrically_up_to_the_limit():
+    policy = RetryPolicy(max_attempts=3, base_timeout=2, backoff_factor=3)
+
+    assert [policy.attempt_timeout(attempt) for attempt in (1, 2, 3)] == [2, 6, 18]
+    assert [policy.should_retry(attempt) for attempt in (1, 2, 3)] == [True, True, False]
+
+
+def test_single_attempt_policy_never_retries():
+    assert not RetryPolicy(max_attempts=1, base_timeout=5).should_retry(1)
+
+
+@pytest.fixture
+def breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+def test_breaker_opens_after_consecutive_failures(breaker):
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened_count == 1
+    assert not breaker.allow()
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_half_open_breaker_allows_one_trial_and_closes_on_success(breaker):
+    breaker._opened_at -= 60
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # the trial is still in flight
+
+    breaker.record_success()
+    assert (breaker.state, breaker.failures) == (CircuitBreaker.CLOSED, 0)
+    assert breaker.allow()
+
+
+def test_failed_trial_opens_the_breaker_again(breaker):
+    breaker._opened_at -= 60
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened_count == 2
+    assert not breaker.allow()
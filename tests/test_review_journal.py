@@ -0,0 +1,151 @@
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+import pytest
+
+from src.config.constants import JournalConfig, ReviewStage
+from src.managers.review_journal import COLLECTED, RECOVERED, ReviewJournal
+from src.utils.io_executor import IoExecutor
+
+
+@pytest.fixture
+def dead_pid() -> int:
+    """Pid of a process that has exited"""
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def new_journal() -> ReviewJournal:
+    journal = ReviewJournal(IoExecutor())
+    journal.start()
+    return journal
+
+
+def write_lines(journal: ReviewJournal, entries: list[dict], tail: str = "") -> None:
+    with open(journal.path, "a") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+        f.write(tail)
+
+
+def triggered(trigger_id: str, pid: int, ts: float | None = None, **fields) -> dict:
+    return {"event": ReviewStage.TRIGGERED, "trigger_id": trigger_id, "pid": pid, "ts": ts or time.time(), "timeout": 600, **fields}
+
+
+def event(name: str, trigger_id: str, pid: int, **fields) -> dict:
+    return {"event": name, "trigger_id": trigger_id, "pid": pid, "ts": time.time(), **fields}
+
+
+def journal_events(journal: ReviewJournal) -> list[tuple[str, str]]:
+    with open(journal.path) as f:
+        return [(entry["event"], entry["trigger_id"]) for entry in map(json.loads, f)]
+
+
+def test_recovers_unfinished_reviews_of_a_dead_server(ipc_dir, dead_pid):
+    journal = new_journal()
+    write_lines(
+        journal,
+        [
+            triggered("open", dead_pid, message="Review this", title="Review"),
+            event(ReviewStage.ACKNOWLEDGED, "open", dead_pid),
+            triggered("timed_out", dead_pid),
+            event(ReviewStage.TIMEOUT, "timed_out", dead_pid),
+            triggered("answered_directly", dead_pid),
+            event(ReviewStage.ANSWERED, "answered_directly", dead_pid),
+            triggered("collected", dead_pid),
+            event(ReviewStage.ANSWERED, "collected", dead_pid, answer={"user_input": "ok", "attachment_count": 0}),
+            event(COLLECTED, "collected", dead_pid),
+        ],
+    )
+
+    recovered = asyncio.run(journal.recover())
+
+    assert [review.trigger_id for review in recovered] == ["open"]
+    review = recovered[0]
+    assert (review.message, review.title, review.answer) == ("Review this", "Review", None)
+    assert review.deadline > time.time() + 500
+    # Finished reviews are dropped; the adopted one is marked as taken over
+    assert journal_events(journal) == [(ReviewStage.TRIGGERED, "open"), (ReviewStage.ACKNOWLEDGED, "open"), (RECOVERED, "open")]
+
+
+def test_recovered_ticket_answer_notes_its_attachments(ipc_dir, dead_pid):
+    journal = new_journal()
+    write_lines(
+        journal,
+        [
+            triggered("ticket", dead_pid, ticket_key="k"),
+            event(ReviewStage.ANSWERED, "ticket", dead_pid, answer={"user_input": "looks good", "attachment_count": 2}),
+        ],
+    )
+
+    (review,) = asyncio.run(journal.recover())
+
+    user_input, attachments = review.answer
+    assert review.ticket_key == "k"
+    assert user_input.startswith("looks good\n\n(2 attachment(s)")
+    assert attachments == []
+
+
+def test_reviews_of_a_running_server_are_left_alone(ipc_dir):
+    journal = new_journal()
+    journal.record(ReviewStage.TRIGGERED, "mine", message="m", timeout=60)
+    asyncio.run(journal.flush())
+
+    assert asyncio.run(new_journal().recover()) == []
+    assert journal_events(journal) == [(ReviewStage.TRIGGERED, "mine")]
+
+
+def test_recovered_review_is_not_taken_over_twice(ipc_dir, dead_pid):
+    write_lines(new_journal(), [triggered("open", dead_pid)])
+
+    assert len(asyncio.run(new_journal().recover())) == 1
+    # The recovery was recorded under this (running) process
+    assert asyncio.run(new_journal().recover()) == []
+
+
+def test_torn_and_corrupt_lines_are_skipped(ipc_dir, dead_pid):
+    journal = new_journal()
+    write_lines(journal, [triggered("open", dead_pid)], tail='not json\n{"event": "trig')
+
+    recovered = asyncio.run(journal.recover())
+
+    assert [review.trigger_id for review in recovered] == ["open"]
+    assert journal.corrupt_lines == 2
+
+
+def test_old_unfinished_reviews_are_abandoned(ipc_dir, dead_pid):
+    journal = new_journal()
+    write_lines(journal, [triggered("stale", dead_pid, ts=time.time() - JournalConfig.RECOVERY_MAX_AGE - 1)])
+
+    assert asyncio.run(journal.recover()) == []
+    assert journal_events(journal) == []
+
+
+def test_compaction_keeps_only_unfinished_reviews(ipc_dir):
+    JournalConfig.COMPACT_BYTES = 2048
+    journal = new_journal()
+
+    async def main():
+        journal.record(ReviewStage.TRIGGERED, "open", message="still waiting", timeout=60)
+        for i in range(50):
+            journal.record(ReviewStage.TRIGGERED, f"done_{i}", message="m" * 50, timeout=60)
+            journal.record(ReviewStage.TIMEOUT, f"done_{i}")
+        await journal.close()
+
+    asyncio.run(main())
+
+    assert journal.compactions == 1
+    assert journal.records_written == 101
+    assert journal_events(journal) == [(ReviewStage.TRIGGERED, "open")]
+
+
+def test_nothing_is_recorded_after_close(ipc_dir):
+    journal = new_journal()
+    asyncio.run(journal.close())
+    journal.record(ReviewStage.TRIGGERED, "late")
+
+    assert journal.get_stats()["buffered"] == 0
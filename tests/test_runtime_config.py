@@ -0,0 +1,160 @@
+import itertools
+import json
+import os
+
+import pytest
+
+from src.config.constants import IoConfig, IpcConfig, RetryConfig, SchedulerConfig, TimeoutConfig
+from src.config.runtime_config import SECTIONS, RuntimeConfig, _coerce
+
+_mtimes = itertools.count(1_000_000_000, 1_000_000_000)
+
+
+def write_config(path, data) -> None:
+    path.write_text(json.dumps(data))
+    # A distinct mtime for every write, so reload_if_changed sees rewrites within the same clock tick
+    mtime = next(_mtimes)
+    os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.mark.parametrize(
+    "default, value, from_env, expected",
+    [
+        (True, "off", True, False),
+        (False, " YES ", True, True),
+        (10, "12", True, 12),
+        (10, "2.5", True, 2.5),
+        (1.0, 3, False, 3),
+        ("json", "msgpack", False, "msgpack"),
+    ],
+)
+def test_coerce_converts_to_the_default_type(default, value, from_env, expected):
+    assert _coerce(default, value, from_env) == expected
+
+
+@pytest.mark.parametrize(
+    "default, value, from_env",
+    [
+        (True, "maybe", True),
+        (True, 1, False),
+        (10, True, False),
+        (10, "ten", True),
+        (10, -1, False),
+        ("json", 5, False),
+    ],
+)
+def test_coerce_rejects_values_that_do_not_fit(default, value, from_env):
+    with pytest.raises(ValueError):
+        _coerce(default, value, from_env)
+
+
+def test_environment_wins_over_file(tmp_path):
+    config_file = tmp_path / "config.json"
+    write_config(config_file, {"timeouts": {"CHAT_RESPONSE": 100, "FILE_REVIEW": 50}})
+    config = RuntimeConfig(str(config_file), {"CURSOR_ENHANCER_TIMEOUTS__CHAT_RESPONSE": "200"})
+
+    changed = config.load()
+
+    assert TimeoutConfig.CHAT_RESPONSE == 200
+    assert TimeoutConfig.FILE_REVIEW == 50
+    assert {"timeouts.CHAT_RESPONSE", "timeouts.FILE_REVIEW"} <= changed
+
+
+def test_unknown_and_invalid_settings_are_ignored(tmp_path):
+    config_file = tmp_path / "config.json"
+    write_config(config_file, {"timeouts": {"NO_SUCH_SETTING": 1, "CHAT_RESPONSE": "soon"}, "retry": "not an object"})
+    default = TimeoutConfig.CHAT_RESPONSE
+    config = RuntimeConfig(str(config_file), {})
+
+    config.load()
+
+    assert TimeoutConfig.CHAT_RESPONSE == default
+    assert config.error_count == 1
+
+
+@pytest.mark.parametrize(
+    "section, key, value",
+    [
+        ("scheduler", "AGING_INTERVAL", 0),
+        ("scheduler", "MAX_ACTIVE_POPUPS", 0),
+        ("io", "MAX_WORKERS", 1.5),
+        ("retry", "ACK_BACKOFF_FACTOR", 0.5),
+        ("retry", "ACK_MAX_ATTEMPTS", 0),
+        ("trigger", "BACKUP_COUNT", 1.5),
+    ],
+)
+def test_values_below_a_minimum_keep_the_current_setting(tmp_path, section, key, value):
+    config_file = tmp_path / "config.json"
+    write_config(config_file, {})
+    config = RuntimeConfig(str(config_file), {})
+    config.load()
+    current = getattr(SECTIONS[section], key)
+
+    write_config(config_file, {section: {key: value}})
+    config.reload_if_changed()
+
+    assert getattr(SECTIONS[section], key) == current
+    assert config.error_count == 1
+
+
+def test_rejected_value_keeps_the_value_in_effect_not_the_default(tmp_path):
+    config_file = tmp_path / "config.json"
+    write_config(config_file, {"scheduler": {"AGING_INTERVAL": 5}})
+    config = RuntimeConfig(str(config_file), {})
+    config.load()
+
+    write_config(config_file, {"scheduler": {"AGING_INTERVAL": 0}})
+    config.reload_if_changed()
+
+    assert SchedulerConfig.AGING_INTERVAL == 5
+
+
+def test_reload_applies_changes_and_notifies_subscribers(tmp_path):
+    config_file = tmp_path / "config.json"
+    write_config(config_file, {})
+    config = RuntimeConfig(str(config_file), {})
+    config.load()
+    notified = []
+    config.subscribe(notified.append)
+
+    write_config(config_file, {"scheduler": {"AGING_INTERVAL": 30}})
+    assert config.reload_if_changed() == {"scheduler.AGING_INTERVAL"}
+    assert SchedulerConfig.AGING_INTERVAL == 30
+    assert notified == [{"scheduler.AGING_INTERVAL"}]
+
+    # Unchanged file: nothing to do
+    assert config.reload_if_changed() == set()
+    assert config.reload_count == 1
+
+    # Setting removed from the file: back to the default
+    write_config(config_file, {})
+    config.reload_if_changed()
+    assert SchedulerConfig.AGING_INTERVAL == 60
+
+
+def test_restart_only_sections_apply_at_startup_only(tmp_path):
+    config_file = tmp_path / "config.json"
+    write_config(config_file, {"ipc": {"MODE": "instance"}})
+    config = RuntimeConfig(str(config_file), {})
+
+    assert "ipc.MODE" in config.load()
+    assert IpcConfig.MODE == "instance"
+
+    write_config(config_file, {"ipc": {"MODE": "workspace"}, "timeouts": {"CHAT_RESPONSE": 123}})
+    changed = config.reload_if_changed()
+
+    assert changed == {"timeouts.CHAT_RESPONSE"}
+    assert IpcConfig.MODE == "instance"
+
+
+def test_invalid_file_keeps_current_settings(tmp_path):
+    config_file = tmp_path / "config.json"
+    write_config(config_file, {"timeouts": {"CHAT_RESPONSE": 100}})
+    config = RuntimeConfig(str(config_file), {})
+    config.load()
+
+    config_file.write_text("{not json")
+    os.utime(config_file, ns=(1, 1))
+    assert config.reload_if_changed() == set()
+    assert TimeoutConfig.CHAT_RESPONSE == 100
+    assert config.error_count == 1
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import os
+
+import cursor_enhancer_stats
+from src.config.constants import FilePatterns, IpcConfig, StatsConfig
+from src.managers.ipc_sweeper import IpcSweeper
+from src.managers.popup_scheduler import PopupScheduler
+from src.managers.ticket_manager import TicketManager
+from src.services.stats_collector import MAX_TOOL_NAMES, OTHER_TOOLS, StatsCollector
+from src.utils.io_executor import IoExecutor
+from src.utils.loop_lag_monitor import LoopLagMonitor
+
+
+def new_collector(ipc_dir: str) -> StatsCollector:
+    executor = IoExecutor()
+    sweeper = IpcSweeper(executor, ipc_dir)
+    return StatsCollector(executor, LoopLagMonitor(), sweeper, PopupScheduler(), TicketManager(), {"ipc_sweeper": sweeper})
+
+
+def test_snapshot_covers_every_section(ipc_dir):
+    for name in (f"{FilePatterns.ACK_PREFIX}_t1.json", f"{FilePatterns.ACK_PREFIX}_t2.json", "cursor_enhancer_misc", "foreign.txt"):
+        with open(os.path.join(ipc_dir, name), "w") as f:
+            f.write("data")
+    collector = new_collector(ipc_dir)
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        collector.record_call("cursor_enhancer_chat", seconds)
+
+    snapshot = asyncio.run(collector.collect())
+
+    assert snapshot["pid"] == os.getpid()
+    assert snapshot["in_flight"] == {"popups": [], "tickets": []}
+    assert snapshot["latency_ms"]["cursor_enhancer_chat"] == {"calls": 4, "p50": 300, "p90": 400, "p99": 400, "max": 400}
+    ipc = snapshot["ipc_dir"]
+    assert (ipc["path"], ipc["files"], ipc["bytes"], ipc["truncated"]) == (ipc_dir, 3, 12, False)
+    assert ipc["by_class"] == {"ack": {"files": 2, "bytes": 8}, "other": {"files": 1, "bytes": 4}}
+    assert "rss_bytes" in snapshot["memory"] or "peak_rss_bytes" in snapshot["memory"]
+    assert snapshot["components"]["ipc_sweeper"]["passes"] == 0
+    json.dumps(snapshot)  # written as JSON for the CLI
+
+
+def test_ipc_scan_is_reused_and_bounded(ipc_dir):
+    StatsConfig.IPC_SCAN_MAX_ENTRIES = 2
+    for i in range(3):
+        open(os.path.join(ipc_dir, f"{FilePatterns.ACK_PREFIX}_{i}.json"), "w").close()
+    collector = new_collector(ipc_dir)
+
+    async def main():
+        first = await collector.collect()
+        second = await collector.collect()
+        return first, second, collector.io_executor.get_stats()["operations"]["scan_ipc_dir"]["calls"]
+
+    first, second, scans = asyncio.run(main())
+    assert first["ipc_dir"]["truncated"]
+    assert second["ipc_dir"]["files"] == first["ipc_dir"]["files"] == 2
+    assert scans == 1
+
+
+def test_unknown_tool_names_share_one_latency_entry(ipc_dir):
+    collector = new_collector(ipc_dir)
+    for i in range(MAX_TOOL_NAMES + 5):
+        collector.record_call(f"tool_{i}", 0.01)
+
+    latency = collector._latency_stats()
+    assert len(latency) == MAX_TOOL_NAMES + 1
+    assert latency[OTHER_TOOLS]["calls"] == 5
+
+
+def test_cli_reads_and_summarizes_the_snapshot(ipc_dir, monkeypatch):
+    collector = new_collector(ipc_dir)
+    collector.record_call("cursor_enhancer_chat", 0.25)
+    asyncio.run(collector._write_snapshot())
+    assert os.stat(collector.snapshot_file).st_mode & 0o777 == 0o600
+    monkeypatch.setattr(cursor_enhancer_stats, "ipc_dirs", lambda: [ipc_dir])
+
+    (snapshot,) = cursor_enhancer_stats.load_snapshots()
+    summary = cursor_enhancer_stats.summarize(snapshot)
+
+    assert snapshot["running"]
+    assert summary.startswith(f"Server pid {os.getpid()} (running")
+    assert "In flight: 0 popup(s), 0 ticket(s)" in summary
+    assert "cursor_enhancer_chat: 1 calls, p50 250ms" in summary
+
+    collector.stop()
+    assert cursor_enhancer_stats.load_snapshots() == []
+
+
+def test_cli_finds_private_ipc_dirs_through_the_registry(tmp_path):
+    IpcConfig.BASE_DIR = str(tmp_path)
+    registry_dir = tmp_path / IpcConfig.REGISTRY_DIR
+    registry_dir.mkdir()
+    (registry_dir / "1.json").write_text(json.dumps({"ipc_dir": str(tmp_path / "ws-1")}))
+    (registry_dir / "2.json").write_text("not json")
+
+    assert cursor_enhancer_stats.ipc_dirs() == ["/tmp", os.path.realpath(tmp_path / "ws-1")]
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from src.config.constants import ReviewStage, TicketConfig
+from src.managers.ticket_manager import TicketManager
+from src.utils.file_operations import new_trigger_id
+
+
+def test_ticket_is_collected_once_finished():
+    async def main():
+        manager = TicketManager()
+        release = asyncio.Event()
+
+        async def review(ticket):
+            ticket.set_status(ReviewStage.TRIGGERED)
+            await release.wait()
+            return "looks good"
+
+        ticket = manager.create("review_1", "key", "summary", review)
+        early = await manager.wait(ticket, 0.01)
+        pending = manager.find_pending("key")
+        release.set()
+        finished = await manager.wait(ticket, 1)
+        return ticket, early, pending, finished, manager.collect(ticket), manager.get("review_1")
+
+    ticket, early, pending, finished, result, after = asyncio.run(main())
+    assert not early
+    assert pending is ticket
+    assert finished
+    assert ticket.status == ReviewStage.ANSWERED
+    assert ticket.triggered.is_set()
+    assert result == "looks good"
+    assert after is None
+
+
+def test_failed_ticket_raises_on_collect():
+    async def main():
+        manager = TicketManager()
+
+        async def review(ticket):
+            raise OSError("popup failed")
+
+        ticket = manager.create("review_1", "key", "summary", review)
+        await manager.wait(ticket, 1)
+        return manager, ticket
+
+    manager, ticket = asyncio.run(main())
+    assert ticket.status == ReviewStage.ERROR
+    with pytest.raises(OSError, match="popup failed"):
+        manager.collect(ticket)
+
+
+def test_duplicate_ticket_id_is_refused():
+    async def main():
+        manager = TicketManager()
+        never = asyncio.Event()
+        first = manager.create("review_1", "a", "first", lambda ticket: never.wait())
+        with pytest.raises(ValueError, match="already exists"):
+            manager.create("review_1", "b", "second", lambda ticket: never.wait())
+        kept = manager.get("review_1")
+        first.task.cancel()
+        return first, kept
+
+    first, kept = asyncio.run(main())
+    assert kept is first
+
+
+def test_concurrent_tickets_get_distinct_ids():
+    TicketConfig.MAX_PENDING = 100
+
+    async def main():
+        manager = TicketManager()
+        never = asyncio.Event()
+        # Created within the same millisecond, which a timestamp id could not tell apart
+        tickets = [manager.create(new_trigger_id("review"), str(i), "", lambda ticket: never.wait()) for i in range(50)]
+        listed = manager.list_tickets()
+        for ticket in tickets:
+            ticket.task.cancel()
+        return tickets, listed
+
+    tickets, listed = asyncio.run(main())
+    assert len({ticket.ticket_id for ticket in tickets}) == 50
+    assert len(listed) == 50
+    assert all(ticket.ticket_id.startswith("review_") for ticket in tickets)
+
+
+def test_pending_tickets_are_limited():
+    TicketConfig.MAX_PENDING = 1
+
+    async def main():
+        manager = TicketManager()
+        never = asyncio.Event()
+        first = manager.create("review_1", "a", "", lambda ticket: never.wait())
+        with pytest.raises(RuntimeError, match="too many pending"):
+            manager.create("review_2", "b", "", lambda ticket: never.wait())
+        first.task.cancel()
+
+    asyncio.run(main())
+
+
+def test_uncollected_results_expire():
+    TicketConfig.RESULT_TTL = 60
+
+    async def main():
+        manager = TicketManager()
+
+        async def review(ticket):
+            return "answer"
+
+        old = manager.create("review_old", "a", "", review)
+        fresh = manager.create("review_fresh", "b", "", review)
+        await manager.wait(old, 1)
+        await manager.wait(fresh, 1)
+        old.completed_at -= 61
+        return [ticket.ticket_id for ticket in manager.list_tickets()]
+
+    assert asyncio.run(main()) == ["review_fresh"]
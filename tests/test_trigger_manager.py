@@ -0,0 +1,148 @@
+import asyncio
+import gzip
+import hashlib
+import inspect
+import json
+import os
+
+import pytest
+
+from src.config.constants import FilePatterns, ReviewStage, TriggerConfig
+from src.managers.trigger_manager import TriggerManager
+from src.services.tool_executor import ToolExecutor
+from src.utils.io_executor import IoExecutor
+
+
+def write(ipc_dir: str, name: str, data: dict) -> str:
+    path = os.path.join(ipc_dir, name)
+    with open(path, "w") as f:
+        json.dump(data, f)
+    return path
+
+
+def cancel(trigger_id: str) -> TriggerManager:
+    async def main():
+        manager = TriggerManager(None, IoExecutor())
+        manager.cancel_trigger(trigger_id)
+        await asyncio.gather(*manager._tasks)
+        return manager
+
+    return asyncio.run(main())
+
+
+def test_shared_files_are_only_removed_while_they_carry_the_trigger(ipc_dir):
+    ours = write(ipc_dir, f"{FilePatterns.TRIGGER_PREFIX}.json", {"data": {"trigger_id": "t1"}})
+    backup = write(ipc_dir, f"{FilePatterns.TRIGGER_PREFIX}_0.json", {"data": {"trigger_id": "t1"}})
+    # Already overwritten by the next call's trigger and answer
+    theirs = write(ipc_dir, f"{FilePatterns.TRIGGER_PREFIX}_1.json", {"data": {"trigger_id": "t2"}})
+    answer = write(ipc_dir, f"{FilePatterns.RESPONSE_PREFIX}.json", {"trigger_id": "t2", "user_input": "hi"})
+
+    cancel("t1")
+
+    assert not os.path.exists(ours) and not os.path.exists(backup)
+    assert os.path.exists(theirs) and os.path.exists(answer)
+
+
+def test_cancel_signal_names_the_trigger(ipc_dir):
+    cancel("t1")
+    with open(os.path.join(ipc_dir, f"{FilePatterns.CANCEL_PREFIX}_t1.json")) as f:
+        assert json.load(f)["trigger_id"] == "t1"
+
+
+def test_small_context_stays_inline(ipc_dir):
+    data = {"trigger_id": "t1", "context": "x" * TriggerConfig.CONTEXT_SPILL_BYTES}
+    assert TriggerManager(None, IoExecutor())._spill_context(data) is data
+    assert os.listdir(ipc_dir) == []
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_large_context_is_spilled_once_by_content(ipc_dir, compress):
+    TriggerConfig.CONTEXT_SPILL_BYTES = 10
+    TriggerConfig.CONTEXT_COMPRESS = compress
+    context = "line\n" * 100
+    digest = hashlib.sha256(context.encode()).hexdigest()
+    manager = TriggerManager(None, IoExecutor())
+
+    first = manager._spill_context({"trigger_id": "t1", "context": context})
+    second = manager._spill_context({"trigger_id": "t2", "context": context})
+
+    ref = first["context_ref"]
+    assert "context" not in first
+    assert ref == second["context_ref"]
+    assert (ref["sha256"], ref["size"], ref["encoding"]) == (digest, len(context), "gzip" if compress else "identity")
+    assert os.listdir(ipc_dir) == [ref["file"]]
+    with open(os.path.join(ipc_dir, ref["file"]), "rb") as f:
+        body = f.read()
+    assert (gzip.decompress(body) if compress else body) == context.encode()
+    assert manager.spilled_count == 1
+
+
+def test_foreign_file_under_the_context_name_is_replaced(ipc_dir):
+    TriggerConfig.CONTEXT_SPILL_BYTES = 10
+    context = "y" * 100
+    name = f"{FilePatterns.CONTEXT_PREFIX}_{hashlib.sha256(context.encode()).hexdigest()}.txt"
+    os.symlink("/dev/null", os.path.join(ipc_dir, name))
+
+    TriggerManager(None, IoExecutor())._spill_context({"context": context})
+
+    path = os.path.join(ipc_dir, name)
+    assert not os.path.islink(path)
+    with open(path) as f:
+        assert f.read() == context
+
+
+class RecordingJournal:
+    def __init__(self, closed: bool = False):
+        self.closed = closed
+        self.events = []
+
+    def record(self, event, trigger_id, **fields):
+        self.events.append((event, trigger_id))
+
+
+class RecordingTriggers:
+    def __init__(self):
+        self.cancelled = []
+
+    def cancel_trigger(self, trigger_id):
+        self.cancelled.append(trigger_id)
+
+
+def run_cancelled_popup(journal: RecordingJournal) -> tuple[RecordingTriggers, list[str]]:
+    triggers = RecordingTriggers()
+    components = dict.fromkeys(inspect.signature(ToolExecutor).parameters)
+    executor = ToolExecutor(**{**components, "trigger_manager": triggers, "review_journal": journal})
+    stages = []
+
+    async def never_answered(*args):
+        await asyncio.Event().wait()
+
+    executor._trigger_and_wait = never_answered
+
+    async def main():
+        call = asyncio.create_task(executor._run_chat_popup("t1", "msg", "title", "", "default", False, stages.append))
+        await asyncio.sleep(0)
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+        return call
+
+    assert asyncio.run(main()).cancelled()
+    return triggers, stages
+
+
+def test_client_cancellation_tears_the_popup_down():
+    journal = RecordingJournal()
+    triggers, stages = run_cancelled_popup(journal)
+
+    assert triggers.cancelled == ["t1"]
+    assert stages == [ReviewStage.CANCELLED]
+    assert journal.events == [(ReviewStage.CANCELLED, "t1")]
+
+
+def test_shutdown_leaves_the_popup_for_the_next_server():
+    journal = RecordingJournal(closed=True)
+    triggers, stages = run_cancelled_popup(journal)
+
+    assert triggers.cancelled == []
+    assert stages == []
+    assert journal.events == []
@@ -0,0 +1,138 @@
+import hashlib
+import os
+
+import pytest
+
+from src.config.constants import FileReviewConfig
+from src.utils import workspace_file_cache
+from src.utils.workspace_file_cache import WorkspaceFileCache, _count_lines, _cut, _line_offset
+
+
+def reference_line_offset(data: bytes, line: int) -> int:
+    offset = 0
+    for _ in range(line - 1):
+        newline = data.find(b"\n", offset)
+        if newline < 0:
+            return len(data)
+        offset = newline + 1
+    return offset
+
+
+SAMPLES = [b"", b"\n", b"a", b"a\n", b"a\nb", b"a\nb\n", b"\n\n\n", b"one\ntwo\n\nfour\nfive", b"x" * 10 + b"\n" + b"y" * 10]
+
+
+@pytest.mark.parametrize("chunk", [1, 2, 3, 4, 1024])
+@pytest.mark.parametrize("data", SAMPLES)
+def test_line_offset_matches_a_line_by_line_scan(monkeypatch, data, chunk):
+    # Small chunks make lines straddle chunk boundaries
+    monkeypatch.setattr(workspace_file_cache, "_CHUNK", chunk)
+    for line in range(1, data.count(b"\n") + 4):
+        assert _line_offset(data, line) == reference_line_offset(data, line), line
+
+
+@pytest.mark.parametrize("chunk", [1, 3, 1024])
+@pytest.mark.parametrize("data", SAMPLES)
+def test_count_lines_counts_an_unterminated_last_line(monkeypatch, data, chunk):
+    monkeypatch.setattr(workspace_file_cache, "_CHUNK", chunk)
+    assert _count_lines(data) == len(data.splitlines())
+
+
+@pytest.mark.parametrize(
+    "raw, max_bytes, expected",
+    [
+        (b"abc\ndef\n", 100, (b"abc\ndef\n", False)),
+        (b"abc\ndef\n", 8, (b"abc\ndef\n", False)),
+        (b"abc\ndef\n", 7, (b"abc\n", True)),
+        (b"abc\ndef\n", 4, (b"abc\n", True)),
+        (b"abc\ndef\n", 3, (b"abc", True)),
+        (b"abcdef", 2, (b"ab", True)),
+        (b"", 0, (b"", False)),
+    ],
+)
+def test_cut_ends_at_a_line_break_inside_the_limit(raw, max_bytes, expected):
+    assert _cut(raw, max_bytes) == expected
+
+
+@pytest.fixture
+def text_file(tmp_path):
+    path = tmp_path / "file.py"
+    path.write_bytes(b"".join(f"line {i}\n".encode() for i in range(1, 11)))
+    return str(path)
+
+
+def test_excerpt_reports_the_digest(text_file):
+    excerpt = WorkspaceFileCache().excerpt(text_file)
+    data = open(text_file, "rb").read()
+
+    assert (excerpt.size, excerpt.lines, excerpt.sha256) == (len(data), 10, hashlib.sha256(data).hexdigest())
+    assert excerpt.text is None
+
+
+def test_excerpt_returns_the_line_range(text_file):
+    excerpt = WorkspaceFileCache().excerpt(text_file, 3, 5, max_bytes=1000)
+
+    assert excerpt.text == "line 3\nline 4\nline 5\n"
+    assert (excerpt.start_line, excerpt.end_line, excerpt.truncated) == (3, 5, False)
+
+
+def test_excerpt_range_past_the_end(text_file):
+    cache = WorkspaceFileCache()
+
+    assert cache.excerpt(text_file, 9, 50, max_bytes=1000).text == "line 9\nline 10\n"
+    empty = cache.excerpt(text_file, 20, None, max_bytes=1000)
+    assert (empty.text, empty.end_line) == ("", 19)
+
+
+def test_excerpt_is_cut_at_max_bytes(text_file):
+    excerpt = WorkspaceFileCache().excerpt(text_file, 1, None, max_bytes=16)
+
+    assert excerpt.text == "line 1\nline 2\n"
+    assert (excerpt.end_line, excerpt.truncated) == (2, True)
+
+
+def test_unchanged_file_is_read_once(text_file):
+    cache = WorkspaceFileCache()
+    first = cache.excerpt(text_file, 2, 2, max_bytes=100)
+    second = cache.excerpt(text_file, 2, 2, max_bytes=100)
+
+    assert first.text == second.text == "line 2\n"
+    assert (cache.misses, cache.hits) == (1, 1)
+
+    with open(text_file, "ab") as f:
+        f.write(b"line 11\n")
+    assert cache.excerpt(text_file).lines == 11
+    assert cache.misses == 2
+
+
+def test_large_file_excerpt_is_read_from_the_mapping(text_file):
+    FileReviewConfig.MAX_FILE_BYTES = 10
+    cache = WorkspaceFileCache()
+    cache.excerpt(text_file)
+
+    excerpt = cache.excerpt(text_file, 10, 10, max_bytes=100)
+
+    assert excerpt.text == "line 10\n"
+    assert cache.get_stats()["cached_bytes"] == 0
+
+
+def test_binary_file_has_no_text(tmp_path):
+    path = tmp_path / "image.bin"
+    path.write_bytes(b"\x89PNG\0\0\0\ndata")
+
+    excerpt = WorkspaceFileCache().excerpt(str(path), max_bytes=100)
+
+    assert excerpt.binary and excerpt.text is None
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+
+    excerpt = WorkspaceFileCache().excerpt(str(path), max_bytes=100)
+
+    assert (excerpt.size, excerpt.lines, excerpt.text) == (0, 0, "")
+
+
+def test_missing_file_raises(tmp_path):
+    with pytest.raises(OSError):
+        WorkspaceFileCache().excerpt(os.path.join(tmp_path, "missing.txt"))
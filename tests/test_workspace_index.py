@@ -0,0 +1,252 @@
+import asyncio
+import re
+import threading
+
+import pytest
+
+from src.config.constants import WorkspaceIndexConfig
+from src.managers.workspace_index import IgnoreRules, WorkspaceIndex, WorkspaceIndexRegistry, glob_to_regex
+from src.utils.io_executor import IoExecutor
+
+
+@pytest.mark.parametrize(
+    "pattern, matches, non_matches",
+    [
+        ("*.py", ["a.py", ".py"], ["a/b.py", "a.pyc"]),
+        ("a?c", ["abc"], ["ac", "a/c"]),
+        ("**/build", ["build", "x/build", "x/y/build"], ["xbuild"]),
+        ("docs/**", ["docs/a", "docs/a/b"], ["docs", "other/docs/a"]),
+        ("a/**/b", ["a/b", "a/x/b", "a/x/y/b"], ["a/xb"]),
+        ("[abc].txt", ["a.txt", "c.txt"], ["d.txt", "ab.txt"]),
+        ("[!abc].txt", ["d.txt"], ["a.txt"]),
+        ("\\*.txt", ["*.txt"], ["a.txt"]),
+        ("file(1).txt", ["file(1).txt"], ["file1.txt"]),
+    ],
+)
+def test_glob_to_regex(pattern, matches, non_matches):
+    regex = re.compile(glob_to_regex(pattern))
+    for path in matches:
+        assert regex.fullmatch(path), path
+    for path in non_matches:
+        assert not regex.fullmatch(path), path
+
+
+@pytest.mark.parametrize(
+    "lines, path, is_dir, expected",
+    [
+        (["*.log"], "debug.log", False, True),
+        (["*.log"], "logs/debug.log", False, True),  # no slash: matches at any depth
+        (["/debug.log"], "logs/debug.log", False, None),  # leading slash: this directory only
+        (["logs/*.log"], "logs/debug.log", False, True),
+        (["logs/*.log"], "sub/logs/debug.log", False, None),  # inner slash anchors too
+        (["build/"], "build", True, True),
+        (["build/"], "build", False, None),  # directory-only pattern
+        (["*.log", "!keep.log"], "keep.log", False, False),
+        (["!keep.log", "*.log"], "keep.log", False, True),  # the last matching rule wins
+        (["# comment", "", "   "], "anything", False, None),
+        (["trailing.txt   "], "trailing.txt", False, True),
+        (["windows.txt\r\n"], "windows.txt", False, True),
+    ],
+)
+def test_ignore_rules(lines, path, is_dir, expected):
+    assert IgnoreRules(lines).match(path, is_dir) is expected
+
+
+def make_tree(root, files: dict[str, str]) -> None:
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+async def built_index(root) -> WorkspaceIndex:
+    index = WorkspaceIndex(IoExecutor(), str(root))
+    task = asyncio.create_task(index.run())
+    assert await index.wait_ready(10)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    return index
+
+
+def indexed_files(root) -> list[str]:
+    async def main():
+        index = await built_index(root)
+        return index.query(["*"], 1000)[0]
+
+    return asyncio.run(main())
+
+
+def test_build_honours_nested_gitignores(tmp_path):
+    WorkspaceIndexConfig.WATCH = False
+    make_tree(
+        tmp_path,
+        {
+            ".gitignore": "*.log\nbuild/\n/top_only.txt\n",
+            "app.py": "",
+            "debug.log": "",
+            "top_only.txt": "",
+            "build/out.py": "",
+            "src/main.py": "",
+            "src/top_only.txt": "",
+            "src/trace.log": "",
+            "src/.gitignore": "!trace.log\ngenerated/\n",
+            "src/generated/code.py": "",
+            ".git/config": "",
+            ".git/info/exclude": "secret.txt\n",
+            "secret.txt": "",
+        },
+    )
+
+    assert indexed_files(tmp_path) == [
+        ".gitignore",
+        "app.py",
+        "src/.gitignore",
+        "src/main.py",
+        "src/top_only.txt",
+        "src/trace.log",
+    ]
+
+
+def test_gitignore_can_be_switched_off(tmp_path):
+    WorkspaceIndexConfig.WATCH = False
+    WorkspaceIndexConfig.RESPECT_GITIGNORE = False
+    make_tree(tmp_path, {".gitignore": "*.log\n", "debug.log": "", "app.py": ""})
+
+    assert indexed_files(tmp_path) == [".gitignore", "app.py", "debug.log"]
+
+
+def test_query_by_extension_and_glob(tmp_path):
+    WorkspaceIndexConfig.WATCH = False
+    make_tree(tmp_path, {"a.py": "", "b.PY": "", "c.js": "", "lib/d.py": "", "lib/readme.md": "", "Makefile": ""})
+
+    async def main():
+        index = await built_index(tmp_path)
+        return {
+            "py": index.query(["py"], 100),
+            "dotted": index.query([".js", "*.md"], 100),
+            "glob": index.query(["lib/*"], 100),
+            "name": index.query(["Make*"], 100),
+            "limited": index.query(["*"], 2),
+        }
+
+    results = asyncio.run(main())
+    assert results["py"] == (["a.py", "b.PY", "lib/d.py"], 3)
+    assert results["dotted"] == (["c.js", "lib/readme.md"], 2)
+    assert results["glob"] == (["lib/d.py", "lib/readme.md"], 2)
+    assert results["name"] == (["Makefile"], 1)
+    assert results["limited"] == (["Makefile", "a.py"], 6)
+
+
+def test_resolve_stays_inside_the_root(tmp_path):
+    index = WorkspaceIndex(IoExecutor(), str(tmp_path))
+
+    assert index.resolve("src/main.py") == str(tmp_path.resolve() / "src" / "main.py")
+    assert index.resolve("../outside.py") is None
+    assert index.resolve("") is None
+    assert WorkspaceIndex(IoExecutor(), "/").resolve("etc/hostname") == "/etc/hostname"
+
+
+def test_watched_index_follows_changes_and_gitignore(tmp_path):
+    WorkspaceIndexConfig.REBUILD_DELAY = 0.05
+    make_tree(tmp_path, {".gitignore": "*.log\n", "app.py": ""})
+
+    async def main():
+        index = WorkspaceIndex(IoExecutor(), str(tmp_path))
+        walk_threads = set()
+        walk = index._walk
+        index._walk = lambda snapshot, top: (walk_threads.add(threading.get_ident()), walk(snapshot, top))
+        task = asyncio.create_task(index.run())
+        await index.wait_ready(10)
+        if index.backend != "inotify":
+            task.cancel()
+            pytest.skip("inotify is not available")
+        (tmp_path / "new.py").write_text("")
+        (tmp_path / "new.log").write_text("")
+        (tmp_path / "pkg").mkdir()
+        (tmp_path / "pkg" / "mod.py").write_text("")
+        (tmp_path / "app.py").unlink()
+        for _ in range(100):
+            files = index.query(["*"], 100)[0]
+            if "pkg/mod.py" in files and "app.py" not in files:
+                break
+            await asyncio.sleep(0.02)
+        builds = index.builds
+        (tmp_path / "ignored.log").mkdir()
+        (tmp_path / "nested").mkdir()
+        (tmp_path / "nested" / ".gitignore").write_text("*.tmp\n")
+        (tmp_path / "nested" / "a.tmp").write_text("")
+        (tmp_path / "nested" / "b.py").write_text("")
+        for _ in range(100):
+            files = index.query(["*"], 100)[0]
+            if "nested/b.py" in files and "nested/a.tmp" not in files:
+                break
+            await asyncio.sleep(0.02)
+        rebuilds = index.builds - builds
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return files, rebuilds, walk_threads, index.watch_budget.used
+
+    files, rebuilds, walk_threads, watches = asyncio.run(main())
+    assert files == [".gitignore", "nested/.gitignore", "nested/b.py", "new.py", "pkg/mod.py"]
+    # The burst of directory changes was taken as one rebuild, on a worker thread
+    assert rebuilds == 1
+    assert threading.get_ident() not in walk_threads
+    assert watches == 0
+
+
+def test_cancelled_build_gives_its_watches_back(tmp_path):
+    (tmp_path / "pkg").mkdir()
+
+    async def main():
+        index = WorkspaceIndex(IoExecutor(), str(tmp_path))
+        walking, release = threading.Event(), threading.Event()
+        built = []
+        build = index._build
+
+        def slow_build():
+            walking.set()
+            release.wait(10)
+            built.append(build())
+            return built[-1]
+
+        index._build = slow_build
+        task = asyncio.create_task(index.run())
+        await asyncio.to_thread(walking.wait, 10)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        release.set()
+        for _ in range(100):
+            if built and built[0].inotify_fd < 0:
+                break
+            await asyncio.sleep(0.02)
+        return built[0], index.watch_budget.used
+
+    snapshot, watches = asyncio.run(main())
+    assert snapshot.inotify_fd == -1
+    assert not snapshot.watches
+    assert watches == 0
+
+
+def test_registry_keeps_one_index_per_root(tmp_path):
+    WorkspaceIndexConfig.WATCH = False
+    WorkspaceIndexConfig.MAX_ROOTS = 2
+    roots = [tmp_path / name for name in ("a", "b", "c")]
+    for root in roots:
+        root.mkdir()
+
+    async def main():
+        registry = WorkspaceIndexRegistry(IoExecutor())
+        first = registry.get(str(roots[0]))
+        same = registry.get(str(roots[0]) + "/")
+        registry.get(str(roots[1]))
+        registry.get(str(roots[2]))
+        missing = registry.get(str(tmp_path / "missing"))
+        stats = registry.get_stats()
+        registry.stop()
+        return first, same, missing, stats
+
+    first, same, missing, stats = asyncio.run(main())
+    assert first is same
+    assert missing is None
+    # The least recently used root was dropped
+    assert sorted(stats["roots"]) == [str(roots[1].resolve()), str(roots[2].resolve())]